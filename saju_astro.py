@@ -0,0 +1,393 @@
+# 절기 천문 계산 모듈 (네트워크/외부 데이터 없이 임의 연도의 24절기 절입 시각 생성)
+# 태양 겉보기 황경(VSOP87 지구 급수 축약판 + FK5 보정 + 장동 + 광행차)이 15°의 배수가 되는 순간을
+# 뉴턴 반복으로 구하고, ΔT(Espenak-Meeus 다항식)를 빼서 UTC+9 기준 시각으로 반환합니다.
+# 사용:
+#   python saju_astro.py --start 1800 --end 2200 --out terms.csv   # 엔진용 절기표 CSV 생성
+#   python saju_astro.py --validate                                # 동봉된 CSV/엑셀과 비교 (원본 오류가 있으면 종료 코드 1)
+#   python saju_astro.py --check                                   # 1954~1961년 표준시 구간 앞뒤 명식을 엔진 절기표와 비교
+# 필요 패키지: numpy (검증 시 엑셀 비교에는 pandas openpyxl)
+
+import argparse
+import csv
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# ───────────────────────────────
+# 절기 정의 및 계산 범위
+# ───────────────────────────────
+# 양력 한 해 안의 순서 (소한 ~ 동지) 와 태양 황경(도)
+SOLAR_TERMS = [
+    ("소한", 285), ("대한", 300), ("입춘", 315), ("우수", 330), ("경칩", 345), ("춘분", 0),
+    ("청명", 15), ("곡우", 30), ("입하", 45), ("소만", 60), ("망종", 75), ("하지", 90),
+    ("소서", 105), ("대서", 120), ("입추", 135), ("처서", 150), ("백로", 165), ("추분", 180),
+    ("한로", 195), ("상강", 210), ("입동", 225), ("소설", 240), ("대설", 255), ("동지", 270),
+]
+TERM_NAMES = [name for name, _ in SOLAR_TERMS]
+TERM_LONGITUDES = np.array([lon for _, lon in SOLAR_TERMS], dtype=np.float64)
+MONTH_TERM_NAMES = TERM_NAMES[0::2] # 월주 경계가 되는 12절 (소한, 입춘, 경칩, ...)
+
+SUPPORTED_YEAR_RANGE = (1000, 3000) # ΔT 다항식 적용 범위 안에서만 허용 (1600년 이전은 ΔT 오차가 수 분 이상)
+DEFAULT_YEAR_RANGE = (1800, 2200)   # UI에서 엑셀 데이터를 보충/확장할 기본 범위
+KST_OFFSET_DAYS = 9 / 24.0
+J2000 = 2451545.0
+NEWTON_ITERATIONS = 6
+
+# ───────────────────────────────
+# VSOP87 지구 일심 황경 L, 동경 벡터 R 급수 (Meeus, Astronomical Algorithms 부록 축약판)
+# 각 항: (A, B, C) -> A * cos(B + C * τ), τ = J2000 기준 율리우스 천년, 단위 1e-8
+# ───────────────────────────────
+_L0 = [
+    (175347046, 0, 0), (3341656, 4.6692568, 6283.07585), (34894, 4.6261, 12566.1517),
+    (3497, 2.7441, 5753.3849), (3418, 2.8289, 3.5231), (3136, 3.6277, 77713.7715),
+    (2676, 4.4181, 7860.4194), (2343, 6.1352, 3930.2097), (1324, 0.7425, 11506.7698),
+    (1273, 2.0371, 529.691), (1199, 1.1096, 1577.3435), (990, 5.233, 5884.927),
+    (902, 2.045, 26.298), (857, 3.508, 398.149), (780, 1.179, 5223.694),
+    (753, 2.533, 5507.553), (505, 4.583, 18849.228), (492, 4.205, 775.523),
+    (357, 2.92, 0.067), (317, 5.849, 11790.629), (284, 1.899, 796.298),
+    (271, 0.315, 10977.079), (243, 0.345, 5486.778), (206, 4.806, 2544.314),
+    (205, 1.869, 5573.143), (202, 2.458, 6069.777), (156, 0.833, 213.299),
+    (132, 3.411, 2942.463), (126, 1.083, 20.775), (115, 0.645, 0.98),
+    (103, 0.636, 4694.003), (102, 0.976, 15720.839), (102, 4.267, 7.114),
+    (99, 6.21, 2146.17), (98, 0.68, 155.42), (86, 5.98, 161000.69),
+    (85, 1.3, 6275.96), (85, 3.67, 71430.7), (80, 1.81, 17260.15),
+    (79, 3.04, 12036.46), (75, 1.76, 5088.63), (74, 3.5, 3154.69),
+    (74, 4.68, 801.82), (70, 0.83, 9437.76), (62, 3.98, 8827.39),
+    (61, 1.82, 7084.9), (57, 2.78, 6286.6), (56, 4.39, 14143.5),
+    (56, 3.47, 6279.55), (52, 0.19, 12139.55), (52, 1.33, 1748.02),
+    (51, 0.28, 5856.48), (49, 0.49, 1194.45), (41, 5.37, 8429.24),
+    (41, 2.4, 19651.05), (39, 6.17, 10447.39), (37, 6.04, 10213.29),
+    (37, 2.57, 1059.38), (36, 1.71, 2352.87), (36, 1.78, 6812.77),
+    (33, 0.59, 17789.85), (30, 0.44, 83996.85), (30, 2.74, 1349.87),
+    (25, 3.16, 4690.48),
+]
+_L1 = [
+    (628331966747, 0, 0), (206059, 2.678235, 6283.07585), (4303, 2.6351, 12566.1517),
+    (425, 1.59, 3.523), (119, 5.796, 26.298), (109, 2.966, 1577.344),
+    (93, 2.59, 18849.23), (72, 1.14, 529.69), (68, 1.87, 398.15),
+    (67, 4.41, 5507.55), (59, 2.89, 5223.69), (56, 2.17, 155.42),
+    (45, 0.4, 796.3), (36, 0.47, 775.52), (29, 2.65, 7.11),
+    (21, 5.34, 0.98), (19, 1.85, 5486.78), (19, 4.97, 213.3),
+    (17, 2.99, 6275.96), (16, 0.03, 2544.31), (16, 1.43, 2146.17),
+    (15, 1.21, 10977.08), (12, 2.83, 1748.02), (12, 3.26, 5088.63),
+    (12, 5.27, 1194.45), (12, 2.08, 4694.0), (11, 0.77, 553.57),
+    (10, 1.3, 6286.6), (10, 4.24, 1349.87), (9, 2.7, 242.73),
+    (9, 5.64, 951.72), (8, 5.3, 2352.87), (6, 2.65, 9437.76),
+    (6, 4.67, 4690.48),
+]
+_L2 = [
+    (52919, 0, 0), (8720, 1.0721, 6283.0758), (309, 0.867, 12566.152),
+    (27, 0.05, 3.52), (16, 5.19, 26.3), (16, 3.68, 155.42),
+    (10, 0.76, 18849.23), (9, 2.06, 77713.77), (7, 0.83, 775.52),
+    (5, 4.66, 1577.34), (4, 1.03, 7.11), (4, 3.44, 5573.14),
+    (3, 5.14, 796.3), (3, 6.05, 5507.55), (3, 1.19, 242.73),
+    (3, 6.12, 529.69), (3, 0.31, 398.15), (3, 2.28, 553.57),
+    (2, 4.38, 5223.69), (2, 3.75, 0.98),
+]
+_L3 = [
+    (289, 5.844, 6283.076), (35, 0, 0), (17, 5.49, 12566.15),
+    (3, 5.2, 155.42), (1, 4.72, 3.52), (1, 5.3, 18849.23), (1, 5.97, 242.73),
+]
+_L4 = [(114, 3.142, 0), (8, 4.13, 6283.08), (1, 3.84, 12566.15)]
+_L5 = [(1, 3.14, 0)]
+_R0 = [
+    (100013989, 0, 0), (1670700, 3.0984635, 6283.07585), (13956, 3.05525, 12566.1517),
+    (3084, 5.1985, 77713.7715), (1628, 1.1739, 5753.3849), (1576, 2.8469, 7860.4194),
+    (925, 5.453, 11506.77), (542, 4.564, 3930.21), (472, 3.661, 5884.927),
+]
+_R1 = [(103019, 1.10749, 6283.07585), (1721, 1.0644, 12566.1517)]
+_R2 = [(4359, 5.7846, 6283.0758)]
+
+def _as_arrays(series):
+    table = np.array(series, dtype=np.float64)
+    return table[:, 0], table[:, 1], table[:, 2]
+
+_L_SERIES = [_as_arrays(s) for s in (_L0, _L1, _L2, _L3, _L4, _L5)]
+_R_SERIES = [_as_arrays(s) for s in (_R0, _R1, _R2)]
+
+def _evaluate_series(series_list, tau):
+    """Σ τ^n Σ A cos(B + Cτ) 를 τ 배열 전체에 대해 계산합니다 (단위 1e-8)."""
+    total = np.zeros_like(tau)
+    for power, (amp, phase, freq) in enumerate(series_list):
+        terms = amp * np.cos(phase + freq * tau[..., np.newaxis])
+        total = total + terms.sum(axis=-1) * tau ** power
+    return total * 1e-8
+
+# ───────────────────────────────
+# 태양 겉보기 황경
+# ───────────────────────────────
+def apparent_solar_longitude(jde):
+    """
+    역학시(TT) 율리우스일 배열 -> 태양 겉보기 황경(도, 0~360) 배열.
+    정확도는 약 1초각 (절입 시각으로 1분 이내) 입니다.
+    """
+    jde = np.asarray(jde, dtype=np.float64)
+    tau = (jde - J2000) / 365250.0
+    t = tau * 10.0 # 율리우스 세기
+    helio_lon = _evaluate_series(_L_SERIES, tau)
+    radius = _evaluate_series(_R_SERIES, tau)
+    geo_lon = np.degrees(helio_lon) + 180.0
+    # FK5 좌표계 보정
+    geo_lon = geo_lon - 0.09033 / 3600.0
+    # 황경 장동 (주요 4항)
+    omega = np.radians(125.04452 - 1934.136261 * t)
+    sun_mean = np.radians(280.4665 + 36000.7698 * t)
+    moon_mean = np.radians(218.3165 + 481267.8813 * t)
+    nutation = (-17.20 * np.sin(omega) - 1.32 * np.sin(2 * sun_mean)
+                - 0.23 * np.sin(2 * moon_mean) + 0.21 * np.sin(2 * omega)) / 3600.0
+    # 광행차
+    aberration = -20.4898 / 3600.0 / radius
+    return np.mod(geo_lon + nutation + aberration, 360.0)
+
+# ───────────────────────────────
+# ΔT = TT - UT (초), Espenak & Meeus 다항식
+# ───────────────────────────────
+def delta_t_seconds(year):
+    """소수 연도 배열 -> ΔT(초) 배열."""
+    y = np.asarray(year, dtype=np.float64)
+    result = np.empty_like(y)
+    def poly(mask, t, coeffs):
+        result[mask] = sum(c * t[mask] ** i for i, c in enumerate(coeffs))
+    long_term = -20 + 32 * ((y - 1820) / 100) ** 2
+    result[:] = long_term
+    poly((y >= 500) & (y < 1600), (y - 1000) / 100,
+         [1574.2, -556.01, 71.23472, 0.319781, -0.8503463, -0.005050998, 0.0083572073])
+    poly((y >= 1600) & (y < 1700), y - 1600, [120, -0.9808, -0.01532, 1 / 7129])
+    poly((y >= 1700) & (y < 1800), y - 1700, [8.83, 0.1603, -0.0059285, 0.00013336, -1 / 1174000])
+    poly((y >= 1800) & (y < 1860), y - 1800,
+         [13.72, -0.332447, 0.0068612, 0.0041116, -0.00037436, 0.0000121272, -0.0000001699, 0.000000000875])
+    poly((y >= 1860) & (y < 1900), y - 1860, [7.62, 0.5737, -0.251754, 0.01680668, -0.0004473624, 1 / 233174])
+    poly((y >= 1900) & (y < 1920), y - 1900, [-2.79, 1.494119, -0.0598939, 0.0061966, -0.000197])
+    poly((y >= 1920) & (y < 1941), y - 1920, [21.20, 0.84493, -0.0761, 0.0020936])
+    poly((y >= 1941) & (y < 1961), y - 1950, [29.07, 0.407, -1 / 233, 1 / 2547])
+    poly((y >= 1961) & (y < 1986), y - 1975, [45.45, 1.067, -1 / 260, -1 / 718])
+    poly((y >= 1986) & (y < 2005), y - 2000, [63.86, 0.3345, -0.060374, 0.0017275, 0.000651814, 0.00002373599])
+    poly((y >= 2005) & (y < 2050), y - 2000, [62.92, 0.32217, 0.005589])
+    mask = (y >= 2050) & (y < 2150)
+    result[mask] = long_term[mask] - 0.5628 * (2150 - y[mask])
+    return result
+
+# ───────────────────────────────
+# 날짜 변환 (율리우스일 <-> datetime, 역산 그레고리력)
+# ───────────────────────────────
+_JD_UNIX_EPOCH = 2440587.5
+_DATETIME64_EPOCH = np.datetime64("1970-01-01T00:00:00", "s")
+
+def _jd_from_dates(years, month, day):
+    """그레고리력 (연도 배열, 월, 일) -> 0시 율리우스일 배열."""
+    dates = np.array([f"{int(y):04d}-{month:02d}-{day:02d}" for y in years], dtype="datetime64[D]")
+    return (dates - np.datetime64("1970-01-01", "D")).astype(np.float64) + _JD_UNIX_EPOCH
+
+def _jd_to_datetime64(jd):
+    seconds = np.rint((np.asarray(jd) - _JD_UNIX_EPOCH) * 86400.0).astype(np.int64)
+    return _DATETIME64_EPOCH + seconds.astype("timedelta64[s]")
+
+# ───────────────────────────────
+# 절입 시각 계산 (연도 벡터화)
+# ───────────────────────────────
+def solar_term_instants(years):
+    """
+    연도 배열 -> (len(years), 24) 크기의 UTC+9 기준 절입 시각 배열 (datetime64[s], 열 순서는 TERM_NAMES).
+    모든 연도 x 24절기를 한 번에 뉴턴 반복합니다 (태양 황경 변화율 약 0.9856°/일).
+    """
+    years = np.atleast_1d(np.asarray(years, dtype=np.int64))
+    lo, hi = SUPPORTED_YEAR_RANGE
+    if years.size and (years.min() < lo or years.max() > hi):
+        raise ValueError(f"지원 범위({lo}~{hi}년)를 벗어난 연도가 있습니다: {years.min()}~{years.max()}")
+    # 초기값: 소한(1월 5일 무렵)에서 황경 차이만큼 평균 속도로 전진
+    start_jd = _jd_from_dates(years, 1, 5)[:, np.newaxis]
+    offset_deg = np.mod(TERM_LONGITUDES - 285.0, 360.0)[np.newaxis, :]
+    jde = start_jd + offset_deg * 365.2422 / 360.0
+    target = TERM_LONGITUDES[np.newaxis, :]
+    for _ in range(NEWTON_ITERATIONS):
+        diff = np.mod(apparent_solar_longitude(jde) - target + 180.0, 360.0) - 180.0
+        jde = jde - diff / 0.98564736
+    decimal_year = years[:, np.newaxis] + (jde - start_jd) / 365.2425
+    jd_ut = jde - delta_t_seconds(decimal_year) / 86400.0
+    return _jd_to_datetime64(jd_ut + KST_OFFSET_DAYS)
+
+def build_term_table(start_year, end_year, round_to_minute=True):
+    """
+    엔진이 쓰는 절기표 {양력연도: {절기명: datetime}} 를 생성합니다 (load_solar_terms와 같은 형식).
+    round_to_minute=True면 동봉된 절기표처럼 분 단위로 반올림합니다.
+    """
+    years = np.arange(start_year, end_year + 1)
+    instants = solar_term_instants(years)
+    if round_to_minute:
+        instants = (instants + np.timedelta64(30, "s")).astype("datetime64[m]")
+    table = {}
+    for row in instants.tolist(): # datetime64 -> datetime
+        for term_name, term_dt in zip(TERM_NAMES, row):
+            table.setdefault(term_dt.year, {})[term_name] = term_dt
+    return table
+
+def extend_solar_terms(term_dict, start_year=DEFAULT_YEAR_RANGE[0], end_year=DEFAULT_YEAR_RANGE[1]):
+    """
+    엑셀 등에서 읽은 절기표의 빈 연도/빠진 절기를 계산값으로 채운 새 딕셔너리를 반환합니다.
+    이미 있는 값은 그대로 둡니다 (예: 1900~1945년처럼 중기 4개만 있는 연도도 12절기가 채워짐).
+    """
+    merged = {year: dict(terms) for year, terms in (term_dict or {}).items()}
+    for year, terms in build_term_table(start_year, end_year).items():
+        if not start_year <= year <= end_year:
+            continue
+        year_terms = merged.setdefault(year, {})
+        for term_name, term_dt in terms.items():
+            year_terms.setdefault(term_name, term_dt)
+    return merged
+
+def write_term_csv(path, term_table):
+    """절기표를 Solar_Terms CSV와 같은 (연도, 절기, 절입일시) 형식으로 기록합니다."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["연도", "절기", "절입일시"])
+        for year in sorted(term_table):
+            for term_name, term_dt in sorted(term_table[year].items(), key=lambda item: item[1]):
+                writer.writerow([year, term_name, term_dt.strftime("%Y-%m-%d %H:%M:%S")])
+
+# ───────────────────────────────
+# 동봉 데이터와 비교 검증
+# ───────────────────────────────
+def _read_csv_terms(path):
+    """Solar_Terms1905_2100.csv -> {(양력연도, 절기명): datetime}"""
+    terms = {}
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                term_dt = datetime.strptime(row["절입일시"].strip(), "%Y-%m-%d %H:%M:%S")
+            except (KeyError, ValueError):
+                continue
+            terms[(term_dt.year, row["절기"].strip())] = term_dt
+    return terms
+
+def _read_workbook_terms(path):
+    """엔진 로더(load_solar_terms)로 엑셀을 읽어 {(양력연도, 절기명): datetime} 으로 펼칩니다."""
+    import saju_engine # 엑셀 비교 시에만 필요 (pandas, openpyxl)
+
+    term_dict = saju_engine.load_solar_terms(path) or {}
+    return {(year, name): term_dt for year, terms in term_dict.items() for name, term_dt in terms.items()}
+
+def compare_with_source(source_terms, tolerance_minutes=2):
+    """
+    계산값과 원본 절기표를 비교합니다.
+    반환: {"compared", "max_abs_minutes", "mean_abs_minutes", "over_tolerance": [(연도, 절기, 원본, 계산값, 차이분), ...]}
+    """
+    if not source_terms:
+        return {"compared": 0, "max_abs_minutes": 0.0, "mean_abs_minutes": 0.0, "over_tolerance": []}
+    years = sorted({year for year, _ in source_terms})
+    generated = build_term_table(years[0], years[-1])
+    diffs, over = [], []
+    for (year, name), source_dt in sorted(source_terms.items()):
+        calc_dt = generated.get(year, {}).get(name)
+        if calc_dt is None:
+            continue
+        diff = (calc_dt - source_dt).total_seconds() / 60.0
+        diffs.append(abs(diff))
+        if abs(diff) > tolerance_minutes:
+            over.append((year, name, source_dt, calc_dt, diff))
+    return {"compared": len(diffs), "max_abs_minutes": max(diffs, default=0.0),
+            "mean_abs_minutes": sum(diffs) / len(diffs) if diffs else 0.0, "over_tolerance": over}
+
+def classify_over_tolerance(result, tolerance_minutes=2):
+    """
+    허용치 초과 행을 (당시 현지 시각 표기, 원본 오류) 두 목록으로 나눕니다.
+    당시 현지 시각 표기: 원본 값을 당시 표준시(UTC+8:30 시기) 또는 서머타임 시각으로 보고 UTC+9로 바꾸면 허용치 안에 드는 행.
+    엔진 로더(load_solar_terms)가 불러올 때 UTC+9로 바꾸거나 짝을 이루는 UTC+9 행을 쓰므로 명식에는 영향이 없습니다.
+    원본 오류: 그 밖의 행 (오타, 날짜 누락 등). 큰 오차 순으로 정렬합니다.
+    """
+    import saju_engine # 표준시/서머타임 구간표
+
+    local_time, errors = [], []
+    for row in result["over_tolerance"]:
+        _, _, source_dt, calc_dt, _ = row
+        converted = (saju_engine.to_standard_kst(source_dt, dst=False), saju_engine.to_standard_kst(source_dt))
+        if any(abs((calc_dt - dt).total_seconds()) <= tolerance_minutes * 60 for dt in converted if dt != source_dt):
+            local_time.append(row)
+        else:
+            errors.append(row)
+    errors.sort(key=lambda row: -abs(row[4]))
+    return local_time, errors
+
+def format_comparison(label, result, tolerance_minutes=2, max_examples=10):
+    local_time, errors = classify_over_tolerance(result, tolerance_minutes)
+    month_terms = sum(1 for _, name, _, _, _ in errors if name in MONTH_TERM_NAMES)
+    lines = [f"[{label}] 비교 {result['compared']}건, 최대 오차 {result['max_abs_minutes']:.1f}분, "
+             f"평균 오차 {result['mean_abs_minutes']:.2f}분, 허용치 초과 {len(result['over_tolerance'])}건",
+             f"  당시 현지 시각 표기 {len(local_time)}건 (UTC+8:30 시기/서머타임, 엔진이 불러올 때 UTC+9로 맞춤)",
+             f"  원본 오류 {len(errors)}건 (월주 경계 절기 {month_terms}건)"]
+    for year, name, source_dt, calc_dt, diff in errors[:max_examples]:
+        mark = " *" if name in MONTH_TERM_NAMES else ""
+        lines.append(f"    {year} {name}{mark}: 원본 {source_dt:%Y-%m-%d %H:%M} / 계산 {calc_dt:%Y-%m-%d %H:%M} ({diff:+.0f}분)")
+    return "\n".join(lines), len(errors)
+
+def check_era_boundaries(solar_data, start_year=1953, end_year=1962, margin_minutes=5):
+    """
+    표준시가 바뀐 구간(UTC+8:30, 1954-03-21 ~ 1961-08-10) 앞뒤 연도의 월주 경계 절기마다, 계산한 절입 시각
+    margin_minutes분 전후에 태어난 출생(당시 현지 시각)을 엔진과 같이 UTC+9로 보정해, 엔진 절기표와 계산 절기표의
+    연주/월주가 같은지 비교합니다. 반환: 불일치 목록 [(현지 시각, 절기, 절기표 결과, 계산 결과)].
+    """
+    import saju_engine
+
+    generated = build_term_table(start_year - 1, end_year + 1)
+    mismatches = []
+    for year in range(start_year, end_year + 1):
+        for name in MONTH_TERM_NAMES:
+            term_dt = generated[year][name]
+            for minutes in (-margin_minutes, margin_minutes):
+                kst_dt = term_dt + timedelta(minutes=minutes)
+                wall_dt = kst_dt - (saju_engine.to_standard_kst(kst_dt) - kst_dt)
+                saju_dt = saju_engine.to_standard_kst(wall_dt)
+                pillars = []
+                for table in (solar_data, generated):
+                    year_pillar, year_gan, _ = saju_engine.get_year_ganji(saju_engine.get_saju_year(saju_dt, table))
+                    pillars.append((year_pillar, saju_engine.get_month_ganji(year_gan, saju_dt, table)[0]))
+                if pillars[0] != pillars[1]:
+                    mismatches.append((wall_dt, name, pillars[0], pillars[1]))
+    return mismatches
+
+def main(argv=None):
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="천문 계산으로 24절기 절입 시각(UTC+9)을 생성/검증합니다.")
+    parser.add_argument("--start", type=int, default=DEFAULT_YEAR_RANGE[0], help="시작 연도")
+    parser.add_argument("--end", type=int, default=DEFAULT_YEAR_RANGE[1], help="끝 연도")
+    parser.add_argument("--out", help="절기표 CSV 출력 경로 (연도, 절기, 절입일시)")
+    parser.add_argument("--validate", action="store_true", help="동봉된 CSV/엑셀 절기표와 비교 (원본 오류가 있으면 종료 코드 1)")
+    parser.add_argument("--check", action="store_true", help="표준시 변경 구간(1954~1961년) 앞뒤 절입 시각 전후 명식을 엔진 절기표와 비교")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="검증 허용 오차(분)")
+    args = parser.parse_args(argv)
+
+    status = 0
+    if args.out:
+        write_term_csv(args.out, build_term_table(args.start, args.end))
+        print(f"{args.start}~{args.end}년 절기표를 {args.out} 에 기록했습니다.")
+    if args.validate:
+        csv_path = os.path.join(base_dir, "Solar_Terms1905_2100.csv")
+        text, error_count = format_comparison("Solar_Terms1905_2100.csv", compare_with_source(_read_csv_terms(csv_path), args.tolerance), args.tolerance)
+        print(text)
+        status |= error_count > 0
+        try:
+            import saju_engine
+            workbook_terms = _read_workbook_terms(os.path.join(base_dir, saju_engine.FILE_NAME))
+            text, error_count = format_comparison(saju_engine.FILE_NAME, compare_with_source(workbook_terms, args.tolerance), args.tolerance)
+            print(text)
+            status |= error_count > 0
+        except ImportError as e:
+            print(f"엑셀 비교 생략 (필요 패키지 없음: {e})", file=sys.stderr)
+    if args.check:
+        import saju_engine
+
+        solar_data = saju_engine.load_solar_terms(os.path.join(base_dir, saju_engine.FILE_NAME), lambda level, message: print(message, file=sys.stderr))
+        if solar_data is None:
+            return 1
+        mismatches = check_era_boundaries(solar_data)
+        for wall_dt, name, table_pillars, calc_pillars in mismatches[:10]:
+            print(f"{wall_dt:%Y-%m-%d %H:%M} ({name} 전후): 절기표 {' '.join(table_pillars)} / 계산 {' '.join(calc_pillars)}")
+        print(f"표준시 변경 구간 비교 완료: 불일치 {len(mismatches)}건")
+        status |= bool(mismatches)
+    if not (args.out or args.validate or args.check):
+        parser.print_help()
+    return int(status)
+
+if __name__ == "__main__":
+    sys.exit(main())
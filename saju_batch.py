@@ -0,0 +1,590 @@
+# 대량 명식 배치 분석 - 정수 코드 명식 배열에 세력/신강/격국/용신을 NumPy로 한 번에 판정
+# 판정 코드는 엔진의 classify_arrays (신강: SHINKANG_LABELS, 격국: 함께 돌려주는 이름 목록, 용신/기신: 오행 비트마스크)이며,
+# classification_row로 단건 함수(determine_shinkang_shinyak / determine_gekuk / determine_yongshin_gishin_simplified)와 같은 값으로 풉니다.
+# 출생 레코드는 중복을 먼저 묶습니다: (출생 시각, 성별)이 같은 레코드는 한 번만, 년/월/일주는 출생일마다 한 번만
+# (그날 안에 절입 시각이 있으면 그날 레코드만 시각별로) 계산하고, 세력/판정은 서로 다른 명식마다 한 번 계산해 입력 순서로 펼칩니다.
+# 열 형식 출력 (pyarrow 필요, 선택): 기둥/판정은 작은 정수 사전 인코딩 열, 세력은 float32 고정 길이 목록,
+# 용신/기신/신살은 비트셋 (비트 순서와 신살 이름은 스키마 메타데이터)으로 Arrow 레코드 배치를 만들어 Parquet 또는 Arrow IPC로 씁니다.
+# 사용:
+#   python saju_batch.py births.csv --out result.csv         # 레코드별 명식/판정 CSV, 중복 제거 통계는 표준 오류로
+#   python saju_batch.py births.csv --out result.parquet     # Parquet (.arrow / .feather: Arrow IPC 파일)
+#   python saju_batch.py --check --n 20000                   # 임의 명식/출생 레코드로 단건 계산과 비교 (모든 규칙 프로필)
+#   python saju_batch.py --check --profile extended          # 한 프로필만
+# births.csv 열: customer_id, birth ("YYYY-MM-DD HH:MM", UTC+9 기준), gender (남성/여성, 모르면 빈칸)
+
+import argparse
+import bisect
+import csv
+import itertools
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+import saju_engine as engine
+import saju_uncertain
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CUSTOMER_ID_COLUMN = "customer_id"
+BIRTH_COLUMN = "birth"
+GENDER_COLUMN = "gender"
+
+ARROW_CHUNK_ROWS = 65536 # Arrow 레코드 배치 하나의 행 수
+ARROW_FORMATS = {".parquet": "parquet", ".arrow": "ipc", ".feather": "ipc", ".ipc": "ipc"} # 출력 확장자 -> 형식
+GENDERS = ("남성", "여성")
+DAEWOON_DIRECTIONS = ("순행", "역행") # daewoon_row % 2
+
+# ───────────────────────────────
+# 판정 코드 -> 단건 형식
+# ───────────────────────────────
+def classification_row(result, i):
+    """classify_arrays 결과의 i번째 명식 -> {"shinkang", "gekuk", "yongshin", "gishin"} (단건 함수와 같은 값)."""
+    return {
+        "shinkang": engine.SHINKANG_LABELS[int(result["shinkang"][i])],
+        "gekuk": result["gekuk_labels"][int(result["gekuk"][i])],
+        "yongshin": engine.oheng_mask_names(result["yongshin"][i]),
+        "gishin": engine.oheng_mask_names(result["gishin"][i]),
+    }
+
+# ───────────────────────────────
+# 출생 레코드 배치 (중복 묶기 -> 출생일 단위 기둥 -> 명식 단위 판정 -> 입력 순서로 펼침)
+# ───────────────────────────────
+def _group(keys):
+    """키 목록 -> (처음 나온 순서의 고유 키 목록, 레코드별 고유 키 번호 목록)."""
+    first = {}
+    inverse = [first.setdefault(key, len(first)) for key in keys]
+    return list(first), inverse
+
+def _year_month_codes(dt, solar_data):
+    """dt 시각의 년주/월주 (천간, 지지) 코드 쌍 두 개. 월주를 계산할 수 없으면 None."""
+    _, year_gan, year_ji = engine.get_year_ganji(engine.get_saju_year(dt, solar_data))
+    _, month_gan, month_ji = engine.get_month_ganji(year_gan, dt, solar_data)
+    if not month_gan:
+        return None
+    return (engine.GAN_INDEX[year_gan], engine.JI_INDEX[year_ji]), (engine.GAN_INDEX[month_gan], engine.JI_INDEX[month_ji])
+
+def _day_pillars(days, solar_data):
+    """
+    고유 출생일(date)마다 0시 기준 년/월주, 달력 일주 60갑자, 그날 안에 절입 시각이 있는지 (있으면 년/월주가 하루 중에 바뀜).
+    반환: (년/월주 천간 (D,2), 년/월주 지지 (D,2) 코드 (-1: 계산 불가), 일주 60갑자 (D,), 절입일 여부 (D,) bool)
+    """
+    import numpy as np
+
+    instants = saju_uncertain._term_instants(solar_data)
+    stems, branches = np.full((len(days), 2), -1, dtype=np.int8), np.full((len(days), 2), -1, dtype=np.int8)
+    day_gapja, term_day = np.zeros(len(days), dtype=np.int64), np.zeros(len(days), dtype=bool)
+    for d, day in enumerate(days):
+        midnight = datetime(day.year, day.month, day.day)
+        term_day[d] = bisect.bisect_left(instants, midnight) != bisect.bisect_left(instants, midnight + timedelta(days=1))
+        codes = _year_month_codes(midnight, solar_data)
+        if codes:
+            (stems[d, 0], branches[d, 0]), (stems[d, 1], branches[d, 1]) = codes
+        _, day_gan, day_ji = engine.get_day_ganji(day.year, day.month, day.day)
+        day_gapja[d] = engine.gapja_index(engine.GAN_INDEX[day_gan], engine.JI_INDEX[day_ji])
+    return stems, branches, day_gapja, term_day
+
+_TERM_ARRAY_CACHE = {} # 절기표 id -> (절기표 보관, 절입 시각 datetime64[us] 배열, 절입 양력 연도 배열)
+
+def _term_arrays(solar_data):
+    """saju_uncertain._term_instants 목록의 NumPy 배열판. 절기표 객체별로 한 번만 만듭니다."""
+    import numpy as np
+
+    cached = _TERM_ARRAY_CACHE.get(id(solar_data))
+    if cached is None or cached[0] is not solar_data:
+        instants = saju_uncertain._term_instants(solar_data)
+        cached = _TERM_ARRAY_CACHE[id(solar_data)] = (solar_data, np.array(instants, dtype="datetime64[us]"),
+                                                      np.array([t.year for t in instants]))
+    return cached[1], cached[2]
+
+def _daewoon_starts(births, genders, year_stems, month_gapja, valid, solar_data):
+    """
+    키마다 대운 행 번호 (daewoon_row, -1: 대운 없음)와 시작 나이. get_daewoon과 같은 규칙을 절입 시각 배열 검색으로:
+    순행이면 출생 뒤 첫 절입, 역행이면 출생 전 마지막 절입까지 일수 / 3을 반올림 (최소 1세).
+    get_daewoon처럼 출생 양력 연도 ±1년 안의 절입만 쓰며, 성별을 모르면 대운 없음으로 둡니다.
+    """
+    import numpy as np
+
+    term_us, term_years = _term_arrays(solar_data)
+    birth_us, birth_years = np.array(births, dtype="datetime64[us]"), np.array([birth.year for birth in births])
+    male, female = np.array([g == "남성" for g in genders], dtype=bool), np.array([g == "여성" for g in genders], dtype=bool)
+    yang = np.asarray(year_stems) % 2 == 0
+    is_sunhaeng = (yang & male) | (~yang & female)
+    target = np.where(is_sunhaeng, np.searchsorted(term_us, birth_us, side="right"), np.searchsorted(term_us, birth_us, side="left") - 1)
+    found = (target >= 0) & (target < len(term_us))
+    target = np.clip(target, 0, len(term_us) - 1)
+    found &= np.abs(term_years[target] - birth_years) <= 1
+    days = np.abs(term_us[target] - birth_us).astype(np.int64) / 1e6 / (24 * 3600.0) # timedelta.total_seconds()와 같은 값
+    start_age = np.maximum(1, np.rint(days / 3.0)).astype(np.int64) # round()와 같은 짝수 반올림
+    ok = valid & (male | female) & found
+    return np.where(ok, engine.daewoon_row(np.asarray(month_gapja, dtype=np.int64), is_sunhaeng), -1), np.where(ok, start_age, 0)
+
+def analyze_records(births, genders=None, solar_data=None, convention=engine.DEFAULT_ZASI_CONVENTION, rules=None):
+    """
+    출생 레코드 N건 (UTC+9 기준 출생 시각 목록, 성별 목록)의 명식과 세력/신강/격국/용신 (NumPy 필요).
+    명식은 saju_uncertain.chart_at과 같고, 판정은 classify_arrays와 같습니다. 겹치는 계산은 묶음마다 한 번만 합니다:
+    (출생 시각, 성별) 고유 키 -> 출생일 (년/월/일주 조회, 절입일만 키별로) -> 서로 다른 명식 (세력, 판정).
+    대운은 키마다 시작 나이와 순서표 행 번호만 구하고, 평생 대운은 daewoon_lists로 순서표에서 모읍니다.
+    반환: {"stems"/"branches" (N,4) 코드 (-1: 계산 불가), "valid" (N,), "ohaeng" (N,5)/"sipshin" (N,10) 반올림 세력 (NaN: 계산 불가),
+           "shinkang"/"gekuk" 코드 (-1: 계산 불가), "gekuk_labels", "yongshin"/"gishin" 비트마스크, "genders",
+           "shinsal" (N,F) bool / "shinsal_features" (shinsal_arrays 열),
+           "daewoon_row" (daewoon_row, -1: 대운 없음)/"daewoon_start_age", "birth_years",
+           "key_index"/"chart_index" (레코드 -> 고유 키/명식 번호, 명식 -1: 계산 불가), "stats" (묶음 통계)}
+    """
+    import numpy as np
+
+    rules = rules if rules is not None else engine
+    genders = list(genders) if genders is not None else [None] * len(births)
+    keys, record_key = _group(zip(births, genders))
+    days, key_day = _group(birth.date() for birth, _ in keys)
+    day_stems, day_branches, day_gapja, term_day = _day_pillars(days, solar_data)
+
+    key_day = np.asarray(key_day, dtype=np.intp)
+    stems, branches = np.empty((len(keys), 4), dtype=np.int8), np.empty((len(keys), 4), dtype=np.int8)
+    stems[:, :2], branches[:, :2] = day_stems[key_day], day_branches[key_day]
+    term_keys = np.flatnonzero(term_day[key_day])
+    for k in term_keys: # 절입일 출생만 시각별로 년/월주
+        codes = _year_month_codes(keys[k][0], solar_data) or ((-1, -1), (-1, -1))
+        (stems[k, 0], branches[k, 0]), (stems[k, 1], branches[k, 1]) = codes
+    calendar_gapja = day_gapja[key_day]
+    minute_of_day = np.array([birth.hour * 60 + birth.minute for birth, _ in keys], dtype=np.int64)
+    stems[:, 3], branches[:, 3], day_shift = engine.time_pillar_arrays(calendar_gapja % 10, minute_of_day, convention)
+    gapja = (calendar_gapja + day_shift) % 60 # 자시 일진 변경 규칙: 다음날 일주
+    stems[:, 2], branches[:, 2] = gapja % 10, gapja % 12
+    key_valid = (stems >= 0).all(axis=1)
+    key_daewoon_row, key_daewoon_age = _daewoon_starts([birth for birth, _ in keys], [gender for _, gender in keys], stems[:, 0],
+                                                       engine.gapja_index(stems[:, 1].astype(np.int64), branches[:, 1].astype(np.int64)),
+                                                       key_valid, solar_data)
+
+    # 서로 다른 명식마다 세력/판정 한 번
+    chart_codes = (engine.gapja_index(stems.astype(np.int64), branches.astype(np.int64)) * np.array([216000, 3600, 60, 1])).sum(axis=1)
+    unique_codes, valid_chart = np.unique(chart_codes[key_valid], return_inverse=True)
+    key_chart = np.full(len(keys), -1, dtype=np.int64)
+    key_chart[key_valid] = valid_chart.reshape(-1)
+    first_key = np.flatnonzero(key_valid)[np.unique(valid_chart.reshape(-1), return_index=True)[1]]
+    chart_stems, chart_branches = stems[first_key], branches[first_key]
+    ohaeng, sipshin = rules.strength_arrays(chart_stems, chart_branches)
+    classified = rules.classify_arrays(chart_stems, chart_branches, sipshin)
+    shinsal, shinsal_features = rules.shinsal_arrays(chart_stems, chart_branches)
+
+    record_key = np.asarray(record_key, dtype=np.intp)
+    record_chart = key_chart[record_key]
+    valid = record_chart >= 0
+    gather = np.where(valid, record_chart, 0)
+
+    def fan_out(values, missing):
+        out = values[gather] if len(values) else np.zeros((len(record_key),) + values.shape[1:], dtype=values.dtype)
+        out[~valid] = missing
+        return out
+
+    stats = {"records": len(record_key), "keys": len(keys), "days": len(days), "term_days": int(term_day.sum()),
+             "term_day_keys": len(term_keys), "charts": len(unique_codes), "invalid_records": int((~valid).sum())}
+    return {
+        "stems": stems[record_key], "branches": branches[record_key], "valid": valid, "genders": genders,
+        "ohaeng": fan_out(engine.round_strengths(ohaeng), np.nan), "sipshin": fan_out(classified["sipshin"], np.nan),
+        "shinkang": fan_out(classified["shinkang"], -1), "gekuk": fan_out(classified["gekuk"], -1),
+        "gekuk_labels": classified["gekuk_labels"],
+        "shinsal": fan_out(shinsal, False), "shinsal_features": shinsal_features,
+        "yongshin": fan_out(classified["yongshin"], 0), "gishin": fan_out(classified["gishin"], 0),
+        "daewoon_row": key_daewoon_row[record_key], "daewoon_start_age": key_daewoon_age[record_key],
+        "birth_years": np.array([birth.year for birth, _ in keys])[record_key],
+        "key_index": record_key, "chart_index": record_chart, "stats": stats,
+    }
+
+def daewoon_lists(result, periods=engine.DAEWOON_PERIODS, rules=None):
+    """analyze_records 결과의 평생 대운 (daewoon_arrays: 60갑자, 시작 나이, 일간 기준 12운성, 오행 벡터 (N,P,...))."""
+    rules = rules if rules is not None else engine
+    return rules.daewoon_arrays(result["daewoon_row"], result["daewoon_start_age"], result["stems"][:, 2].clip(0), periods)
+
+def daewoon_text_list(result, daewoon, i):
+    """daewoon_lists 결과의 i번째 레코드 -> get_daewoon 형식 목록 ("만 N세 (YYYY년~): 간지"). 대운이 없으면 빈 목록."""
+    if result["daewoon_row"][i] < 0:
+        return []
+    birth_year = int(result["birth_years"][i])
+    return [f"만 {int(age)}세 ({birth_year + int(age)}년~): {engine.GAPJA_NAMES[int(g)]}" for age, g in zip(daewoon["age"][i], daewoon["gapja"][i])]
+
+def format_stats(stats):
+    """analyze_records 묶음 통계 -> 요약 문장."""
+    records = stats["records"]
+    ratio = lambda count: f"{records / count:.2f}배" if count else "-"
+    return (f"레코드 {records}건 -> 고유 (출생 시각, 성별) {stats['keys']}개 ({ratio(stats['keys'])}), "
+            f"출생일 {stats['days']}일 ({ratio(stats['days'])}, 절입일 {stats['term_days']}일의 {stats['term_day_keys']}개 키는 시각별), "
+            f"서로 다른 명식 {stats['charts']}개 ({ratio(stats['charts'])}), 계산 불가 {stats['invalid_records']}건")
+
+def record_rows(result, births, customer_ids=None):
+    """analyze_records 결과 -> {"columns", "rows"} 표 (레코드 입력 순서, 기둥은 간지 문자열)."""
+    columns = ([CUSTOMER_ID_COLUMN, BIRTH_COLUMN, GENDER_COLUMN] + list(engine.PILLAR_NAMES_KOR)
+               + ["신강/신약", "격국", "용신", "기신"] + list(engine.OHENG_ORDER) + ["대운 시작", "대운"])
+    daewoon = daewoon_lists(result)
+    rows = []
+    for i, birth in enumerate(births):
+        row = [customer_ids[i] if customer_ids else i, f"{birth:%Y-%m-%d %H:%M}", result["genders"][i] or ""]
+        if result["valid"][i]:
+            chart = engine.decode_chart(result["stems"][i], result["branches"][i])
+            labels = classification_row(result, i)
+            row += [chart[f"{key}_gan"] + chart[f"{key}_ji"] for key in engine.PILLAR_KEYS]
+            row += [labels["shinkang"], labels["gekuk"], ", ".join(labels["yongshin"]), ", ".join(labels["gishin"])]
+            row += [float(v) for v in result["ohaeng"][i]]
+            if result["daewoon_row"][i] >= 0:
+                direction = "역행" if result["daewoon_row"][i] % 2 else "순행"
+                row += [f"{int(result['daewoon_start_age'][i])}세 {direction}", " ".join(engine.GAPJA_NAMES[int(g)] for g in daewoon["gapja"][i])]
+            else:
+                row += ["", ""]
+        else:
+            row += ["오류(월주 계산 불가: 절기 데이터 확인)"] + [""] * (len(columns) - len(row) - 1)
+        rows.append(row)
+    return {"columns": columns, "rows": rows}
+
+def load_records(file_name):
+    """births.csv -> (customer_id 목록, 출생 시각 목록, 성별 목록). 출생 시각을 해석할 수 없으면 ValueError."""
+    customer_ids, births, genders = [], [], []
+    with open(file_name, encoding="utf-8-sig", newline="") as f:
+        for line_no, row in enumerate(csv.DictReader(f), start=2):
+            text = (row.get(BIRTH_COLUMN) or "").strip()
+            try:
+                births.append(datetime.fromisoformat(text))
+            except ValueError:
+                raise ValueError(f"오류({file_name} {line_no}행): {BIRTH_COLUMN} 값 '{text}'을 해석할 수 없습니다.") from None
+            customer_ids.append(row.get(CUSTOMER_ID_COLUMN, str(line_no - 1)))
+            genders.append((row.get(GENDER_COLUMN) or "").strip() or None)
+    return customer_ids, births, genders
+
+def write_rows(table, path):
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(table["columns"])
+        writer.writerows(table["rows"])
+
+# ───────────────────────────────
+# Arrow / Parquet 출력 (pyarrow 필요)
+# ───────────────────────────────
+def _dictionary_column(pa, codes, labels, valid=None):
+    """정수 코드 배열 -> 사전 인코딩 열 (int8 인덱스, 문자열 사전). valid가 False인 행은 null."""
+    import numpy as np
+
+    codes = np.asarray(codes)
+    mask = None if valid is None else ~np.asarray(valid, dtype=bool)
+    indices = pa.array(np.where(codes >= 0, codes, 0).astype(np.int8), type=pa.int8(), mask=mask)
+    return pa.DictionaryArray.from_arrays(indices, pa.array(list(labels), type=pa.string()))
+
+def _bitset_column(pa, bits, valid=None):
+    """(N,F) bool -> 고정 길이 바이너리 열 (행마다 ceil(F/8)바이트, 열 j = 바이트 j//8의 비트 j%8). valid가 False인 행은 null."""
+    import numpy as np
+
+    packed = np.ascontiguousarray(np.packbits(bits, axis=1, bitorder="little"))
+    width = packed.shape[1]
+    if valid is None:
+        return pa.FixedSizeBinaryArray.from_buffers(pa.binary(width), len(packed), [None, pa.py_buffer(packed.tobytes())])
+    valid = np.asarray(valid, dtype=bool)
+    validity = pa.py_buffer(np.packbits(valid, bitorder="little").tobytes()) # Arrow 유효성 비트맵 (LSB 우선)
+    return pa.FixedSizeBinaryArray.from_buffers(pa.binary(width), len(packed), [validity, pa.py_buffer(packed.tobytes())],
+                                                null_count=int((~valid).sum()))
+
+def arrow_metadata(result):
+    """Arrow 스키마 메타데이터: 비트셋 열의 비트 순서 (용신/기신 오행, 신살 열)."""
+    features = [f"{name} ({where})" for name, where in result["shinsal_features"]]
+    return {"saju.bit_order": "little", "saju.oheng_bits": json.dumps(list(engine.OHENG_ORDER), ensure_ascii=False),
+            "saju.shinsal_bits": json.dumps(features, ensure_ascii=False)}
+
+def record_batches(result, births, customer_ids=None, chunk_rows=ARROW_CHUNK_ROWS):
+    """
+    analyze_records 결과 -> pyarrow.RecordBatch (chunk_rows 행씩, 입력 순서). 계산 불가 레코드의 기둥/판정/세력은 null.
+    기둥/신강/격국/대운 방향/성별: 사전 인코딩 (int8 인덱스), 오행/십신: fixed_size_list<float32>[5/10], 대운: fixed_size_list<사전>[P],
+    용신/기신: uint8 비트마스크 (비트 i = OHENG_ORDER[i]), 신살: 고정 길이 바이너리 비트셋 (메타데이터 saju.shinsal_bits 순서).
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    n = len(births)
+    valid = np.asarray(result["valid"], dtype=bool)
+    gapja = engine.gapja_index(result["stems"].astype(np.int64), result["branches"].astype(np.int64))
+    daewoon = daewoon_lists(result)
+    has_daewoon = result["daewoon_row"] >= 0
+    gender_codes = np.array([GENDERS.index(g) if g in GENDERS else -1 for g in result["genders"]], dtype=np.int8)
+    birth_us = np.array(births, dtype="datetime64[us]")
+    ids = pa.array([str(c) for c in customer_ids] if customer_ids is not None else np.arange(n))
+    metadata = arrow_metadata(result)
+    ohaeng, sipshin = result["ohaeng"].astype(np.float32), result["sipshin"].astype(np.float32)
+    periods = daewoon["gapja"].shape[1]
+    for start in range(0, max(n, 1), chunk_rows):
+        rows = slice(start, min(start + chunk_rows, n))
+        ok, dw = valid[rows], has_daewoon[rows]
+        columns = {CUSTOMER_ID_COLUMN: ids[rows], BIRTH_COLUMN: pa.array(birth_us[rows]),
+                   GENDER_COLUMN: _dictionary_column(pa, gender_codes[rows], GENDERS, gender_codes[rows] >= 0)}
+        for p, name in enumerate(engine.PILLAR_NAMES_KOR):
+            columns[name] = _dictionary_column(pa, gapja[rows, p], engine.GAPJA_NAMES, ok)
+        columns["신강/신약"] = _dictionary_column(pa, result["shinkang"][rows], engine.SHINKANG_LABELS, ok)
+        columns["격국"] = _dictionary_column(pa, result["gekuk"][rows], result["gekuk_labels"], ok)
+        columns["용신"] = pa.array(result["yongshin"][rows], type=pa.uint8(), mask=~ok)
+        columns["기신"] = pa.array(result["gishin"][rows], type=pa.uint8(), mask=~ok)
+        columns["오행"] = pa.FixedSizeListArray.from_arrays(pa.array(ohaeng[rows].ravel()), len(engine.OHENG_ORDER), mask=pa.array(~ok))
+        columns["십신"] = pa.FixedSizeListArray.from_arrays(pa.array(sipshin[rows].ravel()), len(engine.SIPSHIN_ORDER), mask=pa.array(~ok))
+        columns["신살"] = _bitset_column(pa, result["shinsal"][rows], ok)
+        columns["대운 시작"] = pa.array(result["daewoon_start_age"][rows], type=pa.int16(), mask=~dw)
+        columns["대운 방향"] = _dictionary_column(pa, result["daewoon_row"][rows] % 2, DAEWOON_DIRECTIONS, dw)
+        columns["대운"] = pa.FixedSizeListArray.from_arrays(_dictionary_column(pa, daewoon["gapja"][rows].ravel(), engine.GAPJA_NAMES),
+                                                           periods, mask=pa.array(~dw))
+        yield pa.RecordBatch.from_pydict(columns, metadata=metadata)
+
+def write_arrow(result, births, path, customer_ids=None, fmt=None, chunk_rows=ARROW_CHUNK_ROWS):
+    """record_batches를 Parquet (fmt="parquet") 또는 Arrow IPC 파일 (fmt="ipc")로 씁니다. fmt가 없으면 확장자로 정합니다."""
+    import pyarrow as pa
+
+    fmt = fmt or ARROW_FORMATS.get(os.path.splitext(path)[1].lower(), "parquet")
+    batches = record_batches(result, births, customer_ids, chunk_rows)
+    first = next(batches)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        with pq.ParquetWriter(path, first.schema) as writer:
+            for batch in itertools.chain([first], batches):
+                writer.write_batch(batch)
+    elif fmt == "ipc":
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, first.schema) as writer:
+            for batch in itertools.chain([first], batches):
+                writer.write_batch(batch)
+    else:
+        raise ValueError(f"오류(알 수 없는 출력 형식: {fmt})")
+    return fmt
+
+def read_arrow(path):
+    """write_arrow로 쓴 파일 -> pyarrow.Table (형식은 확장자로)."""
+    import pyarrow as pa
+
+    if ARROW_FORMATS.get(os.path.splitext(path)[1].lower(), "parquet") == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path)
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all()
+
+# ───────────────────────────────
+# 단건/배치 일치 점검
+# ───────────────────────────────
+def check_classification(n=20000, seed=3, rules=None):
+    """
+    임의 명식 n개의 배치 판정을 단건 함수 결과와 비교합니다 (반올림된 십신 세력 포함).
+    반환: 불일치 목록 [(명식 번호, 항목, 단건 값, 배치 값)].
+    """
+    import saju_compat
+
+    rules = rules if rules is not None else engine
+    charts = saju_compat.random_charts(n, seed)
+    stems, branches = engine.encode_charts(charts)
+    result = rules.classify_arrays(stems, branches)
+    mismatches = []
+    for i, chart in enumerate(charts):
+        _, sipshin = rules.calculate_ohaeng_sipshin_strengths(chart)
+        shinkang = rules.determine_shinkang_shinyak(sipshin)
+        yongshin = rules.determine_yongshin_gishin_simplified(chart["day_gan"], shinkang)
+        expected = {"sipshin": list(sipshin.values()), "shinkang": shinkang,
+                    "gekuk": rules.determine_gekuk(chart["day_gan"], chart["month_gan"], chart["month_ji"], sipshin),
+                    "yongshin": yongshin["yongshin"], "gishin": yongshin["gishin"]}
+        actual = {"sipshin": [float(v) for v in result["sipshin"][i]], **classification_row(result, i)}
+        mismatches += [(i, key, value, actual[key]) for key, value in expected.items() if actual[key] != value]
+    return mismatches
+
+def random_records(n, solar_data, seed=4):
+    """
+    점검/벤치마크용 출생 레코드 (실제 고객 파일처럼 겹침이 많음): 앞 레코드와 완전히 같은 것, 같은 날 다른 시각,
+    절입 시각 전후 2시간 이내, 새 임의 시각을 섞습니다. 반환: (출생 시각 목록, 성별 목록)
+    """
+    rng = random.Random(seed)
+    instants = saju_uncertain._term_instants(solar_data)
+    first, last = datetime(min(solar_data), 1, 1), datetime(max(solar_data), 12, 31)
+    span_minutes = int((last - first).total_seconds() // 60)
+    births, genders = [], []
+    for _ in range(n):
+        roll = rng.random()
+        if births and roll < 0.4:
+            j = rng.randrange(len(births))
+            births.append(births[j])
+            genders.append(genders[j] if rng.random() < 0.8 else rng.choice(("남성", "여성")))
+            continue
+        if births and roll < 0.7:
+            day = births[rng.randrange(len(births))]
+            birth = datetime(day.year, day.month, day.day) + timedelta(minutes=rng.randrange(24 * 60))
+        elif roll < 0.8:
+            birth = rng.choice(instants).replace(second=0) + timedelta(minutes=rng.randint(-120, 120))
+        else:
+            birth = first + timedelta(minutes=rng.randrange(span_minutes))
+        births.append(birth)
+        genders.append(rng.choice(("남성", "여성")))
+    return births, genders
+
+def _daewoon_differences(result, daewoon, i, chart, birth, gender, solar_data, rules):
+    """레코드 i의 배치 대운과 get_daewoon 목록 / get_12_unseong / 지장간 오행 합의 차이 [(항목, 단건 값, 배치 값)]."""
+    expected = []
+    if all(chart.values()) and gender in ("남성", "여성"):
+        daewoon_list, _, _ = rules.get_daewoon(chart["year_gan"], gender, birth, chart["month_gan"], chart["month_ji"], solar_data)
+        expected = [] if "오류" in daewoon_list[0] else daewoon_list
+    actual = daewoon_text_list(result, daewoon, i)
+    if actual != expected:
+        return [("daewoon", expected, actual)]
+    differences = []
+    for p, item in enumerate(expected):
+        ganji = item.rsplit(": ", 1)[1]
+        unseong = engine._12_UNSEONG_PHASES_KOR[daewoon["unseong"][i, p]]
+        if unseong != rules.get_12_unseong(chart["day_gan"], ganji[1]):
+            differences.append(("daewoon_unseong", rules.get_12_unseong(chart["day_gan"], ganji[1]), unseong))
+        ohaeng = [0.0] * len(engine.OHENG_ORDER)
+        for char, proportion in [(ganji[0], 1.0)] + list(rules.JIJI_JANGGAN.get(ganji[1], {}).items()):
+            ohaeng[engine.OHENG_ORDER.index(rules.GAN_TO_OHENG[char])] += proportion
+        if any(abs(a - b) > 1e-9 for a, b in zip(ohaeng, daewoon["ohaeng"][i, p])):
+            differences.append(("daewoon_ohaeng", ohaeng, [float(v) for v in daewoon["ohaeng"][i, p]]))
+    return differences
+
+def check_records(solar_data, n=3000, seed=4, rules=None):
+    """
+    겹침이 많은 임의 출생 레코드 n건을 자시 규칙마다 analyze_records로 계산해, 레코드마다 chart_at 명식, 단건 판정 함수,
+    get_daewoon 목록 (대운 12운성/오행 포함) 결과와 비교합니다.
+    반환: 불일치 목록 [(자시 규칙, 레코드 번호, 항목, 단건 값, 배치 값)].
+    """
+    rules = rules if rules is not None else engine
+    births, genders = random_records(n, solar_data, seed)
+    mismatches = []
+    for convention in engine.ZASI_CONVENTIONS:
+        result = analyze_records(births, genders, solar_data, convention, rules)
+        daewoon = daewoon_lists(result, rules=rules)
+        expected_cache = {}
+        for i, birth in enumerate(births):
+            chart = saju_uncertain.chart_at(birth, solar_data, convention)
+            valid = all(chart.values())
+            mismatches += [(convention, i, item, expected, actual) for item, expected, actual
+                           in _daewoon_differences(result, daewoon, i, chart, birth, genders[i], solar_data, rules)]
+            if valid != bool(result["valid"][i]):
+                mismatches.append((convention, i, "valid", valid, bool(result["valid"][i])))
+                continue
+            if not valid:
+                continue
+            key = tuple(chart.values())
+            if key not in expected_cache:
+                ohaeng, sipshin = rules.calculate_ohaeng_sipshin_strengths(chart)
+                shinkang = rules.determine_shinkang_shinyak(sipshin)
+                yongshin = rules.determine_yongshin_gishin_simplified(chart["day_gan"], shinkang)
+                expected_cache[key] = {
+                    "chart": chart, "ohaeng": list(ohaeng.values()), "sipshin": list(sipshin.values()), "shinkang": shinkang,
+                    "gekuk": rules.determine_gekuk(chart["day_gan"], chart["month_gan"], chart["month_ji"], sipshin),
+                    "yongshin": yongshin["yongshin"], "gishin": yongshin["gishin"]}
+            actual = {"chart": engine.decode_chart(result["stems"][i], result["branches"][i]),
+                      "ohaeng": [float(v) for v in result["ohaeng"][i]], "sipshin": [float(v) for v in result["sipshin"][i]],
+                      **classification_row(result, i)}
+            mismatches += [(convention, i, item, value, actual[item]) for item, value in expected_cache[key].items() if actual[item] != value]
+    return mismatches
+
+def _arrow_row(record, metadata_bits, width):
+    """read_arrow 표의 한 행 (to_pylist) -> record_rows와 같은 형식의 행 (세력은 float32를 소수점 한 자리로)."""
+    row = [record[CUSTOMER_ID_COLUMN], f"{record[BIRTH_COLUMN]:%Y-%m-%d %H:%M}", record[GENDER_COLUMN] or ""]
+    if record["년주"] is None:
+        return row + ["오류(월주 계산 불가: 절기 데이터 확인)"] + [""] * (width - len(row) - 1)
+    masks = [", ".join(sorted(o for i, o in enumerate(metadata_bits) if record[column] >> i & 1)) for column in ("용신", "기신")]
+    row += [record[name] for name in engine.PILLAR_NAMES_KOR] + [record["신강/신약"], record["격국"]] + masks
+    row += [round(v, 1) for v in record["오행"]]
+    if record["대운"] is None:
+        return row + ["", ""]
+    return row + [f"{record['대운 시작']}세 {record['대운 방향']}", " ".join(record["대운"])]
+
+def check_arrow(solar_data, n=2000, seed=5, rules=None):
+    """
+    임의 출생 레코드를 Parquet / Arrow IPC로 썼다가 다시 읽어, 사전/비트셋 열을 풀어낸 값이 record_rows (CSV 행)와
+    신살 판정 (shinsal 열)과 같은지 비교합니다. 반환: 불일치 목록 [(형식, 레코드 번호, 기대 값, 읽은 값)].
+    """
+    import tempfile
+
+    import numpy as np
+
+    births, genders = random_records(n, solar_data, seed)
+    result = analyze_records(births, genders, solar_data, rules=rules)
+    expected = record_rows(result, births)
+    mismatches = []
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt, ext in (("parquet", ".parquet"), ("ipc", ".arrow")):
+            path = os.path.join(directory, "records" + ext)
+            write_arrow(result, births, path, chunk_rows=max(1, n // 3))
+            table = read_arrow(path)
+            oheng_bits = json.loads(table.schema.metadata[b"saju.oheng_bits"])
+            width = len(json.loads(table.schema.metadata[b"saju.shinsal_bits"]))
+            column = table.column("신살")
+            stored = column.to_pylist()
+            blank = bytes(column.type.byte_width)
+            shinsal = np.unpackbits(np.frombuffer(b"".join(blank if v is None else v for v in stored), dtype=np.uint8).reshape(len(table), -1),
+                                    axis=1, bitorder="little")[:, :width].astype(bool)
+            valid = np.asarray(result["valid"], dtype=bool)
+            is_null = np.array([v is None for v in stored], dtype=bool)
+            mismatches += [(fmt, i, "값" if valid[i] else "null", "null" if is_null[i] else "값") for i in np.flatnonzero(is_null == valid)] # 계산 불가 행만 null
+            mismatches += [(fmt, i, result["shinsal"][i].tolist(), shinsal[i].tolist())
+                           for i in np.flatnonzero(((shinsal != result["shinsal"]).any(axis=1)) & valid)]
+            for i, record in enumerate(table.to_pylist()):
+                actual = _arrow_row(record, oheng_bits, len(expected["columns"]))
+                if actual != expected["rows"][i]:
+                    mismatches.append((fmt, i, expected["rows"][i], actual))
+    return mismatches
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="대량 명식 배치 분석 (세력/신강/격국/용신)")
+    parser.add_argument("records", nargs="?", help="출생 레코드 CSV (customer_id, birth, gender)")
+    parser.add_argument("--out", help="레코드별 결과 저장 경로: .csv, .parquet, .arrow/.feather (Arrow IPC) (기본: 표준 출력에 표로)")
+    parser.add_argument("--convention", default=engine.DEFAULT_ZASI_CONVENTION, choices=list(engine.ZASI_CONVENTIONS), help="자시 경계 규칙")
+    parser.add_argument("--check", action="store_true", help="임의 명식/출생 레코드로 단건 계산과 배치 결과 비교")
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--profile", default=None, help="규칙 프로필 (기본: --check는 모든 프로필, 그 외는 기본 규칙)")
+    args = parser.parse_args(argv)
+    if not (args.check or args.records):
+        parser.print_help()
+        return 0
+
+    import saju_rules
+    solar_data = engine.load_solar_terms(os.path.join(BASE_DIR, engine.FILE_NAME), lambda level, message: print(message, file=sys.stderr))
+    if solar_data is None:
+        return 1
+    if args.records:
+        rules = saju_rules.get_profile(args.profile) if args.profile else engine
+        if rules is None:
+            parser.error(f"규칙 프로필 '{args.profile}'을 읽을 수 없습니다.")
+        try:
+            customer_ids, births, genders = load_records(args.records)
+        except (OSError, ValueError) as e:
+            print(e, file=sys.stderr)
+            return 1
+        result = analyze_records(births, genders, solar_data, args.convention, rules)
+        if args.out and os.path.splitext(args.out)[1].lower() in ARROW_FORMATS:
+            try:
+                write_arrow(result, births, args.out, customer_ids)
+            except ImportError:
+                print("오류(Arrow/Parquet 출력에는 pyarrow가 필요합니다: pip install pyarrow)", file=sys.stderr)
+                return 1
+        elif args.out:
+            write_rows(record_rows(result, births, customer_ids), args.out)
+        else:
+            import saju_table
+            print(saju_table.to_text(record_rows(result, births, customer_ids)))
+        print(format_stats(result["stats"]), file=sys.stderr)
+        return 0
+
+    keys = [args.profile] if args.profile else [key for key, _, _ in saju_rules.list_profiles()]
+    failed = False
+    for key in keys:
+        rules = saju_rules.get_profile(key)
+        if rules is None:
+            parser.error(f"규칙 프로필 '{key}'을 읽을 수 없습니다.")
+        mismatches = check_classification(args.n, rules=rules)
+        for i, item, expected, actual in mismatches[:10]:
+            print(f"[{key}] 명식 #{i} {item}: 단건 {expected} / 배치 {actual}")
+        print(f"[{key}] 비교 완료: 명식 {args.n}건, 불일치 {len(mismatches)}건")
+        record_mismatches = check_records(solar_data, max(1, args.n // 10), rules=rules)
+        for convention, i, item, expected, actual in record_mismatches[:10]:
+            print(f"[{key} {convention}] 레코드 #{i} {item}: 단건 {expected} / 배치 {actual}")
+        print(f"[{key}] 비교 완료: 출생 레코드 {max(1, args.n // 10)}건 x 자시 규칙 {len(engine.ZASI_CONVENTIONS)}개, 불일치 {len(record_mismatches)}건")
+        failed = failed or bool(mismatches or record_mismatches)
+    try:
+        import pyarrow # noqa: F401
+    except ImportError:
+        print("Arrow/Parquet 출력 점검 생략 (pyarrow 없음)")
+        return 1 if failed else 0
+    arrow_mismatches = check_arrow(solar_data, max(1, args.n // 10))
+    for fmt, i, expected, actual in arrow_mismatches[:10]:
+        print(f"[{fmt}] 레코드 #{i}: CSV 행 {expected} / 읽은 행 {actual}")
+    print(f"비교 완료: Parquet/Arrow IPC 출력 {max(1, args.n // 10)}건, 불일치 {len(arrow_mismatches)}건")
+    return 1 if failed or arrow_mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
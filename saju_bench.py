@@ -0,0 +1,529 @@
+# 사주 엔진 벤치마크 (import 시간 + 주요 계산 경로 처리량)
+# 사용:
+#   python saju_bench.py                      # 전체 실행, 표 형식 출력
+#   python saju_bench.py --json out.json      # 결과를 JSON으로도 기록
+#   python saju_bench.py --max-import-ms 150  # saju_engine import가 기준보다 느리면 종료 코드 1 (CI 회귀 확인용)
+# import 시간은 매번 새 인터프리터에서 측정하므로 이미 로드된 모듈의 영향을 받지 않습니다.
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# import 시 함께 로드되면 시작 시간이 크게 늘어나는 패키지들
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl", "lunardate", "streamlit", "pyarrow")
+
+# (측정 대상 모듈, 설명)
+IMPORT_TARGETS = [
+    ("saju_engine", "핵심 엔진 (표준 라이브러리만)"),
+    ("saju_verify", "차분 검증 하네스"),
+    ("saju_astro", "천문 절기 계산 (numpy)"),
+]
+
+_IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+# ───────────────────────────────
+# import 시간 측정
+# ───────────────────────────────
+def measure_import(module, repeat=5):
+    """새 인터프리터에서 module을 import하는 데 걸린 시간(초)의 최솟값/중앙값과 함께 로드된 무거운 패키지 목록."""
+    samples, heavy = [], []
+    probe = _IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, "-c", probe], cwd=BASE_DIR, capture_output=True, text=True)
+        if completed.returncode != 0:
+            return {"module": module, "error": completed.stderr.strip().splitlines()[-1] if completed.stderr else "실패"}
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        heavy = result["heavy"]
+    return {"module": module, "min_ms": min(samples) * 1000, "median_ms": statistics.median(samples) * 1000, "heavy": heavy}
+
+# ───────────────────────────────
+# 계산 경로 벤치마크
+# ───────────────────────────────
+def _random_datetimes(n, seed=7, start_year=1950, end_year=2050):
+    rng = random.Random(seed)
+    start = datetime(start_year, 1, 1)
+    span_minutes = int((datetime(end_year, 1, 1) - start).total_seconds() // 60)
+    return [start + timedelta(minutes=rng.randrange(span_minutes)) for _ in range(n)]
+
+def _timeit(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def bench_solar_terms_load(ctx):
+    engine = ctx["engine"]
+    file_name = os.path.join(BASE_DIR, engine.FILE_NAME)
+    quiet = lambda level, message: None
+    rows = [("절기표 로드 (원본 파싱, 캐시 미사용)", 1, _timeit(lambda: engine.load_solar_terms(file_name, quiet, use_cache=False), repeat=1))]
+    engine.load_solar_terms(file_name, quiet) # 캐시 준비
+    rows.append(("절기표 로드 (컴파일 캐시 적중)", 1, _timeit(lambda: engine.load_solar_terms(file_name, quiet))))
+    return rows
+
+def bench_scalar_pillars(ctx):
+    engine, solar = ctx["engine"], ctx["solar_data"]
+    dts = _random_datetimes(ctx["n"])
+    def run():
+        for dt in dts:
+            year_gan = engine.get_year_ganji(engine.get_saju_year(dt, solar))[1]
+            engine.get_month_ganji(year_gan, dt, solar)
+            day_gan = engine.get_day_ganji(dt.year, dt.month, dt.day)[1]
+            engine.get_time_pillar(day_gan, dt.hour, dt.minute)
+    return [("사주 4주 (스칼라)", len(dts), _timeit(run, repeat=1))]
+
+def bench_time_corrections(ctx):
+    engine = ctx["engine"]
+    dts = _random_datetimes(ctx["n"], start_year=1900, end_year=2000)
+    return [("표준시/서머타임 보정 (스칼라)", len(dts), _timeit(lambda: [engine.get_kst_correction(dt) for dt in dts]))]
+
+def bench_numpy_paths(ctx):
+    try:
+        import numpy as np
+    except ImportError:
+        return [("numpy 배치 경로", 0, None)]
+    engine = ctx["engine"]
+    n = ctx["n"] * 10
+    rng = np.random.default_rng(7)
+    day_gan = rng.integers(0, 10, n)
+    minutes = rng.integers(0, engine.MINUTES_PER_DAY, n)
+    wall = np.datetime64("1900-01-01T00:00") + rng.integers(0, 100 * 525960, n).astype("timedelta64[m]")
+    longitudes = rng.uniform(124.0, 132.0, n)
+    rows = [
+        ("시주 조회표 (배치)", n, _timeit(lambda: engine.time_pillar_arrays(day_gan, minutes))),
+        ("표준시/서머타임 보정 (배치)", n, _timeit(lambda: engine.kst_correction_arrays(wall))),
+        ("진태양시 보정 (배치)", n, _timeit(lambda: engine.solar_time_correction_arrays(wall, longitudes))),
+    ]
+    import saju_astro
+    rows.append(("천문 절기 생성 (401년 x 24절기)", 401 * 24, _timeit(lambda: saju_astro.build_term_table(1800, 2200), repeat=1)))
+    return rows
+
+def bench_compatibility(ctx):
+    try:
+        import numpy as np
+    except ImportError:
+        return [("궁합 배치 경로", 0, None)]
+    import saju_compat
+    charts = saju_compat.random_charts(ctx["n"])
+    stems, branches = ctx["engine"].encode_charts(charts)
+    rng = np.random.default_rng(7)
+    many = 1_000_000
+    gapja = rng.integers(0, 60, (many, 4))
+    many_stems, many_branches = (gapja % 10).astype(np.int8), (gapja % 12).astype(np.int8)
+    ohaeng = saju_compat.ohaeng_vectors(many_stems, many_branches)
+    pairs = list(zip(charts, charts[1:]))
+    return [
+        ("궁합 분석 (스칼라)", len(pairs), _timeit(lambda: [saju_compat.analyze_compatibility(a, b) for a, b in pairs], repeat=1)),
+        ("궁합 행렬 (N x N)", len(charts) ** 2, _timeit(lambda: saju_compat.score_matrix(stems, branches, stems, branches), repeat=1)),
+        ("궁합 상위 10명 (후보 100만, 오행 미리 계산)", many, _timeit(lambda: saju_compat.top_k_matches(charts[0], many_stems, many_branches, 10, ohaeng=ohaeng))),
+    ]
+
+def bench_daily_fanout(ctx):
+    import saju_compat
+    import saju_daily
+    customers = [(f"C{i}", chart) for i, chart in enumerate(saju_compat.random_charts(ctx["n"] * 10))]
+    index = saju_daily.build_index(customers)
+    pillars = [ctx["engine"].get_ganji_from_index(i) for i in range(60)]
+    pillars = [(ganji, ganji[0], ganji[1]) for ganji in pillars]
+    return [
+        ("일진 알림 대상 (역색인, 60일)", len(customers) * 60, _timeit(lambda: [saju_daily.fan_out(index, p) for p in pillars], repeat=1)),
+        ("일진 알림 대상 (전체 스캔, 60일)", len(customers) * 60, _timeit(lambda: [saju_daily.scan_all(customers, p) for p in pillars], repeat=1)),
+    ]
+
+def bench_shinsal(ctx):
+    import saju_compat
+    engine = ctx["engine"]
+    charts = saju_compat.random_charts(ctx["n"])
+    results = [("신살 분석 (스칼라)", len(charts), _timeit(lambda: [engine.analyze_shinsal(c) for c in charts]))]
+    try:
+        import numpy # noqa: F401
+    except ImportError:
+        return results + [("신살 배치 판정", 0, None)]
+    stems, branches = engine.encode_charts(charts)
+    return results + [("신살 배치 판정 (shinsal_arrays)", len(charts), _timeit(lambda: engine.shinsal_arrays(stems, branches)))]
+
+def bench_lazy_sections(ctx):
+    import saju_compat
+    engine, solar = ctx["engine"], ctx["solar_data"]
+    charts = saju_compat.random_charts(ctx["n"] // 10)
+    dts = _random_datetimes(len(charts))
+    def run(sections):
+        for chart, dt in zip(charts, dts):
+            lazy = engine.LazyChart(chart, gender="여성", birth_dt=dt, solar_data=solar, target_date=(2026, 10, 19))
+            for name in sections:
+                lazy[name]
+    return [
+        ("분석 섹션 (명식 표만, 지연 계산)", len(charts), _timeit(lambda: run(()))),
+        ("분석 섹션 (신살만)", len(charts), _timeit(lambda: run(("shinsal",)))),
+        ("분석 섹션 (전체)", len(charts), _timeit(lambda: run(engine.CHART_SECTIONS), repeat=1)),
+    ]
+
+def bench_table_render(ctx):
+    import saju_compat
+    import saju_report
+    import saju_table
+    engine, solar = ctx["engine"], ctx["solar_data"]
+    charts = saju_compat.random_charts(ctx["n"] // 10)
+    dts = _random_datetimes(len(charts))
+    # 요청 하나가 만드는 표 데이터 (명식, 오행/십신 세력, 대운, 세운/일운/월운)를 미리 계산해 두고 렌더링만 잽니다.
+    requests = []
+    for chart, dt in zip(charts, dts):
+        lazy = engine.LazyChart(chart, gender="남성", birth_dt=dt, solar_data=solar, target_date=(2026, 10, 19))
+        pillars = [(chart[f"{p}_gan"] + chart[f"{p}_ji"], chart[f"{p}_gan"], chart[f"{p}_ji"]) for p in engine.PILLAR_KEYS]
+        ohaeng, sipshin = lazy["strengths"]
+        requests.append((pillars, ohaeng, sipshin, lazy["daewoon"], lazy["seun"], lazy["ilun"], lazy["wolun"]))
+
+    def render_native():
+        for pillars, ohaeng, sipshin, daewoon, seun, ilun, wolun in requests:
+            tables = [saju_report.myeongshik_table(pillars), saju_report.strength_table("오행", ohaeng, engine.OHENG_ORDER),
+                      saju_report.strength_table("십신", sipshin, engine.SIPSHIN_ORDER), saju_report.daewoon_rows(daewoon)[1],
+                      saju_table.make_table(["연도", "간지"], seun), saju_table.make_table(["날짜", "간지"], ilun),
+                      saju_table.make_table(["연월", "간지"], wolun)]
+            for table in tables:
+                saju_table.to_markdown(table), saju_table.to_html(table)
+            for table in tables[3:]:
+                saju_table.to_text(table)
+
+    results = [("결과 표 렌더링 (saju_table, Markdown+HTML+텍스트)", len(requests), _timeit(render_native))]
+    try:
+        import pandas as pd
+        import tabulate # noqa: F401 (DataFrame.to_markdown 의존성)
+    except ImportError:
+        return results + [("결과 표 렌더링 (pandas DataFrame)", 0, None)]
+
+    def render_pandas():
+        for pillars, ohaeng, sipshin, daewoon, seun, ilun, wolun in requests:
+            ms, dw = saju_report.myeongshik_table(pillars), saju_report.daewoon_rows(daewoon)[1]
+            frames = [pd.DataFrame(ms["rows"], columns=list(ms["columns"])).set_index("구분"),
+                      pd.DataFrame({"오행": engine.OHENG_ORDER, "세력": [ohaeng.get(k, 0.0) for k in engine.OHENG_ORDER]}),
+                      pd.DataFrame({"십신": engine.SIPSHIN_ORDER, "세력": [sipshin.get(k, 0.0) for k in engine.SIPSHIN_ORDER]}),
+                      pd.DataFrame(dw["rows"], columns=list(dw["columns"])),
+                      pd.DataFrame(seun, columns=["연도", "간지"]), pd.DataFrame(ilun, columns=["날짜", "간지"]),
+                      pd.DataFrame(wolun, columns=["연월", "간지"])]
+            for i, df in enumerate(frames):
+                df.to_markdown(index=i == 0), df.to_html()
+            for df in frames[3:]:
+                df.to_string(index=False, header=True)
+
+    return results + [("결과 표 렌더링 (pandas DataFrame, 이전 방식)", len(requests), _timeit(render_pandas, repeat=1))]
+
+def bench_unknown_hour(ctx):
+    try:
+        import numpy # noqa: F401
+    except ImportError:
+        return [("시각 미상 분석 (후보 12개 일괄)", 0, None)]
+    import saju_uncertain
+    engine, solar = ctx["engine"], ctx["solar_data"]
+    days = [dt.date() for dt in _random_datetimes(ctx["n"] // 20)]
+    sections = ("strengths", "shinkang", "gekuk", "shinsal", "hap_chung")
+
+    def one_pass():
+        for day in days:
+            saju_uncertain.analyze_unknown_hour(saju_uncertain.date_chart(day, solar))
+
+    def recompute():
+        # 시주 후보마다 명식 전체(년/월/일/시주)와 분석 섹션을 새로 계산하는 방식
+        for day in days:
+            for j in range(12):
+                dt = datetime(day.year, day.month, day.day) + timedelta(minutes=(j * 120 + 30) % 1440)
+                _, year_gan, year_ji = engine.get_year_ganji(engine.get_saju_year(dt, solar))
+                _, month_gan, month_ji = engine.get_month_ganji(year_gan, dt, solar)
+                _, day_gan, day_ji = engine.get_day_ganji(dt.year, dt.month, dt.day)
+                _, time_gan, time_ji = engine.get_time_pillar(day_gan, dt.hour, dt.minute)
+                lazy = engine.LazyChart({"year_gan": year_gan, "year_ji": year_ji, "month_gan": month_gan, "month_ji": month_ji,
+                                         "day_gan": day_gan, "day_ji": day_ji, "time_gan": time_gan, "time_ji": time_ji})
+                for name in sections:
+                    lazy[name]
+
+    return [
+        ("시각 미상 분석 (후보 12개 일괄)", len(days), _timeit(one_pass)),
+        ("시각 미상 분석 (후보별 전체 재계산 x12)", len(days), _timeit(recompute, repeat=1)),
+    ]
+
+def bench_birth_time_intervals(ctx):
+    import saju_uncertain
+    solar = ctx["solar_data"]
+    datetimes = _random_datetimes(ctx["n"] // 10)
+    margin = 60
+
+    def boundaries():
+        saju_uncertain.flag_birth_times(datetimes, margin, solar)
+
+    def minute_sweep():
+        # 오차 범위의 매 분마다 명식을 계산해 바뀌는 기둥을 찾는 방식
+        for dt in datetimes:
+            charts = [saju_uncertain.chart_at(dt + timedelta(minutes=k), solar) for k in range(-margin, margin + 1)]
+            {key for a, b in zip(charts, charts[1:]) for key in saju_uncertain._changed_pillars(a, b)}
+
+    return [
+        (f"출생 시각 ±{margin}분 구간 (경계 bisect)", len(datetimes), _timeit(boundaries)),
+        (f"출생 시각 ±{margin}분 구간 (분 단위 전수)", len(datetimes), _timeit(minute_sweep, repeat=1)),
+    ]
+
+def bench_partial_distribution(ctx):
+    import saju_uncertain
+    engine, solar = ctx["engine"], ctx["solar_data"]
+    start, end = saju_uncertain.partial_birth_period(1990, 2)
+    minutes = int((end - start).total_seconds() // 60)
+
+    def analytic():
+        saju_uncertain.period_chart_counts(start, end, solar)
+
+    def minute_sweep():
+        # 매 분의 명식을 get_month_ganji/get_day_ganji/get_time_pillar로 계산해 세는 방식
+        counts = {}
+        for day in range(minutes // 1440):
+            dt = start + timedelta(days=day)
+            for m in range(1440):
+                t = dt + timedelta(minutes=m)
+                _, year_gan, year_ji = engine.get_year_ganji(engine.get_saju_year(t, solar))
+                _, month_gan, month_ji = engine.get_month_ganji(year_gan, t, solar)
+                _, day_gan, day_ji = engine.get_day_ganji(t.year, t.month, t.day)
+                _, time_gan, time_ji = engine.get_time_pillar(day_gan, t.hour, t.minute)
+                key = (year_gan, year_ji, month_gan, month_ji, day_gan, day_ji, time_gan, time_ji)
+                counts[key] = counts.get(key, 0) + 1
+
+    return [
+        ("연월만 아는 명식 분포 (일진 주기)", minutes, _timeit(analytic)),
+        ("연월만 아는 명식 분포 (분 단위 전수)", minutes, _timeit(minute_sweep, repeat=1)),
+    ]
+
+def bench_luck_curve(ctx):
+    try:
+        import numpy # noqa: F401
+    except ImportError:
+        return [("평생 운 점수 (1,200개월 배열)", 0, None)]
+    import saju_luck
+    import saju_uncertain
+    solar = ctx["solar_data"]
+    births = _random_datetimes(ctx["n"] // 100, end_year=2000) # 절기표(~2100년) 안에서 100년
+    charts = [saju_uncertain.chart_at(dt, solar) for dt in births]
+
+    def vectorized():
+        for chart, dt in zip(charts, births):
+            saju_luck.luck_curve(chart, "남성", dt, solar)
+
+    def scalar():
+        for chart, dt in zip(charts, births):
+            saju_luck.luck_curve_scalar(chart, "남성", dt, solar)
+
+    return [
+        ("평생 운 점수 (1,200개월 배열)", len(births), _timeit(vectorized)),
+        ("평생 운 점수 (달마다 엔진 함수)", len(births), _timeit(scalar, repeat=1)),
+    ]
+
+def bench_strength_series(ctx):
+    try:
+        import numpy # noqa: F401
+    except ImportError:
+        return [("원국+운 세력 시계열 (배열)", 0, None)]
+    import saju_luck
+    import saju_uncertain
+    engine, solar = ctx["engine"], ctx["solar_data"]
+    births = _random_datetimes(ctx["n"] // 2, end_year=2000)
+    charts = [saju_uncertain.chart_at(dt, solar) for dt in births]
+    params = saju_luck.luck_params(charts, ["여성"] * len(charts), births, solar)
+    stems, branches = engine.encode_charts(charts)
+    steps = saju_luck.transit_steps((2021, 1), (2030, 12))
+    few = 20
+
+    def vectorized():
+        saju_luck.strength_series(stems, branches, params, steps, include_wolun=True)
+
+    def scalar():
+        # 고객/달마다 원국과 운 간지 6글자를 더한 사전 계산 (세운/월운 간지는 달마다 엔진 함수로)
+        for chart, birth_dt in zip(charts[:few], births[:few]):
+            for year, month in zip(steps["year"], steps["month"]):
+                dt = datetime(int(year), int(month), 15, 12, 0)
+                _, seun_gan, seun_ji = engine.get_year_ganji(engine.get_saju_year(dt, solar))
+                _, wolun_gan, wolun_ji = engine.get_month_ganji(seun_gan, dt, solar)
+                ohaeng, sipshin = engine.calculate_ohaeng_sipshin_strengths(chart)
+                for char in (seun_gan, seun_ji, wolun_gan, wolun_ji):
+                    for janggan, proportion in engine.JIJI_JANGGAN.get(char, {char: 1.0}).items():
+                        ohaeng[engine.GAN_TO_OHENG[janggan]] += proportion
+                        sipshin[engine.SIPSHIN_MAP[chart["day_gan"]][janggan]] += proportion
+
+    points = len(steps["U"])
+    return [
+        (f"원국+운 세력 시계열 (배열, {points}개월)", len(charts) * points, _timeit(vectorized)),
+        (f"원국+운 세력 시계열 (사전, {points}개월)", few * points, _timeit(scalar, repeat=1)),
+    ]
+
+def bench_classify(ctx):
+    try:
+        import numpy # noqa: F401
+    except ImportError:
+        return [("신강/격국/용신 배치 판정", 0, None)]
+    import saju_compat
+    engine = ctx["engine"]
+    charts = saju_compat.random_charts(ctx["n"] * 10)
+    stems, branches = engine.encode_charts(charts)
+    _, sipshin = engine.strength_arrays(stems, branches)
+
+    def scalar():
+        for chart in charts[:ctx["n"]]:
+            _, strengths = engine.calculate_ohaeng_sipshin_strengths(chart)
+            shinkang = engine.determine_shinkang_shinyak(strengths)
+            engine.determine_gekuk(chart["day_gan"], chart["month_gan"], chart["month_ji"], strengths)
+            engine.determine_yongshin_gishin_simplified(chart["day_gan"], shinkang)
+
+    return [
+        ("신강/격국/용신 단건 (세력 포함)", ctx["n"], _timeit(scalar, repeat=1)),
+        ("신강/격국/용신 배치 (classify_arrays, 세력 포함)", len(charts), _timeit(lambda: engine.classify_arrays(stems, branches))),
+        ("신강/격국/용신 배치 (세력 계산 제외)", len(charts), _timeit(lambda: engine.classify_arrays(stems, branches, sipshin))),
+    ]
+
+def bench_batch_records(ctx):
+    try:
+        import numpy # noqa: F401
+    except ImportError:
+        return [("출생 레코드 배치 (중복 묶기)", 0, None)]
+    import saju_batch
+    import saju_uncertain
+    engine, solar = ctx["engine"], ctx["solar_data"]
+    births, genders = saju_batch.random_records(ctx["n"] * 5, solar)
+    stats = saju_batch.analyze_records(births, genders, solar)["stats"]
+
+    def per_record():
+        # 묶지 않은 경로: 레코드마다 chart_at, 세력/판정은 전체 배열로 한 번
+        charts = [saju_uncertain.chart_at(birth, solar) for birth in births]
+        stems, branches = engine.encode_charts([chart for chart in charts if all(chart.values())])
+        engine.classify_arrays(stems, branches)
+
+    return [
+        (f"출생 레코드 배치 (묶음: 키 {stats['keys']}, 일 {stats['days']}, 명식 {stats['charts']})", len(births),
+         _timeit(lambda: saju_batch.analyze_records(births, genders, solar))),
+        ("출생 레코드 배치 (레코드마다 chart_at)", len(births), _timeit(per_record, repeat=1)),
+    ]
+
+def bench_daewoon_tables(ctx):
+    try:
+        import numpy as np
+    except ImportError:
+        return [("평생 대운 배치 (순서표)", 0, None)]
+    import saju_batch
+    import saju_uncertain
+    engine, solar = ctx["engine"], ctx["solar_data"]
+    births, genders = saju_batch.random_records(ctx["n"] * 5, solar)
+    result = saju_batch.analyze_records(births, genders, solar)
+    charts = [saju_uncertain.chart_at(birth, solar) for birth in births[:ctx["n"]]]
+    month_gapja = engine.gapja_index(result["stems"][:, 1].astype(np.int64), result["branches"][:, 1].astype(np.int64))
+
+    def scalar():
+        for chart, birth, gender in zip(charts, births, genders):
+            if all(chart.values()):
+                engine.get_daewoon(chart["year_gan"], gender, birth, chart["month_gan"], chart["month_ji"], solar)
+
+    def vectorized():
+        rows, ages = saju_batch._daewoon_starts(births, genders, result["stems"][:, 0], month_gapja, result["valid"], solar)
+        engine.daewoon_arrays(rows, ages, result["stems"][:, 2].clip(0))
+
+    return [
+        ("평생 대운 단건 (get_daewoon)", len(charts), _timeit(scalar, repeat=1)),
+        ("평생 대운 배치 (절입 검색 + 순서표 모으기)", len(births), _timeit(vectorized)),
+        ("평생 대운 배치 (순서표 모으기만)", len(births), _timeit(lambda: saju_batch.daewoon_lists(result))),
+    ]
+
+def bench_arrow_output(ctx):
+    try:
+        import numpy # noqa: F401
+        import pyarrow # noqa: F401
+    except ImportError:
+        return [("배치 결과 Parquet/Arrow 출력", 0, None)]
+    import tempfile
+    import saju_batch
+    solar = ctx["solar_data"]
+    births, genders = saju_batch.random_records(ctx["n"] * 5, solar)
+    result = saju_batch.analyze_records(births, genders, solar)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for label, file_name, write in (
+            ("CSV (record_rows)", "records.csv", lambda path: saju_batch.write_rows(saju_batch.record_rows(result, births), path)),
+            ("Parquet", "records.parquet", lambda path: saju_batch.write_arrow(result, births, path)),
+            ("Arrow IPC", "records.arrow", lambda path: saju_batch.write_arrow(result, births, path)),
+        ):
+            path = os.path.join(directory, file_name)
+            seconds = _timeit(lambda: write(path))
+            results.append((f"배치 결과 출력 {label}, {os.path.getsize(path) // 1024} KB", len(births), seconds))
+    return results
+
+BENCHMARKS = [bench_solar_terms_load, bench_scalar_pillars, bench_time_corrections, bench_numpy_paths, bench_compatibility,
+              bench_daily_fanout, bench_shinsal,
+              bench_lazy_sections, bench_table_render, bench_unknown_hour, bench_birth_time_intervals,
+              bench_partial_distribution, bench_luck_curve, bench_strength_series, bench_classify,
+              bench_batch_records, bench_daewoon_tables,
+              bench_arrow_output]
+
+# ───────────────────────────────
+# 실행 및 출력
+# ───────────────────────────────
+def run_benchmarks(n=2000, import_repeat=5):
+    import saju_engine
+
+    results = {"python": sys.version.split()[0], "imports": [measure_import(module, import_repeat) for module, _ in IMPORT_TARGETS], "benchmarks": []}
+    ctx = {"engine": saju_engine, "n": n}
+    ctx["solar_data"] = saju_engine.load_solar_terms(os.path.join(BASE_DIR, saju_engine.FILE_NAME), lambda level, message: None)
+    for bench in BENCHMARKS:
+        for name, count, seconds in bench(ctx):
+            results["benchmarks"].append({"name": name, "count": count, "seconds": seconds,
+                                          "per_second": count / seconds if seconds else None})
+    return results
+
+def format_results(results):
+    lines = [f"Python {results['python']}", "", "[import 시간] (새 인터프리터, ms)"]
+    descriptions = dict(IMPORT_TARGETS)
+    for item in results["imports"]:
+        if "error" in item:
+            lines.append(f"  {item['module']:<14} 실패: {item['error']}")
+            continue
+        heavy = ", ".join(item["heavy"]) or "-"
+        lines.append(f"  {item['module']:<14} 최소 {item['min_ms']:8.1f}  중앙값 {item['median_ms']:8.1f}  "
+                     f"함께 로드: {heavy:<20} ({descriptions.get(item['module'], '')})")
+    lines += ["", "[계산 경로]"]
+    for item in results["benchmarks"]:
+        if item["seconds"] is None:
+            lines.append(f"  {item['name']:<34} 건너뜀")
+            continue
+        rate = f"{item['per_second']:>14,.0f}/초" if item["count"] > 1 else ""
+        lines.append(f"  {item['name']:<34} {item['count']:>9,}건 {item['seconds'] * 1000:10.2f} ms {rate}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="사주 엔진 import 시간 및 계산 경로 벤치마크")
+    parser.add_argument("--n", type=int, default=2000, help="스칼라 벤치마크 건수 (배치는 10배)")
+    parser.add_argument("--import-repeat", type=int, default=5, help="import 시간 측정 반복 횟수")
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    parser.add_argument("--max-import-ms", type=float, help="saju_engine import 최소 시간이 이 값을 넘으면 종료 코드 1")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.n, args.import_repeat)
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.max_import_ms is not None:
+        engine_import = next((item for item in results["imports"] if item["module"] == "saju_engine"), {})
+        if "min_ms" not in engine_import or engine_import["min_ms"] > args.max_import_ms:
+            print(f"\nsaju_engine import 시간이 기준({args.max_import_ms} ms)을 넘었습니다.", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+# 궁합(宮合) 점수 계산 모듈
+# 두 명식 사이의 합충형해파(엔진의 규칙 상수 재사용)와 오행 보완 정도로 점수를 매깁니다.
+#   - analyze_compatibility(chart_a, chart_b) : 단건, 관계 목록과 설명 포함
+#   - score_one_vs_many / score_matrix / top_k_matches : 정수 코드 명식 배열에 대한 NumPy 배치 계산
+# 배치 경로는 단건과 같은 쌍 조회표를 쓰므로 점수가 일치합니다 (python saju_compat.py --check 로 확인).
+
+import argparse
+import random
+import sys
+
+import saju_engine as engine
+from saju_engine import GAN, JI, OHENG_ORDER, PILLAR_NAMES_KOR_SHORT
+
+# ───────────────────────────────
+# 궁합 점수 상수
+# ───────────────────────────────
+# 관계별 기본 점수 (합은 +, 충형해파는 -)
+COMPAT_RELATION_SCORES = {
+    "천간합": 3.0, "천간충": -2.0,
+    "지지육합": 3.0, "지지반합": 1.5,
+    "지지충": -3.0, "형살": -2.0, "해살": -1.5, "파살": -1.0,
+}
+# 기둥 쌍 가중치 [A의 기둥][B의 기둥] (년, 월, 일, 시). 일주끼리(배우자궁)를 가장 크게 봅니다.
+PILLAR_PAIR_WEIGHTS = [
+    [1.0, 0.5, 0.5, 0.3],
+    [0.5, 1.2, 0.7, 0.3],
+    [0.5, 0.7, 2.0, 0.7],
+    [0.3, 0.3, 0.7, 0.8],
+]
+OHAENG_BALANCE_WEIGHT = 10.0 # 오행 보완 점수 배율
+SCORE_CENTER, SCORE_SCALE = 50.0, 2.5 # 100점 환산: 50 + 원점수 x 2.5 (0~100으로 자름)
+
+COMPAT_GRADES = [(80, "매우 좋음"), (65, "좋음"), (45, "보통"), (30, "노력 필요")]
+COMPAT_GRADE_LOWEST = "어려움"
+
+# ───────────────────────────────
+# 쌍 관계표 (엔진 규칙 상수에서 생성)
+# ───────────────────────────────
+def _build_stem_pair_relations():
+    table = [[[] for _ in GAN] for _ in GAN]
+    for a_idx, a in enumerate(GAN):
+        for b_idx, b in enumerate(GAN):
+            pair = tuple(sorted((a, b)))
+            if pair in engine.CHEONGAN_HAP_RULES:
+                table[a_idx][b_idx].append("천간합")
+            if pair in engine.CHEONGAN_CHUNG_RULES:
+                table[a_idx][b_idx].append("천간충")
+    return table
+
+def _build_branch_pair_relations():
+    hyeong_pairs = set(engine.SANGHYEONG_RULES)
+    for members in engine.SAMHYEONG_RULES: # 삼형은 두 글자만 만나도 형으로 봄
+        hyeong_pairs.update(tuple(sorted((x, y))) for x in members for y in members if x != y)
+    table = [[[] for _ in JI] for _ in JI]
+    for a_idx, a in enumerate(JI):
+        for b_idx, b in enumerate(JI):
+            pair = tuple(sorted((a, b)))
+            relations = table[a_idx][b_idx]
+            if pair in engine.JIJI_YUKHAP_RULES:
+                relations.append("지지육합")
+            if any((a == wangji and b in others) or (b == wangji and a in others)
+                   for wangji, others in engine.JIJI_BANHAP_WANGJI_CENTERED_RULES.items()):
+                relations.append("지지반합")
+            if pair in engine.JIJI_CHUNG_RULES:
+                relations.append("지지충")
+            if pair in hyeong_pairs or (a == b and a in engine.JAHYEONG_CHARS):
+                relations.append("형살")
+            if pair in engine.JIJI_HAE_RULES:
+                relations.append("해살")
+            if pair in engine.JIJI_PA_RULES:
+                relations.append("파살")
+    return table
+
+STEM_PAIR_RELATIONS = _build_stem_pair_relations()
+BRANCH_PAIR_RELATIONS = _build_branch_pair_relations()
+STEM_PAIR_SCORES = [[sum(COMPAT_RELATION_SCORES[r] for r in cell) for cell in row] for row in STEM_PAIR_RELATIONS]
+BRANCH_PAIR_SCORES = [[sum(COMPAT_RELATION_SCORES[r] for r in cell) for cell in row] for row in BRANCH_PAIR_RELATIONS]
+
+# ───────────────────────────────
+# 단건 궁합
+# ───────────────────────────────
+def ohaeng_imbalance(values):
+    """오행 값 5개의 불균형도: 비율과 균등분포(0.2)의 차이 합 (0 = 완전 균형, 최대 1.6)."""
+    total = sum(values)
+    if total <= 0:
+        return 0.0
+    return sum(abs(v / total - 0.2) for v in values)
+
+def _ohaeng_values(chart):
+    """calculate_ohaeng_sipshin_strengths와 같은 위치 가중치의 오행 세력 (점수 계산용이라 반올림하지 않음)."""
+    values = dict.fromkeys(OHENG_ORDER, 0.0)
+    for key, position in zip(engine.PILLAR_KEYS, range(0, 8, 2)):
+        stem_weight = engine.POSITIONAL_WEIGHTS[engine.POSITION_KEYS_ORDERED[position]]
+        branch_weight = engine.POSITIONAL_WEIGHTS[engine.POSITION_KEYS_ORDERED[position + 1]]
+        values[engine.GAN_TO_OHENG[chart[f"{key}_gan"]]] += stem_weight
+        for janggan, proportion in engine.JIJI_JANGGAN[chart[f"{key}_ji"]].items():
+            values[engine.GAN_TO_OHENG[janggan]] += branch_weight * proportion
+    return [values[o] for o in OHENG_ORDER]
+
+def compat_grade(score):
+    for threshold, label in COMPAT_GRADES:
+        if score >= threshold:
+            return label
+    return COMPAT_GRADE_LOWEST
+
+def analyze_compatibility(chart_a, chart_b):
+    """
+    두 명식(saju_8char_details 형식)의 궁합을 분석합니다.
+    반환: {"score": 0~100, "grade", "raw", "relation_score", "balance_score",
+           "relations": [{"위치", "관계", "내용", "점수"}, ...], "ohaeng": {"A", "B", "합산"}}
+    """
+    (stems_a, branches_a), (stems_b, branches_b) = engine.encode_chart(chart_a), engine.encode_chart(chart_b)
+    relations = []
+    relation_score = 0.0
+    for i in range(4):
+        for j in range(4):
+            weight = PILLAR_PAIR_WEIGHTS[i][j]
+            position = f"A {PILLAR_NAMES_KOR_SHORT[i]} ↔ B {PILLAR_NAMES_KOR_SHORT[j]}"
+            for kind, a_idx, b_idx, names, pair_table in (
+                ("간", stems_a[i], stems_b[j], GAN, STEM_PAIR_RELATIONS),
+                ("지", branches_a[i], branches_b[j], JI, BRANCH_PAIR_RELATIONS),
+            ):
+                for relation in pair_table[a_idx][b_idx]:
+                    points = weight * COMPAT_RELATION_SCORES[relation]
+                    relation_score += points
+                    relations.append({"위치": position, "관계": relation,
+                                      "내용": f"A {PILLAR_NAMES_KOR_SHORT[i]}{kind}({names[a_idx]}) ↔ B {PILLAR_NAMES_KOR_SHORT[j]}{kind}({names[b_idx]})",
+                                      "점수": round(points, 2)})
+    ohaeng_a, ohaeng_b = _ohaeng_values(chart_a), _ohaeng_values(chart_b)
+    combined = [a + b for a, b in zip(ohaeng_a, ohaeng_b)]
+    balance_raw = (ohaeng_imbalance(ohaeng_a) + ohaeng_imbalance(ohaeng_b)) / 2 - ohaeng_imbalance(combined)
+    balance_score = OHAENG_BALANCE_WEIGHT * balance_raw
+    raw = relation_score + balance_score
+    score = min(100.0, max(0.0, SCORE_CENTER + SCORE_SCALE * raw))
+    return {
+        "score": round(score, 1), "grade": compat_grade(score), "raw": raw,
+        "relation_score": relation_score, "balance_score": balance_score,
+        "relations": sorted(relations, key=lambda r: -abs(r["점수"])),
+        "ohaeng": {label: {o: round(v, 1) for o, v in zip(OHENG_ORDER, values)}
+                   for label, values in (("A", ohaeng_a), ("B", ohaeng_b), ("합산", combined))},
+    }
+
+def get_compatibility_summary(result):
+    """궁합 결과 요약 문장."""
+    good = [r for r in result["relations"] if r["점수"] > 0]
+    bad = [r for r in result["relations"] if r["점수"] < 0]
+    text = f"궁합 점수 {result['score']}점 ({result['grade']}). "
+    if good:
+        text += "주요 조화: " + ", ".join(f"{r['내용']} {r['관계']}" for r in good[:3]) + ". "
+    if bad:
+        text += "주의할 관계: " + ", ".join(f"{r['내용']} {r['관계']}" for r in bad[:3]) + ". "
+    if result["balance_score"] > 0:
+        text += "두 사람의 오행이 서로의 부족한 기운을 채워 줍니다."
+    elif result["balance_score"] < 0:
+        text += "두 사람의 오행이 같은 쪽으로 치우쳐 있어 균형을 의식할 필요가 있습니다."
+    return text
+
+# ───────────────────────────────
+# 배치 궁합 (NumPy, 정수 코드 명식)
+# ───────────────────────────────
+_np_tables = {}
+
+def _tables():
+    """NumPy 조회표를 처음 쓸 때 한 번만 만듭니다."""
+    if not _np_tables:
+        import numpy as np
+
+        stem_ohaeng = np.zeros((10, 5))
+        for idx, gan in enumerate(GAN):
+            stem_ohaeng[idx, OHENG_ORDER.index(engine.GAN_TO_OHENG[gan])] = 1.0
+        branch_ohaeng = np.zeros((12, 5))
+        for idx, ji in enumerate(JI):
+            for janggan, proportion in engine.JIJI_JANGGAN[ji].items():
+                branch_ohaeng[idx, OHENG_ORDER.index(engine.GAN_TO_OHENG[janggan])] += proportion
+        position_weights = [engine.POSITIONAL_WEIGHTS[key] for key in engine.POSITION_KEYS_ORDERED]
+        _np_tables.update(
+            np=np,
+            stem_pair=np.array(STEM_PAIR_SCORES), branch_pair=np.array(BRANCH_PAIR_SCORES),
+            pillar_weights=np.array(PILLAR_PAIR_WEIGHTS),
+            stem_ohaeng=stem_ohaeng, branch_ohaeng=branch_ohaeng,
+            stem_weights=np.array(position_weights[0::2]), branch_weights=np.array(position_weights[1::2]),
+        )
+    return _np_tables
+
+def ohaeng_vectors(stems, branches):
+    """(N,4) 천간/지지 코드 -> (N,5) 오행 세력 (calculate_ohaeng_sipshin_strengths와 같은 가중치, 반올림 전 값)."""
+    t = _tables()
+    np = t["np"]
+    stems, branches = np.asarray(stems, dtype=np.intp), np.asarray(branches, dtype=np.intp)
+    values = (t["stem_ohaeng"][stems] * t["stem_weights"][:, None]).sum(axis=1)
+    values += (t["branch_ohaeng"][branches] * t["branch_weights"][:, None]).sum(axis=1)
+    return values
+
+def _imbalance(values):
+    np = _tables()["np"]
+    total = values.sum(axis=-1, keepdims=True)
+    safe_total = np.where(total > 0, total, 1.0)
+    return np.where(total[..., 0] > 0, np.abs(values / safe_total - 0.2).sum(axis=-1), 0.0)
+
+def _to_score(raw):
+    np = _tables()["np"]
+    return np.clip(SCORE_CENTER + SCORE_SCALE * raw, 0.0, 100.0)
+
+def score_one_vs_many(chart_a, stems, branches, ohaeng=None):
+    """
+    명식 하나와 후보 N개의 궁합 점수 (N,) 배열 (0~100, analyze_compatibility()["score"]와 같은 식, 반올림 전 값).
+    A의 기둥별 쌍 점수를 후보 기둥별 조회표(4x10, 4x12)로 미리 합쳐 두므로 후보당 조회 8번으로 끝납니다.
+    ohaeng: 후보 오행 세력 (N,5)을 미리 계산해 두었다면 전달 (반복 검색 시 재사용)
+    """
+    t = _tables()
+    np = t["np"]
+    stems_a, branches_a = engine.encode_chart(chart_a)
+    stems, branches = np.asarray(stems, dtype=np.intp), np.asarray(branches, dtype=np.intp)
+    weights = t["pillar_weights"]
+    stem_lookup = np.einsum("ij,ig->jg", weights, t["stem_pair"][list(stems_a)])       # (4,10)
+    branch_lookup = np.einsum("ij,ib->jb", weights, t["branch_pair"][list(branches_a)]) # (4,12)
+    relation = sum(stem_lookup[j][stems[:, j]] + branch_lookup[j][branches[:, j]] for j in range(4))
+    ohaeng_a = ohaeng_vectors(np.array([stems_a]), np.array([branches_a]))[0]
+    ohaeng_b = ohaeng_vectors(stems, branches) if ohaeng is None else ohaeng
+    balance = ((_imbalance(ohaeng_a) + _imbalance(ohaeng_b)) / 2 - _imbalance(ohaeng_b + ohaeng_a)) * OHAENG_BALANCE_WEIGHT
+    return _to_score(relation + balance)
+
+def score_matrix(stems_a, branches_a, stems_b, branches_b, row_chunk=256):
+    """
+    M x N 궁합 점수 행렬 (A 그룹 행, B 그룹 열). 메모리를 아끼려고 A를 row_chunk 행씩 나눠 계산합니다.
+    """
+    t = _tables()
+    np = t["np"]
+    stems_a, branches_a = np.asarray(stems_a, dtype=np.intp), np.asarray(branches_a, dtype=np.intp)
+    stems_b, branches_b = np.asarray(stems_b, dtype=np.intp), np.asarray(branches_b, dtype=np.intp)
+    ohaeng_a, ohaeng_b = ohaeng_vectors(stems_a, branches_a), ohaeng_vectors(stems_b, branches_b)
+    imbalance_a, imbalance_b = _imbalance(ohaeng_a), _imbalance(ohaeng_b)
+    weights = t["pillar_weights"]
+    result = np.empty((len(stems_a), len(stems_b)), dtype=np.float64)
+    for start in range(0, len(stems_a), row_chunk):
+        rows = slice(start, start + row_chunk)
+        relation = np.zeros((len(stems_a[rows]), len(stems_b)))
+        for i in range(4):
+            for j in range(4):
+                relation += weights[i, j] * (t["stem_pair"][stems_a[rows, i][:, None], stems_b[None, :, j]]
+                                             + t["branch_pair"][branches_a[rows, i][:, None], branches_b[None, :, j]])
+        combined = ohaeng_a[rows][:, None, :] + ohaeng_b[None, :, :]
+        balance = ((imbalance_a[rows][:, None] + imbalance_b[None, :]) / 2 - _imbalance(combined)) * OHAENG_BALANCE_WEIGHT
+        result[rows] = _to_score(relation + balance)
+    return result
+
+def top_k_matches(chart_a, stems, branches, k=10, ohaeng=None, chunk_size=1 << 20):
+    """
+    후보 중 궁합 점수 상위 k개의 (인덱스 배열, 점수 배열)을 점수 내림차순으로 반환합니다.
+    후보를 chunk_size 단위로 나눠 점수를 내고 청크마다 argpartition으로 상위 k개만 남깁니다.
+    """
+    np = _tables()["np"]
+    best_idx, best_scores = np.empty(0, dtype=np.int64), np.empty(0)
+    for start in range(0, len(stems), chunk_size):
+        end = start + chunk_size
+        scores = score_one_vs_many(chart_a, stems[start:end], branches[start:end],
+                                   None if ohaeng is None else ohaeng[start:end])
+        if len(scores) > k:
+            keep = np.argpartition(-scores, k - 1)[:k]
+        else:
+            keep = np.arange(len(scores))
+        best_idx = np.concatenate([best_idx, keep + start])
+        best_scores = np.concatenate([best_scores, scores[keep]])
+    order = np.lexsort((best_idx, -best_scores))[:k] # 점수 내림차순, 같은 점수는 앞선 인덱스 우선
+    return best_idx[order], best_scores[order]
+
+# ───────────────────────────────
+# 단건/배치 일치 점검
+# ───────────────────────────────
+def random_charts(n, seed=1):
+    """점검/벤치마크용 임의 명식 (음양이 맞는 60갑자 기둥 4개)."""
+    rng = random.Random(seed)
+    charts = []
+    for _ in range(n):
+        chart = {}
+        for key in engine.PILLAR_KEYS:
+            idx = rng.randrange(60)
+            chart[f"{key}_gan"], chart[f"{key}_ji"] = GAN[idx % 10], JI[idx % 12]
+        charts.append(chart)
+    return charts
+
+def check_consistency(n=300, seed=1, tolerance=1e-6):
+    """단건 analyze_compatibility와 배치 score_one_vs_many / score_matrix의 점수를 비교합니다. 반환: 불일치 목록"""
+    charts = random_charts(n, seed)
+    stems, branches = engine.encode_charts(charts)
+    matrix = score_matrix(stems, branches, stems, branches)
+    mismatches = []
+    for a_idx, chart_a in enumerate(charts):
+        row = score_one_vs_many(chart_a, stems, branches)
+        for b_idx in range(0, n, max(1, n // 25)):
+            expected = SCORE_CENTER + SCORE_SCALE * analyze_compatibility(chart_a, charts[b_idx])["raw"]
+            expected = min(100.0, max(0.0, expected))
+            for label, actual in (("one_vs_many", row[b_idx]), ("matrix", matrix[a_idx, b_idx])):
+                if abs(expected - actual) > tolerance:
+                    mismatches.append((label, a_idx, b_idx, expected, float(actual)))
+    return mismatches
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="궁합 점수 단건/배치 일치 점검")
+    parser.add_argument("--check", action="store_true", help="임의 명식으로 단건과 배치 점수 비교")
+    parser.add_argument("--n", type=int, default=300)
+    args = parser.parse_args(argv)
+    if not args.check:
+        parser.print_help()
+        return 0
+    mismatches = check_consistency(args.n)
+    for label, a_idx, b_idx, expected, actual in mismatches[:10]:
+        print(f"[{label}] A#{a_idx} B#{b_idx}: 단건 {expected:.6f} / 배치 {actual:.6f}")
+    print(f"비교 완료: 불일치 {len(mismatches)}건")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+# 일진(오늘의 일주) 알림 대상 선정 - 원국 글자 역색인(inverted index)
+# 오늘 일주와 원국의 관계(합/충/형/해/파, 공망)는 원국의 몇 글자에만 달려 있으므로,
+# 고객 전체 명식을 매일 훑는 대신 (위치, 글자) -> 고객 ID 색인을 만들어 두고
+# 오늘 일주로 성립하는 규칙 키만 조회해 해당 고객에게만 알림을 만듭니다.
+# 사용:
+#   python saju_daily.py customers.csv                     # 오늘 날짜 기준, 알림을 JSON Lines로 출력
+#   python saju_daily.py customers.csv --date 2026-10-19 --out notes.jsonl
+#   python saju_daily.py customers.csv --check              # 색인 조회 결과와 전체 스캔 결과, 공망 계산식과 순(旬) 표 비교
+# customers.csv 열: customer_id, 년주, 월주, 일주, 시주 (예: "갑자". 시주는 모르면 빈칸)
+
+import argparse
+import csv
+import json
+import sys
+from collections import defaultdict
+from datetime import date
+from functools import lru_cache
+
+from saju_engine import GAN, JI, PILLAR_KEYS, PILLAR_NAMES_KOR, PILLAR_NAMES_KOR_SHORT, get_day_ganji, gapja_index, gongmang_branch_indices
+from saju_compat import BRANCH_PAIR_RELATIONS, STEM_PAIR_RELATIONS
+
+CUSTOMER_ID_COLUMN = "customer_id"
+PILLAR_COLUMNS = ("년주", "월주", "일주", "시주") # PILLAR_KEYS 순서
+
+# 기본 알림 대상 위치: 일진은 전통적으로 원국 일주(일간/일지)와의 관계로 봅니다. (0~3: 년, 월, 일, 시)
+DEFAULT_DAILY_POSITIONS = (2,)
+
+# 순(旬) 첫 간지 -> 공망 지지 두 글자 (전수 스캔 기준 구현과 --check용, 색인 쪽 계산식과 따로 둔 표)
+XUN_GONGMANG = {"갑자": "술해", "갑술": "신유", "갑신": "오미", "갑오": "진사", "갑진": "인묘", "갑인": "자축"}
+
+# 관계별 알림 문구
+DAILY_RULE_MESSAGES = {
+    "천간합": "협력과 화합이 잘 되는 날입니다.",
+    "천간충": "생각이 부딪히기 쉬우니 말을 아끼세요.",
+    "지지육합": "인연과 도움이 들어오기 쉬운 날입니다.",
+    "지지반합": "뜻이 맞는 사람과 힘을 모으기 좋습니다.",
+    "지지충": "변동과 이동이 많을 수 있으니 서두르지 마세요.",
+    "형살": "마찰이나 구설에 주의하세요.",
+    "해살": "가까운 관계에서 오해가 생기지 않게 살피세요.",
+    "파살": "계획이 틀어질 수 있으니 한 번 더 확인하세요.",
+    "공망": "큰 결정은 미루고 내실을 다지기 좋은 날입니다.",
+}
+
+# ───────────────────────────────
+# 오늘 일주 -> 성립하는 규칙 키
+# ───────────────────────────────
+# 오늘 천간(0~9) -> [(관계, 원국 천간 인덱스)], 오늘 지지(0~11) -> [(관계, 원국 지지 인덱스)]
+STEM_TRIGGERS = [[(relation, natal) for natal in range(10) for relation in STEM_PAIR_RELATIONS[today][natal]] for today in range(10)]
+BRANCH_TRIGGERS = [[(relation, natal) for natal in range(12) for relation in BRANCH_PAIR_RELATIONS[today][natal]] for today in range(12)]
+
+def gongmang_branches(day_gan, day_ji):
+    """일주가 속한 순(旬)의 공망 지지 인덱스 2개 (analyze_shinsal과 같은 기준)."""
+    return gongmang_branch_indices(gapja_index(GAN.index(day_gan), JI.index(day_ji)))
+
+def xun_gongmang(day_gan, day_ji):
+    """XUN_GONGMANG 표로 찾은 공망 지지 2글자. 일간 수만큼 거슬러 올라가면 순 첫 간지(갑X)입니다."""
+    head = "갑" + JI[(JI.index(day_ji) - GAN.index(day_gan)) % 12]
+    return XUN_GONGMANG[head]
+
+def check_gongmang():
+    """60갑자 일주 전체에서 gongmang_branches(색인용 계산식)와 XUN_GONGMANG 표를 비교합니다. 반환: 불일치 [(일주, 계산, 표)]"""
+    mismatches = []
+    for idx in range(60):
+        day_gan, day_ji = GAN[idx % 10], JI[idx % 12]
+        computed = "".join(JI[j] for j in gongmang_branches(day_gan, day_ji))
+        if computed != xun_gongmang(day_gan, day_ji):
+            mismatches.append((day_gan + day_ji, computed, xun_gongmang(day_gan, day_ji)))
+    return mismatches
+
+def today_pillar(day=None):
+    """day(기본: 오늘) 날짜의 일주 (간지, 천간, 지지)."""
+    day = day or date.today()
+    return get_day_ganji(day.year, day.month, day.day)
+
+# ───────────────────────────────
+# 역색인
+# ───────────────────────────────
+def new_index():
+    """
+    빈 색인. 키는 세 종류입니다.
+      ("간", 위치, 천간 인덱스) / ("지", 위치, 지지 인덱스) -> 고객 ID 집합 (위치: PILLAR_KEYS 순서 0~3)
+      ("공망", 지지 인덱스) -> 그 지지가 일주 공망인 고객 ID 집합
+    """
+    return {"keys": defaultdict(set), "charts": {}}
+
+def add_customer(index, customer_id, chart):
+    """고객 명식(saju_8char_details 형식, 모르는 기둥은 None 또는 빈 문자열)을 색인에 추가합니다. 같은 ID는 교체합니다."""
+    if customer_id in index["charts"]:
+        remove_customer(index, customer_id)
+    keys = []
+    for position, pillar in enumerate(PILLAR_KEYS):
+        gan, ji = chart.get(f"{pillar}_gan"), chart.get(f"{pillar}_ji")
+        if gan:
+            keys.append(("간", position, GAN.index(gan)))
+        if ji:
+            keys.append(("지", position, JI.index(ji)))
+    if chart.get("day_gan") and chart.get("day_ji"):
+        keys.extend(("공망", ji_idx) for ji_idx in gongmang_branches(chart["day_gan"], chart["day_ji"]))
+    for key in keys:
+        index["keys"][key].add(customer_id)
+    index["charts"][customer_id] = (chart, keys)
+
+def remove_customer(index, customer_id):
+    _, keys = index["charts"].pop(customer_id)
+    for key in keys:
+        ids = index["keys"][key]
+        ids.discard(customer_id)
+        if not ids:
+            del index["keys"][key]
+
+def build_index(customers):
+    """(customer_id, chart) 목록으로 색인을 만듭니다."""
+    index = new_index()
+    for customer_id, chart in customers:
+        add_customer(index, customer_id, chart)
+    return index
+
+@lru_cache(maxsize=None)
+def _hit(relation, position, natal, today_char):
+    """관계 항목 dict. 조합 수가 적어 캐시한 같은 객체를 여러 고객이 공유하므로 읽기 전용으로 다룹니다."""
+    if position is None: # 공망
+        pillar = "일주"
+        text = f"오늘 지지 {today_char}: 일주 기준 공망. {DAILY_RULE_MESSAGES[relation]}"
+    else:
+        pillar = PILLAR_NAMES_KOR[position]
+        kind = "천간" if relation.startswith("천간") else "지지"
+        text = f"오늘 {kind} {today_char} ↔ {pillar} {kind} {natal}: {relation}. {DAILY_RULE_MESSAGES[relation]}"
+    return {"관계": relation, "위치": pillar, "원국": natal, "오늘": today_char, "문구": text}
+
+def fan_out(index, day_pillar, positions=DEFAULT_DAILY_POSITIONS, include_gongmang=True):
+    """
+    오늘 일주(get_day_ganji 반환값)로 성립하는 규칙 키만 조회해 {고객 ID: [관계 항목, ...]}를 반환합니다.
+    조회 횟수는 고객 수와 무관하게 최대 (천간 관계 수 + 지지 관계 수) x 위치 수 + 1 입니다.
+    positions: 원국에서 볼 기둥 위치 (0~3: 년, 월, 일, 시)
+    """
+    _, today_gan, today_ji = day_pillar
+    gan_idx, ji_idx = GAN.index(today_gan), JI.index(today_ji)
+    keys = index["keys"]
+    hits = defaultdict(list)
+    for kind, triggers, names, today_char in (("간", STEM_TRIGGERS[gan_idx], GAN, today_gan),
+                                              ("지", BRANCH_TRIGGERS[ji_idx], JI, today_ji)):
+        for relation, natal in triggers:
+            for position in positions:
+                for customer_id in keys.get((kind, position, natal), ()):
+                    hits[customer_id].append(_hit(relation, position, names[natal], today_char))
+    if include_gongmang:
+        for customer_id in keys.get(("공망", ji_idx), ()):
+            hits[customer_id].append(_hit("공망", None, today_ji, today_ji))
+    return dict(hits)
+
+def scan_all(customers, day_pillar, positions=DEFAULT_DAILY_POSITIONS, include_gongmang=True):
+    """색인 없이 모든 고객 명식을 훑는 기준 구현 (fan_out 결과 점검용, 공망은 XUN_GONGMANG 표로 판정)."""
+    _, today_gan, today_ji = day_pillar
+    gan_idx, ji_idx = GAN.index(today_gan), JI.index(today_ji)
+    hits = {}
+    for customer_id, chart in customers:
+        found = []
+        for kind, today_idx, names, table, today_char in (("gan", gan_idx, GAN, STEM_PAIR_RELATIONS, today_gan),
+                                                          ("ji", ji_idx, JI, BRANCH_PAIR_RELATIONS, today_ji)):
+            for position in positions:
+                natal = chart.get(f"{PILLAR_KEYS[position]}_{kind}")
+                if natal:
+                    found.extend(_hit(relation, position, natal, today_char) for relation in table[today_idx][names.index(natal)])
+        if include_gongmang and chart.get("day_gan") and chart.get("day_ji") and today_ji in xun_gongmang(chart["day_gan"], chart["day_ji"]):
+            found.append(_hit("공망", None, today_ji, today_ji))
+        if found:
+            hits[customer_id] = found
+    return hits
+
+# ───────────────────────────────
+# 고객 파일 / 실행
+# ───────────────────────────────
+def load_customers(file_name):
+    """customers.csv를 읽어 [(customer_id, chart)] 를 반환합니다. 기둥 값이 잘못되면 ValueError."""
+    customers = []
+    with open(file_name, encoding="utf-8-sig", newline="") as f:
+        for line_no, row in enumerate(csv.DictReader(f), start=2):
+            chart = {}
+            for pillar, column in zip(PILLAR_KEYS, PILLAR_COLUMNS):
+                ganji = (row.get(column) or "").strip()
+                if not ganji:
+                    chart[f"{pillar}_gan"] = chart[f"{pillar}_ji"] = None
+                    continue
+                if len(ganji) != 2 or ganji[0] not in GAN or ganji[1] not in JI:
+                    raise ValueError(f"오류({file_name} {line_no}행): {column} 값 '{ganji}'을 해석할 수 없습니다.")
+                chart[f"{pillar}_gan"], chart[f"{pillar}_ji"] = ganji[0], ganji[1]
+            customers.append((row[CUSTOMER_ID_COLUMN], chart))
+    return customers
+
+def _normalize(hits):
+    return {cid: sorted((h["관계"], h["위치"], h["원국"]) for h in items) for cid, items in hits.items()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="오늘 일주와 관계가 성립하는 고객에게만 일진 알림 생성")
+    parser.add_argument("customers", help="고객 명식 CSV (customer_id, 년주, 월주, 일주, 시주)")
+    parser.add_argument("--date", help="기준 날짜 YYYY-MM-DD (기본: 오늘)")
+    parser.add_argument("--out", help="알림 JSON Lines 저장 경로 (기본: 표준 출력)")
+    parser.add_argument("--positions", default="일", help="원국에서 볼 기둥 (년,월,일,시 중 쉼표 구분, 기본: 일)")
+    parser.add_argument("--no-gongmang", action="store_true", help="공망 알림 제외")
+    parser.add_argument("--check", action="store_true", help="색인 조회 결과를 전체 스캔 결과와 비교")
+    args = parser.parse_args(argv)
+
+    try:
+        positions = tuple(PILLAR_NAMES_KOR_SHORT.index(name.strip()) for name in args.positions.split(","))
+    except ValueError:
+        parser.error(f"--positions 값 '{args.positions}'을 해석할 수 없습니다. (년, 월, 일, 시 중 선택)")
+    day = date.fromisoformat(args.date) if args.date else date.today()
+    pillar = today_pillar(day)
+    try:
+        customers = load_customers(args.customers)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    index = build_index(customers)
+    hits = fan_out(index, pillar, positions, not args.no_gongmang)
+
+    if args.check:
+        expected = scan_all(customers, pillar, positions, not args.no_gongmang)
+        ok = _normalize(hits) == _normalize(expected)
+        print(f"{day} {pillar[0]}일: 고객 {len(customers)}명 중 알림 대상 {len(hits)}명 / 전체 스캔 {len(expected)}명 - {'일치' if ok else '불일치'}")
+        gongmang_mismatches = check_gongmang()
+        for ilju, computed, expected_pair in gongmang_mismatches[:10]:
+            print(f"[공망] {ilju}일주: 계산 {computed} / 순(旬) 표 {expected_pair}")
+        print(f"공망 비교 완료: 60갑자 일주, 불일치 {len(gongmang_mismatches)}건")
+        return 0 if ok and not gongmang_mismatches else 1
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    try:
+        for customer_id, items in hits.items():
+            out.write(json.dumps({"customer_id": customer_id, "date": day.isoformat(), "일진": pillar[0], "알림": items},
+                                 ensure_ascii=False) + "\n")
+    finally:
+        if args.out:
+            out.close()
+    print(f"{day} {pillar[0]}일: 고객 {len(customers)}명 중 {len(hits)}명에게 알림", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2316 @@
+# 사주 계산 엔진 (Streamlit 없이 import 가능한 순수 계산 함수와 상수 모음)
+# "Saju Calculator.py"(Streamlit UI)와 검증/배치 도구들이 공통으로 사용합니다.
+# 표준 라이브러리만으로 import 됩니다. 선택 의존성은 처음 쓰일 때 불러옵니다:
+#   - pandas, openpyxl : 절기 엑셀 원본을 (캐시 없이) 처음 컴파일할 때
+#   - numpy            : *_arrays() 배치 경로
+
+from datetime import datetime, timedelta
+import os
+import sys
+import math
+import re
+import bisect
+import csv
+import hashlib
+import struct
+
+import saju_metrics # 단계별 성능 계측 (SAJU_METRICS=1 일 때만 동작)
+
+
+# -------------------------------
+# HTML 태그 제거 헬퍼 함수 (이 부분을 추가하거나 확인해주세요)
+# -------------------------------
+def strip_html_tags(html_string):
+    if not isinstance(html_string, str):
+        return str(html_string) # 문자열이 아니면 문자열로 변환하여 반환
+    # Remove style blocks
+    html_string = re.sub(r'<style.*?</style>', '', html_string, flags=re.DOTALL | re.IGNORECASE)
+    # Remove script blocks
+    html_string = re.sub(r'<script.*?</script>', '', html_string, flags=re.DOTALL | re.IGNORECASE)
+    # Remove all other HTML tags
+    clean_text = re.sub(r'<[^>]+>', '', html_string)
+    # Replace common HTML entities
+    clean_text = clean_text.replace('&nbsp;', ' ')
+    clean_text = clean_text.replace('&lt;', '<')
+    clean_text = clean_text.replace('&gt;', '>')
+    clean_text = clean_text.replace('&amp;', '&')
+    # Remove excessive newlines and whitespace, keep meaningful newlines
+    lines = [line.strip() for line in clean_text.splitlines()]
+    # Filter out empty lines but keep a single newline for separation if multiple were there
+    filtered_lines = []
+    last_line_was_content = False
+    for line in lines:
+        if line:
+            filtered_lines.append(line)
+            last_line_was_content = True
+        elif last_line_was_content: # Keep one empty line if it was separating content
+            filtered_lines.append("")
+            last_line_was_content = False
+
+    # Join and then strip leading/trailing newlines from the whole block
+    clean_text = '\n'.join(filtered_lines).strip()
+    # Ensure at least one newline between paragraphs if they were merged by tag removal
+    clean_text = re.sub(r'(?<=[א-힣a-zA-Z0-9])\n(?=[א-힣a-zA-Z0-9])', '\n\n', clean_text)
+    return clean_text
+
+# ▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼ 만 나이 계산 함수 (여기에 추가 또는 기존 위치 확인) ▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼
+def calculate_age(birth_dt_obj, current_dt_obj):
+    """만 나이를 계산합니다."""
+    if birth_dt_obj is None:
+        return "계산 불가"  # 혹은 적절한 오류 값
+    # 출생 시점의 날짜 정보만 사용 (시간 정보는 만 나이 계산에 영향 없음)
+    birth_date_only = birth_dt_obj.date()
+    current_date_only = current_dt_obj.date()
+
+    age = current_date_only.year - birth_date_only.year
+    # 생일이 지났는지 확인 (월, 일 비교)
+    if (current_date_only.month, current_date_only.day) < (birth_date_only.month, birth_date_only.day):
+        age -= 1
+    return age
+# ▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲ 만 나이 계산 함수 끝 ▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲
+
+# 이 아래부터는 기존의 상수 정의 (FILE_NAME = ...) 등이 이어집니다.
+# ───────────────────────────────
+# 0. 기본 상수 (이전과 동일)
+# ───────────────────────────────
+FILE_NAME = "Jeolgi_1900_2100_20250513.xlsx" 
+CITY_TABLE_FILE = "Cities_Longitude.csv" # 출생지 경도/표준시 표 (진태양시 보정용)
+
+GAN = ["갑", "을", "병", "정", "무", "기", "경", "신", "임", "계"]
+JI  = ["자", "축", "인", "묘", "진", "사", "오", "미", "신", "유", "술", "해"]
+
+SAJU_MONTH_TERMS_ORDER = [
+    "입춘", "경칩", "청명", "입하", "망종", "소서",
+    "입추", "백로", "한로", "입동", "대설", "소한"
+]
+SAJU_MONTH_BRANCHES = ["인","묘","진","사","오","미","신","유","술","해","자","축"]
+
+TIME_BRANCH_MAP = [
+    ((23,30),(1,29),"자",0),((1,30),(3,29),"축",1),((3,30),(5,29),"인",2),
+    ((5,30),(7,29),"묘",3),((7,30),(9,29),"진",4),((9,30),(11,29),"사",5),
+    ((11,30),(13,29),"오",6),((13,30),(15,29),"미",7),((15,30),(17,29),"신",8),
+    ((17,30),(19,29),"유",9),((19,30),(21,29),"술",10),((21,30),(23,29),"해",11)
+]
+
+# ───────────────────────────────
+# 정수 코드 (배치/벡터 경로 공용): 천간 0~9, 지지 0~11, 60갑자 0~59
+# ───────────────────────────────
+GAN_INDEX = {gan: i for i, gan in enumerate(GAN)}
+JI_INDEX = {ji: i for i, ji in enumerate(JI)}
+PILLAR_KEYS = ("year", "month", "day", "time") # 정수 코드 배열의 열 순서 (년, 월, 일, 시)
+
+def gapja_index(gan_idx, ji_idx):
+    """(천간 인덱스, 지지 인덱스) -> 60갑자 인덱스 (갑자=0). 음양이 맞지 않는 조합이면 의미 없는 값입니다."""
+    return (6 * gan_idx - 5 * ji_idx) % 60
+
+def encode_chart(saju_8char_details):
+    """명식 딕셔너리 -> (천간 코드 4개, 지지 코드 4개) 튜플. 년, 월, 일, 시 순서입니다."""
+    stems = tuple(GAN_INDEX[saju_8char_details[f"{key}_gan"]] for key in PILLAR_KEYS)
+    branches = tuple(JI_INDEX[saju_8char_details[f"{key}_ji"]] for key in PILLAR_KEYS)
+    return stems, branches
+
+def decode_chart(stems, branches):
+    """encode_chart()의 역변환."""
+    chart = {}
+    for key, gan_idx, ji_idx in zip(PILLAR_KEYS, stems, branches):
+        chart[f"{key}_gan"], chart[f"{key}_ji"] = GAN[int(gan_idx)], JI[int(ji_idx)]
+    return chart
+
+def encode_charts(charts):
+    """명식 딕셔너리 목록 -> (천간 코드 int8 (N,4), 지지 코드 int8 (N,4)) NumPy 배열."""
+    import numpy as np # 배치 경로에서만 필요
+
+    codes = [encode_chart(chart) for chart in charts]
+    stems = np.array([c[0] for c in codes], dtype=np.int8).reshape(-1, 4)
+    branches = np.array([c[1] for c in codes], dtype=np.int8).reshape(-1, 4)
+    return stems, branches
+
+# ───────────────────────────────
+# 추가 상수 정의 (오행, 지장간, 십신 등)
+# (사용자님이 제공해주신 HTML/JS 예제 코드의 상수들을 기반으로 작성되었습니다)
+# ───────────────────────────────
+
+GAN_TO_OHENG = {
+    "갑": "목", "을": "목", "병": "화", "정": "화", "무": "토",
+    "기": "토", "경": "금", "신": "금", "임": "수", "계": "수"
+}
+
+# 지지별 지장간 및 비율 (사용자 HTML 예제의 ZW 상수 기반)
+# 참고: 이 비율들의 합이 항상 정확히 1.0이 되지는 않을 수 있으며,
+#       이는 원본 JS 코드의 로직을 따른 것입니다.
+#       더 일반적인 명리 이론의 지장간 비율(예: 여기/중기/정기 배분 일수 기반)과 다를 수 있습니다.
+JIJI_JANGGAN = {
+    "자": {"계": 1.0},
+    "축": {"기": 0.5, "계": 0.3, "신": 0.2},
+    "인": {"갑": 0.5, "병": 0.3, "무": 0.2},
+    "묘": {"을": 1.0},
+    "진": {"무": 0.5, "을": 0.3, "계": 0.2},
+    "사": {"병": 0.5, "무": 0.3, "경": 0.2},
+    "오": {"정": 0.7, "기": 0.3},
+    "미": {"기": 0.5, "정": 0.3, "을": 0.2},
+    "신": {"경": 0.5, "임": 0.3, "무": 0.2},
+    "유": {"신": 1.0},
+    "술": {"무": 0.5, "신": 0.3, "정": 0.2},
+    "해": {"임": 0.7, "갑": 0.3}
+}
+
+# 각 위치별 가중치 (사용자 HTML 예제의 PW 상수 기반)
+POSITIONAL_WEIGHTS = {
+    "연간": 0.7, "연지": 0.9, "월간": 0.9, "월지": 2.1,
+    "일간": 0.5, "일지": 1.9, "시간": 0.8, "시지": 1.0
+}
+# 계산 시 사용할 위치 키 목록 (순서대로: 년간, 연지, 월간, 월지, 일간, 일지, 시간, 시지)
+POSITION_KEYS_ORDERED = ["연간", "연지", "월간", "월지", "일간", "일지", "시간", "시지"]
+
+
+# 십신 관계표 (일간 기준) (사용자 HTML 예제의 S 상수 기반)
+SIPSHIN_MAP = {
+    "갑": {"갑": "비견", "을": "겁재", "병": "식신", "정": "상관", "무": "편재", "기": "정재", "경": "편관", "신": "정관", "임": "편인", "계": "정인"},
+    "을": {"갑": "겁재", "을": "비견", "병": "상관", "정": "식신", "무": "정재", "기": "편재", "경": "정관", "신": "편관", "임": "정인", "계": "편인"},
+    "병": {"갑": "편인", "을": "정인", "병": "비견", "정": "겁재", "무": "식신", "기": "상관", "경": "편재", "신": "정재", "임": "편관", "계": "정관"},
+    "정": {"갑": "정인", "을": "편인", "병": "겁재", "정": "비견", "무": "상관", "기": "식신", "경": "정재", "신": "편재", "임": "정관", "계": "편관"},
+    "무": {"갑": "편관", "을": "정관", "병": "편인", "정": "정인", "무": "비견", "기": "겁재", "경": "식신", "신": "상관", "임": "편재", "계": "정재"},
+    "기": {"갑": "정관", "을": "편관", "병": "정인", "정": "편인", "무": "겁재", "기": "비견", "경": "상관", "신": "식신", "임": "정재", "계": "편재"},
+    "경": {"갑": "편재", "을": "정재", "병": "편관", "정": "정관", "무": "편인", "기": "정인", "경": "비견", "신": "겁재", "임": "식신", "계": "상관"},
+    "신": {"갑": "정재", "을": "편재", "병": "정관", "정": "편관", "무": "정인", "기": "편인", "경": "겁재", "신": "비견", "임": "상관", "계": "식신"},
+    "임": {"갑": "식신", "을": "상관", "병": "편재", "정": "정재", "무": "편관", "기": "정관", "경": "편인", "신": "정인", "임": "비견", "계": "겁재"},
+    "계": {"갑": "상관", "을": "식신", "병": "정재", "정": "편재", "무": "정관", "기": "편관", "경": "정인", "신": "편인", "임": "겁재", "계": "비견"}
+}
+
+OHENG_ORDER = ["목", "화", "토", "금", "수"]
+SIPSHIN_ORDER = ["비견", "겁재", "식신", "상관", "편재", "정재", "편관", "정관", "편인", "정인"]
+
+OHENG_TO_HANJA = {"목": "木", "화": "火", "토": "土", "금": "金", "수": "水"}
+# 오행 기본 설명 (HTML 예제 참고)
+OHAENG_DESCRIPTIONS = {
+    "목": "성장, 시작, 인자함", "화": "열정, 표현, 예의", "토": "안정, 중재, 신용",
+    "금": "결실, 의리, 결단", "수": "지혜, 유연, 저장"
+}
+# 십신별 색상 (HTML 예제 참고) - CSS 클래스 대신 직접 색상 코드 사용 가능
+SIPSHIN_COLORS = {
+    "비견": "#1d4ed8", "겁재": "#1d4ed8", # 비겁
+    "식신": "#c2410c", "상관": "#c2410c", # 식상
+    "편재": "#ca8a04", "정재": "#ca8a04", # 재성
+    "편관": "#166534", "정관": "#166534", # 관성
+    "편인": "#6b7280", "정인": "#6b7280"  # 인성
+}
+
+
+# ... (기존 OHENG_DESCRIPTIONS, SIPSHIN_COLORS 등 상수 정의 이후) ...
+
+# ... (기존 GAN, JI, SAJU_MONTH_TERMS_ORDER 등 상수 정의 이후) ...
+
+# ───────────────────────────────
+# 12운성 관련 상수
+# ───────────────────────────────
+_12_UNSEONG_PHASES_KOR = ["장생", "목욕", "관대", "건록", "제왕", "쇠", "병", "사", "묘", "절", "태", "양"]
+
+# 각 천간(キー)이 각 지지(内部キー)를 만났을 때의 12운성(値)
+_12_UNSEONG_MAP_DATA = {
+    "갑": {"해":"장생", "자":"목욕", "축":"관대", "인":"건록", "묘":"제왕", "진":"쇠", "사":"병", "오":"사", "미":"묘", "신":"절", "유":"태", "술":"양"},
+    "을": {"오":"장생", "사":"목욕", "진":"관대", "묘":"건록", "인":"제왕", "축":"쇠", "자":"병", "해":"사", "술":"묘", "유":"절", "신":"태", "미":"양"},
+    "병": {"인":"장생", "묘":"목욕", "진":"관대", "사":"건록", "오":"제왕", "미":"쇠", "신":"병", "유":"사", "술":"묘", "해":"절", "자":"태", "축":"양"},
+    "정": {"유":"장생", "신":"목욕", "미":"관대", "오":"건록", "사":"제왕", "진":"쇠", "묘":"병", "인":"사", "축":"묘", "자":"절", "해":"태", "술":"양"},
+    "무": {"인":"장생", "묘":"목욕", "진":"관대", "사":"건록", "오":"제왕", "미":"쇠", "신":"병", "유":"사", "술":"묘", "해":"절", "자":"태", "축":"양"}, # 병과 동일 (화토동법)
+    "기": {"유":"장생", "신":"목욕", "미":"관대", "오":"건록", "사":"제왕", "진":"쇠", "묘":"병", "인":"사", "축":"묘", "자":"절", "해":"태", "술":"양"}, # 정과 동일 (화토동법)
+    "경": {"사":"장생", "오":"목욕", "미":"관대", "신":"건록", "유":"제왕", "술":"쇠", "해":"병", "자":"사", "축":"묘", "인":"절", "묘":"태", "진":"양"},
+    "신": {"자":"장생", "해":"목욕", "술":"관대", "유":"건록", "신":"제왕", "미":"쇠", "오":"병", "사":"사", "진":"묘", "묘":"절", "인":"태", "축":"양"},
+    "임": {"신":"장생", "유":"목욕", "술":"관대", "해":"건록", "자":"제왕", "축":"쇠", "인":"병", "묘":"사", "진":"묘", "사":"절", "오":"태", "미":"양"},
+    "계": {"묘":"장생", "인":"목욕", "축":"관대", "자":"건록", "해":"제왕", "술":"쇠", "유":"병", "신":"사", "미":"묘", "오":"절", "사":"태", "진":"양"}
+}
+
+# ───────────────────────────────
+# 신강/신약 및 격국 분석용 상수 추가
+# ───────────────────────────────
+
+# 건록격 판단용 (HTML 예제 L 상수 기반: 일간 -> 건록에 해당하는 지지)
+# 참고: 일반적인 건록 정의(예: 갑->인)와 다를 수 있으나, 제공해주신 JS 코드 기준을 따릅니다.
+L_NOK_MAP = {
+    "갑": "인",  # 수정: 묘 -> 인
+    "을": "묘",  # 수정: 인 -> 묘
+    "병": "사",  # 유지
+    "정": "오",  # 유지
+    "무": "사",  # 수정: 진 -> 사 (화토동궁)
+    "기": "오",  # 수정: 축 -> 오 (화토동궁)
+    "경": "신",  # 수정: 유 -> 신
+    "신": "유",  # 수정: 신 -> 유
+    "임": "해",  # 유지
+    "계": "자"   # 유지
+}
+
+# 양인격 판단용 (HTML 예제 yangin_map 기반: 양일간 -> 양인에 해당하는 지지)
+YANGIN_JI_MAP = {
+    "갑": "묘",  # 양일간 갑목의 양인은 묘목
+    "병": "오",  # 양일간 병화의 양인은 오화
+    "무": "오",  # 양일간 무토의 양인은 오화 (화토동법)
+    "경": "유",  # 양일간 경금의 양인은 유금
+    "임": "자"   # 양일간 임수의 양인은 자수
+} # (음일간은 보통 양인격으로 논하지 않음)
+
+# 십신 이름을 격국 이름으로 매핑 (일반격 판단 시 사용)
+SIPSHIN_TO_GYEOK_MAP = {
+    '비견':'비견격', '겁재':'겁재격', # 참고: 겁재격은 양인격과 구분되기도 함
+    '식신':'식신격', '상관':'상관격',
+    '편재':'편재격', '정재':'정재격',
+    '편관':'칠살격', '정관':'정관격', # 편관은 칠살격으로도 불림
+    '편인':'편인격', '정인':'정인격'
+}
+
+# ───────────────────────────────
+# 신강/신약 판단 및 설명 함수
+# ───────────────────────────────
+# 신강/신약 판정 기준 (일간을 돕는 세력 - 빼는 세력)
+# 신강 이상이면 신강, 신약 이하면 신약, ±중화 이내면 중화, 그 사이는 약간 신강/약간 신약
+SHINKANG_THRESHOLDS = {"신강": 1.5, "신약": -1.5, "중화": 0.5}
+
+@saju_metrics.timed("shinkang")
+def determine_shinkang_shinyak(sipshin_strengths):
+    """
+    십신 세력값을 바탕으로 일간의 신강/신약을 판단합니다.
+    (HTML 예제의 shinkang 함수 로직 기반)
+    """
+    # 일간을 돕는 기운: 비견, 겁재 (나와 같은 오행), 편인, 정인 (나를 생하는 오행)
+    my_energy = (sipshin_strengths.get("비견", 0.0) +
+                 sipshin_strengths.get("겁재", 0.0) +
+                 sipshin_strengths.get("편인", 0.0) +
+                 sipshin_strengths.get("정인", 0.0))
+    
+    # 일간의 힘을 빼는 기운: 식신, 상관 (내가 생하는 오행), 편재, 정재 (내가 극하는 오행), 편관, 정관 (나를 극하는 오행)
+    opponent_energy = (sipshin_strengths.get("식신", 0.0) +
+                       sipshin_strengths.get("상관", 0.0) +
+                       sipshin_strengths.get("편재", 0.0) +
+                       sipshin_strengths.get("정재", 0.0) +
+                       sipshin_strengths.get("편관", 0.0) +
+                       sipshin_strengths.get("정관", 0.0))
+    
+    score_diff = my_energy - opponent_energy
+    
+    # 기준값은 SHINKANG_THRESHOLDS (HTML 예제 코드의 기준값)
+    if score_diff >= SHINKANG_THRESHOLDS["신강"]: return "신강"
+    elif score_diff <= SHINKANG_THRESHOLDS["신약"]: return "신약"
+    elif -SHINKANG_THRESHOLDS["중화"] <= score_diff <= SHINKANG_THRESHOLDS["중화"]: return "중화" 
+    elif score_diff > SHINKANG_THRESHOLDS["중화"]: return "약간 신강" # 중화 < score_diff < 신강
+    else: return "약간 신약" # 신약 < score_diff < -중화
+
+@saju_metrics.timed("explanation_html")
+def get_shinkang_explanation(shinkang_status_str):
+    """신강/신약 상태에 대한 설명을 반환합니다."""
+    explanations = {
+        "신강": "일간(자신)의 힘이 강한 편입니다. 주체적이고 독립적인 성향이 강하며, 자신의 의지대로 일을 추진하는 힘이 있습니다. 때로는 자기 주장이 강해 주변과의 마찰이 생길 수 있으니 유연성을 갖추는 것이 좋습니다.",
+        "신약": "일간(자신)의 힘이 다소 약한 편입니다. 주변의 도움이나 환경의 영향에 민감하며, 신중하고 사려 깊은 모습을 보일 수 있습니다. 자신감을 갖고 꾸준히 자신의 역량을 키워나가는 것이 중요하며, 좋은 운의 흐름을 잘 활용하는 지혜가 필요합니다.",
+        "중화": "일간(자신)의 힘이 비교적 균형을 이루고 있습니다. 상황에 따라 유연하게 대처하는 능력이 있으며, 원만한 대인관계를 맺을 수 있는 좋은 구조입니다. 다만, 때로는 뚜렷한 개성이 부족해 보일 수도 있습니다.",
+        "약간 신강": "일간(자신)의 힘이 평균보다 조금 강한 편입니다. 자신의 주관을 가지고 일을 처리하면서도 주변과 협력하는 균형 감각을 발휘할 수 있습니다.",
+        "약간 신약": "일간(자신)의 힘이 평균보다 조금 약한 편입니다. 신중하고 주변 상황을 잘 살피며, 인내심을 가지고 목표를 추구하는 경향이 있습니다. 주변의 조언을 경청하는 자세가 도움이 될 수 있습니다."
+    }
+    return explanations.get(shinkang_status_str, "일간의 강약 상태에 대한 설명을 준비 중입니다.")
+
+# ───────────────────────────────
+# 격국 판단 함수들 (HTML 예제 final_gekuk 및 관련 함수 로직 기반)
+# ───────────────────────────────
+def _detect_special_gekuk(day_gan_char, month_ji_char):
+    """특별격(건록격, 양인격)을 우선적으로 판단합니다."""
+    # 건록격: 일간의 건록(祿)이 월지에 있을 때
+    if L_NOK_MAP.get(day_gan_char) == month_ji_char:
+        return "건록격"
+    # 양인격: 양일간의 양인(羊刃)이 월지에 있을 때
+    if day_gan_char in YANGIN_JI_MAP and YANGIN_JI_MAP.get(day_gan_char) == month_ji_char:
+        return "양인격"
+    return None
+
+def _detect_togan_gekuk(day_gan_char, month_gan_char, month_ji_char):
+    """월지의 지장간 중에서 월간에 투간(透干)한 것을 기준으로 격을 정합니다."""
+    if month_ji_char in JIJI_JANGGAN: # JIJI_JANGGAN는 이미 정의된 상수
+        hidden_stems_in_month_ji = JIJI_JANGGAN[month_ji_char]
+        if month_gan_char in hidden_stems_in_month_ji: # 월간이 월지 지장간에 포함(투간)된 경우
+            # 투간된 월간을 기준으로 일간과의 관계(십신)를 파악하여 격을 정함
+            sipshin_type = SIPSHIN_MAP.get(day_gan_char, {}).get(month_gan_char) # SIPSHIN_MAP도 이미 정의
+            if sipshin_type:
+                return SIPSHIN_TO_GYEOK_MAP.get(sipshin_type, sipshin_type + "격")
+    return None
+
+def _detect_general_gekuk_from_month_branch_primary(day_gan_char, month_ji_char):
+    """월지 지장간 중 가장 세력이 강한 정기(正氣 또는 本氣)를 기준으로 격을 정합니다."""
+    if month_ji_char in JIJI_JANGGAN:
+        hidden_stems = JIJI_JANGGAN[month_ji_char]
+        if hidden_stems:
+            # 지장간 중 비율(세력)이 가장 높은 것을 본기로 간주 (HTML 예제 ZW의 값 비교 로직 참고)
+            primary_hidden_stem = None
+            max_ratio = -1 # 비율은 항상 0 이상이므로 -1로 시작
+            for stem, ratio in hidden_stems.items():
+                if ratio > max_ratio:
+                    max_ratio = ratio
+                    primary_hidden_stem = stem
+            
+            if primary_hidden_stem:
+                sipshin_type = SIPSHIN_MAP.get(day_gan_char, {}).get(primary_hidden_stem)
+                if sipshin_type:
+                    return SIPSHIN_TO_GYEOK_MAP.get(sipshin_type, sipshin_type + "격")
+    return None
+
+def _detect_general_gekuk_from_strengths(sipshin_strengths_dict):
+    """위 방법들로 격을 정할 수 없을 때, 사주 전체의 십신 세력 중 가장 강한 것을 기준으로 격을 정합니다. (억부격과 유사)"""
+    if not sipshin_strengths_dict: return None
+    
+    strongest_sipshin_name = None
+    max_strength = -1 
+
+    # SIPSHIN_ORDER 순서대로 순회하며 가장 강한 십신을 찾음 (HTML 예제와 동일한 순서로)
+    for sipshin_name in SIPSHIN_ORDER: # SIPSHIN_ORDER는 이미 정의된 상수
+        strength_val = sipshin_strengths_dict.get(sipshin_name, 0.0)
+        if strength_val > max_strength:
+            max_strength = strength_val
+            strongest_sipshin_name = sipshin_name
+            
+    if strongest_sipshin_name and max_strength > 0.5: # HTML 예제에서는 0.5를 기준으로 함
+        # 비견격/겁재격은 보통 특별격(건록/양인)에 해당하지 않을 때 고려
+        # HTML 예제에서는 이들도 일반격으로 매핑함
+        return SIPSHIN_TO_GYEOK_MAP.get(strongest_sipshin_name, strongest_sipshin_name + "격")
+    return "일반격 판정 어려움" # HTML 예제 참고
+
+
+@saju_metrics.timed("gekuk")
+def determine_gekuk(day_gan_char, month_gan_char, month_ji_char, sipshin_strengths_dict):
+    """격국을 판단하는 메인 함수 (HTML 예제 final_gekuk 로직 순서 참고)"""
+    # 1. 특별격 (건록격, 양인격) 우선 판단
+    special_gekuk = _detect_special_gekuk(day_gan_char, month_ji_char)
+    if special_gekuk:
+        return special_gekuk
+    
+    # 2. 월간이 월지 지장간에서 투간했는지 여부로 격 판단
+    togan_gekuk = _detect_togan_gekuk(day_gan_char, month_gan_char, month_ji_char)
+    if togan_gekuk:
+        return togan_gekuk
+        
+    # 3. 월지 지장간의 본기(정기)를 기준으로 격 판단
+    month_branch_primary_gekuk = _detect_general_gekuk_from_month_branch_primary(day_gan_char, month_ji_char)
+    if month_branch_primary_gekuk:
+        return month_branch_primary_gekuk
+        
+    # 4. 위 방법으로 격을 정하기 어려울 때, 사주 전체 십신 세력을 기준으로 판단 (HTML 예제 로직)
+    strength_based_gekuk = _detect_general_gekuk_from_strengths(sipshin_strengths_dict)
+    if strength_based_gekuk and strength_based_gekuk != "일반격 판정 어려움":
+        return strength_based_gekuk
+    elif strength_based_gekuk == "일반격 판정 어려움":
+        return strength_based_gekuk # 이 메시지 자체를 결과로 반환
+        
+    return "격국 판정 불가" # 모든 조건에 해당하지 않을 경우
+
+@saju_metrics.timed("explanation_html")
+def get_gekuk_explanation(gekuk_name_str):
+    """격국 이름에 대한 설명을 반환합니다."""
+    # HTML 예제의 설명을 기반으로 작성
+    explanations = {
+        '건록격': '스스로 자립하여 성공하는 자수성가형 리더 타입입니다! 굳건하고 독립적인 성향을 가졌습니다. (주로 월지에 일간의 건록이 있는 경우)',
+        '양인격': '강력한 카리스마와 돌파력을 지녔습니다! 때로는 너무 강한 기운으로 인해 조절이 필요할 수 있지만, 큰일을 해낼 수 있는 저력이 있습니다. (주로 월지에 양일간의 양인이 있는 경우)',
+        '비견격': '주체성이 강하고 동료들과 협력하며 목표를 향해 나아가는 타입입니다. 독립심과 자존감이 강한 편입니다.',
+        '겁재격': '승부욕과 경쟁심이 강하며, 때로는 과감한 도전도 불사하는 적극적인 면모가 있습니다. 주변과의 협력과 조화를 중요시해야 합니다.',
+        '식신격': '낙천적이고 창의적인 아이디어가 풍부하며, 표현력이 좋고 예술적 재능을 지녔을 수 있습니다. 안정적인 의식주를 중시하는 경향이 있습니다.',
+        '상관격': '새로운 것을 탐구하고 기존의 틀을 깨려는 혁신가적 기질이 있습니다. 비판적이고 날카로운 통찰력을 지녔지만, 때로는 표현 방식에 유의하여 오해를 피하는 것이 좋습니다.',
+        '편재격': '활동적이고 사교성이 뛰어나며 사람들과 어울리는 것을 좋아합니다. 재물에 대한 감각과 운용 능력이 뛰어나며, 스케일이 크고 통이 큰 경향이 있습니다.',
+        '정재격': '꼼꼼하고 성실하며 안정적인 것을 선호합니다. 신용을 중요하게 생각하고 계획적인 삶을 추구하며, 재물을 안정적으로 관리하는 능력이 있습니다.',
+        '칠살격': '명예를 중시하고 리더십이 있으며, 어려운 상황을 극복하고 위기에서 능력을 발휘하는 카리스마가 있습니다. (편관격과 유사)', # 편관격으로 통일해도 무방
+        '정관격': '원칙을 지키는 반듯하고 합리적인 성향입니다. 명예와 안정을 추구하며 조직 생활에 잘 적응하고 책임감이 강합니다.',
+        '편인격': '직관력과 예지력이 뛰어나며, 독특한 아이디어나 예술, 철학, 종교 등 정신적인 분야에 재능을 보일 수 있습니다. 다소 생각이 많거나 변덕스러울 수 있습니다.',
+        '정인격': '학문과 지식을 사랑하고 인정이 많으며 수용성이 좋습니다. 안정적인 환경에서 능력을 발휘하며, 타인에게 도움을 주는 것을 좋아합니다.',
+        '일반격 판정 어려움': '사주의 기운이 복합적이거나 특정 십신의 세력이 두드러지게 나타나지 않아, 하나의 주된 격국으로 정의하기 어렵습니다. 다양한 가능성을 가진 사주로 볼 수 있으며, 운의 흐름에 따라 여러 격의 특성이 발현될 수 있습니다.',
+        '격국 판정 불가': '사주의 구조상 특정 격국을 명확히 판정하기 어렵습니다. 이 경우, 사주 전체의 오행 및 십신 분포, 운의 흐름 등을 종합적으로 고려하여 판단하는 것이 좋습니다.'
+    }
+    # 편관격과 칠살격이 같은 의미로 사용될 수 있으므로, 칠살격 요청 시 편관격 설명으로 대체 가능
+    if gekuk_name_str == '편관격': gekuk_name_str = '칠살격' # 또는 그 반대
+    
+    return explanations.get(gekuk_name_str, f"'{gekuk_name_str}'에 대한 설명을 준비 중입니다. 일반적으로 해당 십신의 특성을 참고할 수 있습니다.")
+
+# ... (기존의 다른 함수들 get_saju_year, calculate_ohaeng_sipshin_strengths 등은 이 위 또는 아래에 위치) ...
+
+# ... (기존 get_gekuk_explanation 함수 등 다음 줄에)
+import itertools # 조합을 찾기 위해 임포트합니다. 스크립트 상단에 추가해도 됩니다.
+
+# ───────────────────────────────
+# 합충형해파 분석용 상수 정의
+# (사용자님이 제공해주신 HTML/JS 예제 코드의 규칙들을 기반으로 작성되었습니다)
+# ───────────────────────────────
+
+# 천간합 규칙: 합화 오행
+CHEONGAN_HAP_RULES = {
+    tuple(sorted(("갑", "기"))): "토", tuple(sorted(("을", "경"))): "금",
+    tuple(sorted(("병", "신"))): "수", tuple(sorted(("정", "임"))): "목",
+    tuple(sorted(("무", "계"))): "화"
+}
+
+# 지지 삼합 규칙: 국(局) 형성
+JIJI_SAMHAP_RULES = {
+    tuple(sorted(("신", "자", "진"))): "수국(水局)", tuple(sorted(("사", "유", "축"))): "금국(金局)",
+    tuple(sorted(("인", "오", "술"))): "화국(火局)", tuple(sorted(("해", "묘", "미"))): "목국(木局)"
+}
+# 지지 반합 규칙 (삼합의 왕지를 중심으로)
+# 키: 왕지, 값: [생지, 묘지] (이들과 왕지가 만나면 반합)
+JIJI_BANHAP_WANGJI_CENTERED_RULES = {
+    "자": ["신", "진"], "유": ["사", "축"],
+    "오": ["인", "술"], "묘": ["해", "미"]
+}
+
+# 지지 방합 규칙: 국(局) 형성
+JIJI_BANGHAP_RULES = {
+    tuple(sorted(("인", "묘", "진"))): "목국(木局)", tuple(sorted(("사", "오", "미"))): "화국(火局)",
+    tuple(sorted(("신", "유", "술"))): "금국(金局)", tuple(sorted(("해", "자", "축"))): "수국(水局)"
+}
+
+# 지지 육합 규칙: 합화 오행 (또는 관계)
+JIJI_YUKHAP_RULES = {
+    tuple(sorted(("자", "축"))): "토", tuple(sorted(("인", "해"))): "목",
+    tuple(sorted(("묘", "술"))): "화", tuple(sorted(("진", "유"))): "금",
+    tuple(sorted(("사", "신"))): "수", tuple(sorted(("오", "미"))): "화/토" # 오미합은 화 또는 토로 보거나, 기반 오행에 따라 달라짐
+}
+
+# 천간충 규칙
+CHEONGAN_CHUNG_RULES = [
+    tuple(sorted(("갑", "경"))), tuple(sorted(("을", "신"))),
+    tuple(sorted(("병", "임"))), tuple(sorted(("정", "계")))
+] # 무토, 기토는 충이 없음 (혹은 무임충, 기계충을 보기도 하나 JS 예제엔 없음)
+
+# 지지충 규칙
+JIJI_CHUNG_RULES = [
+    tuple(sorted(("자", "오"))), tuple(sorted(("축", "미"))),
+    tuple(sorted(("인", "신"))), tuple(sorted(("묘", "유"))),
+    tuple(sorted(("진", "술"))), tuple(sorted(("사", "해")))
+]
+
+# 지지 형살 규칙
+# 삼형
+SAMHYEONG_RULES = {
+    tuple(sorted(("인", "사", "신"))): "인사신 삼형(無恩之刑)", # 무은지형
+    tuple(sorted(("축", "술", "미"))): "축술미 삼형(持勢之刑)"  # 지세지형
+}
+# 상형 (자묘형)
+SANGHYEONG_RULES = [tuple(sorted(("자", "묘")))] # 자묘 상형(無禮之刑)
+# 자형 (같은 글자가 2개 이상일 때)
+JAHYEONG_CHARS = ["진", "오", "유", "해"]
+
+# 지지 해살(害殺) 규칙
+JIJI_HAE_RULES = [
+    tuple(sorted(("자", "미"))), tuple(sorted(("축", "오"))),
+    tuple(sorted(("인", "사"))), tuple(sorted(("묘", "진"))),
+    tuple(sorted(("신", "해"))), tuple(sorted(("유", "술")))
+]
+HAE_NAMES = {tuple(sorted(k)):v for k,v in {"자미":"자미해", "축오":"축오해", "인사":"인사회", "묘진":"묘진해", "신해":"신해해", "유술":"유술해"}.items()}
+
+
+# 지지 파살(破殺) 규칙
+JIJI_PA_RULES = [
+    tuple(sorted(("자", "유"))), tuple(sorted(("축", "진"))),
+    tuple(sorted(("인", "해"))), tuple(sorted(("묘", "오"))),
+    tuple(sorted(("사", "신"))), tuple(sorted(("술", "미")))
+]
+PA_NAMES = {tuple(sorted(k)):v for k,v in {"자유":"자유파", "축진":"축진파", "인해":"인해파", "묘오":"묘오파", "사신":"사신파", "술미":"술미파"}.items()}
+
+
+PILLAR_NAMES_KOR_SHORT = ["년", "월", "일", "시"] # 결과 출력 시 사용
+
+
+# ───────────────────────────────
+# 합충형해파 분석 함수
+# ───────────────────────────────
+@saju_metrics.timed("hap_chung")
+def analyze_hap_chung_interactions(saju_8char_details):
+    """
+    사주팔자의 천간 및 지지 간의 합, 충, 형, 해, 파 관계를 분석합니다.
+    saju_8char_details: {"year_gan":yg, "year_ji":yj, ...} 형태의 딕셔너리
+    반환: {"천간합": ["결과 문자열 리스트"], "지지삼합": [], ...} 형태의 딕셔너리
+    """
+    gans = [saju_8char_details["year_gan"], saju_8char_details["month_gan"], saju_8char_details["day_gan"], saju_8char_details["time_gan"]]
+    jis = [saju_8char_details["year_ji"], saju_8char_details["month_ji"], saju_8char_details["day_ji"], saju_8char_details["time_ji"]]
+
+    results = {
+        "천간합": [], "지지육합": [], "지지삼합": [], "지지방합": [],  # 합(合)
+        "천간충": [], "지지충": [],                               # 충(沖)
+        "형살(刑殺)": [], "해살(害殺)": [], "파살(破殺)": []          # 형해파(刑害破)
+    }
+    
+    # 중복 방지를 위한 세트들 (JS 예제 참고)
+    found_samhap_banhap_combinations = set() # 삼합, 반합은 같은 지지 조합을 다르게 표현할 수 있으므로 중복 방지
+
+    # 0. 위치 정보와 함께 간/지 리스트 생성
+    # (인덱스, 천간/지지 글자, 기둥이름) 형태의 튜플 리스트
+    gans_with_pos = list(enumerate(gans)) # [(0, '갑'), (1, '병'), ...]
+    jis_with_pos = list(enumerate(jis))   # [(0, '자'), (1, '인'), ...]
+
+    # 1. 천간합 / 천간충 (2개 조합)
+    for (i_idx, i_gan), (j_idx, j_gan) in itertools.combinations(gans_with_pos, 2):
+        pair_sorted = tuple(sorted((i_gan, j_gan)))
+        pos_str = f"{PILLAR_NAMES_KOR_SHORT[i_idx]}간({i_gan}) + {PILLAR_NAMES_KOR_SHORT[j_idx]}간({j_gan})"
+        
+        if pair_sorted in CHEONGAN_HAP_RULES:
+            results["천간합"].append(f"{pos_str} → {CHEONGAN_HAP_RULES[pair_sorted]} 합")
+        if pair_sorted in CHEONGAN_CHUNG_RULES:
+            results["천간충"].append(f"{pos_str.replace('+', '↔')} 충")
+
+    # 2. 지지육합 / 지지충 / 지지해 / 지지파 (2개 조합)
+    for (i_idx, i_ji), (j_idx, j_ji) in itertools.combinations(jis_with_pos, 2):
+        pair_sorted = tuple(sorted((i_ji, j_ji)))
+        pos_str = f"{PILLAR_NAMES_KOR_SHORT[i_idx]}지({i_ji}) + {PILLAR_NAMES_KOR_SHORT[j_idx]}지({j_ji})"
+        
+        if pair_sorted in JIJI_YUKHAP_RULES:
+            results["지지육합"].append(f"{pos_str} → {JIJI_YUKHAP_RULES[pair_sorted]} 합")
+        if pair_sorted in JIJI_CHUNG_RULES:
+            results["지지충"].append(f"{pos_str.replace('+', '↔')} 충")
+        if pair_sorted in JIJI_HAE_RULES:
+            results["해살(害殺)"].append(f"{pos_str} → {HAE_NAMES.get(pair_sorted, '해')}")
+        if pair_sorted in JIJI_PA_RULES:
+            results["파살(破殺)"].append(f"{pos_str} → {PA_NAMES.get(pair_sorted, '파')}")
+        
+        # 자묘 상형 체크
+        if pair_sorted in SANGHYEONG_RULES:
+             results["형살(刑殺)"].append(f"{pos_str} → 자묘 상형(無禮之刑)")
+
+
+    # 3. 지지삼합 / 지지방합 / 지지삼형 (3개 조합)
+    for (i_idx, i_ji), (j_idx, j_ji), (k_idx, k_ji) in itertools.combinations(jis_with_pos, 3):
+        combo_sorted = tuple(sorted((i_ji, j_ji, k_ji)))
+        # 위치 문자열 만들 때, 실제 인덱스 순서대로 표시하는 것이 좋으나, 일단 정렬된 지지 순서대로
+        pos_str = f"{PILLAR_NAMES_KOR_SHORT[i_idx]}지({i_ji}), {PILLAR_NAMES_KOR_SHORT[j_idx]}지({j_ji}), {PILLAR_NAMES_KOR_SHORT[k_idx]}지({k_ji})"
+        
+        if combo_sorted in JIJI_SAMHAP_RULES:
+            # 삼합이 성립되면, 이 조합을 기록하여 반합 중복 방지에 사용
+            found_samhap_banhap_combinations.add(combo_sorted) 
+            results["지지삼합"].append(f"{pos_str} → {JIJI_SAMHAP_RULES[combo_sorted]}")
+        if combo_sorted in JIJI_BANGHAP_RULES:
+            results["지지방합"].append(f"{pos_str} → {JIJI_BANGHAP_RULES[combo_sorted]}")
+        if combo_sorted in SAMHYEONG_RULES:
+            results["형살(刑殺)"].append(f"{pos_str} → {SAMHYEONG_RULES[combo_sorted]}")
+
+    # 4. 지지반합 (삼합에 포함되지 않은 반합만 찾기, JS 예제 로직 참고)
+    for (i_idx, i_ji), (j_idx, j_ji) in itertools.combinations(jis_with_pos, 2):
+        pos_str = f"{PILLAR_NAMES_KOR_SHORT[i_idx]}지({i_ji}) + {PILLAR_NAMES_KOR_SHORT[j_idx]}지({j_ji})"
+        
+        for wangji, others in JIJI_BANHAP_WANGJI_CENTERED_RULES.items():
+            # 반합 조건: (i_ji가 왕지이고 j_ji가 others에 속함) 또는 (j_ji가 왕지이고 i_ji가 others에 속함)
+            if (i_ji == wangji and j_ji in others) or \
+               (j_ji == wangji and i_ji in others):
+                
+                # 이 반합이 이미 발견된 삼합의 일부인지 확인
+                is_part_of_samhap = False
+                potential_samhap_members = {i_ji, j_ji}
+                # 나머지 하나의 삼합 멤버 찾기 (왕지, 생지, 묘지 중 빠진 것)
+                full_samhap_group = None
+                for samhap_key_tuple in JIJI_SAMHAP_RULES.keys():
+                    if wangji in samhap_key_tuple and (i_ji in samhap_key_tuple and j_ji in samhap_key_tuple):
+                        full_samhap_group = samhap_key_tuple
+                        break
+                
+                if full_samhap_group and full_samhap_group in found_samhap_banhap_combinations:
+                    is_part_of_samhap = True
+                    
+                if not is_part_of_samhap:
+                    # 중복된 반합 문자열 방지 (예: 년지(자)+월지(신) vs 월지(신)+년지(자))
+                    # 반합 결과 문자열을 정렬된 기준으로 만들어 중복 체크
+                    sorted_banhap_key = tuple(sorted((i_ji, j_ji))) 
+                    banhap_result_str = f"{pos_str} → {wangji} 기준 반합 ({JIJI_SAMHAP_RULES.get(full_samhap_group, '국 형성')})"
+                    
+                    # 반합 결과를 저장하고, 중복을 피하기 위해 found_samhap_banhap_combinations에 (정렬된 키, 결과문자열) 추가
+                    # 여기서는 결과 문자열 자체로 중복을 피하기보다, 반합이 발생했다는 사실로 기록
+                    if not any(banhap_result_str == item for item in results["지지삼합"]): # 이미 삼합으로 기록된 경우 제외
+                         # 삼합의 하위 개념이므로, 삼합 리스트에 "반합"으로 명시하여 추가
+                         results["지지삼합"].append(banhap_result_str)
+                break # 해당 pair에 대한 반합 찾았으므로 다음 pair로
+
+    # 5. 자형(自刑)
+    for jahyeong_char in JAHYEONG_CHARS:
+        count = jis.count(jahyeong_char)
+        if count >= 2:
+            positions = [f"{PILLAR_NAMES_KOR_SHORT[i]}지({jis[i]})" for i, ji_val in enumerate(jis) if ji_val == jahyeong_char]
+            results["형살(刑殺)"].append(f"{', '.join(positions)} ({jahyeong_char}{jahyeong_char}) → 자형(自刑)")
+            
+    return results
+
+
+@saju_metrics.timed("explanation_html")
+def get_hap_chung_detail_explanation(found_interactions_dict):
+    """발견된 합충형해파 종류에 따라 간단한 설명을 반환합니다."""
+    if not found_interactions_dict or not any(v for v in found_interactions_dict.values()):
+        return "<p>특별히 두드러지는 합충형해파의 관계가 나타나지 않습니다. 비교적 안정적인 구조일 수 있습니다.</p>"
+
+    explanation_parts = []
+    # HTML 예제의 설명을 기반으로 각 상호작용 타입에 대한 설명 추가
+    interaction_explanations = {
+        "천간합": "정신적, 사회적 관계에서의 연합, 변화 또는 새로운 기운의 생성 가능성을 나타냅니다.",
+        "지지육합": "개인적인 관계, 애정, 또는 비밀스러운 합의나 내부적인 결속을 의미할 수 있습니다.",
+        "지지삼합": "강력한 사회적 합으로, 특정 목표를 향한 강력한 추진력이나 세력 형성을 나타냅니다. (반합 포함)",
+        "지지방합": "가족, 지역, 동료 등 혈연이나 지연에 기반한 강한 결속력이나 세력 확장을 의미합니다.",
+        "천간충": "생각의 충돌, 가치관의 대립, 또는 외부 환경으로부터의 갑작스러운 변화나 자극, 정신적 스트레스를 암시합니다.",
+        "지지충": "현실적인 변화, 이동, 관계의 단절 또는 새로운 시작, 건강상의 주의 등을 나타낼 수 있습니다. 역동적인 사건의 발생 가능성을 의미합니다.",
+        "형살(刑殺)": "조정, 갈등, 법적 문제, 수술, 배신, 또는 내적 갈등과 성장통 등을 나타낼 수 있습니다. 때로는 정교함이나 전문성을 요구하는 일과도 관련됩니다.",
+        "해살(害殺)": "관계에서의 방해, 질투, 오해, 또는 건강상의 문제(주로 만성적) 등을 암시합니다. 예기치 않은 손실이나 어려움을 겪을 수 있습니다.",
+        "파살(破殺)": "깨짐, 분리, 손상, 계획의 차질, 관계의 갑작스러운 단절 등을 나타낼 수 있습니다. 기존의 것이 깨지고 새로워지는 과정을 의미하기도 합니다."
+    }
+    
+    for key, found_list in found_interactions_dict.items():
+        if found_list: # 해당 상호작용이 하나라도 발견되었다면
+            desc = interaction_explanations.get(key)
+            if desc:
+                explanation_parts.append(f"<li><strong>{key}:</strong> {desc}</li>")
+    
+    if not explanation_parts:
+        return "<p>구체적인 합충형해파 관계에 대한 설명을 준비 중입니다.</p>"
+        
+    return "<ul style='list-style-type: disc; margin-left: 20px; padding-left: 0;'>" + "".join(explanation_parts) + "</ul>"
+
+# ... (기존의 다른 함수들 determine_shinkang_shinyak, determine_gekuk 등은 이 위 또는 아래에 위치) ...
+# (saju_app.py 파일에 추가될 내용)
+
+# ... (기존 get_hap_chung_detail_explanation 함수 등 다음 줄에)
+
+# ───────────────────────────────
+# 주요 신살(神煞) 분석용 상수 및 함수 정의
+# (사용자님이 제공해주신 HTML/JS 예제 코드의 규칙들을 기반으로 작성되었습니다)
+# ───────────────────────────────
+
+# 천을귀인 (일간 기준, 해당 지지가 사주 내에 있는지 확인)
+CHEONEULGWIIN_MAP = {
+    "갑": ["축", "미"], "을": ["자", "신"], "병": ["해", "유"], "정": ["해", "유"],
+    "무": ["축", "미"], "기": ["자", "신"], "경": ["축", "미", "인", "오"], # JS 예제는 경: 축미인오, 신: 인오
+    "신": ["인", "오"], "임": ["사", "묘"], "계": ["사", "묘"]
+}
+
+# 문창귀인 (일간 기준, 해당 지지가 사주 내에 있는지 확인)
+MUNCHANGGWIIN_MAP = {
+    "갑": "사", "을": "오", "병": "신", "정": "유", "무": "신",
+    "기": "유", "경": "해", "신": "자", "임": "인", "계": "묘"
+}
+
+# 도화살 (년지 또는 일지 기준 - 삼합 왕지의 다음 글자, 즉 목욕지)
+# 기준 지지(삼합의 생지) -> 도화 지지(삼합의 왕지) - JS맵은 왕지를 가리킴. 도화는 목욕지.
+# 예: 해묘미(목국) -> 목욕지 '자'. 인오술(화국) -> 목욕지 '묘'.
+# JS 예제: {"해":"자", "묘":"자", "미":"자", "인":"묘", "오":"묘", "술":"묘", ... }
+# 이 맵은 (삼합의 첫글자 또는 중간글자 또는 끝글자) -> 도화살 지지(목욕지)
+DOHWASAL_MAP = {
+    # 해묘미 -> 자
+    "해": "자", "묘": "자", "미": "자",
+    # 인오술 -> 묘
+    "인": "묘", "오": "묘", "술": "묘",
+    # 사유축 -> 오
+    "사": "오", "유": "오", "축": "오",
+    # 신자진 -> 유
+    "신": "유", "자": "유", "진": "유"
+}
+
+# 역마살 (년지 또는 일지 기준 - 삼합 생지를 충(沖)하는 지지)
+YEONGMASAL_MAP = {
+    # 해묘미(목국) -> 목의 생지 해와 충하는 사
+    "해": "사", "묘": "사", "미": "사",
+    # 인오술(화국) -> 화의 생지 인과 충하는 신
+    "인": "신", "오": "신", "술": "신",
+    # 사유축(금국) -> 금의 생지 사와 충하는 해
+    "사": "해", "유": "해", "축": "해",
+    # 신자진(수국) -> 수의 생지 신과 충하는 인
+    "신": "인", "자": "인", "진": "인"
+}
+
+# 화개살 (년지 또는 일지 기준 - 삼합의 묘지)
+HWAGAESAL_MAP = {
+    # 해묘미 -> 미
+    "해": "미", "묘": "미", "미": "미",
+    # 인오술 -> 술
+    "인": "술", "오": "술", "술": "술",
+    # 사유축 -> 축
+    "사": "축", "유": "축", "축": "축",
+    # 신자진 -> 진
+    "신": "진", "자": "진", "진": "진"
+}
+
+# 양인살 (일간 기준, YANGIN_JI_MAP 재활용 가능 - 격국에서 이미 정의됨)
+# YANGIN_JI_MAP = {"갑": "묘", "병": "오", "무": "오", "경": "유", "임": "자"}
+
+# 괴강살 (일주가 해당 간지 조합일 때)
+GOEGANGSAL_ILJU_LIST = ["경진", "경술", "임진", "임술", "무진", "무술"] # 갑진, 갑술도 포함하는 경우도 있음, JS예제는 6개.
+
+# 백호대살 (각 기둥의 간지가 해당 조합일 때)
+BAEKHODAESAL_GANJI_LIST = ["갑진", "을미", "병술", "정축", "무진", "임술", "계축"]
+
+# 귀문관살 (지지 쌍이 사주 내에 있을 때) - 정렬된 쌍으로 정의
+GWIMUNGWANSAL_PAIRS = [
+    tuple(sorted(("자", "유"))), tuple(sorted(("축", "오"))), tuple(sorted(("인", "미"))),
+    tuple(sorted(("묘", "신"))), tuple(sorted(("진", "해"))), tuple(sorted(("사", "술")))
+]
+
+# 공망 (일주 기준)
+# (일지 인덱스 - 일간 인덱스) % 12 = 일주가 속한 순(旬)의 첫 간지(갑X)의 지지 -> 공망 지지 쌍
+# GAN, JI 리스트는 이미 상단에 정의되어 있음
+GONGMANG_MAP_BY_DIFF = {
+    # 일지-일간 인덱스 차 (mod 12) : [공망지지1, 공망지지2]
+    # 예: 갑자일주 -> 자(0)-갑(0)=0 -> 갑자순 -> 술,해 공망 / 을축(1,1)도 0 -> 술,해
+    #     갑술(0,10) -> 10 -> 갑술순 -> 신,유 공망 / 계해(9,11) -> 2 -> 갑인순 -> 자,축 공망
+    0: ["술", "해"], 10: ["신", "유"], 8: ["오", "미"],
+    6: ["진", "사"], 4: ["인", "묘"], 2: ["자", "축"]
+}
+
+def gongmang_branch_indices(gapja_idx):
+    """
+    일주 60갑자 인덱스 -> 그 일주가 속한 순(旬)의 공망 지지 인덱스 2개.
+    순 = 갑X부터 열 간지 (인덱스 // 10), 순 첫 지지는 10*순 % 12 이고 공망은 그 다음 열째·열한째 지지입니다.
+    정수와 numpy 정수 배열 모두 받습니다 (단건 analyze_shinsal / 배치 shinsal_arrays 공용).
+    """
+    xun = gapja_idx // 10
+    return (10 - 2 * xun) % 12, (11 - 2 * xun) % 12
+# PILLAR_NAMES_KOR (전체 기둥 이름) - 신살 결과 표시시 사용
+PILLAR_NAMES_KOR = ["년주", "월주", "일주", "시주"]
+
+
+# ───────────────────────────────
+# 신살 규칙 (선언형) - 규칙 문자열을 조회표로 컴파일해 단건/배치 모두 같은 표로 판정
+# ───────────────────────────────
+# 신살 하나 = 규칙 한 줄. 새 신살은 판정 코드를 늘리지 않고 여기(또는 규칙 프로필의 SHINSAL_RULES)에 한 줄 추가합니다.
+#   lookup <기준 위치>[,<기준 위치>...] -> <천간|지지> : <맵>
+#       기준 글자로 맵을 찾아 나온 글자가 원국 천간/지지에 있으면 성립.
+#       기준이 여럿이면 앞 기준과 맵 결과가 같은 기준은 건너뜀 (연지·일지 기준 도화가 겹치는 경우 등).
+#   pillar <기둥>[,<기둥>...] in <간지 목록>   : 해당 기둥의 간지가 목록에 있으면 성립
+#   pair <천간|지지> in <쌍 목록>              : 원국의 두 글자가 쌍 목록에 있으면 성립
+#   gongmang                                  : 일주가 속한 순(旬)의 공망 (원국 지지 중 해당 위치도 표시)
+# <맵>/<목록>은 엔진 상수 이름 또는 직접 적은 값: "갑=오 을=오 경=축미인오" / "경진 경술" / "자유 축오"
+# 위치 이름은 POSITION_KEYS_ORDERED(연간~시지), 기둥 이름은 PILLAR_NAMES_KOR(년주~시주)
+SHINSAL_RULES = {
+    "천을귀인": "lookup 일간 -> 지지 : CHEONEULGWIIN_MAP",
+    "문창귀인": "lookup 일간 -> 지지 : MUNCHANGGWIIN_MAP",
+    "도화살": "lookup 연지,일지 -> 지지 : DOHWASAL_MAP",
+    "역마살": "lookup 연지,일지 -> 지지 : YEONGMASAL_MAP",
+    "화개살": "lookup 연지,일지 -> 지지 : HWAGAESAL_MAP",
+    "양인살": "lookup 일간 -> 지지 : YANGIN_JI_MAP",
+    "괴강살": "pillar 일주 in GOEGANGSAL_ILJU_LIST",
+    "백호대살": "pillar 년주,월주,일주,시주 in BAEKHODAESAL_GANJI_LIST",
+    "귀문관살": "pair 지지 in GWIMUNGWANSAL_PAIRS",
+    "공망": "gongmang",
+}
+SHINSAL_RULE_PATTERN = re.compile(
+    r"^\s*(?:lookup\s+(?P<refs>\S+)\s*->\s*(?P<target>천간|지지)\s*:\s*(?P<map>.+?)"
+    r"|pillar\s+(?P<pillars>\S+)\s+in\s+(?P<ganjis>.+?)"
+    r"|pair\s+(?P<pair_kind>천간|지지)\s+in\s+(?P<pairs>.+?)"
+    r"|(?P<gongmang>gongmang))\s*$")
+_POSITION_PAIRS = list(itertools.combinations(range(4), 2)) # 기둥 쌍 (0,1) ~ (2,3)
+_SHINSAL_COMPILE_CACHE = {} # 규칙 dict id -> (규칙, 참조 상수 이름) / (규칙 dict id, 참조 상수 id...) -> ((규칙, 참조 객체) 보관, 컴파일 결과)
+
+def _shinsal_source(text, namespace):
+    """규칙의 <맵>/<목록> 부분: 엔진 상수 이름이면 그 값(namespace에서 조회), 아니면 직접 적은 값 문자열."""
+    text = text.strip()
+    if re.fullmatch(r"[A-Z_][A-Z0-9_]*", text):
+        if text not in namespace:
+            raise ValueError(f"오류(신살규칙:알 수 없는 상수 {text})")
+        return namespace[text]
+    return text
+
+def _shinsal_chars(value, names, rule_name):
+    chars = list(value) if isinstance(value, str) else [c for item in value for c in item]
+    unknown = [c for c in chars if c not in names]
+    if unknown:
+        raise ValueError(f"오류(신살규칙:{rule_name} 알 수 없는 글자 {''.join(unknown)})")
+    return [names.index(c) for c in chars]
+
+def compile_shinsal_rule(name, spec, namespace=None):
+    """
+    규칙 문자열 하나를 조회표로 컴파일합니다. 형식 오류는 ValueError("오류(신살규칙:...)").
+    반환: {"name", "kind", ...} - lookup: refs(위치 0~7), target_is_gan, table(기준 글자 인덱스 -> 대상 인덱스 frozenset)
+          pillar: pillars(기둥 0~3), gapja(성립 60갑자 인덱스 집합)
+          pair: is_gan, pairs(정렬된 인덱스 쌍 집합), matrix(두 글자 인덱스 -> 성립 여부) / gongmang
+    """
+    namespace = globals() if namespace is None else namespace
+    match = SHINSAL_RULE_PATTERN.match(spec)
+    if not match:
+        raise ValueError(f"오류(신살규칙:{name} 형식을 해석할 수 없음 '{spec}')")
+    if match["gongmang"]:
+        return {"name": name, "kind": "gongmang"}
+    if match["refs"]:
+        refs = [POSITION_KEYS_ORDERED.index(ref) if ref in POSITION_KEYS_ORDERED else None for ref in match["refs"].split(",")]
+        if None in refs or len({ref % 2 for ref in refs}) != 1:
+            raise ValueError(f"오류(신살규칙:{name} 기준 위치 '{match['refs']}' - 천간끼리 또는 지지끼리만 가능)")
+        ref_names = GAN if refs[0] % 2 == 0 else JI
+        target_is_gan = match["target"] == "천간"
+        source = _shinsal_source(match["map"], namespace)
+        if isinstance(source, str):
+            source = dict(entry.split("=", 1) for entry in source.split())
+        table = [frozenset()] * len(ref_names)
+        for ref_char, targets in source.items():
+            table[_shinsal_chars(ref_char, ref_names, name)[0]] = frozenset(_shinsal_chars(targets, GAN if target_is_gan else JI, name))
+        return {"name": name, "kind": "lookup", "refs": refs, "target_is_gan": target_is_gan, "table": table}
+    if match["pillars"]:
+        pillars = [PILLAR_NAMES_KOR.index(p) if p in PILLAR_NAMES_KOR else None for p in match["pillars"].split(",")]
+        if None in pillars:
+            raise ValueError(f"오류(신살규칙:{name} 기둥 이름 '{match['pillars']}')")
+        source = _shinsal_source(match["ganjis"], namespace)
+        ganjis = source.split() if isinstance(source, str) else source
+        gapja = set()
+        for ganji in ganjis:
+            g, j = _shinsal_chars(ganji[0], GAN, name)[0], _shinsal_chars(ganji[1:], JI, name)[0]
+            gapja.add(gapja_index(g, j))
+        return {"name": name, "kind": "pillar", "pillars": pillars, "gapja": frozenset(gapja)}
+    is_gan = match["pair_kind"] == "천간"
+    source = _shinsal_source(match["pairs"], namespace)
+    pairs = source.split() if isinstance(source, str) else source
+    indexed = set()
+    for pair in pairs:
+        a, b = _shinsal_chars(pair, GAN if is_gan else JI, name)
+        indexed.add((min(a, b), max(a, b)))
+    width = len(GAN if is_gan else JI)
+    matrix = [[(min(a, b), max(a, b)) in indexed for b in range(width)] for a in range(width)]
+    return {"name": name, "kind": "pair", "is_gan": is_gan, "pairs": frozenset(indexed), "matrix": matrix}
+
+def compiled_shinsal_rules():
+    """현재 모듈(또는 규칙 프로필) 전역의 SHINSAL_RULES를 컴파일한 목록. 규칙/참조 상수 객체가 같으면 캐시를 씁니다."""
+    namespace, rules = globals(), SHINSAL_RULES
+    names = _SHINSAL_COMPILE_CACHE.get(id(rules))
+    if names is None or names[0] is not rules:
+        names = (rules, sorted(set(re.findall(r"\b[A-Z_][A-Z0-9_]+\b", " ".join(rules.values())))))
+        _SHINSAL_COMPILE_CACHE[id(rules)] = names
+    referenced = [namespace.get(name) for name in names[1]]
+    key = (id(rules), *map(id, referenced))
+    cached = _SHINSAL_COMPILE_CACHE.get(key)
+    if cached is None:
+        cached = ((rules, referenced), [compile_shinsal_rule(name, spec, namespace) for name, spec in rules.items()])
+        _SHINSAL_COMPILE_CACHE[key] = cached
+    return cached[1]
+
+def shinsal_features(compiled):
+    """배치 판정 결과의 열 정의: [(신살 이름, 설명)]. 열 순서는 shinsal_arrays의 hits 열과 같습니다."""
+    features = []
+    for rule in compiled:
+        if rule["kind"] == "lookup":
+            kind = "간" if rule["target_is_gan"] else "지"
+            features += [(rule["name"], f"{POSITION_KEYS_ORDERED[ref]} 기준 {PILLAR_NAMES_KOR_SHORT[p]}{kind}") for ref in rule["refs"] for p in range(4)]
+        elif rule["kind"] == "pillar":
+            features += [(rule["name"], PILLAR_NAMES_KOR[p]) for p in rule["pillars"]]
+        elif rule["kind"] == "pair":
+            kind = "간" if rule["is_gan"] else "지"
+            features += [(rule["name"], f"{PILLAR_NAMES_KOR_SHORT[i]}{kind}+{PILLAR_NAMES_KOR_SHORT[j]}{kind}") for i, j in itertools.combinations(range(4), 2)]
+        else:
+            features += [(rule["name"], f"{PILLAR_NAMES_KOR_SHORT[p]}지") for p in range(4)]
+    return features
+
+@saju_metrics.timed("shinsal")
+def analyze_shinsal(saju_8char_details):
+    """
+    사주팔자를 기반으로 주요 신살을 분석합니다. 판정 규칙은 SHINSAL_RULES (선언형, 조회표로 컴파일).
+    saju_8char_details: {"year_gan":yg, "year_ji":yj, ..., "day_gan":dg, ...} (모르는 글자는 None - 해당 위치만 판정에서 빠짐)
+    반환: ["신살 결과 문자열 리스트"]
+    """
+    get = saju_8char_details.get
+    gans = [get("year_gan"), get("month_gan"), get("day_gan"), get("time_gan")]
+    jis = [get("year_ji"), get("month_ji"), get("day_ji"), get("time_ji")]
+    g = [GAN_INDEX.get(c) for c in gans]
+    j = [JI_INDEX.get(c) for c in jis]
+    chars = [gans[0], jis[0], gans[1], jis[1], gans[2], jis[2], gans[3], jis[3]] # POSITION_KEYS_ORDERED 순서
+    values = [g[0], j[0], g[1], j[1], g[2], j[2], g[3], j[3]]
+    found_shinsals_set = set() # 중복 방지를 위해 set 사용
+
+    for rule in compiled_shinsal_rules():
+        name, kind = rule["name"], rule["kind"]
+        if kind == "lookup":
+            targets, target_chars, target_kind = (g, gans, "간") if rule["target_is_gan"] else (j, jis, "지")
+            used = []
+            for ref in rule["refs"]:
+                hit_set = rule["table"][values[ref]] if values[ref] is not None else frozenset()
+                if not hit_set or hit_set in used: # 앞 기준과 결과가 같으면 중복 방지
+                    continue
+                used.append(hit_set)
+                for p in range(4):
+                    if targets[p] in hit_set:
+                        found_shinsals_set.add(f"{name}: {POSITION_KEYS_ORDERED[ref]}({chars[ref]}) 기준 {PILLAR_NAMES_KOR_SHORT[p]}{target_kind}({target_chars[p]})")
+        elif kind == "pillar":
+            for p in rule["pillars"]:
+                if g[p] is not None and j[p] is not None and (6 * g[p] - 5 * j[p]) % 60 in rule["gapja"]:
+                    found_shinsals_set.add(f"{name}: {PILLAR_NAMES_KOR[p]}({gans[p]}{jis[p]})")
+        elif kind == "pair":
+            idx, names, kind_char = (g, gans, "간") if rule["is_gan"] else (j, jis, "지")
+            matrix = rule["matrix"]
+            for a, b in _POSITION_PAIRS:
+                if idx[a] is not None and idx[b] is not None and matrix[idx[a]][idx[b]]:
+                    found_shinsals_set.add(f"{name}: {PILLAR_NAMES_KOR_SHORT[a]}{kind_char}({names[a]}) + {PILLAR_NAMES_KOR_SHORT[b]}{kind_char}({names[b]})")
+        elif g[2] is not None and j[2] is not None: # 공망 (일주 기준)
+            first, second = gongmang_branch_indices((6 * g[2] - 5 * j[2]) % 60)
+            gongmang_jis = JI[first], JI[second]
+            found_shinsals_set.add(f"{name}(空亡): 일주({gans[2]}{jis[2]}) 기준 {gongmang_jis[0]}, {gongmang_jis[1]} 공망")
+            found_in_pillars = [f"{PILLAR_NAMES_KOR[p]}의 {jis[p]}" for p in range(4) if jis[p] in gongmang_jis]
+            if found_in_pillars:
+                found_shinsals_set.add(f"  └ ({', '.join(found_in_pillars)})가 공망에 해당합니다.")
+
+    return sorted(found_shinsals_set)
+
+def _shinsal_rule_arrays(rule):
+    """
+    컴파일된 규칙의 NumPy 조회표 (처음 쓸 때 만들어 규칙 dict의 "arrays"에 보관합니다).
+    lookup: (성립 표 (기준, 대상) bool, 기준 간 결과 같음 (중복 방지), 빈 결과) / pillar: 60갑자 bool / pair: 두 글자 bool 행렬
+    """
+    import numpy as np
+
+    if "arrays" not in rule:
+        if rule["kind"] == "lookup":
+            width = 10 if rule["target_is_gan"] else 12
+            arrays = (np.array([[t in hit_set for t in range(width)] for hit_set in rule["table"]]),
+                      np.array([[a == b for b in rule["table"]] for a in rule["table"]]),
+                      np.array([not hit_set for hit_set in rule["table"]]))
+        elif rule["kind"] == "pillar":
+            arrays = np.zeros(60, dtype=bool)
+            arrays[list(rule["gapja"])] = True
+        elif rule["kind"] == "pair":
+            width = 10 if rule["is_gan"] else 12
+            arrays = np.zeros((width, width), dtype=bool)
+            arrays[:, :] = rule["matrix"]
+        else:
+            arrays = None
+        rule["arrays"] = arrays
+    return rule["arrays"]
+
+def shinsal_arrays(stems, branches):
+    """
+    정수 코드 명식 배열 (N,4) 천간/지지(encode_charts)에 대해 SHINSAL_RULES를 벡터로 판정합니다 (NumPy 필요).
+    반환: (hits (N,F) bool, features [(신살 이름, 설명)]) - 열은 analyze_shinsal의 결과 문자열 하나씩에 대응합니다.
+    (공망은 원국 지지가 공망인 위치별 열이며, 항상 붙는 요약 문장은 열로 두지 않습니다.)
+    """
+    import numpy as np
+
+    compiled = compiled_shinsal_rules()
+    stems, branches = np.asarray(stems, dtype=np.intp), np.asarray(branches, dtype=np.intp)
+    positions = np.empty((len(stems), 8), dtype=np.intp)
+    positions[:, 0::2], positions[:, 1::2] = stems, branches
+    gapja = (6 * stems - 5 * branches) % 60
+    columns = []
+    for rule in compiled:
+        arrays = _shinsal_rule_arrays(rule)
+        if rule["kind"] == "lookup":
+            targets = stems if rule["target_is_gan"] else branches
+            table, same, empty = arrays
+            for k, ref in enumerate(rule["refs"]):
+                ref_values = positions[:, ref]
+                skip = empty[ref_values].copy()
+                for earlier in rule["refs"][:k]:
+                    skip |= same[positions[:, earlier], ref_values] & ~empty[positions[:, earlier]]
+                for p in range(4):
+                    columns.append(table[ref_values, targets[:, p]] & ~skip)
+        elif rule["kind"] == "pillar":
+            columns += [arrays[gapja[:, p]] for p in rule["pillars"]]
+        elif rule["kind"] == "pair":
+            idx = stems if rule["is_gan"] else branches
+            columns += [arrays[idx[:, a], idx[:, b]] for a, b in _POSITION_PAIRS]
+        else:
+            first, second = gongmang_branch_indices(gapja[:, 2])
+            columns += [(branches[:, p] == first) | (branches[:, p] == second) for p in range(4)]
+    hits = np.stack(columns, axis=1) if columns else np.zeros((len(stems), 0), dtype=bool)
+    return hits, shinsal_features(compiled)
+
+def shinsal_counts(stems, branches):
+    """신살별 성립 개수 {신살 이름: (N,) int 배열} (shinsal_arrays 열을 이름별로 합산)."""
+    import numpy as np
+
+    hits, features = shinsal_arrays(stems, branches)
+    names = [name for name, _ in features]
+    return {name: hits[:, [i for i, n in enumerate(names) if n == name]].sum(axis=1) for name in dict.fromkeys(names)}
+
+
+@saju_metrics.timed("explanation_html")
+def get_shinsal_detail_explanation(found_shinsals_list):
+    """발견된 신살 종류에 따라 간단한 설명을 반환합니다."""
+    if not found_shinsals_list:
+        return "<p>특별히 나타나는 주요 신살이 없습니다.</p>"
+
+    explanation_parts = []
+    # HTML 예제의 설명을 기반으로 각 신살 타입에 대한 설명 추가
+    # 설명은 키워드 기반으로 찾아서 추가 (중복 방지)
+    main_shinsal_explanations = {
+        "천을귀인": "어려울 때 귀인의 도움을 받거나 위기를 넘기는 행운이 따르는 길성 중의 길성입니다.",
+        "문창귀인": "학문, 지혜, 총명함을 나타내며 글재주나 시험운 등에 긍정적인 영향을 줄 수 있습니다.",
+        "도화살": "매력, 인기, 예술적 감각을 의미하며, 이성에게 인기가 많을 수 있으나 때로는 구설을 조심해야 합니다.",
+        "역마살": "활동성, 이동, 변화, 여행, 해외와의 인연 등을 나타냅니다. 한 곳에 정착하기보다 변화를 추구하는 성향일 수 있습니다.",
+        "화개살": "예술, 종교, 학문, 철학 등 정신세계와 관련된 분야에 재능이나 인연이 깊을 수 있습니다. 때로 고독감을 느끼기도 합니다.",
+        "양인살": "강한 에너지, 카리스마, 독립심, 경쟁심을 나타냅니다. 순탄할 때는 큰 성취를 이루지만, 운이 나쁠 때는 과격함이나 사건사고를 조심해야 합니다.",
+        "괴강살": "매우 강한 기운과 리더십, 총명함을 나타냅니다. 극단적인 성향이나 고집을 주의해야 하며, 큰 인물이 될 가능성도 있습니다.",
+        "백호대살": "강한 기운으로 인해 급작스러운 사건, 사고, 질병 등을 경험할 수 있음을 암시하므로 평소 건강과 안전에 유의하는 것이 좋습니다.",
+        "귀문관살": "예민함, 직관력, 영감, 독특한 정신세계를 나타냅니다. 때로는 신경과민, 변덕, 집착 등으로 나타날 수 있어 마음의 안정이 중요합니다.",
+        "공망": "해당 글자의 영향력이 약화되거나 공허함을 의미합니다. 정신적인 활동, 종교, 철학 등에 관심을 두거나, 예상 밖의 결과나 변화를 경험할 수 있습니다.",
+        "홍염살": "다정다감하고 이성의 호감을 사는 매력을 뜻합니다. 도화살과 비슷하지만 은근하고 내면적인 매력으로 봅니다." # 규칙 프로필에서 추가하는 신살
+    }
+    
+    added_explanations_keys = set() # 이미 추가된 설명인지 확인
+
+    for shinsal_item_str in found_shinsals_list:
+        for shinsal_key, desc in main_shinsal_explanations.items():
+            if shinsal_key in shinsal_item_str and shinsal_key not in added_explanations_keys:
+                explanation_parts.append(f"<li><strong>{shinsal_key}:</strong> {desc}</li>")
+                added_explanations_keys.add(shinsal_key)
+    
+    if not explanation_parts:
+        return "<p>발견된 신살에 대한 구체적인 설명을 준비 중입니다.</p>"
+        
+    return "<ul style='list-style-type: disc; margin-left: 20px; padding-left: 0;'>" + "".join(explanation_parts) + "</ul>"
+
+# ... (기존의 다른 함수들 determine_shinkang_shinyak, get_hap_chung_detail_explanation 등은 이 위 또는 아래에 위치) ...
+# (saju_app.py 파일에 추가될 내용)
+
+# ... (기존 get_shinsal_detail_explanation 함수 등 다음 줄에)
+
+# ───────────────────────────────
+# 용신/기신 분석용 상수 및 함수 정의
+# (사용자님이 제공해주신 HTML/JS 예제 코드의 로직을 기반으로 작성되었습니다)
+# ───────────────────────────────
+
+# 일간 오행을 기준으로 각 관계의 오행을 정의 (GAN_TO_OHENG는 이미 정의됨)
+# 1. 일간을 생하는 오행 (인성)
+OHENG_HELPER_MAP = {"목": "수", "화": "목", "토": "화", "금": "토", "수": "금"}
+# 2. 일간이 생하는 오행 (식상)
+OHENG_PRODUCES_MAP = {"목": "화", "화": "토", "토": "금", "금": "수", "수": "목"}
+# 3. 일간이 극하는 오행 (재성)
+OHENG_CONTROLS_MAP = {"목": "토", "화": "금", "토": "수", "금": "목", "수": "화"}
+# 4. 일간을 극하는 오행 (관성)
+OHENG_IS_CONTROLLED_BY_MAP = {"목": "금", "화": "수", "토": "목", "금": "화", "수": "토"}
+
+
+@saju_metrics.timed("yongshin")
+def determine_yongshin_gishin_simplified(day_gan_char, shinkang_status_str):
+    """
+    일간, 신강/신약 상태를 바탕으로 간략화된 용신/기신 후보 오행을 판단합니다.
+    (HTML 예제의 determine_yongshin_gishin 함수 로직 기반)
+    """
+    ilgan_ohaeng = GAN_TO_OHENG.get(day_gan_char)
+    if not ilgan_ohaeng:
+        return {
+            "yongshin": [], "gishin": [],
+            "html": "<p>일간의 오행을 알 수 없어 용신/기신을 판단할 수 없습니다.</p>"
+        }
+
+    yongshin_candidates = []
+    gishin_candidates = []
+
+    # 오행 역할 정의 (일간 기준)
+    sik상_ohaeng = OHENG_PRODUCES_MAP.get(ilgan_ohaeng)
+    jae성_ohaeng = OHENG_CONTROLS_MAP.get(ilgan_ohaeng)
+    gwan성_ohaeng = OHENG_IS_CONTROLLED_BY_MAP.get(ilgan_ohaeng)
+    in성_ohaeng = OHENG_HELPER_MAP.get(ilgan_ohaeng)
+    bi겁_ohaeng = ilgan_ohaeng # 나와 같은 오행 (비견/겁재)
+
+    if "신강" in shinkang_status_str: # 신강 또는 약간 신강 포함
+        # 용신 후보: 식상, 재성, 관성 (일간의 힘을 빼거나 적절히 제어하는 오행)
+        if sik상_ohaeng: yongshin_candidates.append(sik상_ohaeng)
+        if jae성_ohaeng: yongshin_candidates.append(jae성_ohaeng)
+        if gwan성_ohaeng: yongshin_candidates.append(gwan성_ohaeng)
+        # 기신 후보: 인성, 비겁 (일간의 힘을 더 강하게 하는 오행)
+        if in성_ohaeng: gishin_candidates.append(in성_ohaeng)
+        if bi겁_ohaeng: gishin_candidates.append(bi겁_ohaeng)
+
+    elif "신약" in shinkang_status_str: # 신약 또는 약간 신약 포함
+        # 용신 후보: 인성, 비겁 (일간의 힘을 더해주는 오행)
+        if in성_ohaeng: yongshin_candidates.append(in성_ohaeng)
+        if bi겁_ohaeng: yongshin_candidates.append(bi겁_ohaeng)
+        # 기신 후보: 식상, 재성, 관성 (일간의 힘을 더 빼거나 극하는 오행)
+        if sik상_ohaeng: gishin_candidates.append(sik상_ohaeng)
+        if jae성_ohaeng: gishin_candidates.append(jae성_ohaeng)
+        if gwan성_ohaeng: gishin_candidates.append(gwan성_ohaeng)
+
+    elif "중화" in shinkang_status_str:
+        return {
+            "yongshin": [], "gishin": [],
+            "html": "<p>중화 사주로 판단됩니다. 이 경우 특정 오행을 용신이나 기신으로 엄격히 구분하기보다는, 사주 전체의 균형과 조화를 유지하고 대운의 흐름에 유연하게 대처하는 것이 중요할 수 있습니다. 때로는 사주에 부족하거나 고립된 오행을 보충하는 방향을 고려하기도 합니다.</p>"
+        }
+    else: # shinkang_status_str이 예상치 못한 값일 경우
+        return {
+            "yongshin": [], "gishin": [],
+            "html": "<p>일간의 강약 상태가 명확하지 않아 용신/기신을 판단하기 어렵습니다.</p>"
+        }
+
+    # 중복 제거 및 정렬
+    unique_yongshin = sorted(list(set(yongshin_candidates)))
+    unique_gishin = sorted(list(set(gishin_candidates)))
+    
+    # (드물지만) 용신과 기신에 같은 오행이 들어간 경우 제거 (JS 예제 참고)
+    # common_elements = [y_el for y_el in unique_yongshin if y_el in unique_gishin]
+    # unique_yongshin = [y_el for y_el in unique_yongshin if y_el not in common_elements]
+    # unique_gishin = [g_el for g_el in unique_gishin if g_el not in common_elements]
+    # -> 현재 로직상으로는 common_elements가 거의 발생하지 않음.
+
+    html_parts = []
+    if unique_yongshin:
+        yongshin_str = ", ".join([f"<span style='color:#15803d; font-weight:bold;'>{o}({OHENG_TO_HANJA.get(o, '')})</span>" for o in unique_yongshin])
+        html_parts.append(f"<p>유력한 용신(喜神) 후보 오행: {yongshin_str}</p>")
+    else:
+        html_parts.append("<p>용신(喜神)으로 특정할 만한 오행을 명확히 구분하기 어렵습니다. (중화 사주 외)</p>")
+    
+    if unique_gishin:
+        gishin_str = ", ".join([f"<span style='color:#b91c1c; font-weight:bold;'>{o}({OHENG_TO_HANJA.get(o, '')})</span>" for o in unique_gishin])
+        html_parts.append(f"<p>주의가 필요한 기신(忌神) 후보 오행: {gishin_str}</p>")
+    else:
+        html_parts.append("<p>특별히 기신(忌神)으로 강하게 작용할 만한 오행이 두드러지지 않을 수 있습니다.</p>")
+
+    return {"yongshin": unique_yongshin, "gishin": unique_gishin, "html": "".join(html_parts)}
+
+
+@saju_metrics.timed("explanation_html")
+def get_gaewoon_tips_html(yongshin_list):
+    """용신 오행에 따른 간단한 개운법 팁 HTML을 반환합니다."""
+    if not yongshin_list:
+        return ""
+    
+    tips_html = "<h5 style='color: #047857; margin-top: 0.8rem; margin-bottom: 0.3rem; font-size:1em;'>🍀 간단 개운법 (용신 활용)</h5><ul style='list-style:none; padding-left:0; font-size:0.9em;'>"
+    gaewoon_tips_data = {
+        "목": "<li><strong style='color:#15803d;'>목(木) 용신:</strong> 동쪽 방향, 푸른색/초록색 계열 아이템 활용. 숲이나 공원 산책, 식물 키우기, 교육/문화/기획 관련 활동.</li>",
+        "화": "<li><strong style='color:#15803d;'>화(火) 용신:</strong> 남쪽 방향, 붉은색/분홍색/보라색 계열 아이템 활용. 밝고 따뜻한 환경 조성, 예체능/방송/조명/열정적인 활동.</li>",
+        "토": "<li><strong style='color:#15803d;'>토(土) 용신:</strong> 중앙(거주지 중심), 노란색/황토색/베이지색 계열 아이템 활용. 안정적이고 편안한 환경, 명상, 신용을 중시하는 활동, 등산.</li>",
+        "금": "<li><strong style='color:#15803d;'>금(金) 용신:</strong> 서쪽 방향, 흰색/은색/금색 계열 아이템 활용. 단단하고 정돈된 환경, 금속 액세서리, 결단력과 의리를 지키는 활동, 악기 연주.</li>",
+        "수": "<li><strong style='color:#15803d;'>수(水) 용신:</strong> 북쪽 방향, 검은색/파란색/회색 계열 아이템 활용. 물가나 조용하고 차분한 환경, 지혜를 활용하는 활동, 명상이나 충분한 휴식.</li>"
+    }
+    for yongshin_ohaeng in yongshin_list:
+        tips_html += gaewoon_tips_data.get(yongshin_ohaeng, f"<li>{yongshin_ohaeng}({OHENG_TO_HANJA.get(yongshin_ohaeng,'')}) 용신에 대한 개운법 정보를 준비 중입니다.</li>")
+    
+    tips_html += "</ul><p style='font-size:0.8rem; color:#555; margin-top:0.5rem;'>* 위 내용은 일반적인 개운법이며, 개인의 전체 사주 구조와 상황에 따라 다를 수 있습니다. 참고용으로 활용하세요.</p>"
+    return tips_html
+
+# ... (기존의 다른 함수들 get_shinsal_detail_explanation 등은 이 위 또는 아래에 위치) ...
+# ───────────────────────────────
+# 오행 및 십신 세력 계산 함수
+# ───────────────────────────────
+@saju_metrics.timed("strengths")
+def calculate_ohaeng_sipshin_strengths(saju_8char_details):
+    """
+    사주팔자의 각 글자를 기반으로 오행 및 십신의 가중치를 계산합니다.
+    saju_8char_details: {"year_gan":yg, "year_ji":yj, ..., "day_gan":dg, ...} 형태의 딕셔너리
+    반환: (ohaeng_strengths_dict, sipshin_strengths_dict)
+    """
+    day_master_gan = saju_8char_details["day_gan"]
+
+    # 분석할 8글자 (천간4 + 지지4)와 각 위치 키
+    chars_to_analyze = [
+        (saju_8char_details["year_gan"], "연간"), (saju_8char_details["year_ji"], "연지"),
+        (saju_8char_details["month_gan"], "월간"), (saju_8char_details["month_ji"], "월지"),
+        (saju_8char_details["day_gan"], "일간"), (saju_8char_details["day_ji"], "일지"),
+        (saju_8char_details["time_gan"], "시간"), (saju_8char_details["time_ji"], "시지")
+    ]
+
+    ohaeng_strengths = {oheng: 0.0 for oheng in OHENG_ORDER}
+    sipshin_strengths = {sipshin: 0.0 for sipshin in SIPSHIN_ORDER}
+
+    def get_sipshin(dm_gan, other_gan):
+        if dm_gan in SIPSHIN_MAP and other_gan in SIPSHIN_MAP[dm_gan]:
+            return SIPSHIN_MAP[dm_gan][other_gan]
+        return None # 또는 "기타" 반환
+
+    for char_val, position_key in chars_to_analyze:
+        weight = POSITIONAL_WEIGHTS.get(position_key, 0.0)
+        is_gan = "간" in position_key # 천간인지 지지인지 구분
+
+        if is_gan: # 천간인 경우
+            gan_char = char_val
+            # 오행 계산
+            ohaeng = GAN_TO_OHENG.get(gan_char)
+            if ohaeng:
+                ohaeng_strengths[ohaeng] += weight
+            
+            # 십신 계산
+            sipshin = get_sipshin(day_master_gan, gan_char)
+            if sipshin:
+                sipshin_strengths[sipshin] += weight
+        
+        else: # 지지인 경우
+            ji_char = char_val
+            if ji_char in JIJI_JANGGAN:
+                for janggan_char, proportion in JIJI_JANGGAN[ji_char].items():
+                    # 지장간의 오행 계산
+                    ohaeng = GAN_TO_OHENG.get(janggan_char)
+                    if ohaeng:
+                        ohaeng_strengths[ohaeng] += weight * proportion
+                    
+                    # 지장간의 십신 계산
+                    sipshin = get_sipshin(day_master_gan, janggan_char)
+                    if sipshin:
+                        sipshin_strengths[sipshin] += weight * proportion
+    
+    # 결과값을 소수점 한 자리까지 반올림 (JS 예제와 동일하게)
+    for o in OHENG_ORDER: 
+        ohaeng_strengths[o] = round(ohaeng_strengths[o], 1)
+    for s in SIPSHIN_ORDER: 
+        sipshin_strengths[s] = round(sipshin_strengths[s], 1)
+
+    return ohaeng_strengths, sipshin_strengths
+
+_STRENGTH_TABLE_CACHE = {} # (GAN_TO_OHENG, JIJI_JANGGAN, SIPSHIN_MAP id) -> ((표 보관), 조회표)
+
+def _strength_tables():
+    """
+    세력 배치 계산용 조회표 (NumPy): 천간 -> 오행 (10,5), (일간, 천간) -> 십신 (10,10,10),
+    지장간 k번째 -> 오행 비율 (K,12,5), (일간, 지지) -> 십신 비율 (K,10,12,10). K는 지지당 최대 지장간 수입니다.
+    지장간을 하나씩 따로 두어 단건 계산과 같은 순서로 더합니다. 규칙 프로필마다 표가 다르므로 표 객체 id로 캐시합니다.
+    """
+    import numpy as np
+
+    key = (id(GAN_TO_OHENG), id(JIJI_JANGGAN), id(SIPSHIN_MAP))
+    cached = _STRENGTH_TABLE_CACHE.get(key)
+    if cached is None:
+        oheng_pos, sipshin_pos = {o: i for i, o in enumerate(OHENG_ORDER)}, {s: i for i, s in enumerate(SIPSHIN_ORDER)}
+        layers = max((len(JIJI_JANGGAN.get(ji, {})) for ji in JI), default=0)
+        stem_ohaeng, branch_ohaeng = np.zeros((10, 5)), np.zeros((layers, 12, 5))
+        stem_sipshin, branch_sipshin = np.zeros((10, 10, 10)), np.zeros((layers, 10, 12, 10))
+        for g, gan in enumerate(GAN):
+            if gan in GAN_TO_OHENG:
+                stem_ohaeng[g, oheng_pos[GAN_TO_OHENG[gan]]] = 1.0
+            for dg, day_gan in enumerate(GAN):
+                if gan in SIPSHIN_MAP.get(day_gan, {}):
+                    stem_sipshin[dg, g, sipshin_pos[SIPSHIN_MAP[day_gan][gan]]] = 1.0
+        for j, ji in enumerate(JI):
+            for k, (janggan, proportion) in enumerate(JIJI_JANGGAN.get(ji, {}).items()):
+                if janggan in GAN_TO_OHENG:
+                    branch_ohaeng[k, j, oheng_pos[GAN_TO_OHENG[janggan]]] = proportion
+                for dg, day_gan in enumerate(GAN):
+                    if janggan in SIPSHIN_MAP.get(day_gan, {}):
+                        branch_sipshin[k, dg, j, sipshin_pos[SIPSHIN_MAP[day_gan][janggan]]] = proportion
+        cached = ((GAN_TO_OHENG, JIJI_JANGGAN, SIPSHIN_MAP), (stem_ohaeng, branch_ohaeng, stem_sipshin, branch_sipshin))
+        _STRENGTH_TABLE_CACHE[key] = cached
+    return cached[1]
+
+def strength_arrays(stems, branches):
+    """
+    정수 코드 명식 배열 (N,4) 천간/지지(encode_charts)의 오행 (N,5) / 십신 (N,10) 세력 (NumPy 필요, 반올림 전 값).
+    calculate_ohaeng_sipshin_strengths와 같은 위치 순서로 더하므로 round(값, 1)이 단건 결과와 같습니다.
+    """
+    import numpy as np
+
+    stem_ohaeng, branch_ohaeng, stem_sipshin, branch_sipshin = _strength_tables()
+    stems, branches = np.asarray(stems, dtype=np.intp), np.asarray(branches, dtype=np.intp)
+    day_gan = stems[:, 2]
+    ohaeng, sipshin = np.zeros((len(stems), 5)), np.zeros((len(stems), 10))
+    for p in range(4):
+        stem_weight = POSITIONAL_WEIGHTS.get(POSITION_KEYS_ORDERED[2 * p], 0.0)
+        branch_weight = POSITIONAL_WEIGHTS.get(POSITION_KEYS_ORDERED[2 * p + 1], 0.0)
+        ohaeng += stem_weight * stem_ohaeng[stems[:, p]]
+        sipshin += stem_weight * stem_sipshin[day_gan, stems[:, p]]
+        for layer_ohaeng, layer_sipshin in zip(branch_ohaeng, branch_sipshin):
+            ohaeng += branch_weight * layer_ohaeng[branches[:, p]]
+            sipshin += branch_weight * layer_sipshin[day_gan, branches[:, p]]
+    return ohaeng, sipshin
+
+def strength_dicts(ohaeng_row, sipshin_row):
+    """strength_arrays의 한 행 -> calculate_ohaeng_sipshin_strengths 형식 (오행 dict, 십신 dict), 소수점 한 자리 반올림."""
+    return ({o: round(float(v), 1) for o, v in zip(OHENG_ORDER, ohaeng_row)},
+            {s: round(float(v), 1) for s, v in zip(SIPSHIN_ORDER, sipshin_row)})
+
+# ───────────────────────────────
+# 신강/격국/용신 배치 판정 (NumPy)
+# ───────────────────────────────
+SHINKANG_LABELS = ("신강", "약간 신강", "중화", "약간 신약", "신약") # shinkang_arrays 코드 순서
+_CLASSIFY_TABLE_CACHE = {} # (격국/용신 관련 표 id) -> ((표 보관), 조회표)
+
+def round_strengths(values):
+    """
+    세력 배열을 소수점 한 자리로 반올림 (NumPy 필요). 각 원소가 round(float(v), 1)과 같습니다.
+    (np.round는 0.35처럼 10배 값이 .5에 걸리는 경우 결과가 달라지므로, 그런 원소는 서로 다른 값만 파이썬 round로 다시 계산합니다.)
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=float)
+    scaled = values * 10.0
+    rounded = np.rint(scaled) / 10.0
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        distinct, inverse = np.unique(values[near_tie], return_inverse=True)
+        rounded[near_tie] = np.array([round(float(v), 1) for v in distinct])[inverse]
+    return rounded
+
+def shinkang_arrays(sipshin):
+    """
+    반올림된 십신 세력 (N,10) (SIPSHIN_ORDER 열, round_strengths 값) -> 신강/신약 코드 (N,) int8 (SHINKANG_LABELS 순서).
+    determine_shinkang_shinyak과 같은 순서로 더하고 같은 기준값(SHINKANG_THRESHOLDS)으로 나눕니다.
+    """
+    import numpy as np
+
+    sipshin = np.asarray(sipshin, dtype=float)
+    col = {s: sipshin[:, i] for i, s in enumerate(SIPSHIN_ORDER)}
+    my_energy = col["비견"] + col["겁재"] + col["편인"] + col["정인"]
+    opponent_energy = col["식신"] + col["상관"] + col["편재"] + col["정재"] + col["편관"] + col["정관"]
+    score_diff = my_energy - opponent_energy
+    strong, weak, balanced = SHINKANG_THRESHOLDS["신강"], SHINKANG_THRESHOLDS["신약"], SHINKANG_THRESHOLDS["중화"]
+    codes = np.where(score_diff > balanced, 1, 3).astype(np.int8)
+    codes[(-balanced <= score_diff) & (score_diff <= balanced)] = 2
+    codes[score_diff <= weak] = 4
+    codes[score_diff >= strong] = 0
+    return codes
+
+def _classify_tables():
+    """
+    격국/용신 배치 판정용 조회표. 단건 함수를 모든 경우에 한 번씩 불러 채우므로 결과가 단건과 같습니다.
+    월령 격국 (일간, 월간, 월지) -> 격국 코드 (10,10,12) int16 (-1: 세력 기준으로 넘김), 세력 기준 격국 (10,) (SIPSHIN_ORDER),
+    격국 이름 목록, 용신/기신 오행 비트마스크 (일간, 신강 코드) -> (10,5) uint8 (비트 i = OHENG_ORDER[i]).
+    """
+    import numpy as np
+
+    tables = (L_NOK_MAP, YANGIN_JI_MAP, JIJI_JANGGAN, SIPSHIN_MAP, SIPSHIN_TO_GYEOK_MAP, GAN_TO_OHENG,
+              OHENG_HELPER_MAP, OHENG_PRODUCES_MAP, OHENG_CONTROLS_MAP, OHENG_IS_CONTROLLED_BY_MAP)
+    key = tuple(id(t) for t in tables)
+    cached = _CLASSIFY_TABLE_CACHE.get(key)
+    if cached is None:
+        labels = {}
+        code = lambda name: labels.setdefault(name, len(labels))
+        month_gekuk = np.full((10, 10, 12), -1, dtype=np.int16)
+        for dg, day_gan in enumerate(GAN):
+            for j, ji in enumerate(JI):
+                fixed = _detect_special_gekuk(day_gan, ji)
+                for mg, month_gan in enumerate(GAN):
+                    name = (fixed or _detect_togan_gekuk(day_gan, month_gan, ji)
+                            or _detect_general_gekuk_from_month_branch_primary(day_gan, ji))
+                    if name:
+                        month_gekuk[dg, mg, j] = code(name)
+        strength_gekuk = np.array([code(SIPSHIN_TO_GYEOK_MAP.get(s, s + "격")) for s in SIPSHIN_ORDER], dtype=np.int16)
+        undecided = code("일반격 판정 어려움")
+        oheng_bit = {o: 1 << i for i, o in enumerate(OHENG_ORDER)}
+        yongshin, gishin = np.zeros((10, len(SHINKANG_LABELS)), dtype=np.uint8), np.zeros((10, len(SHINKANG_LABELS)), dtype=np.uint8)
+        for dg, day_gan in enumerate(GAN):
+            for s, status in enumerate(SHINKANG_LABELS):
+                result = determine_yongshin_gishin_simplified(day_gan, status)
+                yongshin[dg, s] = sum(oheng_bit[o] for o in result["yongshin"])
+                gishin[dg, s] = sum(oheng_bit[o] for o in result["gishin"])
+        cached = (tables, (month_gekuk, strength_gekuk, undecided, tuple(labels), yongshin, gishin))
+        _CLASSIFY_TABLE_CACHE[key] = cached
+    return cached[1]
+
+def gekuk_arrays(stems, branches, sipshin):
+    """
+    정수 코드 명식 (N,4) 천간/지지와 반올림된 십신 세력 (N,10) -> (격국 코드 (N,) int16, 격국 이름 목록).
+    determine_gekuk과 같은 순서: 건록/양인 -> 투간 -> 월지 본기 (월령 조회표), 아니면 가장 강한 십신 (0.5 초과일 때).
+    """
+    import numpy as np
+
+    month_gekuk, strength_gekuk, undecided, labels, _, _ = _classify_tables()
+    stems, branches = np.asarray(stems, dtype=np.intp), np.asarray(branches, dtype=np.intp)
+    sipshin = np.asarray(sipshin, dtype=float)
+    codes = month_gekuk[stems[:, 2], stems[:, 1], branches[:, 1]]
+    rest = codes < 0
+    if rest.any():
+        strongest = np.argmax(sipshin[rest], axis=1) # 같은 값이면 SIPSHIN_ORDER 앞쪽 (단건의 > 비교와 같음)
+        decided = sipshin[rest][np.arange(len(strongest)), strongest] > 0.5
+        codes[rest] = np.where(decided, strength_gekuk[strongest], undecided)
+    return codes, labels
+
+def yongshin_arrays(day_stems, shinkang_codes):
+    """
+    일간 코드 (N,)와 신강 코드 (N,) -> (용신, 기신) 오행 비트마스크 (N,) uint8 (determine_yongshin_gishin_simplified와 같음).
+    oheng_mask_names로 단건과 같은 정렬된 오행 목록을 얻습니다.
+    """
+    import numpy as np
+
+    *_, yongshin, gishin = _classify_tables()
+    day_stems, shinkang_codes = np.asarray(day_stems, dtype=np.intp), np.asarray(shinkang_codes, dtype=np.intp)
+    return yongshin[day_stems, shinkang_codes], gishin[day_stems, shinkang_codes]
+
+def oheng_mask_names(mask):
+    """오행 비트마스크 -> 오행 이름 목록 (단건 용신/기신 목록처럼 sorted)."""
+    return sorted(o for i, o in enumerate(OHENG_ORDER) if int(mask) >> i & 1)
+
+def classify_arrays(stems, branches, sipshin=None):
+    """
+    정수 코드 명식 배열 (N,4) 천간/지지의 신강/격국/용신 배치 판정 (NumPy 필요).
+    sipshin: strength_arrays의 반올림 전 십신 세력 (없으면 계산). 단건과 같이 반올림한 값으로 판정합니다.
+    반환: {"sipshin": 반올림 세력 (N,10), "shinkang": 코드, "gekuk": 코드, "gekuk_labels": 이름 목록, "yongshin"/"gishin": 비트마스크}
+    """
+    import numpy as np
+
+    stems = np.asarray(stems, dtype=np.intp)
+    if sipshin is None:
+        _, sipshin = strength_arrays(stems, branches)
+    sipshin = round_strengths(sipshin)
+    shinkang = shinkang_arrays(sipshin)
+    gekuk, gekuk_labels = gekuk_arrays(stems, branches, sipshin)
+    yongshin, gishin = yongshin_arrays(stems[:, 2], shinkang)
+    return {"sipshin": sipshin, "shinkang": shinkang, "gekuk": gekuk, "gekuk_labels": gekuk_labels,
+            "yongshin": yongshin, "gishin": gishin}
+
+# --- 오행 및 십신 설명 생성 함수 (HTML 예제 기반) ---
+@saju_metrics.timed("explanation_html")
+def get_ohaeng_summary_explanation(ohaeng_counts):
+    explanation = "오행 분포는 사주의 에너지 균형을 보여줍니다. "
+    threshold = 1.5 # 이 값은 JS 예제에 명시적으로 없었으나, 설명 로직상 유사하게 설정
+    strong = []
+    weak = []
+    # JS 예제에서는 점수 자체를 보여줬으므로, 여기서는 JS의 설명 로직을 따름
+    # JS 예제에서는 단순히 강한 오행과 약한 오행을 나열
+    # 기준값은 JS 예제처럼 동적으로 하기보다, 전체적인 분포를 보고 서술하는 방식 채택
+    
+    # 가장 강한 오행과 가장 약한 오행 찾기 (간단 버전)
+    if not ohaeng_counts: return explanation + "오행 정보를 계산할 수 없습니다."
+
+    sorted_ohaeng = sorted(ohaeng_counts.items(), key=lambda item: item[1], reverse=True)
+    
+    if sorted_ohaeng[0][1] > threshold * 1.5 : # JS 예제는 특정 값 이상/이하를 강/약으로 표현하지 않음.
+                                            # 대신 상대적 강약을 서술하는 것이 좋아보임.
+        explanation += f"특히 {sorted_ohaeng[0][0]}(이)가 {sorted_ohaeng[0][1]}점으로 가장 강한 기운을 가집니다. "
+    
+    if sorted_ohaeng[-1][1] < threshold / 1.5 and sorted_ohaeng[-1][1] < sorted_ohaeng[0][1] / 2:
+         explanation += f"반면, {sorted_ohaeng[-1][0]}(이)가 {sorted_ohaeng[-1][1]}점으로 상대적으로 약한 편입니다. "
+    
+    explanation += "전체적인 균형과 조화를 이루는 것이 중요합니다."
+    return explanation
+
+@saju_metrics.timed("explanation_html")
+def get_sipshin_summary_explanation(sipshin_counts, day_master_gan):
+    explanation = "십신은 일간(나)을 기준으로 다른 글자와의 관계를 나타내며, 사회적 관계, 성향, 재능 등을 유추해볼 수 있습니다. "
+    threshold = 1.5 # JS 예제 참고 (강한 십신 기준)
+    strong_sibsins = []
+    
+    for sibshin_name in SIPSHIN_ORDER:
+        if (sipshin_counts.get(sibshin_name, 0.0)) >= threshold:
+            strong_sibsins.append(f"{sibshin_name}({sipshin_counts.get(sibshin_name, 0.0)})")
+    
+    if strong_sibsins:
+        explanation += f"이 사주에서는 {', '.join(strong_sibsins)}의 영향력이 두드러질 수 있습니다. "
+        # 각 강한 십신에 대한 간략한 설명 추가 (JS 예제처럼)
+        temp_explanations = []
+        for s_info in strong_sibsins:
+            s_name = s_info.split('(')[0]
+            if s_name in ["비견", "겁재"]: temp_explanations.append("주체성/독립심/경쟁심")
+            elif s_name in ["식신", "상관"]: temp_explanations.append("표현력/창의력/기술 관련 재능")
+            elif s_name in ["편재", "정재"]: temp_explanations.append("현실감각/재물운용/활동성")
+            elif s_name in ["편관", "정관"]: temp_explanations.append("책임감/명예/조직 적응력")
+            elif s_name in ["편인", "정인"]: temp_explanations.append("학문/수용성/직관력")
+        
+        unique_explanations = list(dict.fromkeys(temp_explanations)) # 중복 제거 (순서 유지: 실행마다 같은 문장)
+        if unique_explanations:
+            explanation += f" 이는 {', '.join(unique_explanations)} 등이 발달했을 가능성을 시사합니다. "
+
+    else:
+        explanation += "특별히 한쪽으로 치우치기보다는 여러 십신의 특성이 비교적 균형 있게 나타날 수 있습니다. "
+    
+    explanation += "각 십신의 긍정적인 면을 잘 발휘하고 보완하는 것이 중요합니다."
+    return explanation
+
+# ... (기존의 다른 함수들 get_saju_year, get_year_ganji 등은 이 아래에 위치) ...
+# ... (다른 함수들 get_saju_year, calculate_ohaeng_sipshin_strengths 등 근처) ...
+
+def get_12_unseong(cheon_gan, ji_ji):
+    """천간과 지지에 따른 12운성을 반환합니다."""
+    if not cheon_gan or not ji_ji or cheon_gan == "?" or ji_ji == "?": # 입력값 유효성 검사 강화
+        return "?" # 또는 "입력오류" 등
+    if cheon_gan in _12_UNSEONG_MAP_DATA and ji_ji in _12_UNSEONG_MAP_DATA[cheon_gan]:
+        return _12_UNSEONG_MAP_DATA[cheon_gan][ji_ji]
+    return "계산불가"
+# ───────────────────────────────
+# 1. 절입일 데이터 로딩 (원본 해시 기반 컴파일 캐시)
+# ───────────────────────────────
+def _print_report(level, message):
+    print(f"[{level}] {message}", file=sys.stderr)
+
+# 컴파일된 절기 캐시: 원본 파일 내용의 SHA-256으로 식별, 형식이 바뀌면 버전을 올려 기존 캐시를 무효화
+SOLAR_TERMS_CACHE_VERSION = 1
+SOLAR_TERMS_CACHE_MAGIC = b"SAJUTERM"
+SOLAR_TERMS_CACHE_DIR_ENV = "SAJU_CACHE_DIR" # 미설정 시 이 모듈 옆의 .saju_cache/
+_EPOCH = datetime(1970, 1, 1)
+
+def _file_sha256(file_name):
+    digest = hashlib.sha256()
+    with open(file_name, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+_SOLAR_TERMS_CACHE_SUFFIX = re.compile(r"[0-9a-f]{16}\.v\d+\.bin") # 캐시 파일명에서 원본 파일명 뒤에 붙는 부분
+
+def _solar_terms_cache_path(file_name, source_hash):
+    cache_dir = os.environ.get(SOLAR_TERMS_CACHE_DIR_ENV) or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".saju_cache")
+    return os.path.join(cache_dir, f"{os.path.basename(file_name)}.{source_hash.hex()[:16]}.v{SOLAR_TERMS_CACHE_VERSION}.bin")
+
+def _write_solar_terms_cache(file_name, cache_path, source_hash, term_dict, warnings):
+    """
+    절기표를 이진 캐시로 기록합니다 (임시 파일 후 교체, 같은 원본의 이전 캐시 파일은 삭제).
+    형식: 매직, 버전, 원본 SHA-256, 절기명 목록, (절기 인덱스 u16, 1970년 기준 초 i64) 레코드들, 경고 목록
+    """
+    names = sorted({name for terms in term_dict.values() for name in terms})
+    name_idx = {name: i for i, name in enumerate(names)}
+    records = [(name_idx[name], int((dt - _EPOCH).total_seconds())) for terms in term_dict.values() for name, dt in terms.items()]
+    names_blob = "\n".join(names).encode("utf-8")
+    warnings_blob = "\n".join(warnings).encode("utf-8")
+    payload = [SOLAR_TERMS_CACHE_MAGIC, struct.pack("<H32sI", SOLAR_TERMS_CACHE_VERSION, source_hash, len(names_blob)), names_blob,
+               struct.pack("<I", len(records)), b"".join(struct.pack("<Hq", *record) for record in records),
+               struct.pack("<I", len(warnings_blob)), warnings_blob]
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(payload))
+        os.replace(tmp_path, cache_path)
+        # 같은 원본 파일명(확장자 포함 전체)의 다른 해시/버전 캐시만 정리: Solar_Terms.csv 와 .xlsx 캐시는 서로 지우지 않음
+        stale_prefix = f"{os.path.basename(file_name)}."
+        for entry in os.listdir(os.path.dirname(cache_path)):
+            if (entry.startswith(stale_prefix) and _SOLAR_TERMS_CACHE_SUFFIX.fullmatch(entry[len(stale_prefix):])
+                    and entry != os.path.basename(cache_path)):
+                os.remove(os.path.join(os.path.dirname(cache_path), entry))
+    except OSError:
+        pass # 캐시 디렉터리에 쓸 수 없으면 캐시 없이 동작
+
+def _read_solar_terms_cache(cache_path, source_hash):
+    """캐시가 있고 버전/원본 해시가 일치하면 (절기표, 경고 목록), 아니면 None."""
+    try:
+        with open(cache_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    try:
+        if not data.startswith(SOLAR_TERMS_CACHE_MAGIC):
+            return None
+        offset = len(SOLAR_TERMS_CACHE_MAGIC)
+        version, stored_hash, names_len = struct.unpack_from("<H32sI", data, offset)
+        if version != SOLAR_TERMS_CACHE_VERSION or stored_hash != source_hash:
+            return None
+        offset += struct.calcsize("<H32sI")
+        names = data[offset:offset + names_len].decode("utf-8").split("\n")
+        offset += names_len
+        (record_count,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        term_dict = {}
+        for name_idx, seconds in struct.iter_unpack("<Hq", data[offset:offset + record_count * 10]):
+            dt = _EPOCH + timedelta(seconds=seconds)
+            term_dict.setdefault(dt.year, {})[names[name_idx]] = dt
+        offset += record_count * 10
+        (warnings_len,) = struct.unpack_from("<I", data, offset)
+        warnings_text = data[offset + 4:offset + 4 + warnings_len].decode("utf-8")
+    except (struct.error, UnicodeDecodeError, IndexError):
+        return None # 손상된 캐시는 무시하고 다시 컴파일
+    return term_dict, warnings_text.split("\n") if warnings_text else []
+
+def _read_solar_term_rows(file_name):
+    """원본 파일에서 (절기명, 절입일시 원본값) 행을 읽습니다. CSV는 표준 라이브러리, 엑셀은 pandas/openpyxl 사용."""
+    if file_name.lower().endswith(".csv"):
+        with open(file_name, encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            dt_col = "iso_datetime" if "iso_datetime" in (reader.fieldnames or []) else "절입일시"
+            if "절기" not in (reader.fieldnames or []) or dt_col not in reader.fieldnames:
+                raise KeyError(f"CSV 파일에 필요한 컬럼(절기, iso_datetime 또는 절입일시)이 없습니다. 현재 컬럼: {reader.fieldnames}")
+            return [(row["절기"], row[dt_col]) for row in reader]
+    import pandas as pd # 엑셀 원본 컴파일 시에만 필요 (캐시 적중 시에는 불러오지 않음)
+
+    df = pd.read_excel(file_name, engine='openpyxl') 
+    required_excel_cols = ["절기", "iso_datetime"] 
+    if not all(col in df.columns for col in required_excel_cols):
+        raise KeyError(f"엑셀 파일에 필요한 컬럼({required_excel_cols})이 없습니다. 현재 컬럼: {df.columns.tolist()}")
+    return list(zip(df["절기"], df["iso_datetime"]))
+
+# 원본 절기표는 UTC+8:30 시기(1954-03-21 ~ 1961-08-10) 절입 시각을 당시 표준시(서머타임 미적용)로 적었습니다.
+# 이 구간에서 한 번만 적힌 값은 불러올 때 UTC+9 기준으로 바꿉니다 (1954년, 1961년 일부 절기는 UTC+9 값이 함께 적혀 있음).
+_TERM_TABLE_LOCAL_TIME_RANGE = (datetime(1954, 3, 21), datetime(1961, 8, 10, 0, 30))
+
+def _compile_solar_terms(rows):
+    """(절기명, 원본값) 행 -> ({양력연도: {절기명: datetime}}, 경고 목록)"""
+    term_dict, warnings, paired = {}, [], set()
+    for term_raw, dt_val in rows:
+        term = str(term_raw).strip()
+        dt = None
+        if isinstance(dt_val, datetime): # pd.Timestamp 포함
+            dt = dt_val.to_pydatetime() if hasattr(dt_val, "to_pydatetime") else dt_val
+        elif isinstance(dt_val, str) and dt_val.strip():
+            try:
+                dt = datetime.fromisoformat(dt_val.strip())
+            except ValueError:
+                pass
+        if dt is None or dt != dt: # NaT 포함
+            warnings.append(f"'{term}'의 절입일시 값 ('{dt_val}')을 datetime으로 변환 불가.")
+            continue
+        year = dt.year
+        prev_dt = term_dict.get(year, {}).get(term)
+        if prev_dt is not None:
+            paired.add((year, term))
+            if to_standard_kst(dt) == prev_dt:
+                continue # 같은 절기가 당시 현지 시각으로 한 번 더 적힌 행(1954년 UTC+8:30, 1988년 서머타임)은 UTC+9 기준 값을 유지
+        term_dict.setdefault(year, {})[term] = dt
+    range_start, range_end = _TERM_TABLE_LOCAL_TIME_RANGE
+    for year, terms in term_dict.items():
+        for term, dt in terms.items():
+            if (year, term) not in paired and range_start <= dt < range_end:
+                terms[term] = to_standard_kst(dt, dst=False)
+    return term_dict, warnings
+
+@saju_metrics.timed("solar_terms_load")
+def load_solar_terms(file_name: str, report=_print_report, use_cache=True):
+    """
+    절기 파일(엑셀 또는 CSV)을 {양력연도: {절기명: datetime}} 딕셔너리로 읽어옵니다.
+    report(level, message): 오류/경고 메시지를 전달받는 콜백 (level: "error" 또는 "warning")
+    use_cache: 원본 내용 해시로 식별되는 이진 캐시를 사용 (원본이 바뀌면 자동 재컴파일, 프로세스 간 공유)
+    변환할 수 없는 행은 건너뛰고 경고 한 건으로 묶어 알립니다.
+    """
+    if not os.path.exists(file_name):
+        report("error", f"`{file_name}` 파일을 찾을 수 없습니다. 스크립트와 같은 폴더에 있는지 확인하세요.")
+        return None
+    cached = None
+    if use_cache:
+        source_hash = _file_sha256(file_name)
+        cache_path = _solar_terms_cache_path(file_name, source_hash)
+        saju_metrics.count("saju_cache_lookups_total", cache="solar_terms_file")
+        cached = _read_solar_terms_cache(cache_path, source_hash)
+    if cached is not None:
+        term_dict, warnings = cached
+    else:
+        if use_cache:
+            saju_metrics.count("saju_cache_misses_total", cache="solar_terms_file")
+        try:
+            rows = _read_solar_term_rows(file_name)
+        except KeyError as e:
+            report("error", str(e.args[0]))
+            return None
+        except Exception as e:
+            report("error", f"절기 파일('{file_name}')을 읽는 중 오류 발생: {e}. 엑셀이면 'openpyxl' 패키지가 설치되어 있는지 확인하세요.")
+            return None
+        term_dict, warnings = _compile_solar_terms(rows)
+        if use_cache and term_dict:
+            _write_solar_terms_cache(file_name, cache_path, source_hash, term_dict, warnings)
+    if warnings:
+        examples = " / ".join(warnings[:3])
+        report("warning", f"절기 데이터 {len(warnings)}개 행을 건너뛰었습니다. 예: {examples}")
+    if not term_dict: report("warning", "절기 데이터를 로드하지 못했거나 유효한 데이터가 없습니다."); return None 
+    return term_dict
+
+# ───────────────────────────────
+# 2. 사주/운세 계산 함수 (get_day_ganji는 이전 JD기반 사용, 나머지는 동일)
+# ───────────────────────────────
+def get_saju_year(birth_dt, solar_data_dict):
+    year = birth_dt.year
+    ipchun_data = solar_data_dict.get(year, {})
+    ipchun = ipchun_data.get("입춘") 
+    return year - 1 if (ipchun and birth_dt < ipchun) else year
+
+def get_ganji_from_index(idx):
+    return GAN[idx % 10] + JI[idx % 12]
+
+def get_year_ganji(saju_year):
+    idx = (saju_year - 4 + 60) % 60 
+    return get_ganji_from_index(idx), GAN[idx % 10], JI[idx % 12]
+
+# get_month_ganji 함수의 개선된 절기 검색 로직 (이전 답변 참고 및 일부 강조)
+@saju_metrics.timed("month_pillar")
+def get_month_ganji(year_gan_char, birth_dt, solar_data_dict):
+    # ... (생략) ...
+    saju_year_of_birth = get_saju_year(birth_dt, solar_data_dict) # birth_dt의 사주년도
+
+    candidate_solar_years = sorted(list(set([birth_dt.year - 1, birth_dt.year, birth_dt.year + 1]))) # birth_dt의 양력년도 기준 +-1년 탐색
+
+    all_relevant_terms = []
+    for solar_yr in candidate_solar_years:
+        year_terms_data = solar_data_dict.get(solar_yr, {})
+        for term_name, term_datetime_obj in year_terms_data.items():
+            if term_name in SAJU_MONTH_TERMS_ORDER:
+                all_relevant_terms.append({'name': term_name, 'datetime': term_datetime_obj})
+
+    if not all_relevant_terms:
+        return f"오류(월주절기데이터부족:{birth_dt.strftime('%Y%m%d')})", "", ""
+
+    all_relevant_terms.sort(key=lambda x: x['datetime'])
+
+    governing_term_name = None
+    for term_info in all_relevant_terms:
+        if birth_dt >= term_info['datetime']:
+            # 이 절기가 birth_dt가 속한 사주년도(saju_year_of_birth)와 동일한 사주년도에 속하는지 확인
+            # 이렇게 하면 다른 사주년도의 절기가 잘못 적용되는 것을 방지할 수 있음
+            if get_saju_year(term_info['datetime'], solar_data_dict) == saju_year_of_birth:
+                governing_term_name = term_info['name']
+            # 만약 위 조건 없이, 단순히 시간상 가장 가까운 과거 절기를 찾는다면,
+            # 예를 들어 2025년 사주년 초입(입춘 직후)인데, 실수로 2024년 사주년 말(대한)이 선택될 수도 있음.
+            # (위 로직에서는 get_saju_year를 통해 필터링 시도)
+            # 더 간단하게는, birth_dt 직전의 절기를 찾으면 됨.
+            # governing_term_name = term_info['name'] # 이 로직으로 하면 시간상 가장 가까운 과거 절기.
+        else:
+            break # birth_dt보다 늦은 절기를 만나면 루프 종료
+
+    if not governing_term_name:
+         # birth_dt가 수집된 모든 절기 중 가장 이른 것보다도 빠를 경우 (데이터 시작점 이전)
+         # 또는 필터링 조건으로 인해 적합한 절기를 찾지 못한 경우
+        return f"오류(월주기준절기못찾음:{birth_dt.strftime('%Y%m%d')})", "", ""
+
+    # ... (이후 월지, 월간 계산 로직은 동일) ...
+    try:
+        month_ji_idx = SAJU_MONTH_TERMS_ORDER.index(governing_term_name)
+        month_ji = SAJU_MONTH_BRANCHES[month_ji_idx]
+    except ValueError:
+        return f"오류(월지변환실패:{governing_term_name})", "", ""
+
+    # 월간 계산
+    try:
+        yg_idx = GAN.index(year_gan_char)
+    except ValueError:
+        return f"오류(알수없는연간:{year_gan_char})", "", ""
+        
+    start_map = {0:2, 5:2, 1:4, 6:4, 2:6, 7:6, 3:8, 8:8, 4:0, 9:0}
+    start_gan_idx_for_in_month = start_map.get(yg_idx)
+
+    if start_gan_idx_for_in_month is None:
+        return f"오류(월두법맵핑실패:{year_gan_char})", "", ""
+
+    try:
+        current_month_order_idx = SAJU_MONTH_BRANCHES.index(month_ji)
+    except ValueError:
+         return f"오류(알수없는월지:{month_ji})", "", ""
+
+    month_gan_idx = (start_gan_idx_for_in_month + current_month_order_idx) % 10
+    month_gan = GAN[month_gan_idx]
+
+    return month_gan + month_ji, month_gan, month_ji
+def date_to_jd(year, month, day):
+    y = year; m = month
+    if m <= 2: y -= 1; m += 12
+    a = math.floor(y / 100)
+    b = 2 - a + math.floor(a / 4)
+    jd_val = math.floor(365.25 * (y + 4716)) + math.floor(30.6001 * (m + 1)) + day + b - 1524
+    return int(jd_val)
+
+@saju_metrics.timed("day_pillar")
+def get_day_ganji(year, month, day):
+    jd = date_to_jd(year, month, day)
+    day_stem_idx = (jd + 9) % 10 
+    day_branch_idx = (jd + 1) % 12
+    day_gan_char = GAN[day_stem_idx]
+    day_ji_char = JI[day_branch_idx]
+    return day_gan_char + day_ji_char, day_gan_char, day_ji_char
+
+@saju_metrics.timed("time_pillar")
+def get_time_ganji(day_gan_char, hour, minute):
+    cur_time_float = hour + minute/60.0 
+    siji_char, siji_order_idx = None, -1 
+    for (sh,sm),(eh,em), ji_name, order_idx in TIME_BRANCH_MAP:
+        start_float = sh + sm/60.0; end_float = eh + em/60.0
+        if ji_name == "자": 
+            if cur_time_float >= start_float or cur_time_float <= end_float: siji_char,siji_order_idx=ji_name,order_idx;break
+        elif start_float <= cur_time_float <= end_float: siji_char,siji_order_idx=ji_name,order_idx;break # 끝 분(예: 3시 29분)도 포함
+    if siji_char is None: return "오류(시지판단불가)", "", ""
+    dg_idx = GAN.index(day_gan_char) 
+    sidu_start_map = {0:0,5:0, 1:2,6:2, 2:4,7:4, 3:6,8:6, 4:8,9:8}
+    start_gan_idx_for_ja_hour = sidu_start_map.get(dg_idx)
+    if start_gan_idx_for_ja_hour is None: return "오류(일간→시간맵)", "", ""
+    time_gan_idx = (start_gan_idx_for_ja_hour + siji_order_idx) % 10 
+    return GAN[time_gan_idx] + siji_char, GAN[time_gan_idx], siji_char
+
+# ───────────────────────────────
+# 시주 분(分) 단위 조회표 (자시 경계 규칙 선택 가능)
+# ───────────────────────────────
+# ja_start: 자시가 시작되는 분(0시 기준), late_ja: 자정 이전 자시(23시대)의 처리 방식
+#   "same_day"  : 당일 일간으로 시간(時干)을 정함 (기존 get_time_ganji 방식)
+#   "next_stem" : 야자시 - 일주는 당일 유지, 시간은 다음날 일간 기준 자시를 사용 (조자시는 당일 그대로)
+#   "next_day"  : 자시부터 다음날로 봄 - 일주와 시주 모두 다음날 기준
+ZASI_CONVENTIONS = {
+    "offset30": {"label": "30분 보정 (23:30 자시 시작, 기본)", "ja_start": 23 * 60 + 30, "late_ja": "same_day"},
+    "whole_hour": {"label": "정시 경계 (23:00 자시 시작)", "ja_start": 23 * 60, "late_ja": "same_day"},
+    "yajasi": {"label": "야자시/조자시 구분 (야자시는 익일 시간 적용)", "ja_start": 23 * 60 + 30, "late_ja": "next_stem"},
+    "ja_day_change": {"label": "자시 일진 변경 (23:30부터 다음날 일주)", "ja_start": 23 * 60 + 30, "late_ja": "next_day"},
+}
+DEFAULT_ZASI_CONVENTION = "offset30"
+MINUTES_PER_DAY = 24 * 60
+
+# 일간 인덱스 -> 자시 시간(時干) 인덱스 (시두법: 갑기일 갑자시, 을경일 병자시, ...)
+SIDU_START_GAN_IDX = [(dg_idx % 5) * 2 for dg_idx in range(10)]
+
+def _build_time_branch_tables(convention):
+    """분(0~1439) -> (시지 인덱스, 시간 계산용 일간 이동량, 일주 이동량) 조회표 3개를 만듭니다."""
+    spec = ZASI_CONVENTIONS[convention]
+    offset = MINUTES_PER_DAY - spec["ja_start"] # 자시 시작을 0분으로 옮기기 위한 이동량
+    branch_idx, stem_shift, day_shift = bytearray(MINUTES_PER_DAY), bytearray(MINUTES_PER_DAY), bytearray(MINUTES_PER_DAY)
+    for minute_of_day in range(MINUTES_PER_DAY):
+        branch_idx[minute_of_day] = ((minute_of_day + offset) // 120) % 12
+        is_late_ja = minute_of_day >= spec["ja_start"]
+        stem_shift[minute_of_day] = 1 if is_late_ja and spec["late_ja"] in ("next_stem", "next_day") else 0
+        day_shift[minute_of_day] = 1 if is_late_ja and spec["late_ja"] == "next_day" else 0
+    return bytes(branch_idx), bytes(stem_shift), bytes(day_shift)
+
+TIME_BRANCH_TABLES = {name: _build_time_branch_tables(name) for name in ZASI_CONVENTIONS}
+
+@saju_metrics.timed("time_pillar")
+def get_time_pillar(day_gan_char, hour, minute, convention=DEFAULT_ZASI_CONVENTION):
+    """
+    분 단위 조회표로 시주를 구합니다. 반환 형식은 get_time_ganji와 같습니다.
+    day_gan_char: 달력(자정 기준) 날짜의 일간. 야자시 등의 일간 이동은 조회표가 처리합니다.
+    convention이 "ja_day_change"일 때 일주도 바뀌므로 get_time_day_shift()로 확인해야 합니다.
+    """
+    if convention not in TIME_BRANCH_TABLES:
+        return f"오류(알수없는자시규칙:{convention})", "", ""
+    minute_of_day = int(hour) * 60 + int(minute)
+    if not 0 <= minute_of_day < MINUTES_PER_DAY:
+        return "오류(시지판단불가)", "", ""
+    branch_table, stem_shift_table, _ = TIME_BRANCH_TABLES[convention]
+    dg_idx = GAN.index(day_gan_char)
+    siji_order_idx = branch_table[minute_of_day]
+    time_gan_idx = (SIDU_START_GAN_IDX[(dg_idx + stem_shift_table[minute_of_day]) % 10] + siji_order_idx) % 10
+    return GAN[time_gan_idx] + JI[siji_order_idx], GAN[time_gan_idx], JI[siji_order_idx]
+
+def get_time_day_shift(hour, minute, convention=DEFAULT_ZASI_CONVENTION):
+    """자시 규칙에 따라 일주를 다음날로 넘겨야 하면 1, 아니면 0을 반환합니다."""
+    minute_of_day = int(hour) * 60 + int(minute)
+    if convention not in TIME_BRANCH_TABLES or not 0 <= minute_of_day < MINUTES_PER_DAY:
+        return 0
+    return TIME_BRANCH_TABLES[convention][2][minute_of_day]
+
+def time_pillar_arrays(day_gan_idx, minute_of_day, convention=DEFAULT_ZASI_CONVENTION):
+    """
+    배치용 시주 계산 (NumPy). 레코드마다 조회표 한 번 인덱싱으로 끝납니다.
+    day_gan_idx: 일간 인덱스 배열(0~9), minute_of_day: 0~1439 배열
+    반환: (시간 인덱스 배열, 시지 인덱스 배열, 일주 이동량 배열)
+    """
+    import numpy as np # 배치 경로에서만 필요
+
+    branch_table, stem_shift_table, day_shift_table = (np.frombuffer(t, dtype=np.uint8) for t in TIME_BRANCH_TABLES[convention])
+    minute_of_day = np.asarray(minute_of_day, dtype=np.int64)
+    day_gan_idx = np.asarray(day_gan_idx, dtype=np.int64)
+    branch_idx = branch_table[minute_of_day].astype(np.int8)
+    sidu_start = np.asarray(SIDU_START_GAN_IDX, dtype=np.int8)
+    time_gan_idx = (sidu_start[(day_gan_idx + stem_shift_table[minute_of_day]) % 10] + branch_idx) % 10
+    return time_gan_idx.astype(np.int8), branch_idx, day_shift_table[minute_of_day].astype(np.int8)
+
+# ───────────────────────────────
+# 한국 표준시/서머타임 보정 (출생 현지 시각 -> UTC+9 기준 시각)
+# ───────────────────────────────
+# 절기표와 시주 경계(30분 보정 포함)는 UTC+9 기준이므로, 표준시가 달랐던 시기나 서머타임 기간의
+# 출생 시각은 먼저 UTC+9 기준으로 바꿔야 시주/월주 경계 판단이 맞습니다.
+# (적용 시작 현지 시각, UTC 오프셋(초), 서머타임 여부, 설명) - tz 데이터베이스 Asia/Seoul 기준
+# 시계를 앞당긴 구간(존재하지 않는 시각)은 이전 오프셋, 되돌린 구간(두 번 있는 시각)은 서머타임으로 봅니다.
+KST_STANDARD_OFFSET_SECONDS = 9 * 3600
+KST_OFFSET_HISTORY = [
+    (datetime(1, 1, 1), 8 * 3600 + 27 * 60 + 52, False, "서울 지방평균시 (UTC+8:27:52)"),
+    (datetime(1908, 4, 1, 0, 2, 8), 8 * 3600 + 30 * 60, False, "대한제국 표준시 (UTC+8:30)"),
+    (datetime(1912, 1, 1, 0, 30), 9 * 3600, False, "표준시 (UTC+9)"),
+    (datetime(1948, 6, 1, 1, 0), 10 * 3600, True, "서머타임 (UTC+10)"),
+    (datetime(1948, 9, 13), 9 * 3600, False, "표준시 (UTC+9)"),
+    (datetime(1949, 4, 3, 1, 0), 10 * 3600, True, "서머타임 (UTC+10)"),
+    (datetime(1949, 9, 11), 9 * 3600, False, "표준시 (UTC+9)"),
+    (datetime(1950, 4, 1, 1, 0), 10 * 3600, True, "서머타임 (UTC+10)"),
+    (datetime(1950, 9, 10), 9 * 3600, False, "표준시 (UTC+9)"),
+    (datetime(1951, 5, 6, 1, 0), 10 * 3600, True, "서머타임 (UTC+10)"),
+    (datetime(1951, 9, 9), 9 * 3600, False, "표준시 (UTC+9)"),
+    (datetime(1954, 3, 21), 8 * 3600 + 30 * 60, False, "표준시 (UTC+8:30)"),
+    (datetime(1955, 5, 5, 1, 0), 9 * 3600 + 30 * 60, True, "서머타임 (UTC+9:30)"),
+    (datetime(1955, 9, 9), 8 * 3600 + 30 * 60, False, "표준시 (UTC+8:30)"),
+    (datetime(1956, 5, 20, 1, 0), 9 * 3600 + 30 * 60, True, "서머타임 (UTC+9:30)"),
+    (datetime(1956, 9, 30), 8 * 3600 + 30 * 60, False, "표준시 (UTC+8:30)"),
+    (datetime(1957, 5, 5, 1, 0), 9 * 3600 + 30 * 60, True, "서머타임 (UTC+9:30)"),
+    (datetime(1957, 9, 22), 8 * 3600 + 30 * 60, False, "표준시 (UTC+8:30)"),
+    (datetime(1958, 5, 4, 1, 0), 9 * 3600 + 30 * 60, True, "서머타임 (UTC+9:30)"),
+    (datetime(1958, 9, 21), 8 * 3600 + 30 * 60, False, "표준시 (UTC+8:30)"),
+    (datetime(1959, 5, 3, 1, 0), 9 * 3600 + 30 * 60, True, "서머타임 (UTC+9:30)"),
+    (datetime(1959, 9, 20), 8 * 3600 + 30 * 60, False, "표준시 (UTC+8:30)"),
+    (datetime(1960, 5, 1, 1, 0), 9 * 3600 + 30 * 60, True, "서머타임 (UTC+9:30)"),
+    (datetime(1960, 9, 18), 8 * 3600 + 30 * 60, False, "표준시 (UTC+8:30)"),
+    (datetime(1961, 8, 10, 0, 30), 9 * 3600, False, "표준시 (UTC+9)"),
+    (datetime(1987, 5, 10, 3, 0), 10 * 3600, True, "서머타임 (UTC+10)"),
+    (datetime(1987, 10, 11, 3, 0), 9 * 3600, False, "표준시 (UTC+9)"),
+    (datetime(1988, 5, 8, 3, 0), 10 * 3600, True, "서머타임 (UTC+10)"),
+    (datetime(1988, 10, 9, 3, 0), 9 * 3600, False, "표준시 (UTC+9)"),
+]
+_KST_ERA_STARTS = [row[0] for row in KST_OFFSET_HISTORY]
+
+def get_kst_correction(birth_dt):
+    """
+    출생 현지 시각(당시 벽시계 기준)을 UTC+9 기준 시각으로 보정합니다.
+    반환: {"corrected_dt", "correction_seconds", "utc_offset_seconds", "is_dst", "label"}
+    correction_seconds는 더한 보정량입니다 (예: 1988년 서머타임 -3600, 1955년 표준시 +1800).
+    """
+    era_idx = bisect.bisect_right(_KST_ERA_STARTS, birth_dt) - 1
+    _, utc_offset, is_dst, label = KST_OFFSET_HISTORY[era_idx]
+    correction = KST_STANDARD_OFFSET_SECONDS - utc_offset
+    return {"corrected_dt": birth_dt + timedelta(seconds=correction), "correction_seconds": correction,
+            "utc_offset_seconds": utc_offset, "is_dst": is_dst, "label": label}
+
+def to_standard_kst(birth_dt, dst=True):
+    """
+    get_kst_correction()의 보정된 시각만 반환합니다.
+    dst=False: 서머타임 기간이어도 그 시기 표준시로 적힌 시각으로 보고 보정합니다 (예: 1955~1960년 절기표).
+    """
+    if dst:
+        return get_kst_correction(birth_dt)["corrected_dt"]
+    era_idx = bisect.bisect_right(_KST_ERA_STARTS, birth_dt) - 1
+    while KST_OFFSET_HISTORY[era_idx][2]:
+        era_idx -= 1
+    return birth_dt + timedelta(seconds=KST_STANDARD_OFFSET_SECONDS - KST_OFFSET_HISTORY[era_idx][1])
+
+def format_kst_correction(birth_dt, correction):
+    """결과 화면용 보정 설명 문자열 (보정이 없으면 빈 문자열)."""
+    seconds = correction["correction_seconds"]
+    if seconds == 0:
+        return ""
+    sign = "+" if seconds > 0 else "-"
+    minutes, rest = divmod(abs(seconds), 60)
+    amount = f"{sign}{minutes}분" + (f" {rest}초" if rest else "")
+    return (f"시각 보정: {birth_dt.strftime('%Y-%m-%d %H:%M')} {correction['label']} → "
+            f"{correction['corrected_dt'].strftime('%Y-%m-%d %H:%M')} (UTC+9 기준, {amount})")
+
+def kst_correction_arrays(wall_datetimes):
+    """
+    배치용 표준시/서머타임 보정 (NumPy). 구간 시작 시각 배열에 searchsorted 한 번으로 처리합니다.
+    wall_datetimes: 출생 현지 시각 배열 (datetime64 또는 datetime 목록)
+    반환: (보정된 datetime64[s] 배열, 보정량(초) int32 배열, 서머타임 여부 bool 배열, 구간 인덱스 int8 배열)
+    """
+    import numpy as np # 배치 경로에서만 필요
+
+    wall = np.asarray(wall_datetimes, dtype="datetime64[s]")
+    era_starts = np.array(_KST_ERA_STARTS[1:], dtype="datetime64[s]") # 첫 구간(지방평균시)은 하한 없음
+    era_idx = np.searchsorted(era_starts, wall, side="right")
+    offsets = np.array([row[1] for row in KST_OFFSET_HISTORY], dtype=np.int32)
+    dst_flags = np.array([row[2] for row in KST_OFFSET_HISTORY], dtype=bool)
+    corrections = KST_STANDARD_OFFSET_SECONDS - offsets[era_idx]
+    corrected = wall + corrections.astype("timedelta64[s]")
+    return corrected, corrections, dst_flags[era_idx], era_idx.astype(np.int8)
+
+# ───────────────────────────────
+# 진태양시 보정 (출생지 경도 + 균시차)
+# ───────────────────────────────
+KST_COUNTRY = "대한민국" # 이 국가의 도시는 KST_OFFSET_HISTORY로 당시 표준시/서머타임을 보정
+
+def load_city_table(file_name=CITY_TABLE_FILE, report=_print_report):
+    """
+    출생지 도시표(CSV)를 {도시명: {"도시", "영문명", "국가", "위도", "경도", "UTC오프셋"}} 딕셔너리로 읽어옵니다.
+    표준 라이브러리 csv만 사용하며, 파일이 없으면 report("error", ...) 후 None을 반환합니다.
+    """
+    if not os.path.exists(file_name):
+        report("error", f"`{file_name}` 파일을 찾을 수 없습니다. 스크립트와 같은 폴더에 있는지 확인하세요.")
+        return None
+    cities = {}
+    with open(file_name, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                cities[row["도시"].strip()] = {
+                    "도시": row["도시"].strip(), "영문명": row["영문명"].strip(), "국가": row["국가"].strip(),
+                    "위도": float(row["위도"]), "경도": float(row["경도"]), "UTC오프셋": float(row["UTC오프셋"]),
+                }
+            except (KeyError, ValueError) as e:
+                report("warning", f"도시표 행을 읽을 수 없습니다: {row} ({e})")
+    return cities
+
+def zasi_reference_longitude(convention=DEFAULT_ZASI_CONVENTION):
+    """자시 규칙의 시각 경계가 전제하는 기준 경도 (30분 보정 규칙 127.5°E, 정시 경계 135°E)."""
+    return 135.0 - (ZASI_CONVENTIONS[convention]["ja_start"] - 23 * 60) / 4.0
+
+def equation_of_time_minutes(utc_dt):
+    """균시차(진태양시 - 평균태양시, 분). Spencer 급수 (오차 약 ±0.5분)."""
+    day_of_year = utc_dt.timetuple().tm_yday
+    gamma = 2 * math.pi / 365 * (day_of_year - 1 + (utc_dt.hour + utc_dt.minute / 60 - 12) / 24)
+    return 229.18 * (0.000075 + 0.001868 * math.cos(gamma) - 0.032077 * math.sin(gamma)
+                     - 0.014615 * math.cos(2 * gamma) - 0.040849 * math.sin(2 * gamma))
+
+def get_solar_time_correction(std_dt, longitude, convention=DEFAULT_ZASI_CONVENTION, use_equation_of_time=True):
+    """
+    UTC+9 기준 시각(std_dt)을 출생지 진태양시에 맞춘 시각으로 옮깁니다 (시주/일주 판단용).
+    자시 규칙의 경계는 기준 경도의 평균태양시를 전제로 하므로, 기준 경도와의 차이(1°=4분)와
+    균시차만큼 옮기면 get_time_pillar()의 조회표를 그대로 쓸 수 있습니다.
+    월주/연주는 절입 '순간'으로 정해지므로 이 보정을 적용하지 않습니다.
+    반환: {"solar_dt", "correction_seconds", "longitude_minutes", "eot_minutes"}
+    """
+    longitude_minutes = (longitude - zasi_reference_longitude(convention)) * 4.0
+    eot_minutes = 0.0
+    if use_equation_of_time:
+        eot_minutes = equation_of_time_minutes(std_dt - timedelta(seconds=KST_STANDARD_OFFSET_SECONDS))
+    correction = round((longitude_minutes + eot_minutes) * 60)
+    return {"solar_dt": std_dt + timedelta(seconds=correction), "correction_seconds": correction,
+            "longitude_minutes": longitude_minutes, "eot_minutes": eot_minutes}
+
+def get_birthplace_correction(birth_dt, city, convention=DEFAULT_ZASI_CONVENTION, use_equation_of_time=True, apply_kst_history=True):
+    """
+    출생지 현지 시각 -> (UTC+9 기준 시각, 진태양시 기준 시각).
+    국내 도시는 get_kst_correction()으로 당시 표준시/서머타임을(apply_kst_history=False면 보정 없이),
+    해외 도시는 도시표의 표준 UTC 오프셋을 적용합니다 (해외 서머타임 이력은 포함하지 않음).
+    반환: {"std_dt", "solar_dt", "std_correction_seconds", "solar_correction_seconds", "longitude_minutes", "eot_minutes", "label"}
+    """
+    if city["국가"] == KST_COUNTRY:
+        kst = get_kst_correction(birth_dt) if apply_kst_history else {"corrected_dt": birth_dt, "correction_seconds": 0, "label": ""}
+        std_dt, std_correction, label = kst["corrected_dt"], kst["correction_seconds"], kst["label"]
+    else:
+        std_correction = round((9 - city["UTC오프셋"]) * 3600)
+        std_dt = birth_dt + timedelta(seconds=std_correction)
+        label = f"현지 표준시 (UTC{city['UTC오프셋']:+g})"
+    solar = get_solar_time_correction(std_dt, city["경도"], convention, use_equation_of_time)
+    return {"std_dt": std_dt, "solar_dt": solar["solar_dt"], "std_correction_seconds": std_correction,
+            "solar_correction_seconds": solar["correction_seconds"], "longitude_minutes": solar["longitude_minutes"],
+            "eot_minutes": solar["eot_minutes"], "label": label}
+
+def solar_time_correction_arrays(std_datetimes, longitudes, convention=DEFAULT_ZASI_CONVENTION, use_equation_of_time=True):
+    """
+    배치용 진태양시 보정 (NumPy). get_solar_time_correction()과 같은 식을 배열 연산 한 번으로 계산합니다.
+    std_datetimes: UTC+9 기준 시각 배열 (kst_correction_arrays()의 결과 등), longitudes: 경도 배열(동경 +)
+    반환: (진태양시 기준 datetime64[s] 배열, 보정량(초) int32 배열)
+    """
+    import numpy as np # 배치 경로에서만 필요
+
+    std = np.asarray(std_datetimes, dtype="datetime64[s]")
+    corrections = (np.asarray(longitudes, dtype=np.float64) - zasi_reference_longitude(convention)) * 4.0
+    if use_equation_of_time:
+        utc = std - np.timedelta64(KST_STANDARD_OFFSET_SECONDS, "s")
+        utc_minutes = utc.astype("datetime64[m]")
+        minutes_into_year = (utc_minutes - utc_minutes.astype("datetime64[Y]")).astype(np.int64)
+        gamma = 2 * np.pi / 365 * (minutes_into_year / 1440.0 - 0.5)
+        corrections = corrections + 229.18 * (0.000075 + 0.001868 * np.cos(gamma) - 0.032077 * np.sin(gamma)
+                                              - 0.014615 * np.cos(2 * gamma) - 0.040849 * np.sin(2 * gamma))
+    correction_seconds = np.rint(corrections * 60).astype(np.int32)
+    return std + correction_seconds.astype("timedelta64[s]"), correction_seconds
+
+def format_solar_time_correction(city, correction):
+    """결과 화면용 진태양시 보정 설명 문자열."""
+    sign = "+" if correction["solar_correction_seconds"] >= 0 else "-"
+    minutes, seconds = divmod(abs(correction["solar_correction_seconds"]), 60)
+    eot_text = f", 균시차 {correction['eot_minutes']:+.1f}분" if correction["eot_minutes"] else ""
+    return (f"진태양시 보정: {city['도시']} (경도 {city['경도']:.2f}°, 경도차 {correction['longitude_minutes']:+.1f}분{eot_text}) "
+            f"{sign}{minutes}분 {seconds}초 → 시주 기준 {correction['solar_dt'].strftime('%Y-%m-%d %H:%M')}")
+
+# ───────────────────────────────
+# 대운 순서표: 대운 간지는 월주 60갑자와 순행/역행만으로 정해집니다 (순번 p의 대운 = 월주 ± (p+1))
+# ───────────────────────────────
+DAEWOON_PERIODS = 10 # get_daewoon 목록의 대운 수
+GAPJA_NAMES = tuple(GAN[i % 10] + JI[i % 12] for i in range(60))
+GAPJA_NAME_INDEX = {name: i for i, name in enumerate(GAPJA_NAMES)} # "갑자" -> 0 (음양이 맞지 않는 조합은 없음)
+# (월주 60갑자, 0: 순행 / 1: 역행) -> 대운 60갑자 DAEWOON_PERIODS개
+DAEWOON_SEQUENCES = tuple(tuple(tuple((month + sign * (p + 1)) % 60 for p in range(DAEWOON_PERIODS)) for sign in (1, -1)) for month in range(60))
+
+@saju_metrics.timed("daewoon")
+def get_daewoon(year_gan_char, gender, birth_dt, month_gan_char, month_ji_char, solar_data_dict):
+    # 입력된 birth_dt (생일)는 datetime 객체여야 합니다.
+    if not isinstance(birth_dt, datetime):
+        return ["오류(잘못된 생년월일 객체)"], 0, False
+
+    # 1. 순행/역행 결정
+    try:
+        gan_index = GAN.index(year_gan_char) # 연간이 GAN 리스트에 있는지 확인
+    except ValueError:
+        return [f"오류(알 수 없는 연간: {year_gan_char})"], 0, False # is_sunhaeng 기본값 False
+    
+    is_yang_year = gan_index % 2 == 0
+    is_sunhaeng = (is_yang_year and gender == "남성") or (not is_yang_year and gender == "여성")
+
+    # 2. 생일(birth_dt) 전후의 절기 찾기
+    # ▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼ 이 변수가 사용되기 전에 반드시 초기화되어야 합니다 ▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼
+    relevant_terms_for_daewoon = []  # <--- 이 라인이 중요합니다!
+    # ▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲ 변수 초기화 ▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲
+
+    if solar_data_dict is None: # solar_data_dict가 None이면 .get() 호출 시 오류 발생 방지
+        return ["오류(절기 데이터 누락)"], 0, is_sunhaeng
+
+    for yr_offset in [-1, 0, 1]: 
+        year_to_check_in_solar_terms = birth_dt.year + yr_offset
+        year_terms = solar_data_dict.get(year_to_check_in_solar_terms, {}) # 기본값으로 빈 dict 반환
+        if year_terms is None: # 혹시 모를 경우 대비 (get의 기본값이 {}이므로 보통은 필요 없음)
+            year_terms = {}
+            
+        for term_name, term_dt_obj in year_terms.items():
+            if term_name in SAJU_MONTH_TERMS_ORDER: 
+                relevant_terms_for_daewoon.append({'name': term_name, 'datetime': term_dt_obj})
+    
+    relevant_terms_for_daewoon.sort(key=lambda x: x['datetime'])
+
+    # ▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼ 사용자님 오류 발생 지점 (line 1267 근처) ▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼
+    if not relevant_terms_for_daewoon: 
+        return ["오류(대운 계산용 절기 부족)"], 0, is_sunhaeng 
+    # ▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲ 여기까지 ▲▲▲▲▲▲▲▲▲▲▲▲▲▲▲
+    
+    target_term_dt = None
+    if is_sunhaeng: 
+        for term_info in relevant_terms_for_daewoon:
+            if term_info['datetime'] > birth_dt:
+                target_term_dt = term_info['datetime']
+                break
+    else: 
+        for term_info in reversed(relevant_terms_for_daewoon):
+            if term_info['datetime'] < birth_dt:
+                target_term_dt = term_info['datetime']
+                break
+    
+    if target_term_dt is None:
+        return ["오류(대운 목표 절기 탐색 실패)"], 0, is_sunhaeng
+
+    if is_sunhaeng:
+        days_difference = (target_term_dt - birth_dt).total_seconds() / (24 * 3600.0)
+    else: 
+        days_difference = (birth_dt - target_term_dt).total_seconds() / (24 * 3600.0)
+    
+    daewoon_start_age = max(1, int(round(days_difference / 3.0)))
+
+    if month_gan_char is None or month_ji_char is None: # 월주 간지 누락 시 오류 처리
+        return ["오류(월주 정보 누락)"], daewoon_start_age, is_sunhaeng
+        
+    month_ganji_str = month_gan_char + month_ji_char
+    current_month_gapja_idx = GAPJA_NAME_INDEX.get(month_ganji_str, -1)
+    if current_month_gapja_idx == -1:
+        return ["오류(월주를 60갑자로 변환 실패)"], daewoon_start_age, is_sunhaeng
+
+    daewoon_list_output = []
+    birth_year_solar = birth_dt.year 
+    daewoon_sequence = DAEWOON_SEQUENCES[current_month_gapja_idx][0 if is_sunhaeng else 1]
+
+    for i_period, daewoon_gapja_idx in enumerate(daewoon_sequence): 
+        current_daewoon_man_age = daewoon_start_age + (i_period * 10)
+        current_daewoon_start_solar_year = birth_year_solar + current_daewoon_man_age
+        daewoon_list_output.append(f"만 {current_daewoon_man_age}세 ({current_daewoon_start_solar_year}년~): {GAPJA_NAMES[daewoon_gapja_idx]}")
+        
+    return daewoon_list_output, daewoon_start_age, is_sunhaeng        
+
+_DAEWOON_TABLE_CACHE = {} # (대운 수, GAN_TO_OHENG, JIJI_JANGGAN id) -> ((표 보관), 조회표)
+
+def daewoon_tables(periods=DAEWOON_PERIODS):
+    """
+    배치 대운 조회표 (NumPy). 행 번호 = 월주 60갑자 x 2 + (0: 순행 / 1: 역행), 열 = 대운 순번 (0 ~ periods-1).
+    반환: {"gapja": (120,P) int8 대운 60갑자, "unseong": (10,120,P) int8 일간 기준 12운성 (_12_UNSEONG_PHASES_KOR 순서),
+           "ohaeng": (120,P,5) 대운 간지의 오행 세력 (천간 1 + 지장간 비율, 위치 가중치 없음)}
+    오행 벡터는 규칙 프로필의 지장간 표를 따르므로 표 객체 id로 캐시합니다.
+    """
+    import numpy as np
+
+    key = (periods, id(GAN_TO_OHENG), id(JIJI_JANGGAN))
+    cached = _DAEWOON_TABLE_CACHE.get(key)
+    if cached is None:
+        stem_ohaeng, branch_ohaeng, _, _ = _strength_tables()
+        steps = np.arange(1, periods + 1)
+        months = np.arange(60)[:, None, None]
+        gapja = ((months + np.array([1, -1])[None, :, None] * steps[None, None, :]) % 60).reshape(120, periods)
+        phase = {name: i for i, name in enumerate(_12_UNSEONG_PHASES_KOR)}
+        unseong_by_branch = np.array([[phase[_12_UNSEONG_MAP_DATA[gan][ji]] for ji in JI] for gan in GAN], dtype=np.int8)
+        ohaeng = stem_ohaeng[gapja % 10] + branch_ohaeng.sum(axis=0)[gapja % 12]
+        tables = {"gapja": gapja.astype(np.int8), "unseong": unseong_by_branch[:, gapja % 12], "ohaeng": ohaeng}
+        cached = ((GAN_TO_OHENG, JIJI_JANGGAN), tables)
+        _DAEWOON_TABLE_CACHE[key] = cached
+    return cached[1]
+
+def daewoon_row(month_gapja, is_sunhaeng):
+    """daewoon_tables 행 번호 (배열도 가능): 월주 60갑자 x 2 + (0: 순행 / 1: 역행)."""
+    return month_gapja * 2 + 1 - is_sunhaeng
+
+def daewoon_arrays(rows, start_ages, day_stems, periods=DAEWOON_PERIODS):
+    """
+    평생 대운 배치 (NumPy): 행 번호 (N,) (daewoon_row, -1: 대운 없음), 대운 시작 나이 (N,), 일간 코드 (N,)
+    -> {"gapja" (N,P) int8 (-1: 없음), "age" (N,P) 시작 만 나이, "unseong" (N,P) int8 (-1: 없음), "ohaeng" (N,P,5)}.
+    순서표를 모으고 시작 나이만 더하므로 get_daewoon 목록(만 나이, 간지)과 같습니다.
+    """
+    import numpy as np
+
+    tables = daewoon_tables(periods)
+    rows, start_ages = np.asarray(rows, dtype=np.intp), np.asarray(start_ages, dtype=np.int64)
+    valid = rows >= 0
+    safe_rows = np.where(valid, rows, 0)
+    gapja = np.where(valid[:, None], tables["gapja"][safe_rows], -1).astype(np.int8)
+    unseong = np.where(valid[:, None], tables["unseong"][np.asarray(day_stems, dtype=np.intp), safe_rows], -1).astype(np.int8)
+    return {"gapja": gapja, "age": start_ages[:, None] + 10 * np.arange(periods), "unseong": unseong,
+            "ohaeng": np.where(valid[:, None, None], tables["ohaeng"][safe_rows], 0.0)}
+@saju_metrics.timed("seun")
+def get_seun_list(start_year, n=10): 
+    return [(y, get_year_ganji(y)[0]) for y in range(start_year, start_year+n)]
+
+@saju_metrics.timed("wolun")
+def get_wolun_list(base_year, base_month, solar_data_dict, n=12):
+    output_wolun = []
+    try:
+        ref_date_for_start_month = datetime(base_year, base_month, 1, 12, 0)
+    except ValueError:
+        return [(f"오류: 잘못된 기준월 {base_year}-{base_month}", "계산불가")]
+
+    start_saju_year = get_saju_year(ref_date_for_start_month, solar_data_dict)
+    start_year_ganji_full, start_year_gan, _ = get_year_ganji(start_saju_year)
+    if "오류" in start_year_ganji_full:
+        return [(f"오류: 시작 사주년도({start_saju_year}) 연간 계산 실패", "계산불가")]
+
+    _, _, start_month_ji = get_month_ganji(start_year_gan, ref_date_for_start_month, solar_data_dict)
+    if "오류" in start_month_ji or not start_month_ji:
+        return [(f"오류: 시작월주 계산 실패 (기준일: {base_year}-{base_month}-01)", "계산불가")]
+    try:
+        start_month_idx = SAJU_MONTH_BRANCHES.index(start_month_ji)
+    except ValueError:
+        return [(f"오류: 알 수 없는 시작월 지지 ({start_month_ji})", "계산불가")]
+
+    # 사주월(인덱스) -> 대표 양력월 정보 (월이름, 대표일자, 사주년도 대비 양력년도 오프셋, 대표 양력월 숫자)
+    month_representative_details = [
+        ("인", 15, 0, 2), ("묘", 15, 0, 3), ("진", 15, 0, 4),
+        ("사", 15, 0, 5), ("오", 15, 0, 6), ("미", 15, 0, 7),
+        ("신", 15, 0, 8), ("유", 15, 0, 9), ("술", 15, 0, 10),
+        ("해", 15, 0, 11),("자", 15, 0, 12),("축", 15, 1, 1)
+    ]
+
+    for i in range(n):
+        current_month_saju_idx = (start_month_idx + i) % 12
+        current_saju_year = start_saju_year + (start_month_idx + i) // 12
+
+        current_year_ganji_full, year_gan_for_wolun, _ = get_year_ganji(current_saju_year)
+        if "오류" in current_year_ganji_full:
+            # 오류 시 표시할 레이블 (사주년/월로 간략히 또는 연도만)
+            target_month_branch_char = SAJU_MONTH_BRANCHES[current_month_saju_idx]
+            # display_label_for_error = f"{current_saju_year}년 {target_month_branch_char}월"
+            display_label_for_error = f"{current_saju_year}-??" # 숫자 형식 유지 시도
+            output_wolun.append((display_label_for_error, "오류(연간계산실패)"))
+            continue
+
+        _, representative_day, solar_year_offset, representative_solar_month = month_representative_details[current_month_saju_idx]
+
+        try:
+            # 월주 계산을 위한 dummy 날짜 (해당 사주월에 속하는 대표 양력 날짜)
+            dummy_dt_solar_year = current_saju_year + solar_year_offset
+            dummy_birth_dt_for_wolun = datetime(dummy_dt_solar_year, representative_solar_month, representative_day, 12, 0)
+        except ValueError:
+            # 오류 시 표시할 레이블
+            # target_month_branch_char_err = SAJU_MONTH_BRANCHES[current_month_saju_idx]
+            # target_term_name_err = SAJU_MONTH_TERMS_ORDER[current_month_saju_idx]
+            # display_label_on_err = f"{current_saju_year}년 {target_month_branch_char_err}월({target_term_name_err})"
+            display_label_on_err = f"{current_saju_year + solar_year_offset}-{representative_solar_month:02d} (오류)"
+            output_wolun.append((display_label_on_err, "오류(대표날짜생성실패)"))
+            continue
+
+        wolun_ganji, _, wolun_ji_calculated = get_month_ganji(year_gan_for_wolun, dummy_birth_dt_for_wolun, solar_data_dict)
+
+        # --- 월운 표시 레이블 수정 ---
+        if "오류" in wolun_ganji:
+            # 월주 계산 오류 시, 대표 양력 연/월로 표시하고 간지는 오류로 표시
+            display_label = f"{dummy_birth_dt_for_wolun.year}-{dummy_birth_dt_for_wolun.month:02d}"
+            actual_wolun_ganji = wolun_ganji # "오류(...)" 문자열
+        else:
+            # 정상 계산 시, dummy_birth_dt_for_wolun (대표 양력 날짜)의 연도와 월을 사용
+            display_label = f"{dummy_birth_dt_for_wolun.year}-{dummy_birth_dt_for_wolun.month:02d}"
+            actual_wolun_ganji = wolun_ganji
+
+        output_wolun.append((display_label, actual_wolun_ganji))
+
+    return output_wolun
+    
+@saju_metrics.timed("ilun")
+def get_ilun_list(year_val, month_val, day_val, n=10):
+    base_dt = datetime(year_val, month_val, day_val); output_ilun = []
+    for i in range(n):
+        current_dt = base_dt + timedelta(days=i)
+        ilun_ganji,_,_ = get_day_ganji(current_dt.year, current_dt.month, current_dt.day)
+        output_ilun.append((current_dt.strftime("%Y-%m-%d"), ilun_ganji))
+    return output_ilun
+
+# ───────────────────────────────
+# 분석 섹션 지연 계산 (화면/API가 요청한 섹션만 계산)
+# ───────────────────────────────
+# 섹션 이름 -> 계산 함수(rules, chart). chart[이름]으로 다른 섹션을 참조하면 그 섹션도 필요할 때 계산됩니다.
+# 이름은 saju_store.ANALYSIS_OUTPUTS와 같습니다. 대운/운세 섹션은 LazyChart의 context 값이 필요합니다.
+CHART_SECTIONS = {
+    "strengths": lambda rules, c: rules.calculate_ohaeng_sipshin_strengths(c["chart"]),
+    "shinkang": lambda rules, c: rules.determine_shinkang_shinyak(c["strengths"][1]),
+    "gekuk": lambda rules, c: rules.determine_gekuk(c["chart"]["day_gan"], c["chart"]["month_gan"], c["chart"]["month_ji"], c["strengths"][1]),
+    "yongshin": lambda rules, c: rules.determine_yongshin_gishin_simplified(c["chart"]["day_gan"], c["shinkang"]),
+    "hap_chung": lambda rules, c: rules.analyze_hap_chung_interactions(c["chart"]),
+    "shinsal": lambda rules, c: rules.analyze_shinsal(c["chart"]),
+    # context: gender, birth_dt(보정된 출생 시각), solar_data
+    "daewoon": lambda rules, c: rules.get_daewoon(c["chart"]["year_gan"], c["gender"], c["birth_dt"],
+                                                  c["chart"]["month_gan"], c["chart"]["month_ji"], c["solar_data"]),
+    # context: target_date(운세 기준일 (연, 월, 일)), solar_data. 개수는 화면 표시 기준
+    "seun": lambda rules, c: rules.get_seun_list(c["target_date"][0], 5),
+    "wolun": lambda rules, c: rules.get_wolun_list(c["target_date"][0], c["target_date"][1], c["solar_data"], 12),
+    "ilun": lambda rules, c: rules.get_ilun_list(*c["target_date"], 7),
+}
+
+class LazyChart:
+    """
+    명식 하나의 분석 섹션을 처음 요청할 때 계산하고 기억합니다. 예: chart["shinsal"], chart["yongshin"]
+    chart: saju_8char_details 형식 8글자 / rules: 엔진 또는 saju_rules 프로필 모듈 (기본: 이 엔진)
+    context: 대운/운세 섹션용 값 (gender, birth_dt, solar_data, target_date) - chart["gender"]처럼 그대로 꺼낼 수 있음
+    계산 중 예외는 기억하지 않고 그대로 올립니다 (다음 요청 때 다시 시도).
+    """
+
+    def __init__(self, chart, rules=None, **context):
+        self.chart = dict(chart)
+        self.rules = rules if rules is not None else sys.modules[__name__]
+        self.context = context
+        self.sections = {} # 계산을 마친 섹션 이름 -> 값
+
+    def __getitem__(self, name):
+        if name == "chart":
+            return self.chart
+        if name in self.context:
+            return self.context[name]
+        if name not in self.sections:
+            if name not in CHART_SECTIONS:
+                raise KeyError(name)
+            self.sections[name] = CHART_SECTIONS[name](self.rules, self)
+            saju_metrics.count("saju_sections_computed_total", section=name)
+        return self.sections[name]
+
+    def __contains__(self, name):
+        return name == "chart" or name in self.context or name in CHART_SECTIONS
+
+    @property
+    def analysis_possible(self):
+        """8글자가 모두 올바른 천간/지지여야 명식 전체를 쓰는 섹션(강약, 신살 등)을 계산할 수 있습니다."""
+        return all(self.chart.get(f"{pillar}_gan") in GAN_INDEX and self.chart.get(f"{pillar}_ji") in JI_INDEX for pillar in PILLAR_KEYS)
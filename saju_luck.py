@@ -0,0 +1,421 @@
+# 평생 운 흐름 - 대운/세운/월운 간지를 정수 코드 배열로 만들어 월 단위 점수를 한 번에 계산
+# 출생 사주월부터 매달(기본 1,200개월 = 100년)의 대운/세운/월운 60갑자 인덱스는 월주/연주 인덱스에
+# 달 수만 더하면 되므로 (N,3) 배열 하나로 만들고, 오행 세력표(천간, 지장간)를 인덱싱해 (N,3,5) 오행 벡터를 얻습니다.
+# 점수 = 용신 오행 세력 - 기신 오행 세력 (determine_yongshin_gishin_simplified 기준)을 운 층별 가중치로 더한 값.
+# 세력 시계열은 원국 세력(strength_arrays) + 운 층별 가중치 x 운 간지의 오행/십신 세력을 고객 N명 x 기간 T단계로 계산합니다.
+# 세운/월운은 모든 고객이 같으므로 (T,5)/(일간 10,T,10) 한 번, 대운만 고객별 (N,T)로 모읍니다.
+# 대운은 해당 나이 생일이 든 달(출생 사주월과 같은 달)부터 바뀌고, 첫 대운 전에는 월주를 대운 자리에 씁니다.
+# 사용:
+#   python saju_luck.py "1990-06-15 12:30" --gender 남성            # 연도별 평균 점수 요약
+#   python saju_luck.py "1990-06-15 12:30" --gender 여성 --csv luck.csv   # 1,200개월 전체를 CSV로
+#   python saju_luck.py "1990-06-15 12:30" --series 2020-01:2030-12 --wolun   # 원국+운 오행/십신 세력 시계열
+#   python saju_luck.py --check --n 50                             # 달마다 엔진 함수(get_daewoon 등)로 구한 결과와 비교
+
+import argparse
+import csv
+import os
+import random
+import sys
+from datetime import datetime
+
+import saju_engine as engine
+from saju_engine import GAN, GAN_INDEX, JI, JI_INDEX, OHENG_ORDER, SAJU_MONTH_BRANCHES, gapja_index
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LUCK_MONTHS = 1200 # 100년
+LUCK_LAYER_WEIGHTS = {"daewoon": 1.0, "seun": 0.6, "wolun": 0.3} # 운 층별 가중치 (대운 > 세운 > 월운)
+LUCK_LAYERS = tuple(LUCK_LAYER_WEIGHTS)
+LUCK_LAYER_NAMES = {"daewoon": "대운", "seun": "세운", "wolun": "월운"}
+
+# 사주월(인월=0 ... 축월=11) -> 대표 양력월 (get_wolun_list와 같음: 축월은 다음 양력 연도 1월)
+REPRESENTATIVE_SOLAR_MONTHS = [2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 1]
+
+# ───────────────────────────────
+# 용신/기신 가중치
+# ───────────────────────────────
+def yongshin_weights(yongshin_info):
+    """determine_yongshin_gishin_simplified 결과 -> 오행 가중치 (5,): 용신 +1, 기신 -1, 나머지 0 (중화면 모두 0)."""
+    import numpy as np
+
+    weights = np.zeros(len(OHENG_ORDER))
+    for i, o in enumerate(OHENG_ORDER):
+        weights[i] = (o in yongshin_info.get("yongshin", ())) - (o in yongshin_info.get("gishin", ()))
+    return weights
+
+def _transit_strength_tables(rules):
+    """운 간지 세력 조회표: 천간 오행 (10,5), 지지 오행 (12,5), (일간, 천간) 십신 (10,10,10), (일간, 지지) 십신 (10,12,10)."""
+    stem_ohaeng, branch_ohaeng, stem_sipshin, branch_sipshin = rules._strength_tables()
+    return stem_ohaeng, branch_ohaeng.sum(axis=0), stem_sipshin, branch_sipshin.sum(axis=0)
+
+# ───────────────────────────────
+# 운 간지 배열
+# ───────────────────────────────
+def transit_gapja(chart, daewoon_start_age, is_sunhaeng, months=LUCK_MONTHS):
+    """
+    출생 사주월부터 months개월의 (대운, 세운, 월운) 60갑자 인덱스 (months,3) int8과 만 나이(년) 배열.
+    월운은 월주 + m, 세운은 연주 + (출생 사주월 순서 + m) // 12, 대운은 월주 ± (대운 순번 + 1) 입니다.
+    """
+    import numpy as np
+
+    month_gapja = gapja_index(GAN_INDEX[chart["month_gan"]], JI_INDEX[chart["month_ji"]])
+    year_gapja = gapja_index(GAN_INDEX[chart["year_gan"]], JI_INDEX[chart["year_ji"]])
+    month_order = SAJU_MONTH_BRANCHES.index(chart["month_ji"])
+    m = np.arange(months)
+    age = m // 12
+    step = np.maximum((age - daewoon_start_age) // 10, -1) + 1 # 첫 대운 전 0 (월주), 첫 대운 1, ...
+    gapja = np.empty((months, 3), dtype=np.int8)
+    gapja[:, 0] = (month_gapja + (step if is_sunhaeng else -step)) % 60
+    gapja[:, 1] = (year_gapja + (month_order + m) // 12) % 60
+    gapja[:, 2] = (month_gapja + m) % 60
+    return gapja, age
+
+def luck_curve(chart, gender, birth_dt, solar_data, rules=None, months=LUCK_MONTHS, yongshin_info=None):
+    """
+    평생 월별 운 점수. chart: saju_8char_details / birth_dt: 보정된 출생 시각 / rules: 엔진 또는 프로필 모듈 (기본: 엔진)
+    yongshin_info: determine_yongshin_gishin_simplified 결과 (없으면 원국 세력으로 판단)
+    반환 dict (배열 길이 months): year/month(대표 양력 연월), age(만 나이), gapja (months,3: 대운/세운/월운),
+      ohaeng (months,3,5), layer_scores (months,3), score (months,), yongshin, gishin, daewoon_start_age, is_sunhaeng
+    대운을 계산할 수 없으면(월주 오류, 절기 데이터 부족 등) None.
+    """
+    import numpy as np
+
+    rules = rules if rules is not None else engine
+    daewoon_list, start_age, is_sunhaeng = rules.get_daewoon(chart["year_gan"], gender, birth_dt, chart["month_gan"], chart["month_ji"], solar_data)
+    if not daewoon_list or "오류" in daewoon_list[0]:
+        return None
+    if yongshin_info is None:
+        _, sipshin = rules.calculate_ohaeng_sipshin_strengths(chart)
+        yongshin_info = rules.determine_yongshin_gishin_simplified(chart["day_gan"], rules.determine_shinkang_shinyak(sipshin))
+    gapja, age = transit_gapja(chart, start_age, is_sunhaeng, months)
+    stem_ohaeng, branch_ohaeng, _, _ = _transit_strength_tables(rules)
+    ohaeng = stem_ohaeng[gapja % 10] + branch_ohaeng[gapja % 12]
+    layer_scores = ohaeng @ yongshin_weights(yongshin_info)
+    score = layer_scores @ np.array([LUCK_LAYER_WEIGHTS[layer] for layer in LUCK_LAYERS])
+
+    saju_order = SAJU_MONTH_BRANCHES.index(chart["month_ji"]) + np.arange(months)
+    saju_year = engine.get_saju_year(birth_dt, solar_data) + saju_order // 12
+    order = saju_order % 12
+    return {"year": saju_year + (order == 11), "month": np.array(REPRESENTATIVE_SOLAR_MONTHS)[order], "age": age,
+            "gapja": gapja, "ohaeng": ohaeng, "layer_scores": layer_scores, "score": score,
+            "yongshin": list(yongshin_info.get("yongshin", [])), "gishin": list(yongshin_info.get("gishin", [])),
+            "daewoon_start_age": start_age, "is_sunhaeng": is_sunhaeng}
+
+def yearly_scores(curve):
+    """월별 점수 -> 만 나이별 평균 [(만 나이, 평균 점수)] (차트/요약용)."""
+    import numpy as np
+
+    ages = curve["age"]
+    totals = np.bincount(ages, weights=curve["score"])
+    counts = np.bincount(ages)
+    return [(int(age), round(float(totals[age] / counts[age]), 3)) for age in range(len(counts)) if counts[age]]
+
+def luck_rows(curve):
+    """월별 점수 -> 표 (saju_table: 연월, 만 나이, 대운, 세운, 월운, 점수)."""
+    import saju_table
+
+    names = [GAN[k % 10] + JI[k % 12] for k in range(60)]
+    rows = [(f"{int(y)}-{int(m):02d}", int(age), names[g[0]], names[g[1]], names[g[2]], round(float(s), 3))
+            for y, m, age, g, s in zip(curve["year"], curve["month"], curve["age"], curve["gapja"], curve["score"])]
+    return saju_table.make_table(["연월", "만 나이", "대운", "세운", "월운", "점수"], rows)
+
+def write_luck_csv(curve, path):
+    table = luck_rows(curve)
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(table["columns"])
+        writer.writerows(table["rows"])
+
+# ───────────────────────────────
+# 원국 + 운 세력 시계열 (고객 N명 x 기간 T단계)
+# ───────────────────────────────
+# 사주월 번호 U = 사주년도 x 12 + 사주월 순서(인월=0). 월운 60갑자 = (U + MONTH_GAPJA_OFFSET) % 60
+# (1984년 인월 병인(2): (1984 x 12 + 0 + 14) % 60 = 2). 월주는 달마다 60갑자를 하나씩 나아갑니다.
+MONTH_GAPJA_OFFSET = 14
+
+def saju_month_number(year, month):
+    """대표 양력 연월(REPRESENTATIVE_SOLAR_MONTHS 기준, 예: 2020-01은 2019년 축월) -> 사주월 번호 U."""
+    order = REPRESENTATIVE_SOLAR_MONTHS.index(month)
+    return (year - (order == 11)) * 12 + order
+
+def transit_steps(start, end, step="month"):
+    """
+    (연, 월) ~ (연, 월) 대표 양력 연월 범위(양 끝 포함)의 단계 목록.
+    step="month": 사주월마다, step="year": 사주년도마다 (각 해 인월 기준, 월운 없음)
+    반환 dict: U (T,) 사주월 번호, year/month (T,) 대표 양력 연월, step
+    """
+    import numpy as np
+
+    first, last = saju_month_number(*start), saju_month_number(*end)
+    if step == "year":
+        first_year, last_year = first // 12 + (first % 12 > 0), last // 12
+        months = np.arange(first_year, last_year + 1) * 12
+    else:
+        months = np.arange(first, last + 1)
+    order = months % 12
+    return {"U": months, "year": months // 12 + (order == 11), "month": np.array(REPRESENTATIVE_SOLAR_MONTHS)[order], "step": step}
+
+def luck_params(charts, genders, birth_dts, solar_data, rules=None):
+    """
+    고객별 대운 계산 값 (배열 N개): birth_U (출생 사주월 번호), month_gapja, start_age, direction (순행 +1 / 역행 -1),
+    valid (대운 계산 가능 여부 - 월주 오류, 절기 데이터 부족이면 False이고 대운 기여는 0).
+    """
+    import numpy as np
+
+    rules = rules if rules is not None else engine
+    n = len(charts)
+    params = {"birth_U": np.zeros(n, dtype=np.int64), "month_gapja": np.zeros(n, dtype=np.int64),
+              "start_age": np.zeros(n, dtype=np.int64), "direction": np.ones(n, dtype=np.int64), "valid": np.zeros(n, dtype=bool)}
+    for i, (chart, gender, birth_dt) in enumerate(zip(charts, genders, birth_dts)):
+        if chart["month_ji"] not in SAJU_MONTH_BRANCHES or chart["month_gan"] not in GAN_INDEX:
+            continue
+        daewoon_list, start_age, is_sunhaeng = rules.get_daewoon(chart["year_gan"], gender, birth_dt, chart["month_gan"], chart["month_ji"], solar_data)
+        if not daewoon_list or "오류" in daewoon_list[0]:
+            continue
+        params["birth_U"][i] = engine.get_saju_year(birth_dt, solar_data) * 12 + SAJU_MONTH_BRANCHES.index(chart["month_ji"])
+        params["month_gapja"][i] = gapja_index(GAN_INDEX[chart["month_gan"]], JI_INDEX[chart["month_ji"]])
+        params["start_age"][i], params["direction"][i], params["valid"][i] = start_age, 1 if is_sunhaeng else -1, True
+    return params
+
+def daewoon_gapja_at(params, months):
+    """고객별 대운 60갑자 (N,T) int64와 출생 전 여부 (N,T). 첫 대운 전에는 월주(대운 순번 0)."""
+    import numpy as np
+
+    elapsed = months[None, :] - params["birth_U"][:, None] # 출생 사주월부터 지난 달 수
+    age = elapsed // 12
+    step = np.maximum((age - params["start_age"][:, None]) // 10, -1) + 1
+    return (params["month_gapja"][:, None] + params["direction"][:, None] * step) % 60, elapsed < 0
+
+def strength_series(stems, branches, params, steps, rules=None, include_wolun=False):
+    """
+    원국 + 대운 + 세운 (+ 월운) 오행/십신 세력 시계열.
+    stems/branches: 원국 정수 코드 (N,4) (encode_charts) / params: luck_params / steps: transit_steps
+    반환: (오행 (N,T,5), 십신 (N,T,10), 출생 전 단계 (N,T) bool) - 반올림 전 값. 운 층 가중치는 LUCK_LAYER_WEIGHTS.
+    N x T가 크면 고객을 나눠 호출하세요 (float64 15개 x N x T).
+    """
+    import numpy as np
+
+    rules = rules if rules is not None else engine
+    stem_ohaeng, branch_ohaeng, stem_sipshin, branch_sipshin = _transit_strength_tables(rules)
+    natal_ohaeng, natal_sipshin = rules.strength_arrays(stems, branches)
+    day_gan = np.asarray(stems, dtype=np.intp)[:, 2]
+    months = steps["U"]
+
+    # 모든 고객에게 같은 세운(/월운): (T,5), 일간별 십신 (10,T,10)
+    shared = [(LUCK_LAYER_WEIGHTS["seun"], (months // 12 - 4) % 60)]
+    if include_wolun:
+        shared.append((LUCK_LAYER_WEIGHTS["wolun"], (months + MONTH_GAPJA_OFFSET) % 60))
+    shared_ohaeng = sum(weight * (stem_ohaeng[g % 10] + branch_ohaeng[g % 12]) for weight, g in shared)
+    shared_sipshin = sum(weight * (stem_sipshin[:, g % 10] + branch_sipshin[:, g % 12]) for weight, g in shared)
+
+    daewoon, before_birth = daewoon_gapja_at(params, months)
+    daewoon_weight = LUCK_LAYER_WEIGHTS["daewoon"] * params["valid"][:, None, None]
+    ohaeng = natal_ohaeng[:, None, :] + shared_ohaeng[None] + daewoon_weight * (stem_ohaeng[daewoon % 10] + branch_ohaeng[daewoon % 12])
+    sipshin = (natal_sipshin[:, None, :] + shared_sipshin[day_gan]
+               + daewoon_weight * (stem_sipshin[day_gan[:, None], daewoon % 10] + branch_sipshin[day_gan[:, None], daewoon % 12]))
+    return ohaeng, sipshin, before_birth
+
+def series_rows(steps, ohaeng, sipshin, params=None, index=0):
+    """고객 한 명(index)의 세력 시계열 표 (saju_table: 연월, 대운, 세운, 오행 5개, 가장 강한 십신)."""
+    import saju_table
+    from saju_engine import SIPSHIN_ORDER
+
+    names = [GAN[k % 10] + JI[k % 12] for k in range(60)]
+    daewoon = daewoon_gapja_at({key: value[index:index + 1] for key, value in params.items()}, steps["U"])[0][0] if params else None
+    rows = []
+    for t, (year, month) in enumerate(zip(steps["year"], steps["month"])):
+        label = f"{int(year)}" if steps["step"] == "year" else f"{int(year)}-{int(month):02d}"
+        rows.append((label, names[daewoon[t]] if daewoon is not None else "", names[(int(steps["U"][t]) // 12 - 4) % 60],
+                     *(round(float(v), 1) for v in ohaeng[index, t]), SIPSHIN_ORDER[int(sipshin[index, t].argmax())]))
+    return saju_table.make_table(["연월", "대운", "세운", *OHENG_ORDER, "가장 강한 십신"], rows)
+
+# ───────────────────────────────
+# 점검 (달마다 엔진 함수로 계산한 결과와 비교)
+# ───────────────────────────────
+def luck_curve_scalar(chart, gender, birth_dt, solar_data, rules=None, months=LUCK_MONTHS, yongshin_info=None):
+    """
+    luck_curve와 같은 점수를 달마다 get_daewoon 목록, get_year_ganji/get_month_ganji(대표 날짜 15일 정오),
+    GAN_TO_OHENG/JIJI_JANGGAN 사전으로 구합니다. 반환: [(대표 연, 월, (대운, 세운, 월운 간지), 점수)]
+    """
+    rules = rules if rules is not None else engine
+    daewoon_list, start_age, _ = rules.get_daewoon(chart["year_gan"], gender, birth_dt, chart["month_gan"], chart["month_ji"], solar_data)
+    if yongshin_info is None:
+        _, sipshin = rules.calculate_ohaeng_sipshin_strengths(chart)
+        yongshin_info = rules.determine_yongshin_gishin_simplified(chart["day_gan"], rules.determine_shinkang_shinyak(sipshin))
+    weights = dict(zip(OHENG_ORDER, yongshin_weights(yongshin_info)))
+    periods = [(int(item.split("세")[0].replace("만", "")), item.rsplit(": ", 1)[1]) for item in daewoon_list]
+
+    def ganji_score(ganji):
+        total = weights.get(rules.GAN_TO_OHENG.get(ganji[0]), 0.0)
+        for janggan, proportion in rules.JIJI_JANGGAN.get(ganji[1], {}).items():
+            total += proportion * weights.get(rules.GAN_TO_OHENG.get(janggan), 0.0)
+        return total
+
+    rows = []
+    saju_year = engine.get_saju_year(birth_dt, solar_data)
+    month_order = SAJU_MONTH_BRANCHES.index(chart["month_ji"])
+    for m in range(months):
+        order = (month_order + m) % 12
+        year, month = saju_year + (month_order + m) // 12 + (order == 11), REPRESENTATIVE_SOLAR_MONTHS[order]
+        dt = datetime(year, month, 15, 12, 0)
+        seun, seun_gan, _ = engine.get_year_ganji(engine.get_saju_year(dt, solar_data))
+        wolun = engine.get_month_ganji(seun_gan, dt, solar_data)[0]
+        daewoon = chart["month_gan"] + chart["month_ji"]
+        for period_age, ganji in periods:
+            if m // 12 >= period_age:
+                daewoon = ganji
+        score = sum(LUCK_LAYER_WEIGHTS[layer] * ganji_score(ganji) for layer, ganji in zip(LUCK_LAYERS, (daewoon, seun, wolun)))
+        rows.append((year, month, (daewoon, seun, wolun), score))
+    return rows
+
+def check_luck_curve(solar_data, n=50, seed=1, rules=None):
+    """절기표 범위 안에서 100년을 볼 수 있는 임의 출생 n건을 luck_curve_scalar와 비교합니다. 반환: 불일치 목록."""
+    import saju_uncertain
+
+    rng = random.Random(seed)
+    first_year, last_year = min(solar_data) + 1, max(solar_data) - 101
+    names = [GAN[k % 10] + JI[k % 12] for k in range(60)]
+    mismatches = []
+    for i in range(n):
+        birth_dt = datetime(rng.randint(first_year, last_year), rng.randint(1, 12), rng.randint(1, 28), rng.randint(0, 23), rng.randint(0, 59))
+        chart = saju_uncertain.chart_at(birth_dt, solar_data)
+        gender = rng.choice(("남성", "여성"))
+        curve = luck_curve(chart, gender, birth_dt, solar_data, rules)
+        if curve is None: # 절기표 첫해 등 대운 계산 불가
+            continue
+        expected = luck_curve_scalar(chart, gender, birth_dt, solar_data, rules)
+        for m, (year, month, ganjis, score) in enumerate(expected):
+            actual = ((int(curve["year"][m]), int(curve["month"][m])), tuple(names[g] for g in curve["gapja"][m]))
+            if actual != ((year, month), ganjis) or abs(curve["score"][m] - score) > 1e-9:
+                mismatches.append((birth_dt, gender, m, (year, month, ganjis, score), actual + (float(curve["score"][m]),)))
+                break
+    return mismatches
+
+def check_strength_series(solar_data, n=30, seed=2, rules=None):
+    """
+    임의 고객 n명 x 임의 10년 구간(출생 전 포함, 월운 포함)의 세력 시계열을 달마다 엔진 함수와 사전 조회로 구한 값과 비교합니다.
+    원국 부분은 strength_arrays(단건 계산과 같음을 따로 점검), 운 부분은 get_daewoon 목록/get_year_ganji/get_month_ganji를 씁니다.
+    반환: 불일치 목록 [(출생, 단계 번호, 기대 오행, 계산 오행)].
+    """
+    import numpy as np
+    import saju_uncertain
+
+    rules = rules if rules is not None else engine
+    rng = random.Random(seed)
+    births = [datetime(rng.randint(min(solar_data) + 1, max(solar_data) - 40), rng.randint(1, 12), rng.randint(1, 28), rng.randint(0, 23), rng.randint(0, 59))
+              for _ in range(n)]
+    births = [dt for dt in births if all(saju_uncertain.chart_at(dt, solar_data).values())] # 절기표 첫해 월주 오류 제외
+    charts = [saju_uncertain.chart_at(dt, solar_data) for dt in births]
+    genders = [rng.choice(("남성", "여성")) for _ in births]
+    params = luck_params(charts, genders, births, solar_data, rules)
+    start_year = rng.randint(min(dt.year for dt in births), max(dt.year for dt in births) + 20)
+    steps = transit_steps((start_year, rng.randint(1, 12)), (start_year + 10, rng.randint(1, 12)))
+    stems, branches = engine.encode_charts(charts)
+    ohaeng, sipshin, _ = strength_series(stems, branches, params, steps, rules, include_wolun=True)
+    natal_ohaeng, natal_sipshin = rules.strength_arrays(stems, branches)
+    from saju_engine import SIPSHIN_ORDER
+
+    def ganji_strengths(ganji, day_gan, weight):
+        o, s = np.zeros(len(OHENG_ORDER)), np.zeros(len(SIPSHIN_ORDER))
+        for char, proportion in [(ganji[0], 1.0)] + list(rules.JIJI_JANGGAN.get(ganji[1], {}).items()):
+            if char in rules.GAN_TO_OHENG:
+                o[OHENG_ORDER.index(rules.GAN_TO_OHENG[char])] += weight * proportion
+            if char in rules.SIPSHIN_MAP.get(day_gan, {}):
+                s[SIPSHIN_ORDER.index(rules.SIPSHIN_MAP[day_gan][char])] += weight * proportion
+        return o, s
+
+    mismatches = []
+    for i, (chart, gender, birth_dt) in enumerate(zip(charts, genders, births)):
+        daewoon_list, _, _ = rules.get_daewoon(chart["year_gan"], gender, birth_dt, chart["month_gan"], chart["month_ji"], solar_data)
+        valid = bool(daewoon_list) and "오류" not in daewoon_list[0]
+        periods = [(int(item.split("세")[0].replace("만", "")), item.rsplit(": ", 1)[1]) for item in daewoon_list] if valid else []
+        for t, (year, month, months) in enumerate(zip(steps["year"], steps["month"], steps["U"])):
+            if periods and (months - params["birth_U"][i]) // 12 >= periods[-1][0] + 10:
+                continue # get_daewoon 목록(10개) 뒤의 대운은 비교 대상 없음
+            dt = datetime(int(year), int(month), 15, 12, 0)
+            seun, seun_gan, _ = engine.get_year_ganji(engine.get_saju_year(dt, solar_data))
+            wolun = engine.get_month_ganji(seun_gan, dt, solar_data)[0]
+            daewoon = chart["month_gan"] + chart["month_ji"]
+            for period_age, ganji in periods:
+                if (months - params["birth_U"][i]) // 12 >= period_age:
+                    daewoon = ganji
+            expected_o, expected_s = natal_ohaeng[i].copy(), natal_sipshin[i].copy()
+            layers = [("seun", seun), ("wolun", wolun)] + ([("daewoon", daewoon)] if valid else [])
+            for layer, ganji in layers:
+                o, s = ganji_strengths(ganji, chart["day_gan"], LUCK_LAYER_WEIGHTS[layer])
+                expected_o, expected_s = expected_o + o, expected_s + s
+            if not (np.allclose(expected_o, ohaeng[i, t]) and np.allclose(expected_s, sipshin[i, t])):
+                mismatches.append((birth_dt, t, expected_o.round(3).tolist(), ohaeng[i, t].round(3).tolist()))
+                break
+    return mismatches
+
+# ───────────────────────────────
+# 실행
+# ───────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="평생 월별 운 점수 (대운/세운/월운 x 용신/기신 오행)")
+    parser.add_argument("birth", nargs="?", metavar="'YYYY-MM-DD HH:MM'", help="출생 시각 (UTC+9 기준)")
+    parser.add_argument("--gender", default="남성", choices=("남성", "여성"))
+    parser.add_argument("--months", type=int, default=LUCK_MONTHS)
+    parser.add_argument("--profile", default=None, help="규칙 프로필 (rule_profiles 폴더, 기본: 기본 규칙)")
+    parser.add_argument("--csv", metavar="PATH", help="월별 점수를 CSV로 저장")
+    parser.add_argument("--series", metavar="YYYY-MM:YYYY-MM", help="원국+운 오행/십신 세력 시계열 구간 (대표 양력 연월)")
+    parser.add_argument("--wolun", action="store_true", help="--series에 월운 포함")
+    parser.add_argument("--yearly", action="store_true", help="--series를 사주년도 단위로 (월운 없음)")
+    parser.add_argument("--check", action="store_true", help="임의 출생으로 달마다 엔진 함수 결과와 비교")
+    parser.add_argument("--n", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    import saju_rules
+    import saju_uncertain
+    rules = saju_rules.get_profile(args.profile) if args.profile else engine
+    if rules is None:
+        parser.error(f"규칙 프로필 '{args.profile}'을 읽을 수 없습니다.")
+    if not (args.check or args.birth):
+        parser.print_help()
+        return 0
+    solar_data = engine.load_solar_terms(os.path.join(BASE_DIR, engine.FILE_NAME), lambda level, message: print(message, file=sys.stderr))
+    if solar_data is None:
+        return 1
+    if args.check:
+        mismatches = check_luck_curve(solar_data, args.n, rules=rules)
+        for birth_dt, gender, m, expected, actual in mismatches[:10]:
+            print(f"{birth_dt:%Y-%m-%d %H:%M} {gender} {m}번째 달: 단건 {expected} / 배열 {actual}")
+        print(f"비교 완료: 출생 {args.n}건 x {LUCK_MONTHS}개월, 불일치 {len(mismatches)}건")
+        series_mismatches = check_strength_series(solar_data, args.n, rules=rules)
+        for birth_dt, t, expected, actual in series_mismatches[:10]:
+            print(f"[세력 시계열] {birth_dt:%Y-%m-%d %H:%M} {t}번째 단계: 단건 {expected} / 배열 {actual}")
+        print(f"비교 완료: 고객 {args.n}명 x 10년 세력 시계열, 불일치 {len(series_mismatches)}건")
+        return 1 if mismatches or series_mismatches else 0
+    birth_dt = datetime.fromisoformat(args.birth)
+    chart = saju_uncertain.chart_at(birth_dt, solar_data)
+    if args.series:
+        import saju_table
+
+        try:
+            start, end = (tuple(int(part) for part in text.split("-")) for text in args.series.split(":"))
+        except ValueError:
+            parser.error(f"--series 형식 오류: {args.series} (YYYY-MM:YYYY-MM)")
+        steps = transit_steps(start, end, "year" if args.yearly else "month")
+        params = luck_params([chart], [args.gender], [birth_dt], solar_data, rules)
+        stems, branches = engine.encode_charts([chart])
+        ohaeng, sipshin, _ = strength_series(stems, branches, params, steps, rules, include_wolun=args.wolun and not args.yearly)
+        print(saju_table.to_text(series_rows(steps, ohaeng, sipshin, params)))
+        return 0
+    curve = luck_curve(chart, args.gender, birth_dt, solar_data, rules, args.months)
+    if curve is None:
+        print("오류(대운 계산 불가: 월주 또는 절기 데이터를 확인하세요)", file=sys.stderr)
+        return 1
+    print(" ".join(chart[f"{key}_gan"] + chart[f"{key}_ji"] for key in engine.PILLAR_KEYS)
+          + f" / 용신 {', '.join(curve['yongshin']) or '-'} / 기신 {', '.join(curve['gishin']) or '-'}"
+          + f" / 대운 {curve['daewoon_start_age']}세 {'순행' if curve['is_sunhaeng'] else '역행'}")
+    if args.csv:
+        write_luck_csv(curve, args.csv)
+        print(f"{args.months}개월 점수를 {args.csv}에 저장했습니다.")
+        return 0
+    for age, score in yearly_scores(curve)[::5]:
+        print(f"만 {age:3d}세  {score:+7.3f}  {'#' * int(round(abs(score) * 4))}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+# 사주 계산기 성능 계측 모듈
+# 사용: SAJU_METRICS=1 streamlit run "Saju Calculator.py"
+#   - SAJU_METRICS_FILE=경로 : 계산 실행마다 Prometheus 텍스트 형식으로 파일에 기록
+#   - SAJU_METRICS_PORT=9108 : http://127.0.0.1:9108/metrics 로 지표 노출 (이 컴퓨터에서만 접속 가능)
+#   - SAJU_METRICS_ADDR=0.0.0.0 : 다른 컴퓨터(수집 서버 등)에도 엔드포인트를 열 때만 명시적으로 지정
+# 환경 변수가 없으면 모든 계측 함수는 아무 일도 하지 않습니다 (opt-in).
+
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# ───────────────────────────────
+# 계측 설정 및 상수
+# ───────────────────────────────
+METRIC_PREFIX = "saju"
+
+# 단계별 지연시간 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# 엔진이 반환하는 "오류(월주기준절기못찾음:19000101)" 형태에서 종류("월주기준절기못찾음")만 추출
+ERROR_KIND_PATTERN = re.compile(r"오류\(([^:)]*)")
+
+_lock = threading.Lock()
+_enabled = os.environ.get("SAJU_METRICS", "").strip().lower() in ("1", "true", "yes", "on")
+_histograms = {}  # stage -> {"buckets": [..], "sum": float, "count": int}
+_counters = {}    # (name, (("label","값"), ...)) -> int
+_counter_help = {
+    "saju_cache_lookups_total": "캐시 조회 횟수 (적중 = lookups - misses)",
+    "saju_cache_misses_total": "캐시 미스로 실제 계산/로딩이 수행된 횟수",
+    "saju_errors_total": "엔진 함수가 반환한 오류(...) 문자열 수 (종류별)",
+    "saju_stage_failures_total": "예외로 끝난 계산 단계 수 (단계, 예외 종류별)",
+}
+_http_server = None
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(flag=True):
+    """런타임에 계측을 켜거나 끕니다 (테스트/벤치마크용)."""
+    global _enabled
+    _enabled = bool(flag)
+
+
+def reset():
+    """누적된 모든 지표를 초기화합니다."""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+# ───────────────────────────────
+# 기록 함수 (히스토그램, 카운터)
+# ───────────────────────────────
+def observe(stage, seconds):
+    """단계(stage)의 소요 시간을 히스토그램에 기록합니다."""
+    if not _enabled:
+        return
+    with _lock:
+        hist = _histograms.get(stage)
+        if hist is None:
+            hist = {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0}
+            _histograms[stage] = hist
+        for i, upper in enumerate(LATENCY_BUCKETS):
+            if seconds <= upper:
+                hist["buckets"][i] += 1
+        hist["sum"] += seconds
+        hist["count"] += 1
+
+
+def count(name, value=1, **labels):
+    """카운터를 증가시킵니다. 예: count("saju_cache_lookups_total", cache="solar_terms")"""
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def record_error(value):
+    """엔진 반환값에 포함된 "오류(...)" 문자열을 종류별로 집계합니다."""
+    if not _enabled:
+        return
+    text = value
+    if isinstance(value, (list, tuple)):
+        text = value[0] if value else None
+    if not isinstance(text, str) or "오류(" not in text:
+        return
+    match = ERROR_KIND_PATTERN.search(text)
+    count("saju_errors_total", kind=match.group(1) if match else "알수없음")
+
+
+@contextmanager
+def span(stage):
+    """with span("daewoon"): ... 블록의 소요 시간을 stage 이름으로 기록합니다."""
+    if not _enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        count("saju_stage_failures_total", stage=stage, exception=type(e).__name__)
+        raise
+    finally:
+        observe(stage, time.perf_counter() - started)
+
+
+def timed(stage):
+    """엔진 함수용 데코레이터: 소요 시간 기록 + 반환값의 오류(...) 문자열 집계. 예외로 끝나면 실패 카운터를 올리고 다시 던집니다."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                count("saju_stage_failures_total", stage=stage, exception=type(e).__name__)
+                raise
+            finally:
+                observe(stage, time.perf_counter() - started)
+            record_error(result)
+            return result
+        return wrapper
+    return decorator
+
+
+# ───────────────────────────────
+# 조회 및 내보내기 (디버그 패널, Prometheus)
+# ───────────────────────────────
+def stage_summary():
+    """디버그 패널용 요약: [{"단계", "호출 수", "총 시간(ms)", "평균(ms)"}, ...] (총 시간 내림차순)"""
+    with _lock:
+        rows = [
+            {
+                "단계": stage,
+                "호출 수": hist["count"],
+                "총 시간(ms)": round(hist["sum"] * 1000, 3),
+                "평균(ms)": round(hist["sum"] * 1000 / hist["count"], 3) if hist["count"] else 0.0,
+            }
+            for stage, hist in _histograms.items()
+        ]
+    return sorted(rows, key=lambda row: row["총 시간(ms)"], reverse=True)
+
+
+def counter_summary():
+    """디버그 패널용 카운터 목록: [{"지표", "레이블", "값"}, ...]"""
+    with _lock:
+        items = sorted(_counters.items())
+    return [
+        {"지표": name, "레이블": ", ".join(f"{k}={v}" for k, v in labels), "값": value}
+        for (name, labels), value in items
+    ]
+
+
+def _escape_label_value(value):
+    """Prometheus 텍스트 형식의 레이블 값 이스케이프 (역슬래시, 큰따옴표, 줄바꿈)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = [f'{k}="{_escape_label_value(v)}"' for k, v in labels]
+    return "{" + ",".join(escaped) + "}"
+
+
+def export_prometheus():
+    """누적 지표를 Prometheus 텍스트 노출 형식(0.0.4)으로 반환합니다."""
+    lines = []
+    hist_name = f"{METRIC_PREFIX}_stage_duration_seconds"
+    with _lock:
+        histograms = {stage: dict(hist, buckets=list(hist["buckets"])) for stage, hist in _histograms.items()}
+        counters = dict(_counters)
+
+    if histograms:
+        lines.append(f"# HELP {hist_name} 계산 단계별 소요 시간")
+        lines.append(f"# TYPE {hist_name} histogram")
+        for stage in sorted(histograms):
+            hist = histograms[stage]
+            label = _escape_label_value(stage)
+            for upper, cumulative in zip(LATENCY_BUCKETS, hist["buckets"]):
+                lines.append(f'{hist_name}_bucket{{stage="{label}",le="{upper}"}} {cumulative}')
+            lines.append(f'{hist_name}_bucket{{stage="{label}",le="+Inf"}} {hist["count"]}')
+            lines.append(f'{hist_name}_sum{{stage="{label}"}} {hist["sum"]:.9f}')
+            lines.append(f'{hist_name}_count{{stage="{label}"}} {hist["count"]}')
+
+    names = sorted({name for name, _ in counters})
+    for name in names:
+        lines.append(f"# HELP {name} {_counter_help.get(name, name)}")
+        lines.append(f"# TYPE {name} counter")
+        for (counter_name, labels), value in sorted(counters.items()):
+            if counter_name == name:
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path=None):
+    """Prometheus 텍스트를 파일로 기록합니다 (node_exporter textfile collector 호환: 임시 파일 후 교체)."""
+    path = path or os.environ.get("SAJU_METRICS_FILE")
+    if not _enabled or not path:
+        return None
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(export_prometheus())
+    os.replace(tmp_path, path)
+    return path
+
+
+def start_http_server(port=None, addr=None):
+    """
+    /metrics 엔드포인트를 백그라운드 스레드로 띄웁니다. 이미 실행 중이면 재사용합니다.
+    기본 주소는 127.0.0.1 (로컬 전용)이며, 외부에 노출하려면 addr 또는 SAJU_METRICS_ADDR로 직접 지정해야 합니다.
+    """
+    global _http_server
+    if _http_server is not None or not _enabled:
+        return _http_server
+    port = port or os.environ.get("SAJU_METRICS_PORT")
+    if not port:
+        return None
+    addr = addr or os.environ.get("SAJU_METRICS_ADDR", "").strip() or "127.0.0.1"
+
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = export_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # 접근 로그는 출력하지 않음
+            pass
+
+    try:
+        server = ThreadingHTTPServer((addr, int(port)), _MetricsHandler)
+    except OSError:
+        # Streamlit 다중 프로세스 등으로 포트가 이미 사용 중이면 파일 내보내기만 사용
+        return None
+    threading.Thread(target=server.serve_forever, name="saju-metrics", daemon=True).start()
+    _http_server = server
+    return server
@@ -0,0 +1,249 @@
+# 풀이 텍스트(상담 지침 "다시 보기" 패널) 생성 모듈
+# 세션마다 Markdown 사본(명식/세력/운세 표의 to_markdown() 포함)을 들고 있지 않도록,
+# 세션에는 작은 명식 키(report_key)만 두고 패널을 열 때 build_segments()로 다시 만듭니다.
+# UI는 이 함수를 공유 캐시(st.cache_data)로 감싸므로 같은 명식은 세션이 달라도 한 번만 만듭니다.
+# 사용:
+#   python saju_report.py --measure 200     # 세션당 상태 크기 비교 (Markdown 사본 vs 명식 키)
+
+import argparse
+import sys
+from datetime import datetime
+
+import saju_engine as engine
+import saju_table
+from saju_engine import OHENG_ORDER, SIPSHIN_ORDER, strip_html_tags
+
+# 풀이 섹션 (UI "표시 항목"과 같은 이름, 이 순서로 세그먼트를 만듭니다)
+REPORT_SECTIONS = ("ohaeng", "sipshin", "shinkang_gekuk", "hap_chung", "shinsal", "yongshin", "daewoon", "unse", "guideline")
+
+YONGSHIN_NOTICE_HTML = """<div style="font-size: 0.85rem; color: #4b5563; margin-top: 1.5rem; padding: 0.85rem 1rem; background-color: #f9fafb; border: 1px dashed #d1d5db; border-radius: 4px;"><strong style="color:#374151;">참고 사항:</strong><br> 여기서 제공되는 용신(喜神) 및 기신(忌神) 정보는 사주 당사자의 신강/신약을 기준으로 한 <strong>간략화된 억부용신(抑扶用神) 결과</strong>입니다. 실제 정밀한 용신 판단은 사주 전체의 조후(調候 - 계절의 조화), 통관(通關 - 막힌 기운 소통), 병약(病藥 - 사주의 문제점과 해결책) 등 다양한 요소를 종합적으로 고려해야 하므로, 본 결과는 참고용으로만 활용하시고 중요한 판단은 반드시 사주 전문가와 상의하시기 바랍니다.</div>"""
+
+# ───────────────────────────────
+# 명식 키
+# ───────────────────────────────
+def report_key(pillars, caption, gender, birth_dt, target_date, profile_key="default", sections=REPORT_SECTIONS, profile_version=None):
+    """
+    세션에 저장하는 명식 키 (문자열/정수로만 된 hashable tuple, 약 1KB).
+    pillars: 연/월/일/시 순서 [(간지 문자열, 천간, 지지)] - 간지 문자열만 저장 (계산 오류면 "오류(...)")
+    caption: 명식 표 아래 설명 (사주 기준 연도, 보정 내용) / birth_dt: 보정된 출생 시각 / target_date: 운세 기준일 (연, 월, 일)
+    sections: 풀이에 넣을 섹션 이름 (REPORT_SECTIONS 순서의 비트 마스크로 저장)
+    profile_version: saju_rules.profile_version(규칙 모듈) - 프로필 파일이 바뀌면 키도 달라져 공유 캐시의 이전 풀이를 쓰지 않음
+    """
+    mask = sum(1 << i for i, name in enumerate(REPORT_SECTIONS) if name in sections)
+    return (tuple(pillar[0] for pillar in pillars), caption, gender, birth_dt.isoformat(timespec="minutes"),
+            tuple(target_date), profile_key, mask, profile_version)
+
+def key_pillars(key):
+    """명식 키의 연/월/일/시 [(간지 문자열, 천간, 지지)] (오류 기둥은 천간/지지가 빈 문자열)."""
+    return [(ganji, "", "") if "오류" in ganji or len(ganji) != 2 else (ganji, ganji[0], ganji[1]) for ganji in key[0]]
+
+def key_sections(key):
+    return tuple(name for i, name in enumerate(REPORT_SECTIONS) if key[6] >> i & 1)
+
+def key_chart(key):
+    """명식 키의 8글자 dict (saju_8char_details 형식)."""
+    chart = {}
+    for pillar, (_, gan, ji) in zip(engine.PILLAR_KEYS, key_pillars(key)):
+        chart[f"{pillar}_gan"], chart[f"{pillar}_ji"] = gan, ji
+    return chart
+
+# ───────────────────────────────
+# 표
+# ───────────────────────────────
+def myeongshik_table(pillars):
+    """연/월/일/시 [(간지 문자열, 천간, 지지)] -> 사주 명식 표 (saju_table, "구분" 행 이름 + 시주, 일주, 월주, 연주 열)."""
+    day_gan = pillars[2][1]
+    columns = {}
+    for column, (pillar_str, gan, ji) in zip(("연주", "월주", "일주", "시주"), pillars):
+        error = "오류" in pillar_str
+        ilgan_potae = "?"
+        if day_gan and ji and ji not in ["?", "오류"]:
+            ilgan_potae = engine.get_12_unseong(day_gan, ji)
+        columns[column] = [gan if gan and not error else "?", ji if ji and not error else "?", pillar_str if not error else "오류",
+                           engine.get_12_unseong(gan, ji), ilgan_potae]
+    ms_data = {"구분": ["천간", "지지", "간지", "12운성 궁위포태", f"일간({day_gan})기준 포태"]}
+    ms_data.update((column, columns[column]) for column in ("시주", "일주", "월주", "연주"))
+    return saju_table.from_columns(ms_data, index="구분")
+
+def daewoon_rows(daewoon):
+    """대운 섹션 값 (get_daewoon 반환값) -> (시작 나이 문구, 대운 표). 오류면 (오류 문구, None)."""
+    daewoon_text_list, start_age, is_sunhaeng = daewoon
+    if isinstance(daewoon_text_list, list) and daewoon_text_list and "오류" in daewoon_text_list[0]:
+        return daewoon_text_list[0], None
+    if isinstance(daewoon_text_list, list) and all(":" in item for item in daewoon_text_list):
+        return (f"대운 시작 나이: 약 {start_age}세 ({'순행' if is_sunhaeng else '역행'})",
+                saju_table.make_table(["주기(나이)", "간지"], [(item.split(':')[0], item.split(': ')[1]) for item in daewoon_text_list]))
+    return "대운 정보를 올바르게 가져오지 못했습니다.", None
+
+def strength_table(label, strengths, order):
+    """오행/십신 세력 dict -> [label, "세력"] 표 (order 순서, 없는 항목은 0.0)."""
+    return saju_table.make_table([label, "세력"], [(k, float(strengths.get(k, 0.0))) for k in order])
+
+def unse_tables(chart):
+    """LazyChart의 세운/일운/월운 섹션 -> (세운 표, 일운 표, 월운 표)."""
+    return (saju_table.make_table(["연도", "간지"], chart["seun"]),
+            saju_table.make_table(["날짜", "간지"], chart["ilun"]),
+            saju_table.make_table(["연월", "간지"], chart["wolun"]))
+
+# ───────────────────────────────
+# 세그먼트 생성
+# ───────────────────────────────
+def build_segments(key, solar_data, rules=None):
+    """
+    명식 키로 "다시 보기" 패널의 [(제목, Markdown 내용)] 목록을 만듭니다 (화면 표시 순서, key의 섹션만).
+    rules: 엔진 또는 saju_rules 프로필 모듈 (기본: 키의 프로필, 읽기 실패 시 엔진)
+    """
+    _, caption, gender, birth_iso, (ty, tm, td), profile_key, _, _ = key
+    pillars, sections = key_pillars(key), key_sections(key)
+    if rules is None:
+        import saju_rules
+        rules = saju_rules.get_profile(profile_key) or engine
+    chart = engine.LazyChart(key_chart(key), rules, gender=gender, birth_dt=datetime.fromisoformat(birth_iso),
+                             solar_data=solar_data, target_date=(ty, tm, td))
+    day_gan = pillars[2][1]
+    segments = [("📜 사주 명식", saju_table.to_markdown(myeongshik_table(pillars)) + "\n" + caption)]
+
+    analysis_possible = chart.analysis_possible
+    ohaeng, sipshin = {}, {}
+    if analysis_possible and {"ohaeng", "sipshin", "shinkang_gekuk", "yongshin", "guideline"} & set(sections):
+        try:
+            ohaeng, sipshin = chart["strengths"]
+        except Exception:
+            analysis_possible = False
+
+    for name, title, label, strengths, order, summary in (
+            ("ohaeng", "🌳🔥 오행(五行) 분석", "오행", ohaeng, OHENG_ORDER, lambda: engine.get_ohaeng_summary_explanation(ohaeng)),
+            ("sipshin", "🌟 십신(十神) 분석", "십신", sipshin, SIPSHIN_ORDER, lambda: engine.get_sipshin_summary_explanation(sipshin, day_gan))):
+        if name not in sections:
+            continue
+        if strengths and analysis_possible:
+            table = saju_table.to_markdown(strength_table(label, strengths, order))
+            segments += [(title, strip_html_tags(summary())), (f"{label} 세력표", table)]
+        else:
+            segments += [(title, f"{label} 분석 정보 없음"), (f"{label} 세력표", "세력표 정보 없음")]
+
+    shinkang, gekuk, shinkang_html, gekuk_html = "분석 정보 없음", "분석 정보 없음", "", ""
+    if {"shinkang_gekuk", "yongshin", "guideline"} & set(sections) and analysis_possible and ohaeng and sipshin:
+        try:
+            shinkang = chart["shinkang"]
+            shinkang_html = engine.get_shinkang_explanation(shinkang)
+            gekuk = chart["gekuk"]
+            gekuk_html = engine.get_gekuk_explanation(gekuk)
+        except Exception:
+            shinkang, gekuk = "분석 오류", "분석 오류"
+    if "shinkang_gekuk" in sections:
+        segments.append(("💪 일간 강약", f"**{shinkang}**\n{strip_html_tags(shinkang_html)}"))
+        segments.append(("💪 격국(格局) 분석", f"**{gekuk}**\n{strip_html_tags(gekuk_html)}"))
+
+    if "hap_chung" in sections:
+        parts = []
+        if analysis_possible and day_gan:
+            try:
+                found = chart["hap_chung"]
+                if any(v for v in found.values()):
+                    parts += [f"**{kind}**\n" + "\n".join(f"- {item}" for item in items) for kind, items in found.items() if items]
+                    parts.append(f"\n**설명:**\n{strip_html_tags(engine.get_hap_chung_detail_explanation(found))}")
+                else:
+                    parts.append("특별히 두드러지는 합충형해파의 관계가 나타나지 않습니다. 비교적 안정적인 구조일 수 있습니다.")
+            except Exception:
+                parts.append("합충형해파 분석 중 오류 발생")
+        else:
+            parts.append("사주 정보가 부족하여 합충형해파 분석을 수행할 수 없습니다.")
+        segments.append(("🤝💥 합충형해파 분석", "\n\n".join(parts)))
+
+    if "shinsal" in sections:
+        parts = []
+        if analysis_possible and day_gan:
+            try:
+                found = chart["shinsal"]
+                if found:
+                    parts.append("**발견된 주요 신살:**\n" + "\n".join(f"- {item}" for item in found))
+                    parts.append(f"\n**설명:**\n{strip_html_tags(engine.get_shinsal_detail_explanation(found))}")
+                else:
+                    parts.append("특별히 나타나는 주요 신살이 없습니다.")
+            except Exception:
+                parts.append("신살 분석 중 오류 발생")
+        else:
+            parts.append("사주 정보가 부족하여 신살 분석을 수행할 수 없습니다.")
+        segments.append(("🔮 주요 신살(神煞) 분석", "\n\n".join(parts)))
+
+    if "yongshin" in sections:
+        text, gaewoon = "용신/기신 분석 정보 없음", ""
+        if analysis_possible and shinkang not in ["분석 정보 없음", "분석 오류", "계산 불가"] and day_gan:
+            try:
+                info = chart["yongshin"]
+                gaewoon_html = engine.get_gaewoon_tips_html(info["yongshin"])
+                text = strip_html_tags(info.get("html", "분석 정보 없음"))
+                if info.get("yongshin"):
+                    gaewoon = strip_html_tags(gaewoon_html)
+            except Exception:
+                pass
+        segments.append(("☯️ 용신(喜神) 및 기신(忌神) 분석 (간략)", text + ("\n\n" + gaewoon if gaewoon else "")))
+        segments.append(("용신/기신 참고사항", strip_html_tags(YONGSHIN_NOTICE_HTML)))
+
+    if "daewoon" in sections:
+        month_pillar = pillars[1]
+        if "오류" in month_pillar[0] or not month_pillar[1] or not month_pillar[2]:
+            parts = ["월주 계산에 오류가 있어 대운을 표시할 수 없습니다."]
+        else:
+            start_info, table = daewoon_rows(chart["daewoon"])
+            parts = [start_info] + ([saju_table.to_markdown(table)] if table else [])
+        segments.append((f"運 대운 ({gender})", "\n".join(parts)))
+
+    if "unse" in sections:
+        seun, ilun, wolun = (saju_table.to_markdown(table) for table in unse_tables(chart))
+        segments.append((f"📅 기준일({ty}년 {tm}월 {td}일) 운세", "\n".join([
+            f"**歲 세운 ({ty}년~)**\n{seun}",
+            f"\n**日 일운 ({ty}-{tm:02d}-{td:02d}~)**\n{ilun}",
+            f"\n**月 월운 ({ty}년 {tm:02d}월~)**\n{wolun}"])))
+    return segments
+
+# ───────────────────────────────
+# 세션 상태 크기 측정
+# ───────────────────────────────
+def deep_sizeof(value, seen=None):
+    """컨테이너 안의 객체까지 합친 대략적인 메모리 크기 (바이트, 같은 객체는 한 번만)."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in value)
+    return size
+
+def measure_session_state(n=200, seed=7):
+    """임의 명식 n개에 대해 세션당 상태 크기 {"segments": [바이트], "key": [바이트]} (Markdown 사본 vs 명식 키)."""
+    import random
+    import saju_compat
+
+    solar_data = engine.load_solar_terms(engine.FILE_NAME, lambda level, message: None)
+    rng = random.Random(seed)
+    sizes = {"segments": [], "key": []}
+    for chart in saju_compat.random_charts(n, seed):
+        pillars = [(chart[f"{p}_gan"] + chart[f"{p}_ji"], chart[f"{p}_gan"], chart[f"{p}_ji"]) for p in engine.PILLAR_KEYS]
+        birth_dt = datetime(rng.randrange(1950, 2010), rng.randrange(1, 13), rng.randrange(1, 29), rng.randrange(24), rng.randrange(60))
+        key = report_key(pillars, f"사주 기준 연도 (입춘 기준): {birth_dt.year}년", rng.choice(("남성", "여성")), birth_dt, (2026, 10, 19))
+        sizes["segments"].append(deep_sizeof(build_segments(key, solar_data, engine)))
+        sizes["key"].append(deep_sizeof(key))
+    return sizes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="풀이 텍스트 세그먼트 생성 / 세션 상태 크기 측정")
+    parser.add_argument("--measure", type=int, metavar="N", default=200, help="임의 명식 N개로 세션당 상태 크기 비교 (기본 200)")
+    args = parser.parse_args(argv)
+
+    import statistics
+    sizes = measure_session_state(args.measure)
+    for label, name in (("Markdown 사본 (interpretation_segments)", "segments"), ("명식 키 (interpretation_key)", "key")):
+        values = sizes[name]
+        print(f"{label:<40} 중앙값 {statistics.median(values):>8,.0f} B  최대 {max(values):>8,} B")
+    ratio = statistics.median(sizes["segments"]) / statistics.median(sizes["key"])
+    print(f"세션당 약 {ratio:.0f}배 절감 (동시 세션 1,000개 기준 {statistics.median(sizes['segments']) * 1000 / 2**20:.1f} MiB -> "
+          f"{statistics.median(sizes['key']) * 1000 / 2**20:.2f} MiB)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
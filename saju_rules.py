@@ -0,0 +1,287 @@
+# 해석 규칙 프로필 - 학파별 규칙표를 데이터 파일(rule_profiles/*.json)로 정의해 엔진에 바인딩
+# 프로필은 엔진 규칙표(JIJI_JANGGAN, POSITIONAL_WEIGHTS, SHINKANG_THRESHOLDS, 신살 맵 등) 중 바꿀 것만 적습니다.
+# get_profile(key)는 그 표를 엔진과 같은 형태로 한 번 변환(컴파일)하고, 엔진 함수들을 새 표를 보도록 다시 묶은
+# 모듈 객체를 돌려줍니다. 코드 사본 없이 한 프로세스에서 여러 학파를 요청별로 골라 쓸 수 있습니다.
+#   rules = saju_rules.get_profile("extended")
+#   rules.analyze_shinsal(chart); rules.determine_shinkang_shinyak(sipshin)
+# 파일이 바뀌면 다음 get_profile 호출에서 자동으로 다시 컴파일합니다 (프로세스 재시작 불필요).
+#
+# 프로필 파일 형식 (JSON):
+#   {"name": "표시 이름", "description": "설명", "extends": "다른 프로필 키(선택)",
+#    "tables": {"규칙표 이름": 값, ...}, "replace": ["dict 표를 통째로 바꿀 이름", ...]}
+#   - dict 표는 키 단위로 덮어쓰고(replace에 적으면 통째로 교체), list 표는 통째로 교체합니다.
+#   - 지지/천간 쌍·삼합처럼 엔진에서 튜플인 키/원소는 "자유", "신자진"처럼 글자를 이어 쓴 문자열로 적습니다.
+# 검증: python saju_rules.py            # 모든 프로필 컴파일 및 기본값 대비 바뀐 표 출력
+
+import argparse
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import types
+
+import saju_engine as engine
+
+RULE_PROFILE_DIR_ENV = "SAJU_RULE_PROFILE_DIR" # 미설정 시 이 모듈 옆의 rule_profiles/
+DEFAULT_PROFILE = "default" # 엔진 내장 규칙 (saju_engine 모듈 그대로)
+DEFAULT_PROFILE_LABEL = "기본 (엔진 내장 규칙)"
+
+# 프로필에서 바꿀 수 있는 규칙표 (달력/간지 자체 같은 고정 정의는 제외)
+RULE_TABLE_NAMES = (
+    # 오행/십신 세력, 신강약, 격국
+    "JIJI_JANGGAN", "POSITIONAL_WEIGHTS", "SHINKANG_THRESHOLDS",
+    "SIPSHIN_TO_GYEOK_MAP", "L_NOK_MAP", "YANGIN_JI_MAP",
+    # 합충형해파
+    "CHEONGAN_HAP_RULES", "JIJI_SAMHAP_RULES", "JIJI_BANHAP_WANGJI_CENTERED_RULES", "JIJI_BANGHAP_RULES",
+    "JIJI_YUKHAP_RULES", "CHEONGAN_CHUNG_RULES", "JIJI_CHUNG_RULES",
+    "SAMHYEONG_RULES", "SANGHYEONG_RULES", "JAHYEONG_CHARS", "JIJI_HAE_RULES", "JIJI_PA_RULES",
+    # 신살 (SHINSAL_RULES에 규칙 한 줄을 더하면 새 신살 추가)
+    "SHINSAL_RULES", "CHEONEULGWIIN_MAP", "MUNCHANGGWIIN_MAP", "DOHWASAL_MAP", "YEONGMASAL_MAP", "HWAGAESAL_MAP",
+    "GOEGANGSAL_ILJU_LIST", "BAEKHODAESAL_GANJI_LIST", "GWIMUNGWANSAL_PAIRS",
+)
+
+_lock = threading.Lock()
+_compiled = {} # 프로필 키 -> (읽은 파일 목록, 파일 서명, 프로필 모듈)
+
+def profile_dir():
+    return os.environ.get(RULE_PROFILE_DIR_ENV) or os.path.join(os.path.dirname(os.path.abspath(__file__)), "rule_profiles")
+
+def _profile_path(key):
+    return os.path.join(profile_dir(), f"{key}.json")
+
+def _signature(paths):
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        signature.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+# ───────────────────────────────
+# 규칙표 변환 (JSON 값 -> 엔진 기본값과 같은 형태)
+# ───────────────────────────────
+def _tuple_from(value, sort, where):
+    if isinstance(value, str):
+        items = list(value)
+    elif isinstance(value, list) and all(isinstance(v, str) for v in value):
+        items = value
+    else:
+        raise ValueError(f"{where}: 글자 묶음은 \"자유\" 같은 문자열이나 문자열 배열이어야 합니다. (받은 값: {value!r})")
+    return tuple(sorted(items)) if sort else tuple(items)
+
+def _coerce(default, value, where):
+    """엔진 기본값 default의 형태(키/원소 타입, 튜플 정렬 여부)에 맞춰 JSON 값을 변환합니다. 맞지 않으면 ValueError."""
+    if isinstance(default, dict):
+        if not isinstance(value, dict):
+            raise ValueError(f"{where}: 객체(dict)여야 합니다.")
+        if not default:
+            return dict(value)
+        sample_key, sample_value = next(iter(default.items()))
+        if isinstance(sample_key, tuple):
+            sort = all(k == tuple(sorted(k)) for k in default)
+            convert_key = lambda k: _tuple_from(k, sort, f"{where}의 키 {k!r}")
+        elif isinstance(sample_key, int):
+            convert_key = int
+        else:
+            convert_key = str
+        return {convert_key(k): _coerce(sample_value, v, f"{where}[{k}]") for k, v in value.items()}
+    if isinstance(default, tuple):
+        return _tuple_from(value, default == tuple(sorted(default)), where)
+    if isinstance(default, list):
+        if not isinstance(value, list):
+            raise ValueError(f"{where}: 배열(list)이어야 합니다.")
+        if not default:
+            return list(value)
+        sample = default[0]
+        if isinstance(sample, tuple):
+            sort = all(item == tuple(sorted(item)) for item in default)
+            return [_tuple_from(item, sort, f"{where}[{i}]") for i, item in enumerate(value)]
+        return [_coerce(sample, item, f"{where}[{i}]") for i, item in enumerate(value)]
+    if isinstance(default, (int, float)) and not isinstance(default, bool):
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise ValueError(f"{where}: 숫자여야 합니다. (받은 값: {value!r})")
+        return float(value) if isinstance(default, float) else value
+    if isinstance(default, str):
+        if not isinstance(value, str):
+            raise ValueError(f"{where}: 문자열이어야 합니다. (받은 값: {value!r})")
+        return value
+    return value
+
+def compile_tables(data, base_tables, where):
+    """프로필 JSON의 tables/replace를 base_tables(규칙표 이름 -> 값) 위에 적용한 새 규칙표 dict."""
+    tables = dict(base_tables)
+    overrides = data.get("tables", {})
+    replace = set(data.get("replace", ()))
+    unknown = sorted((set(overrides) | replace) - set(RULE_TABLE_NAMES))
+    if unknown:
+        raise ValueError(f"{where}: 프로필에서 바꿀 수 없는 규칙표: {', '.join(unknown)}")
+    for name, value in overrides.items():
+        compiled = _coerce(getattr(engine, name), value, f"{where} {name}")
+        if isinstance(compiled, dict) and name not in replace:
+            compiled = {**tables[name], **compiled}
+        tables[name] = compiled
+    return tables
+
+def table_warnings(tables):
+    """형식은 맞지만 의심스러운 값 (지장간 비율 합이 1이 아닌 지지, 알 수 없는 글자 등)."""
+    warnings = []
+    for ji, proportions in tables["JIJI_JANGGAN"].items():
+        if ji not in engine.JI or any(gan not in engine.GAN for gan in proportions):
+            warnings.append(f"JIJI_JANGGAN[{ji}]: 알 수 없는 지지/천간")
+        elif abs(sum(proportions.values()) - 1.0) > 1e-6:
+            warnings.append(f"JIJI_JANGGAN[{ji}]: 지장간 비율 합이 {sum(proportions.values()):.2f}")
+    missing = set(engine.POSITIONAL_WEIGHTS) - set(tables["POSITIONAL_WEIGHTS"])
+    if missing:
+        warnings.append(f"POSITIONAL_WEIGHTS: 위치 누락 {', '.join(sorted(missing))}")
+    return warnings
+
+# ───────────────────────────────
+# 엔진 함수 재바인딩
+# ───────────────────────────────
+def _rebind(func, namespace):
+    """엔진 함수 func를 namespace를 전역으로 보는 복제본으로 만듭니다. saju_metrics.timed 래퍼는 유지합니다."""
+    inner = inspect.unwrap(func)
+    clone = types.FunctionType(inner.__code__, namespace, inner.__name__, inner.__defaults__, inner.__closure__)
+    clone.__kwdefaults__, clone.__qualname__, clone.__doc__ = inner.__kwdefaults__, inner.__qualname__, inner.__doc__
+    clone.__annotations__ = dict(inner.__annotations__)
+    if func is inner:
+        return clone
+    # 데코레이터 래퍼: 클로저 안의 원래 함수만 복제본으로 바꿔 끼움 (계측 단계 이름 등은 그대로)
+    cells = tuple(types.CellType(clone) if cell.cell_contents is inner else cell for cell in func.__closure__)
+    wrapper = types.FunctionType(func.__code__, func.__globals__, func.__name__, func.__defaults__, cells)
+    return functools.update_wrapper(wrapper, clone)
+
+def build_profile_module(key, tables, label="", description=""):
+    """규칙표 tables를 쓰는 엔진 모듈 대용 객체. saju_engine의 모든 이름을 가지며, 엔진 함수는 이 객체의 표를 참조합니다."""
+    module = types.ModuleType(f"{engine.__name__}@{key}")
+    namespace = module.__dict__
+    namespace.update({name: value for name, value in vars(engine).items() if not name.startswith("__")})
+    namespace.update(__file__=engine.__file__, __builtins__=engine.__builtins__, RULE_PROFILE_KEY=key, RULE_PROFILE_LABEL=label or key,
+                     RULE_PROFILE_DESCRIPTION=description)
+    namespace.update(tables)
+    for name, value in vars(engine).items():
+        if isinstance(value, types.FunctionType) and inspect.unwrap(value).__module__ == engine.__name__:
+            namespace[name] = _rebind(value, namespace)
+    return module
+
+def profile_label(module):
+    """프로필 모듈의 표시 이름 (기본 프로필은 saju_engine 모듈 자체)."""
+    return getattr(module, "RULE_PROFILE_LABEL", DEFAULT_PROFILE_LABEL)
+
+# ───────────────────────────────
+# 프로필 조회 / 핫 리로드
+# ───────────────────────────────
+def _read_profile(key):
+    path = _profile_path(key)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: 최상위 값은 객체여야 합니다.")
+    return path, data
+
+def _compile_profile(key):
+    """extends 사슬을 따라 기본 규칙부터 차례로 적용. 반환: (읽은 파일 목록, 모듈, 경고 목록)"""
+    chain, seen = [], set()
+    current = key
+    while current and current != DEFAULT_PROFILE:
+        if current in seen:
+            raise ValueError(f"프로필 extends 순환: {' -> '.join(k for k, _, _ in chain)} -> {current}")
+        seen.add(current)
+        path, data = _read_profile(current)
+        chain.append((current, path, data))
+        current = data.get("extends")
+    tables = {name: getattr(engine, name) for name in RULE_TABLE_NAMES}
+    for current, path, data in reversed(chain):
+        tables = compile_tables(data, tables, os.path.basename(path))
+    data = chain[0][2]
+    module = build_profile_module(key, tables, data.get("name", key), data.get("description", ""))
+    module.compiled_shinsal_rules() # 신살 규칙 문법/참조 오류를 컴파일 시점에 드러냄 (ValueError)
+    return [path for _, path, _ in chain], module, table_warnings(tables)
+
+def get_profile(key=DEFAULT_PROFILE, report=engine._print_report):
+    """
+    규칙 프로필 모듈. 파일(및 extends로 잇는 파일)이 바뀌었으면 다시 컴파일합니다.
+    다시 컴파일에 실패하면 경고를 알리고 직전에 성공한 버전을 계속 씁니다. 처음부터 실패하면 오류를 알리고 None.
+    """
+    if not key or key == DEFAULT_PROFILE:
+        return engine
+    cached = _compiled.get(key)
+    if cached is not None and _signature(cached[0]) == cached[1]:
+        return cached[2]
+    with _lock:
+        cached = _compiled.get(key)
+        if cached is not None and _signature(cached[0]) == cached[1]:
+            return cached[2]
+        try:
+            paths, module, warnings = _compile_profile(key)
+        except FileNotFoundError as e:
+            message = f"규칙 프로필 '{key}' 파일을 찾을 수 없습니다: {e.filename}"
+        except (ValueError, json.JSONDecodeError) as e:
+            message = f"규칙 프로필 '{key}'을 읽을 수 없습니다: {e}"
+        else:
+            for warning in warnings:
+                report("warning", f"규칙 프로필 '{key}': {warning}")
+            _compiled[key] = (paths, _signature(paths), module)
+            return module
+        if cached is not None:
+            report("warning", f"{message} (이전 버전을 계속 사용)")
+            return cached[2]
+        report("error", message)
+        return None
+
+def profile_version(module):
+    """
+    규칙 모듈의 버전: 프로필이면 컴파일할 때 읽은 파일 서명((경로, mtime, 크기) 튜플), 기본 규칙(엔진)은 None.
+    파일이 바뀌어 다시 컴파일되면 값이 달라지므로 풀이 캐시 키에 넣어 이전 규칙의 결과를 다시 쓰지 않게 합니다.
+    """
+    for _, signature, compiled in list(_compiled.values()):
+        if compiled is module:
+            return signature
+    return None
+
+def reload_profiles():
+    """컴파일된 프로필을 모두 버립니다. 다음 get_profile 호출에서 파일을 다시 읽습니다."""
+    with _lock:
+        _compiled.clear()
+
+def list_profiles():
+    """[(키, 표시 이름, 설명)] - 기본 프로필이 먼저, 나머지는 파일 이름 순. 읽을 수 없는 파일은 설명에 오류를 적습니다."""
+    profiles = [(DEFAULT_PROFILE, DEFAULT_PROFILE_LABEL, "")]
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return profiles
+    for file_name in sorted(os.listdir(directory)):
+        key, ext = os.path.splitext(file_name)
+        if ext != ".json" or key == DEFAULT_PROFILE:
+            continue
+        try:
+            _, data = _read_profile(key)
+            profiles.append((key, data.get("name", key), data.get("description", "")))
+        except (OSError, ValueError) as e:
+            profiles.append((key, key, f"오류: {e}"))
+    return profiles
+
+def changed_tables(module):
+    """프로필 모듈에서 기본 규칙과 내용이 다른 규칙표 이름 목록."""
+    return [name for name in RULE_TABLE_NAMES if getattr(module, name) != getattr(engine, name)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="규칙 프로필 컴파일 점검")
+    parser.add_argument("profiles", nargs="*", help="점검할 프로필 키 (기본: 전체)")
+    args = parser.parse_args(argv)
+    keys = args.profiles or [key for key, _, _ in list_profiles() if key != DEFAULT_PROFILE]
+    failed = 0
+    for key in keys:
+        module = get_profile(key)
+        if module is None:
+            failed += 1
+            continue
+        print(f"{key}: {profile_label(module)} - 바뀐 규칙표: {', '.join(changed_tables(module)) or '없음'}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
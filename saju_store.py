@@ -0,0 +1,342 @@
+# 사주 명식 저장소 (SQLite) - 규칙표 버전별 분석 결과 보관과 증분 재계산
+# 분석 결과(오행/십신 세력, 신강약, 격국, 용신, 합충, 신살)마다 "규칙 버전"을 함께 저장합니다.
+# 규칙 버전 = 해당 분석 함수(및 호출하는 엔진 함수)의 소스 + 참조하는 규칙표(POSITIONAL_WEIGHTS, JIJI_JANGGAN 등)의
+#             내용 + 입력으로 쓰는 상위 분석 결과의 버전을 해시한 값.
+# 규칙표를 고치면 그 표를 참조하는 분석과 그 하위 분석만 버전이 바뀌고, refresh()는 버전이 다른 결과만 배치로 다시 계산합니다.
+# 사용:
+#   python saju_store.py store.db --import customers.csv   # 명식 가져오기 (saju_daily.py와 같은 CSV 형식)
+#   python saju_store.py store.db --status                 # 분석별 현재 버전, 재계산 대상 수, 바뀐 규칙표
+#   python saju_store.py store.db --refresh [--outputs shinsal,hap_chung] [--batch-size 2000] [--profile extended]
+
+import argparse
+import hashlib
+import inspect
+import json
+import re
+import sqlite3
+import sys
+import time
+import types
+
+import saju_engine as engine
+from saju_engine import PILLAR_KEYS
+
+CHART_COLUMNS = [f"{pillar}_{part}" for pillar in PILLAR_KEYS for part in ("gan", "ji")]
+DEFAULT_BATCH_SIZE = 2000
+_TABLE_NAME_PATTERN = re.compile(r"\b[A-Z_][A-Z0-9_]+\b")
+
+# ───────────────────────────────
+# 분석 결과 정의
+# ───────────────────────────────
+# 이름 -> (엔진 함수, 입력으로 쓰는 상위 분석, 호출기). 호출기는 (fn, ctx)를 받으며
+# ctx는 {"chart": saju_8char_details, <상위 분석 이름>: 저장된 값} 입니다. 상위 분석이 먼저 오도록 나열합니다.
+ANALYSIS_OUTPUTS = {
+    "strengths": (engine.calculate_ohaeng_sipshin_strengths, (), lambda fn, c: fn(c["chart"])),
+    "shinkang": (engine.determine_shinkang_shinyak, ("strengths",), lambda fn, c: fn(c["strengths"][1])),
+    "gekuk": (engine.determine_gekuk, ("strengths",),
+              lambda fn, c: fn(c["chart"]["day_gan"], c["chart"]["month_gan"], c["chart"]["month_ji"], c["strengths"][1])),
+    "yongshin": (engine.determine_yongshin_gishin_simplified, ("shinkang",), lambda fn, c: fn(c["chart"]["day_gan"], c["shinkang"])),
+    "hap_chung": (engine.analyze_hap_chung_interactions, (), lambda fn, c: fn(c["chart"])),
+    "shinsal": (engine.analyze_shinsal, (), lambda fn, c: fn(c["chart"])),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS charts (
+    customer_id TEXT PRIMARY KEY,
+    {chart_columns},
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analyses (
+    customer_id TEXT NOT NULL REFERENCES charts(customer_id) ON DELETE CASCADE,
+    output TEXT NOT NULL,
+    rule_version TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (customer_id, output)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS analyses_by_version ON analyses (output, rule_version);
+CREATE TABLE IF NOT EXISTS rule_versions (
+    output TEXT NOT NULL,
+    rule_version TEXT NOT NULL,
+    tables TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (output, rule_version)
+);
+""".format(chart_columns=",\n    ".join(f"{column} TEXT" for column in CHART_COLUMNS))
+
+# ───────────────────────────────
+# 규칙 의존성 / 버전
+# ───────────────────────────────
+def _code_objects(code):
+    yield code
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from _code_objects(const)
+
+def rule_dependencies(func, rules=engine):
+    """
+    func가 (직접 또는 호출하는 엔진 함수를 통해) 참조하는 엔진 규칙표 이름과 엔진 함수 목록.
+    규칙표는 엔진(또는 saju_rules 프로필 모듈 rules)의 대문자 이름 전역 상수입니다. 반환: (규칙표 이름 정렬 목록, 함수 목록)
+    """
+    tables, functions, pending = set(), [], [inspect.unwrap(func)]
+    while pending:
+        fn = pending.pop()
+        if fn in functions:
+            continue
+        functions.append(fn)
+        for code in _code_objects(fn.__code__):
+            for name in code.co_names:
+                value = getattr(rules, name, None)
+                if value is None or isinstance(value, types.ModuleType):
+                    continue
+                if callable(value) and getattr(inspect.unwrap(value), "__module__", None) == rules.__name__:
+                    pending.append(inspect.unwrap(value))
+                elif name.isupper() and not name.startswith("_"): # 밑줄 이름은 내부 캐시/보조 상수
+                    tables.add(name)
+    pending = list(tables)
+    while pending: # 규칙 문자열 안에서 이름으로 참조하는 표 (예: SHINSAL_RULES의 "... : DOHWASAL_MAP")
+        for name in _TABLE_NAME_PATTERN.findall(_canonical(getattr(rules, pending.pop()))):
+            value = getattr(rules, name, None)
+            if name not in tables and value is not None and not callable(value) and not isinstance(value, types.ModuleType):
+                tables.add(name)
+                pending.append(name)
+    return sorted(tables), functions
+
+def _canonical(value):
+    """dict/set 순서와 무관하게 같은 내용이면 같은 문자열이 되도록 정규화합니다."""
+    if isinstance(value, dict):
+        return "{" + ",".join(sorted(f"{_canonical(k)}:{_canonical(v)}" for k, v in value.items())) + "}"
+    if isinstance(value, (set, frozenset)):
+        return "{" + ",".join(sorted(_canonical(v) for v in value)) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_canonical(v) for v in value) + "]"
+    return repr(value)
+
+def table_fingerprint(name, rules=engine):
+    return hashlib.sha256(_canonical(getattr(rules, name)).encode("utf-8")).hexdigest()[:16]
+
+def current_rule_versions(rules=engine):
+    """
+    분석별 현재 규칙 버전. 반환: {분석 이름: {"version", "tables": {규칙표: 지문}, "upstream"}}
+    rules(엔진 또는 saju_rules 프로필 모듈)의 현재 값으로 매번 계산하므로 규칙표를 바꾸거나 프로필을 바꾸면 반영됩니다.
+    """
+    versions = {}
+    for output, (func, upstream, _) in ANALYSIS_OUTPUTS.items():
+        tables, functions = rule_dependencies(getattr(rules, func.__name__), rules)
+        fingerprints = {name: table_fingerprint(name, rules) for name in tables}
+        digest = hashlib.sha256()
+        for fn in sorted(functions, key=lambda f: f.__qualname__):
+            digest.update(inspect.getsource(fn).encode("utf-8"))
+        digest.update(_canonical(fingerprints).encode("utf-8"))
+        for name in upstream:
+            digest.update(versions[name]["version"].encode("utf-8"))
+        versions[output] = {"version": digest.hexdigest()[:16], "tables": fingerprints, "upstream": upstream}
+    return versions
+
+def downstream_outputs(outputs):
+    """outputs와, 이를 입력으로 쓰는 하위 분석 전체 (ANALYSIS_OUTPUTS 순서)."""
+    selected = set(outputs)
+    for output, (_, upstream, _) in ANALYSIS_OUTPUTS.items():
+        if selected.intersection(upstream):
+            selected.add(output)
+    return [output for output in ANALYSIS_OUTPUTS if output in selected]
+
+# ───────────────────────────────
+# 저장소 열기 / 명식 저장
+# ───────────────────────────────
+def open_store(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(_SCHEMA)
+    return conn
+
+def put_charts(conn, customers):
+    """
+    (customer_id, chart) 목록을 저장합니다. 명식이 바뀐 고객은 기존 분석 결과를 지워 다음 refresh에서 다시 계산되게 합니다.
+    반환: 새로 쓰거나 바뀐 고객 수
+    """
+    customers = list(customers)
+    existing = {}
+    for start in range(0, len(customers), 500):
+        ids = [customer_id for customer_id, _ in customers[start:start + 500]]
+        rows = conn.execute(f"SELECT customer_id, {', '.join(CHART_COLUMNS)} FROM charts WHERE customer_id IN ({', '.join('?' * len(ids))})", ids)
+        existing.update((row[0], row[1:]) for row in rows)
+    changed = []
+    for customer_id, chart in customers:
+        values = tuple(chart.get(column) or None for column in CHART_COLUMNS)
+        if existing.get(customer_id) != values:
+            changed.append((customer_id, *values, time.time()))
+    with conn:
+        conn.executemany("DELETE FROM analyses WHERE customer_id = ?", [(row[0],) for row in changed if row[0] in existing])
+        conn.executemany(f"INSERT OR REPLACE INTO charts (customer_id, {', '.join(CHART_COLUMNS)}, updated_at) "
+                         f"VALUES ({', '.join('?' * (len(CHART_COLUMNS) + 2))})", changed)
+    return len(changed)
+
+def delete_chart(conn, customer_id):
+    with conn:
+        conn.execute("DELETE FROM charts WHERE customer_id = ?", (customer_id,))
+
+def _row_to_chart(row):
+    return dict(zip(CHART_COLUMNS, row))
+
+# ───────────────────────────────
+# 증분 재계산
+# ───────────────────────────────
+def _compute(output, ctx, rules=engine):
+    func, _, caller = ANALYSIS_OUTPUTS[output]
+    try:
+        value = caller(getattr(rules, func.__name__), ctx)
+    except (KeyError, ValueError, TypeError, IndexError) as e: # 기둥 누락 등
+        value = f"오류({output}분석실패:{type(e).__name__} {e})"
+    return json.loads(json.dumps(value, ensure_ascii=False)) # 저장 후 읽은 값과 같은 형태(튜플 -> 리스트)로 맞춤
+
+def stale_counts(conn, versions=None):
+    """분석별 재계산 대상(결과 없음 또는 버전 다름) 고객 수. versions: current_rule_versions() 결과 (기본: 엔진 내장 규칙)"""
+    versions = versions or current_rule_versions()
+    counts = {}
+    for output, info in versions.items():
+        counts[output] = conn.execute(
+            "SELECT COUNT(*) FROM charts c LEFT JOIN analyses a ON a.customer_id = c.customer_id AND a.output = ? "
+            "WHERE a.rule_version IS NULL OR a.rule_version != ?", (output, info["version"])).fetchone()[0]
+    return counts
+
+def changed_tables(conn, versions=None):
+    """분석별로, 저장소에 가장 최근 기록된 버전 대비 내용이 바뀐 규칙표 이름 목록."""
+    versions = versions or current_rule_versions()
+    changes = {}
+    for output, info in versions.items():
+        row = conn.execute("SELECT tables FROM rule_versions WHERE output = ? ORDER BY created_at DESC LIMIT 1", (output,)).fetchone()
+        if row is None:
+            continue
+        recorded = json.loads(row[0])
+        changes[output] = sorted(name for name in set(recorded) | set(info["tables"]) if recorded.get(name) != info["tables"].get(name))
+    return changes
+
+def refresh(conn, outputs=None, batch_size=DEFAULT_BATCH_SIZE, report=None, rules=engine):
+    """
+    버전이 현재와 다른(또는 없는) 분석 결과만 batch_size 고객 단위로 다시 계산해 저장합니다.
+    outputs를 주면 그 분석과 하위 분석만 대상으로 합니다. 상위 분석이 먼저 갱신되므로 하위 분석은 저장된 상위 값을 입력으로 씁니다.
+    rules: 규칙 프로필 모듈 (saju_rules.get_profile). 프로필을 바꾸면 그 프로필이 바꾼 표에 의존하는 분석만 다시 계산됩니다.
+    반환: {분석 이름: 다시 계산한 고객 수}
+    """
+    versions = current_rule_versions(rules)
+    targets = downstream_outputs(outputs) if outputs else list(ANALYSIS_OUTPUTS)
+    recomputed = {}
+    for output in targets:
+        version, upstream = versions[output]["version"], ANALYSIS_OUTPUTS[output][1]
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO rule_versions VALUES (?, ?, ?, ?)",
+                         (output, version, json.dumps(versions[output]["tables"], sort_keys=True), time.time()))
+        done, last_id = 0, ""
+        while True:
+            rows = conn.execute(
+                f"SELECT c.customer_id, {', '.join('c.' + column for column in CHART_COLUMNS)} FROM charts c "
+                "LEFT JOIN analyses a ON a.customer_id = c.customer_id AND a.output = ? "
+                "WHERE c.customer_id > ? AND (a.rule_version IS NULL OR a.rule_version != ?) "
+                "ORDER BY c.customer_id LIMIT ?", (output, last_id, version, batch_size)).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            contexts = {row[0]: {"chart": _row_to_chart(row[1:])} for row in rows}
+            for name in upstream:
+                ids = list(contexts)
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    for customer_id, value in conn.execute(
+                            f"SELECT customer_id, value FROM analyses WHERE output = ? AND customer_id IN ({', '.join('?' * len(chunk))})",
+                            [name, *chunk]):
+                        contexts[customer_id][name] = json.loads(value)
+            values = []
+            for customer_id, ctx in contexts.items():
+                if any(name not in ctx or isinstance(ctx[name], str) and ctx[name].startswith("오류(") for name in upstream):
+                    value = f"오류({output}분석실패:상위 분석 결과 없음)"
+                else:
+                    value = _compute(output, ctx, rules)
+                values.append((customer_id, output, version, json.dumps(value, ensure_ascii=False)))
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?)", values)
+            done += len(values)
+            if report:
+                report("INFO", f"{output}: {done}건 재계산")
+        recomputed[output] = done
+    return recomputed
+
+def get_analysis(conn, customer_id, outputs=None, fresh=True, rules=engine):
+    """
+    고객의 분석 결과 {분석 이름: 값}. fresh이면 버전이 낡은 항목은 이 고객만 즉석에서 다시 계산해 저장합니다.
+    저장된 명식이 없으면 None.
+    """
+    row = conn.execute(f"SELECT {', '.join(CHART_COLUMNS)} FROM charts WHERE customer_id = ?", (customer_id,)).fetchone()
+    if row is None:
+        return None
+    stored = {output: (version, json.loads(value)) for output, version, value in
+              conn.execute("SELECT output, rule_version, value FROM analyses WHERE customer_id = ?", (customer_id,))}
+    wanted = list(ANALYSIS_OUTPUTS)
+    if outputs:
+        needed = set(outputs)
+        for output in reversed(wanted): # 요청한 분석의 상위 분석도 필요
+            if output in needed:
+                needed.update(ANALYSIS_OUTPUTS[output][1])
+        wanted = [output for output in wanted if output in needed]
+    ctx, writes = {"chart": _row_to_chart(row)}, []
+    versions = current_rule_versions(rules) if fresh else {}
+    for output in wanted:
+        if output in stored and (not fresh or stored[output][0] == versions[output]["version"]):
+            ctx[output] = stored[output][1]
+        elif fresh:
+            ctx[output] = _compute(output, ctx, rules)
+            writes.append((customer_id, output, versions[output]["version"], json.dumps(ctx[output], ensure_ascii=False)))
+    if writes:
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?)", writes)
+    return {output: ctx[output] for output in wanted if output in ctx and (not outputs or output in outputs)}
+
+# ───────────────────────────────
+# 실행
+# ───────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="사주 명식 저장소 (규칙 버전별 분석 결과, 증분 재계산)")
+    parser.add_argument("store", help="SQLite 파일 경로")
+    parser.add_argument("--import", dest="import_file", help="명식 CSV 가져오기 (customer_id, 년주, 월주, 일주, 시주)")
+    parser.add_argument("--status", action="store_true", help="분석별 현재 버전과 재계산 대상 수 출력")
+    parser.add_argument("--refresh", action="store_true", help="버전이 바뀐 분석 결과 재계산")
+    parser.add_argument("--outputs", help=f"재계산할 분석 (쉼표 구분, 하위 분석 포함): {', '.join(ANALYSIS_OUTPUTS)}")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--profile", help="규칙 프로필 키 (rule_profiles/*.json, 기본: 엔진 내장 규칙)")
+    args = parser.parse_args(argv)
+
+    import saju_rules
+    rules = saju_rules.get_profile(args.profile)
+    if rules is None:
+        return 1
+    if args.import_file:
+        import saju_daily
+        try:
+            customers = saju_daily.load_customers(args.import_file)
+        except (OSError, ValueError) as e:
+            print(e, file=sys.stderr)
+            return 1
+    conn = open_store(args.store)
+    if args.import_file:
+        print(f"명식 {put_charts(conn, customers)}건 저장")
+    if args.refresh:
+        outputs = [name.strip() for name in args.outputs.split(",")] if args.outputs else None
+        unknown = [name for name in outputs or () if name not in ANALYSIS_OUTPUTS]
+        if unknown:
+            parser.error(f"알 수 없는 분석: {', '.join(unknown)}")
+        started = time.perf_counter()
+        recomputed = refresh(conn, outputs, args.batch_size, rules=rules)
+        print(f"재계산 완료 ({time.perf_counter() - started:.1f}초): " + ", ".join(f"{k} {v}건" for k, v in recomputed.items()))
+    if args.status or not (args.import_file or args.refresh):
+        versions = current_rule_versions(rules)
+        counts, changes = stale_counts(conn, versions), changed_tables(conn, versions)
+        total = conn.execute("SELECT COUNT(*) FROM charts").fetchone()[0]
+        print(f"명식 {total}건")
+        for output, info in versions.items():
+            changed = f"  바뀐 규칙표: {', '.join(changes[output])}" if changes.get(output) else ""
+            print(f"  {output:<10} 버전 {info['version']}  재계산 대상 {counts[output]:>8}건  규칙표 {len(info['tables'])}개{changed}")
+    conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+# 결과 표(명식/세력/대운/세운/월운/일운) 경량 모델과 렌더러
+# 요청마다 pandas DataFrame을 만들어 st.table / to_markdown()(tabulate) / to_string()에 넘기던 것을
+# 열 이름 + 행 tuple 목록만 가진 dict와 HTML/Markdown/텍스트 렌더러로 바꿉니다 (표준 라이브러리만 사용).
+# 출력 형식은 기존과 같게 맞춥니다.
+#   to_markdown: DataFrame.to_markdown() (tabulate pipe 형식, 한글 폭 2칸)
+#   to_text:     DataFrame.to_string(index=False)
+#   to_html:     st.markdown(..., unsafe_allow_html=True)용 인라인 스타일 표
+# 사용:
+#   python saju_table.py --check 500     # 임의 표 500개로 pandas/tabulate 출력과 비교 (점검에만 pandas, tabulate 필요)
+
+import argparse
+import html
+import random
+import sys
+import unicodedata
+
+# ───────────────────────────────
+# 표 모델
+# ───────────────────────────────
+def make_table(columns, rows, index=False):
+    """
+    열 이름 목록과 행(tuple) 목록으로 표를 만듭니다. rows가 None이면 빈 표입니다.
+    index=True면 첫 열을 행 이름(DataFrame.set_index 열)으로 다룹니다 (HTML에서 행 머리글로 표시).
+    """
+    return {"columns": tuple(columns), "rows": [tuple(row) for row in rows or ()], "index": index}
+
+def from_columns(data, index=None):
+    """{열 이름: 값 목록} (pd.DataFrame(dict) 형식) -> 표. index: 행 이름으로 쓸 열 이름 (맨 앞 열로 옮김)."""
+    columns = list(data)
+    if index is not None:
+        columns.remove(index)
+        columns.insert(0, index)
+    return make_table(columns, zip(*(data[column] for column in columns)), index=index is not None)
+
+def is_empty(table):
+    return not table["rows"]
+
+# ───────────────────────────────
+# 셀 값 / 폭
+# ───────────────────────────────
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _cell_text(value):
+    """tabulate 기본 서식: 실수는 format(v, "g"), 나머지는 str."""
+    if isinstance(value, float):
+        return format(value, "g")
+    return "" if value is None else str(value)
+
+def display_width(text):
+    """터미널/Markdown 표시 폭 (한글 등 전각 문자는 2칸, 결합 문자는 0칸)."""
+    width = 0
+    for char in text:
+        if unicodedata.combining(char):
+            continue
+        width += 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+    return width
+
+def _numeric_columns(table):
+    """값이 모두 숫자(int/float)인 열 위치 집합 (빈 표는 없음)."""
+    rows = table["rows"]
+    if not rows:
+        return set()
+    return {i for i in range(len(table["columns"])) if all(_is_number(row[i]) for row in rows)}
+
+def _decimal_align(texts):
+    """tabulate 소수점 정렬: 소수 자릿수를 가장 긴 값에 맞춰 오른쪽을 공백으로 채웁니다."""
+    after = [len(text) - text.find(".") - 1 if "." in text else -1 for text in texts]
+    longest = max(after)
+    return [text + " " * (longest - n) for text, n in zip(texts, after)]
+
+# ───────────────────────────────
+# 렌더러
+# ───────────────────────────────
+def to_markdown(table):
+    """pipe 형식 Markdown 표 (DataFrame.to_markdown()과 같은 출력: 숫자 열 오른쪽, 문자 열 왼쪽 정렬)."""
+    columns, rows = table["columns"], table["rows"]
+    numeric = _numeric_columns(table)
+    header_line, rule_line, body = [], [], [[] for _ in rows]
+    for i, column in enumerate(columns):
+        cells = [_cell_text(row[i]) for row in rows]
+        if i in numeric:
+            cells = _decimal_align(cells)
+        width = max([display_width(column) + 2] + [display_width(cell) for cell in cells])
+        if i in numeric:
+            pad = lambda text: " " * (width - display_width(text)) + text
+        else:
+            pad = lambda text: text + " " * (width - display_width(text))
+        header_line.append(pad(column))
+        if not rows:
+            rule_line.append("-" * (width + 2))
+        elif i in numeric:
+            rule_line.append("-" * (width + 1) + ":")
+        else:
+            rule_line.append(":" + "-" * (width + 1))
+        for line, cell in zip(body, cells):
+            line.append(pad(cell))
+    lines = ["| " + " | ".join(header_line) + " |", "|" + "|".join(rule_line) + "|"]
+    lines += ["| " + " | ".join(line) + " |" for line in body]
+    return "\n".join(lines)
+
+def to_text(table):
+    """
+    고정폭 텍스트 표 (정수/문자 열은 DataFrame.to_string(index=False)와 같은 출력).
+    모든 칸 오른쪽 정렬, 열 사이 공백 1칸, 폭은 len() 기준이며 숫자 열은 머리글 앞에 부호 자리 1칸을 둡니다.
+    """
+    columns, rows = table["columns"], table["rows"]
+    numeric = _numeric_columns(table)
+    texts = [[_cell_text(value) for value in row] for row in rows]
+    widths = [max([len(column) + (i in numeric)] + [len(row[i]) for row in texts]) for i, column in enumerate(columns)]
+    return "\n".join(" ".join(cell.rjust(width) for cell, width in zip(line, widths)) for line in [columns] + texts)
+
+TABLE_STYLE = "border-collapse: collapse; margin: 0.25rem 0 1rem 0; font-size: 0.95rem;"
+CELL_STYLE = "border: 1px solid #e5e7eb; padding: 0.35rem 0.75rem;"
+HEADER_STYLE = CELL_STYLE + " background-color: #f9fafb; color: #374151; font-weight: 600;"
+
+def to_html(table):
+    """인라인 스타일 HTML 표 (st.markdown(..., unsafe_allow_html=True)용). 숫자 열은 오른쪽 정렬합니다."""
+    columns, rows, index = table["columns"], table["rows"], table["index"]
+    numeric = _numeric_columns(table)
+    align = [" text-align: right;" if i in numeric else " text-align: left;" for i in range(len(columns))]
+    parts = [f'<table style="{TABLE_STYLE}"><thead><tr>']
+    parts += [f'<th style="{HEADER_STYLE}{align[i]}">{html.escape(column)}</th>' for i, column in enumerate(columns)]
+    parts.append("</tr></thead><tbody>")
+    for row in rows:
+        parts.append("<tr>")
+        for i, value in enumerate(row):
+            tag, style = ("th", HEADER_STYLE) if index and i == 0 else ("td", CELL_STYLE)
+            parts.append(f'<{tag} style="{style}{align[i]}">{html.escape(_cell_text(value))}</{tag}>')
+        parts.append("</tr>")
+    parts.append("</tbody></table>")
+    return "".join(parts)
+
+# ───────────────────────────────
+# pandas/tabulate 출력과 비교
+# ───────────────────────────────
+def _random_table(rng):
+    hangul = "갑을병정무기경신임계자축인묘진사오미신유술해"
+    kinds = rng.sample(["ganji", "int", "float", "text"], rng.randint(1, 3))
+    columns, values = [], []
+    for n, kind in enumerate(kinds):
+        columns.append(rng.choice(["간지", "연도", "세력", "주기(나이)", "구분"]) + str(n))
+        values.append(kind)
+    rows = []
+    for _ in range(rng.randint(0, 12)):
+        row = []
+        for kind in values:
+            if kind == "ganji":
+                row.append(rng.choice(hangul) + rng.choice(hangul))
+            elif kind == "int":
+                row.append(rng.randint(-50, 3000))
+            elif kind == "float":
+                row.append(round(rng.uniform(0, 40), rng.randint(0, 3)))
+            else:
+                row.append(f"만 {rng.randint(1, 99)}세 ({rng.randint(1900, 2100)}년~)")
+        rows.append(tuple(row))
+    return make_table(columns, rows)
+
+def check(n=500, seed=11):
+    """임의 표 n개를 pandas to_markdown()/to_string()(실수 없는 표)과 비교해 다른 표 수를 반환합니다."""
+    import pandas as pd
+
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(n):
+        table = _random_table(rng)
+        df = pd.DataFrame(table["rows"] or None, columns=list(table["columns"]))
+        if to_markdown(table) != df.to_markdown(index=False):
+            mismatches += 1
+        elif table["rows"] and not any(isinstance(v, float) for row in table["rows"] for v in row) \
+                and to_text(table) != df.to_string(index=False):
+            mismatches += 1
+    return mismatches
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="경량 표 렌더러 출력 점검")
+    parser.add_argument("--check", type=int, default=500, metavar="N", help="pandas/tabulate와 비교할 임의 표 수")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args(argv)
+    mismatches = check(args.check, args.seed)
+    print(f"임의 표 {args.check}개 중 불일치 {mismatches}개")
+    return 0 if mismatches == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,568 @@
+# 출생 정보가 불확실할 때의 명식 분석
+# 출생 시각을 모르면 시주 후보 12개(자시~해시)를 정수 코드 배열 (12,4)로 만들어
+# 세력(strength_arrays)과 신살(shinsal_arrays)을 한 번에 판정합니다. 년/월/일주는 한 번만 계산합니다.
+# 결과는 시주와 무관하게 같은 분석(stable)과 시주에 따라 달라지는 분석(varying, 해당 시 목록)으로 나눕니다.
+# 출생일이 절입일이면 하루 안에서 년/월주가 바뀌므로 절입 시각으로 나눈 구간(date_intervals)을 함께 알립니다.
+# 출생 시각이 대략적이면(±1시간 등) 시각 범위를 명식이 같은 구간들로 나눕니다. 절입 시각은 정렬 목록에서
+# bisect로, 시지 경계는 자시 규칙 조회표에서 찾은 경계 시각에서만 명식을 계산합니다 (분 단위 전수 계산 없음).
+# 연도나 연월만 알면 가능한 명식과 해당 분(分) 수를 셉니다. 년/월주가 같은 절기 구간 안의 온전한 날들은
+# 60일 주기(일진)별 날수 x 하루 시지 구간표로 한꺼번에 세고, 절입 시각이 걸친 날만 구간 분할로 셉니다.
+# 사용:
+#   python saju_uncertain.py --hours 1990-06-15                 # 출생일만 알 때 시주 후보별 분석
+#   python saju_uncertain.py --hours 1990-06-15 --profile extended
+#   python saju_uncertain.py --around "1990-02-04 11:00" --margin 60   # 출생 시각 ±60분 안에서 명식이 같은 구간
+#   python saju_uncertain.py --partial 1990-06                  # 연도만(1990) / 연월만 알 때 가능한 명식 분포
+#   python saju_uncertain.py --check --n 300                    # 단건 함수/분 단위 전수 계산 결과와 비교
+
+import argparse
+import bisect
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+import saju_engine as engine
+from saju_engine import GAN, GAN_INDEX, JI, JI_INDEX, OHENG_ORDER, SIDU_START_GAN_IDX
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 시각을 모를 때 년/월/일주를 정하는 기준 시각 (정오: 자시 규칙과 무관하고 일주가 바뀌지 않음)
+UNKNOWN_HOUR_REFERENCE = (12, 0)
+
+# ───────────────────────────────
+# 시주 후보
+# ───────────────────────────────
+def hour_candidates(day_gan_char):
+    """일간 -> 시주 후보 12개 [(간지, 천간, 지지)] (자시~해시, 시두법). 야자시의 다음날 시간(時干)은 따로 두지 않습니다."""
+    start = SIDU_START_GAN_IDX[GAN_INDEX[day_gan_char]]
+    return [(GAN[(start + j) % 10] + JI[j], GAN[(start + j) % 10], JI[j]) for j in range(12)]
+
+def hour_ranges(convention=engine.DEFAULT_ZASI_CONVENTION):
+    """자시 규칙의 시지별 시각 범위 문자열 12개 (예: "23:30~01:29")."""
+    ja_start = engine.ZASI_CONVENTIONS[convention]["ja_start"]
+    ranges = []
+    for j in range(12):
+        start = (ja_start + 120 * j) % engine.MINUTES_PER_DAY
+        end = (start + 119) % engine.MINUTES_PER_DAY
+        ranges.append(f"{start // 60:02d}:{start % 60:02d}~{end // 60:02d}:{end % 60:02d}")
+    return ranges
+
+def date_chart(day, solar_data):
+    """출생일(date)만 알 때의 년/월/일주 (UNKNOWN_HOUR_REFERENCE 시각 기준, 시주는 빈 문자열)."""
+    dt = datetime(day.year, day.month, day.day, *UNKNOWN_HOUR_REFERENCE)
+    _, year_gan, year_ji = engine.get_year_ganji(engine.get_saju_year(dt, solar_data))
+    _, month_gan, month_ji = engine.get_month_ganji(year_gan, dt, solar_data)
+    _, day_gan, day_ji = engine.get_day_ganji(dt.year, dt.month, dt.day)
+    return {"year_gan": year_gan, "year_ji": year_ji, "month_gan": month_gan, "month_ji": month_ji,
+            "day_gan": day_gan, "day_ji": day_ji, "time_gan": "", "time_ji": ""}
+
+# ───────────────────────────────
+# 출생 시각 오차 구간 (명식이 바뀌는 경계 시각)
+# ───────────────────────────────
+PILLAR_LABELS = dict(zip(engine.PILLAR_KEYS, engine.PILLAR_NAMES_KOR)) # "year" -> "년주"
+_TERM_INSTANT_CACHE = {} # 절기표 id -> (절기표 보관, 월주 절입 시각 정렬 목록)
+
+def _term_instants(solar_data):
+    """절기표 -> 월주를 바꾸는 절입 시각(입춘 포함 12절) 정렬 목록. 절기표 객체별로 한 번만 만듭니다."""
+    cached = _TERM_INSTANT_CACHE.get(id(solar_data))
+    if cached is None or cached[0] is not solar_data:
+        instants = sorted(dt for terms in solar_data.values() for name, dt in terms.items() if name in engine.SAJU_MONTH_TERMS_ORDER)
+        cached = _TERM_INSTANT_CACHE[id(solar_data)] = (solar_data, instants)
+    return cached[1]
+
+def _hour_boundary_minutes(convention):
+    """자시 규칙 조회표에서 시지/시간 이동/일주 이동이 바뀌는 분(0~1439) 목록. 0분(날짜 변경)은 항상 포함합니다."""
+    tables = engine.TIME_BRANCH_TABLES[convention]
+    return [0] + [m for m in range(1, engine.MINUTES_PER_DAY) if any(table[m] != table[m - 1] for table in tables)]
+
+HOUR_BOUNDARY_MINUTES = {name: _hour_boundary_minutes(name) for name in engine.ZASI_CONVENTIONS}
+
+def chart_at(saju_dt, solar_data, convention=engine.DEFAULT_ZASI_CONVENTION, solar_offset_seconds=0):
+    """
+    UTC+9 기준 시각의 명식 (saju_8char_details 형식). 화면과 같은 순서로 계산합니다.
+    년/월주는 saju_dt, 일/시주는 진태양시 보정량(solar_offset_seconds)을 더한 시각으로 정합니다.
+    """
+    hour_dt = saju_dt + timedelta(seconds=solar_offset_seconds)
+    _, year_gan, year_ji = engine.get_year_ganji(engine.get_saju_year(saju_dt, solar_data))
+    _, month_gan, month_ji = engine.get_month_ganji(year_gan, saju_dt, solar_data)
+    _, day_gan, day_ji = engine.get_day_ganji(hour_dt.year, hour_dt.month, hour_dt.day)
+    _, time_gan, time_ji = engine.get_time_pillar(day_gan, hour_dt.hour, hour_dt.minute, convention)
+    if engine.get_time_day_shift(hour_dt.hour, hour_dt.minute, convention): # 자시 일진 변경 규칙: 다음날 일주
+        next_day = hour_dt + timedelta(days=1)
+        _, day_gan, day_ji = engine.get_day_ganji(next_day.year, next_day.month, next_day.day)
+    return {"year_gan": year_gan, "year_ji": year_ji, "month_gan": month_gan, "month_ji": month_ji,
+            "day_gan": day_gan, "day_ji": day_ji, "time_gan": time_gan, "time_ji": time_ji}
+
+def _changed_pillars(before, after):
+    return [key for key in engine.PILLAR_KEYS if (before[f"{key}_gan"], before[f"{key}_ji"]) != (after[f"{key}_gan"], after[f"{key}_ji"])]
+
+def birth_time_intervals(start, end, solar_data, convention=engine.DEFAULT_ZASI_CONVENTION, solar_offset_seconds=0):
+    """
+    [start, end) 시각 범위(UTC+9 기준)를 명식이 같은 구간으로 나눕니다.
+    경계 후보는 범위 안의 절입 시각(bisect), 시지 경계(자시 규칙 조회표, 진태양시 기준), 1월 1일 0시뿐이며
+    후보로 나뉜 조각마다 명식을 한 번만 계산하고 명식이 같은 이웃 조각은 합칩니다.
+    반환: [{"start", "end", "chart", "changed": 앞 구간과 다른 기둥 키 목록 (첫 구간은 빈 목록)}]
+    """
+    if end <= start:
+        return []
+    offset = timedelta(seconds=solar_offset_seconds)
+    instants = _term_instants(solar_data)
+    cuts = set(instants[bisect.bisect_right(instants, start):bisect.bisect_left(instants, end)])
+    cuts.update(datetime(year, 1, 1) for year in range(start.year + 1, end.year + 1)) # 양력 연도가 바뀌면 절기 조회 연도도 바뀜
+    day, last_day = (start + offset).date(), (end + offset).date()
+    while day <= last_day:
+        midnight = datetime(day.year, day.month, day.day) - offset
+        cuts.update(t for t in (midnight + timedelta(minutes=m) for m in HOUR_BOUNDARY_MINUTES[convention]) if start < t < end)
+        day += timedelta(days=1)
+    points = [start] + sorted(cuts)
+    intervals = []
+    for piece_start, piece_end in zip(points, points[1:] + [end]):
+        chart = chart_at(piece_start, solar_data, convention, solar_offset_seconds)
+        if intervals and intervals[-1]["chart"] == chart:
+            intervals[-1]["end"] = piece_end
+            continue
+        changed = _changed_pillars(intervals[-1]["chart"], chart) if intervals else []
+        intervals.append({"start": piece_start, "end": piece_end, "chart": chart, "changed": changed})
+    return intervals
+
+def date_intervals(day, solar_data, offset_seconds=0):
+    """
+    출생일(date)만 알 때 그날 하루를 년/월주가 같은 구간으로 나눕니다 (절입 시각만 bisect, 일주는 그날 일진, 시주는 빈 문자열).
+    절입일이면 구간이 둘이 되어 date_chart(정오 기준)의 년/월주는 출생 시각에 따라 틀릴 수 있습니다.
+    offset_seconds: 입력 시각 -> UTC+9 기준 보정량 (표준시·서머타임). 반환은 birth_time_intervals 형식 (UTC+9 기준 시각).
+    """
+    start = datetime(day.year, day.month, day.day) + timedelta(seconds=offset_seconds)
+    end = start + timedelta(days=1)
+    instants = _term_instants(solar_data)
+    cuts = set(instants[bisect.bisect_right(instants, start):bisect.bisect_left(instants, end)])
+    cuts.update(t for t in (datetime(end.year, 1, 1),) if start < t < end) # 보정으로 1월 1일 0시를 지나면 절기 조회 연도가 바뀜
+    base = date_chart(day, solar_data)
+    points = [start] + sorted(cuts)
+    intervals = []
+    for piece_start, piece_end in zip(points, points[1:] + [end]):
+        _, year_gan, year_ji = engine.get_year_ganji(engine.get_saju_year(piece_start, solar_data))
+        _, month_gan, month_ji = engine.get_month_ganji(year_gan, piece_start, solar_data)
+        chart = dict(base, year_gan=year_gan, year_ji=year_ji, month_gan=month_gan, month_ji=month_ji)
+        if intervals and intervals[-1]["chart"] == chart:
+            intervals[-1]["end"] = piece_end
+            continue
+        changed = _changed_pillars(intervals[-1]["chart"], chart) if intervals else []
+        intervals.append({"start": piece_start, "end": piece_end, "chart": chart, "changed": changed})
+    return intervals
+
+def birth_time_window(saju_dt, margin_minutes, solar_data, convention=engine.DEFAULT_ZASI_CONVENTION, solar_offset_seconds=0):
+    """출생 시각 ±margin_minutes 분 범위의 명식 구간 (끝 분 포함). 구간이 둘 이상이면 오차 안에서 명식이 바뀝니다."""
+    margin = timedelta(minutes=margin_minutes)
+    return birth_time_intervals(saju_dt - margin, saju_dt + margin + timedelta(minutes=1), solar_data, convention, solar_offset_seconds)
+
+def flag_birth_times(saju_datetimes, margin_minutes, solar_data, convention=engine.DEFAULT_ZASI_CONVENTION, solar_offsets=None):
+    """
+    여러 출생 시각을 한 번에 점검합니다. 반환: 레코드별 오차 범위 안에서 바뀌는 기둥 키 tuple (년, 월, 일, 시 순서, 없으면 빈 tuple).
+    solar_offsets: 레코드별 진태양시 보정량(초) 목록 (없으면 0)
+    """
+    flags = []
+    for i, saju_dt in enumerate(saju_datetimes):
+        offset = solar_offsets[i] if solar_offsets is not None else 0
+        changed = {key for interval in birth_time_window(saju_dt, margin_minutes, solar_data, convention, offset) for key in interval["changed"]}
+        flags.append(tuple(key for key in engine.PILLAR_KEYS if key in changed))
+    return flags
+
+def interval_rows(intervals):
+    """birth_time_intervals 결과 -> 구간 표 (saju_table: 시작, 끝, 년주, 월주, 일주, 시주, 바뀐 기둥)."""
+    import saju_table
+
+    rows = [(f"{interval['start']:%Y-%m-%d %H:%M:%S}", f"{interval['end']:%Y-%m-%d %H:%M:%S}",
+             *(interval["chart"][f"{key}_gan"] + interval["chart"][f"{key}_ji"] for key in engine.PILLAR_KEYS),
+             ", ".join(PILLAR_LABELS[key] for key in interval["changed"]))
+            for interval in intervals]
+    return saju_table.make_table(["시작", "끝", *engine.PILLAR_NAMES_KOR, "바뀐 기둥"], rows)
+
+# ───────────────────────────────
+# 부분 출생 정보 (연도만 / 연월만): 가능한 명식 분포
+# ───────────────────────────────
+CHART_FIELDS = tuple(f"{key}_{part}" for key in engine.PILLAR_KEYS for part in ("gan", "ji")) # 명식 tuple 순서
+
+def _day_runs(convention):
+    """하루(0~1439분)를 시지/시간 이동/일주 이동이 같은 구간으로 묶은 [(분 수, 시지, 시간 이동, 일주 이동)]."""
+    tables = engine.TIME_BRANCH_TABLES[convention]
+    runs = []
+    for m in range(engine.MINUTES_PER_DAY):
+        code = tuple(table[m] for table in tables)
+        if runs and runs[-1][1:] == code:
+            runs[-1] = (runs[-1][0] + 1,) + code
+        else:
+            runs.append((1,) + code)
+    return runs
+
+DAY_RUNS = {name: _day_runs(name) for name in engine.ZASI_CONVENTIONS}
+
+def _minute_ceil(dt):
+    """dt 이후(포함) 첫 정분 시각. [start, end) 안의 출생 '분' 수는 _minute_ceil(end) - _minute_ceil(start)입니다."""
+    floor = dt.replace(second=0, microsecond=0)
+    return floor if floor == dt else floor + timedelta(minutes=1)
+
+def _count_intervals(counts, start, end, solar_data, convention):
+    for interval in birth_time_intervals(start, end, solar_data, convention):
+        minutes = int((_minute_ceil(interval["end"]) - _minute_ceil(interval["start"])).total_seconds() // 60)
+        if minutes:
+            key = tuple(interval["chart"][field] for field in CHART_FIELDS)
+            counts[key] = counts.get(key, 0) + minutes
+
+def _count_full_days(counts, year_month, first_day, days, convention):
+    """년/월주가 같은 온전한 날 days일 (first_day부터): 60갑자 일진별 날수 x 하루 시지 구간표로 셉니다."""
+    _, day_gan, day_ji = engine.get_day_ganji(first_day.year, first_day.month, first_day.day)
+    first = engine.gapja_index(GAN_INDEX[day_gan], JI_INDEX[day_ji])
+    for k in range(60):
+        n_days = days // 60 + ((k - first) % 60 < days % 60)
+        if not n_days:
+            continue
+        for minutes, branch, stem_shift, day_shift in DAY_RUNS[convention]:
+            day_k = (k + day_shift) % 60
+            time_gan = (SIDU_START_GAN_IDX[(k % 10 + stem_shift) % 10] + branch) % 10
+            key = year_month + (GAN[day_k % 10], JI[day_k % 12], GAN[time_gan], JI[branch])
+            counts[key] = counts.get(key, 0) + n_days * minutes
+
+def period_chart_counts(start, end, solar_data, convention=engine.DEFAULT_ZASI_CONVENTION):
+    """
+    [start, end) (UTC+9 기준, 정분 단위 출생 시각)의 가능한 명식별 분 수 {명식 tuple(CHART_FIELDS 순서): 분 수}.
+    절입 시각과 1월 1일로 년/월주가 같은 구간을 나누고, 구간 안의 온전한 날은 일진 주기로, 양 끝의 걸친 날만 구간 분할로 셉니다.
+    """
+    instants = _term_instants(solar_data)
+    cuts = set(instants[bisect.bisect_right(instants, start):bisect.bisect_left(instants, end)])
+    cuts.update(datetime(year, 1, 1) for year in range(start.year + 1, end.year + 1))
+    points = [start] + sorted(cuts)
+    counts = {}
+    for segment_start, segment_end in zip(points, points[1:] + [end]):
+        first_midnight = datetime.combine(segment_start.date(), datetime.min.time())
+        if first_midnight < segment_start:
+            first_midnight += timedelta(days=1)
+        last_midnight = datetime.combine(segment_end.date(), datetime.min.time())
+        if last_midnight <= first_midnight:
+            _count_intervals(counts, segment_start, segment_end, solar_data, convention)
+            continue
+        _count_intervals(counts, segment_start, first_midnight, solar_data, convention)
+        chart = chart_at(first_midnight, solar_data, convention)
+        year_month = tuple(chart[field] for field in CHART_FIELDS[:4])
+        _count_full_days(counts, year_month, first_midnight.date(), (last_midnight - first_midnight).days, convention)
+        _count_intervals(counts, last_midnight, segment_end, solar_data, convention)
+    return counts
+
+def partial_birth_period(year, month=None):
+    """연도(와 월) -> 출생 가능 범위 [start, end) (양력, UTC+9 기준)."""
+    if month is None:
+        return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    return datetime(year, month, 1), datetime(year + month // 12, month % 12 + 1, 1)
+
+def partial_chart_distribution(year, month=None, solar_data=None, convention=engine.DEFAULT_ZASI_CONVENTION, rules=None):
+    """
+    연도만 또는 연월만 알 때 가능한 명식 분포.
+    반환 dict:
+      period: (start, end), total_minutes: 전체 분 수, charts: [(명식 dict, 분 수)] (분 수 내림차순)
+      pillars: {기둥 키: {간지: 분 수}} (기둥별 분포), ohaeng_range: {오행: (최소, 최대, 분 가중 평균)}
+    오행 세력은 strength_arrays로 한 번에 계산하며, 절기표 범위를 벗어나 기둥이 계산되지 않은 명식은 세력 집계에서 뺍니다.
+    """
+    import numpy as np
+
+    rules = rules if rules is not None else engine
+    start, end = partial_birth_period(year, month)
+    counts = period_chart_counts(start, end, solar_data, convention)
+    ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    charts = [(dict(zip(CHART_FIELDS, key)), minutes) for key, minutes in ordered]
+    pillars = {}
+    for chart, minutes in charts:
+        for key in engine.PILLAR_KEYS:
+            ganji = chart[f"{key}_gan"] + chart[f"{key}_ji"]
+            pillars.setdefault(key, {})[ganji] = pillars.get(key, {}).get(ganji, 0) + minutes
+    valid = [(chart, minutes) for chart, minutes in charts if all(chart[field] for field in CHART_FIELDS)]
+    ohaeng_range = {}
+    if valid:
+        stems, branches = engine.encode_charts([chart for chart, _ in valid])
+        ohaeng, _ = rules.strength_arrays(stems, branches)
+        weights = np.array([minutes for _, minutes in valid], dtype=np.float64)
+        for i, o in enumerate(OHENG_ORDER):
+            ohaeng_range[o] = (round(float(ohaeng[:, i].min()), 1), round(float(ohaeng[:, i].max()), 1),
+                               round(float(np.dot(ohaeng[:, i], weights) / weights.sum()), 2))
+    return {"period": (start, end), "total_minutes": sum(counts.values()), "charts": charts,
+            "pillars": {key: dict(sorted(values.items(), key=lambda item: -item[1])) for key, values in pillars.items()},
+            "ohaeng_range": ohaeng_range}
+
+def format_partial_distribution(result, top=10):
+    total = result["total_minutes"]
+    lines = [f"가능한 명식 {len(result['charts'])}개 (출생 가능 시각 {total:,}분)"]
+    for key in engine.PILLAR_KEYS:
+        shares = ", ".join(f"{ganji} {minutes / total:.1%}" for ganji, minutes in list(result["pillars"][key].items())[:12])
+        more = len(result["pillars"][key]) - 12
+        lines.append(f"{PILLAR_LABELS[key]}: {shares}" + (f" 외 {more}개" if more > 0 else ""))
+    lines.append("오행 세력 범위 (최소~최대, 평균): " + ", ".join(f"{o} {low}~{high} ({mean})" for o, (low, high, mean) in result["ohaeng_range"].items()))
+    lines.append(f"\n빈도 상위 명식 {min(top, len(result['charts']))}개:")
+    for chart, minutes in result["charts"][:top]:
+        lines.append("  " + " ".join(chart[f"{key}_gan"] + chart[f"{key}_ji"] for key in engine.PILLAR_KEYS) + f"  {minutes}분 ({minutes / total:.3%})")
+    return "\n".join(lines)
+
+# ───────────────────────────────
+# 시각 미상 분석
+# ───────────────────────────────
+def _split_by_hour(per_hour):
+    """시별 항목 목록 -> {"stable": 모든 시에 있는 항목, "varying": {항목: 해당 시 인덱스 목록}} (처음 나온 순서)."""
+    hours = {}
+    for h, items in enumerate(per_hour):
+        for item in dict.fromkeys(items):
+            hours.setdefault(item, []).append(h)
+    return {"stable": [item for item, hs in hours.items() if len(hs) == len(per_hour)],
+            "varying": {item: hs for item, hs in hours.items() if len(hs) < len(per_hour)}}
+
+def analyze_unknown_hour(chart, rules=None):
+    """
+    시주를 모를 때 후보 12개에 대한 분석을 한 번에 계산합니다.
+    chart: saju_8char_details 형식 (time_gan/time_ji는 무시) / rules: 엔진 또는 saju_rules 프로필 모듈 (기본: 엔진)
+    반환 dict (목록은 모두 자시~해시 12개 순서):
+      time_pillars: [(간지, 천간, 지지)], ohaeng / sipshin: [세력 dict], ohaeng_range: {오행: (최소, 최대)}
+      shinkang / gekuk: [판정], shinsal / hap_chung: {"stable": [...], "varying": {항목: [시 인덱스]}}
+      stable: {"ohaeng"(가장 강한 오행), "shinkang", "gekuk", "shinsal", "hap_chung": 시주와 무관하게 같은지}
+    """
+    import numpy as np
+
+    rules = rules if rules is not None else engine
+    day_gan, month_gan, month_ji = chart["day_gan"], chart["month_gan"], chart["month_ji"]
+    candidates = hour_candidates(day_gan)
+    known_stems = [GAN_INDEX[chart[f"{key}_gan"]] for key in engine.PILLAR_KEYS[:3]]
+    known_branches = [JI_INDEX[chart[f"{key}_ji"]] for key in engine.PILLAR_KEYS[:3]]
+    stems = np.array([known_stems + [GAN_INDEX[gan]] for _, gan, _ in candidates], dtype=np.int8)
+    branches = np.array([known_branches + [j] for j in range(12)], dtype=np.int8)
+
+    ohaeng_values, sipshin_values = rules.strength_arrays(stems, branches)
+    strengths = [rules.strength_dicts(ohaeng_values[h], sipshin_values[h]) for h in range(12)]
+    ohaeng = [o for o, _ in strengths]
+    sipshin = [s for _, s in strengths]
+    shinkang = [rules.determine_shinkang_shinyak(s) for s in sipshin]
+    # 격국은 월지/월간으로 정해지면 시주와 무관하므로 한 번만 판단하고, 아니면 시별 십신 세력으로 판단합니다.
+    month_gekuk = (rules._detect_special_gekuk(day_gan, month_ji) or rules._detect_togan_gekuk(day_gan, month_gan, month_ji)
+                   or rules._detect_general_gekuk_from_month_branch_primary(day_gan, month_ji))
+    gekuk = [month_gekuk] * 12 if month_gekuk else [rules.determine_gekuk(day_gan, month_gan, month_ji, s) for s in sipshin]
+
+    hits, features = rules.shinsal_arrays(stems, branches)
+    shinsal = _split_by_hour([[f"{name}: {description}" for (name, description), hit in zip(features, row) if hit] for row in hits])
+    hap_chung_per_hour = []
+    for _, gan, ji in candidates:
+        found = rules.analyze_hap_chung_interactions(dict(chart, time_gan=gan, time_ji=ji))
+        hap_chung_per_hour.append([f"{kind}: {item}" for kind, items in found.items() for item in items])
+    hap_chung = _split_by_hour(hap_chung_per_hour)
+
+    return {
+        "time_pillars": candidates, "ohaeng": ohaeng, "sipshin": sipshin,
+        "ohaeng_range": {o: (min(d[o] for d in ohaeng), max(d[o] for d in ohaeng)) for o in OHENG_ORDER},
+        "shinkang": shinkang, "gekuk": gekuk, "shinsal": shinsal, "hap_chung": hap_chung,
+        "stable": {"ohaeng": len({max(d, key=d.get) for d in ohaeng}) == 1, "shinkang": len(set(shinkang)) == 1,
+                   "gekuk": len(set(gekuk)) == 1, "shinsal": not shinsal["varying"], "hap_chung": not hap_chung["varying"]},
+    }
+
+UNKNOWN_HOUR_ANALYSES = {"ohaeng": "가장 강한 오행", "shinkang": "신강/신약", "gekuk": "격국", "shinsal": "신살", "hap_chung": "합충형해파"}
+
+def unknown_hour_rows(result, convention=engine.DEFAULT_ZASI_CONVENTION):
+    """analyze_unknown_hour 결과 -> 시별 요약 표 (saju_table: 시, 시각, 시주, 가장 강한 오행, 신강/신약, 격국)."""
+    import saju_table
+
+    rows = [(f"{ji}시", time_range, ganji, max(ohaeng, key=ohaeng.get), shinkang, gekuk)
+            for (ganji, _, ji), time_range, ohaeng, shinkang, gekuk
+            in zip(result["time_pillars"], hour_ranges(convention), result["ohaeng"], result["shinkang"], result["gekuk"])]
+    return saju_table.make_table(["시", "시각", "시주", "가장 강한 오행", "신강/신약", "격국"], rows)
+
+# ───────────────────────────────
+# 점검 (후보별 단건 계산과 비교)
+# ───────────────────────────────
+def _shinsal_signature(found):
+    """analyze_shinsal 결과 -> (공망 외 항목 수, 원국 공망 여부). 배치 판정 열과 비교하기 위한 요약입니다."""
+    return (sum(1 for item in found if not item.startswith("공망") and not item.startswith("  └")),
+            any(item.startswith("  └") for item in found))
+
+def check_unknown_hour(n=300, seed=1, rules=None):
+    """임의 명식 n개의 시주 후보 12개를 단건 함수로 각각 계산해 analyze_unknown_hour와 비교합니다. 반환: 불일치 목록."""
+    import saju_compat
+
+    rules = rules if rules is not None else engine
+    mismatches = []
+    for i, chart in enumerate(saju_compat.random_charts(n, seed)):
+        result = analyze_unknown_hour(chart, rules)
+        for h, (_, gan, ji) in enumerate(result["time_pillars"]):
+            full = dict(chart, time_gan=gan, time_ji=ji)
+            ohaeng, sipshin = rules.calculate_ohaeng_sipshin_strengths(full)
+            shinkang = rules.determine_shinkang_shinyak(sipshin)
+            expected = {"ohaeng": ohaeng, "sipshin": sipshin, "shinkang": shinkang,
+                        "gekuk": rules.determine_gekuk(full["day_gan"], full["month_gan"], full["month_ji"], sipshin)}
+            for name, value in expected.items():
+                if result[name][h] != value:
+                    mismatches.append((i, h, name, value, result[name][h]))
+            shinsal_items = [item for item, hours in result["shinsal"]["varying"].items() if h in hours] + result["shinsal"]["stable"]
+            actual_shinsal = (sum(1 for item in shinsal_items if not item.startswith("공망")), any(item.startswith("공망") for item in shinsal_items))
+            if actual_shinsal != _shinsal_signature(rules.analyze_shinsal(full)):
+                mismatches.append((i, h, "shinsal", _shinsal_signature(rules.analyze_shinsal(full)), actual_shinsal))
+            found = rules.analyze_hap_chung_interactions(full)
+            hap_chung_items = {item for item, hours in result["hap_chung"]["varying"].items() if h in hours} | set(result["hap_chung"]["stable"])
+            if hap_chung_items != {f"{kind}: {item}" for kind, items in found.items() for item in items}:
+                mismatches.append((i, h, "hap_chung", found, hap_chung_items))
+    return mismatches
+
+def check_birth_time_intervals(solar_data, n=200, seed=1):
+    """
+    임의 시각 범위 n개(절반은 절입 시각 주변)를 분 단위로 전수 계산해 birth_time_intervals 구간과 비교합니다.
+    자시 규칙과 진태양시 보정량도 임의로 고릅니다. 반환: 불일치 목록 [(범위 시작, 시각, 전수 명식, 구간 명식)].
+    """
+    rng = random.Random(seed)
+    instants = _term_instants(solar_data)
+    first, last = instants[0] + timedelta(days=40), instants[-1] - timedelta(days=40)
+    mismatches = []
+    for i in range(n):
+        if i % 2:
+            center = rng.choice(instants[bisect.bisect_left(instants, first):bisect.bisect_left(instants, last)])
+        else:
+            center = first + timedelta(minutes=rng.randrange(int((last - first).total_seconds() // 60)))
+        start = center - timedelta(minutes=rng.randint(0, 180), seconds=rng.randint(0, 59))
+        end = start + timedelta(minutes=rng.randint(1, 360))
+        convention = rng.choice(list(engine.ZASI_CONVENTIONS))
+        offset = rng.choice([0, rng.randint(-5400, 5400)])
+        intervals = birth_time_intervals(start, end, solar_data, convention, offset)
+        if intervals[0]["start"] != start or intervals[-1]["end"] != end \
+                or any(a["end"] != b["start"] or a["chart"] == b["chart"] for a, b in zip(intervals, intervals[1:])):
+            mismatches.append((start, None, None, intervals))
+            continue
+        # 범위 시작, 매 분 0초(진태양시 기준), 절입 시각에서 명식 확인
+        points = {start} | set(instants[bisect.bisect_left(instants, start):bisect.bisect_left(instants, end)])
+        minute = (start + timedelta(seconds=offset)).replace(second=0, microsecond=0) - timedelta(seconds=offset)
+        while minute < end:
+            if minute >= start:
+                points.add(minute)
+            minute += timedelta(minutes=1)
+        starts = [interval["start"] for interval in intervals]
+        for point in sorted(points):
+            expected = chart_at(point, solar_data, convention, offset)
+            actual = intervals[bisect.bisect_right(starts, point) - 1]["chart"]
+            if expected != actual:
+                mismatches.append((start, point, expected, actual))
+                break
+    return mismatches
+
+def check_date_intervals(solar_data, n=20, seed=1):
+    """출생일 구간(date_intervals)을 하루 1440분 전수 년/월주와 비교합니다. 절반은 절입일에서 고릅니다. 반환: 불일치 [(날짜, 시각)]"""
+    rng = random.Random(seed)
+    instants = [t for t in _term_instants(solar_data) if min(solar_data) < t.year < max(solar_data)]
+    days = [rng.choice(instants).date() if i % 2 else date(rng.randint(min(solar_data) + 1, max(solar_data) - 1), 1, 1) + timedelta(days=rng.randrange(365))
+            for i in range(n)]
+    mismatches = []
+    for day in days:
+        intervals = date_intervals(day, solar_data)
+        for minute in range(engine.MINUTES_PER_DAY):
+            point = datetime(day.year, day.month, day.day) + timedelta(minutes=minute)
+            expected = chart_at(point, solar_data)
+            actual = next(interval["chart"] for interval in intervals if interval["start"] <= point < interval["end"])
+            if any(expected[field] != actual[field] for field in ("year_gan", "year_ji", "month_gan", "month_ji")):
+                mismatches.append((day, point))
+                break
+    return mismatches
+
+def check_partial_counts(solar_data, n=20, seed=1):
+    """
+    임의 연월 n개(4개마다 한 번은 연도 전체)의 명식별 분 수를 구간 분할(birth_time_intervals)만으로 센 결과와 비교합니다.
+    반환: 불일치 목록 [(연, 월, 자시 규칙)].
+    """
+    rng = random.Random(seed)
+    years = sorted(solar_data)[1:-1]
+    mismatches = []
+    for i in range(n):
+        year, month = rng.choice(years), (None if i % 4 == 3 else rng.randint(1, 12))
+        convention = rng.choice(list(engine.ZASI_CONVENTIONS))
+        start, end = partial_birth_period(year, month)
+        expected = {}
+        _count_intervals(expected, start, end, solar_data, convention)
+        if period_chart_counts(start, end, solar_data, convention) != expected:
+            mismatches.append((year, month, convention))
+    return mismatches
+
+# ───────────────────────────────
+# 실행
+# ───────────────────────────────
+def format_unknown_hour(result, convention=engine.DEFAULT_ZASI_CONVENTION):
+    import saju_table
+
+    lines = [saju_table.to_text(unknown_hour_rows(result, convention)), ""]
+    lines.append("시주와 무관: " + (", ".join(label for key, label in UNKNOWN_HOUR_ANALYSES.items() if result["stable"][key]) or "없음"))
+    lines.append("시주에 따라 다름: " + (", ".join(label for key, label in UNKNOWN_HOUR_ANALYSES.items() if not result["stable"][key]) or "없음"))
+    lines.append("오행 세력 범위: " + ", ".join(f"{o} {low}~{high}" for o, (low, high) in result["ohaeng_range"].items()))
+    for key in ("shinsal", "hap_chung"):
+        split = result[key]
+        lines.append(f"\n[{UNKNOWN_HOUR_ANALYSES[key]}] 항상: {len(split['stable'])}개")
+        lines += [f"  - {item}" for item in split["stable"]]
+        lines.append(f"[{UNKNOWN_HOUR_ANALYSES[key]}] 시에 따라:")
+        lines += [f"  - {item} ({', '.join(JI[h] + '시' for h in hours)})" for item, hours in split["varying"].items()]
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="출생 시각을 모를 때 시주 후보 12개 분석")
+    parser.add_argument("--hours", metavar="YYYY-MM-DD", help="양력 출생일 (시각 미상)")
+    parser.add_argument("--profile", default=None, help="규칙 프로필 (rule_profiles 폴더, 기본: 기본 규칙)")
+    parser.add_argument("--around", metavar="YYYY-MM-DD HH:MM", help="대략적인 출생 시각 (UTC+9 기준)")
+    parser.add_argument("--margin", type=int, default=60, help="--around 시각의 오차 범위 (±분)")
+    parser.add_argument("--partial", metavar="YYYY[-MM]", help="연도만 또는 연월만 알 때 가능한 명식 분포")
+    parser.add_argument("--top", type=int, default=10, help="--partial 결과에 보일 빈도 상위 명식 수")
+    parser.add_argument("--convention", default=engine.DEFAULT_ZASI_CONVENTION, choices=list(engine.ZASI_CONVENTIONS), help="자시 경계 규칙")
+    parser.add_argument("--check", action="store_true", help="임의 명식/시각 범위로 단건 계산, 분 단위 전수 계산 결과와 비교")
+    parser.add_argument("--n", type=int, default=300)
+    args = parser.parse_args(argv)
+
+    import saju_rules
+    rules = saju_rules.get_profile(args.profile) if args.profile else engine
+    if rules is None:
+        parser.error(f"규칙 프로필 '{args.profile}'을 읽을 수 없습니다.")
+    if not (args.check or args.hours or args.around or args.partial):
+        parser.print_help()
+        return 0
+    solar_data = engine.load_solar_terms(os.path.join(BASE_DIR, engine.FILE_NAME), lambda level, message: print(message, file=sys.stderr))
+    if solar_data is None:
+        return 1
+    if args.check:
+        mismatches = check_unknown_hour(args.n, rules=rules)
+        for i, h, name, expected, actual in mismatches[:10]:
+            print(f"[{name}] 명식#{i} {JI[h]}시: 단건 {expected} / 일괄 {actual}")
+        print(f"비교 완료: 명식 {args.n}개 x 시주 12개, 불일치 {len(mismatches)}건")
+        interval_mismatches = check_birth_time_intervals(solar_data, args.n)
+        for start, point, expected, actual in interval_mismatches[:10]:
+            print(f"[구간] 범위 {start} 시각 {point}: 전수 {expected} / 구간 {actual}")
+        print(f"비교 완료: 시각 범위 {args.n}개 (분 단위 전수), 불일치 {len(interval_mismatches)}건")
+        date_mismatches = check_date_intervals(solar_data, max(args.n // 15, 4))
+        for day, point in date_mismatches[:10]:
+            print(f"[출생일] {day} 시각 {point}: 전수 년/월주와 구간 결과가 다름")
+        print(f"비교 완료: 출생일 {max(args.n // 15, 4)}개 (분 단위 전수), 불일치 {len(date_mismatches)}건")
+        partial_mismatches = check_partial_counts(solar_data, max(args.n // 15, 4))
+        for year, month, convention in partial_mismatches[:10]:
+            print(f"[분포] {year}년 {month or '전체'}월 ({convention}): 구간 분할 결과와 다름")
+        print(f"비교 완료: 연월 {max(args.n // 15, 4)}개 (구간 분할), 불일치 {len(partial_mismatches)}건")
+        return 1 if mismatches or interval_mismatches or date_mismatches or partial_mismatches else 0
+    if args.partial:
+        year, _, month = args.partial.partition("-")
+        if not year.isdigit() or (month and not (month.isdigit() and 1 <= int(month) <= 12)):
+            parser.error(f"--partial 형식 오류: {args.partial} (YYYY 또는 YYYY-MM)")
+        result = partial_chart_distribution(int(year), int(month) if month else None, solar_data, args.convention, rules)
+        print(f"{args.partial} 출생 (일/시 미상)\n")
+        print(format_partial_distribution(result, args.top))
+        return 0
+    if args.around:
+        import saju_table
+
+        intervals = birth_time_window(datetime.fromisoformat(args.around), args.margin, solar_data, args.convention)
+        print(f"{args.around} ±{args.margin}분: 명식 구간 {len(intervals)}개\n")
+        print(saju_table.to_text(interval_rows(intervals)))
+        return 0
+    chart = date_chart(date.fromisoformat(args.hours), solar_data)
+    print(f"{args.hours} (시각 미상): 년주 {chart['year_gan']}{chart['year_ji']}, 월주 {chart['month_gan']}{chart['month_ji']}, "
+          f"일주 {chart['day_gan']}{chart['day_ji']}\n")
+    intervals = date_intervals(date.fromisoformat(args.hours), solar_data)
+    if len(intervals) > 1:
+        import saju_table
+
+        changed = ", ".join(PILLAR_LABELS[key] for key in engine.PILLAR_KEYS if any(key in interval["changed"] for interval in intervals))
+        print(f"주의: 절입일이라 출생 시각에 따라 {changed}가 바뀝니다. 아래 분석은 정오 기준 명식입니다.")
+        print(saju_table.to_text(interval_rows(intervals)) + "\n")
+    print(format_unknown_hour(analyze_unknown_hour(chart, rules)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,410 @@
+# 사주 엔진 차등 검증 하네스 (reference 함수 vs 최적화 후보 함수)
+# 실행: python saju_verify.py                 # 등록된 모든 후보를 1900~2100 전체 구간에서 검증
+#       python saju_verify.py --start-year 1990 --end-year 1999 --workers 4
+#       python saju_verify.py --self-check      # 후보 없이 reference끼리 비교 (하네스 자체 점검)
+#
+# 스윕 구성
+#   1) hourly   : 매년 1월 1일 00:00 ~ 12월 31일 23:00 매 정시 (일운 목록은 매일 00:00에 한 번)
+#   2) boundary : 절기 데이터의 모든 절입 시각 전후 ±window 분을 1분 간격으로
+#   3) minutes  : 시주 전용 - 10개 일간 × 하루 1440분 전수
+# reference는 원본 계산 함수를 그대로 옮겨 둔 saju_reference 모듈이고, 엔진(saju_engine)과 배치 경로는 후보로 등록됩니다.
+# 후보 함수는 reference와 같은 시그니처를 가져야 하며, 출력(오류 문자열 포함)이 완전히 같아야 통과입니다.
+# 출력 형식이 다른 배치 경로 후보는 reference 출력을 같은 형식으로 바꾸는 project 함수와 함께 등록합니다.
+
+import argparse
+import importlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import saju_engine as engine
+import saju_reference as ref
+
+# ───────────────────────────────
+# 검증 대상 정의
+# ───────────────────────────────
+# target -> (reference 함수, 호출기). 호출기는 (fn, ctx)를 받아 비교할 출력을 반환합니다.
+# ctx: 시점 기반 대상은 {"dt", "solar", "year_gan", "month", "day", "gender"},
+#      명식 기반 대상은 {"chart": saju_8char_details, "sipshin", "shinkang"}
+PILLAR_TARGETS = {
+    "month_ganji": (ref.get_month_ganji, lambda fn, c: fn(c["year_gan"], c["dt"], c["solar"])),
+    "day_ganji": (ref.get_day_ganji, lambda fn, c: fn(c["dt"].year, c["dt"].month, c["dt"].day)),
+    "time_ganji": (ref.get_time_ganji, lambda fn, c: fn(c["day"][1], c["dt"].hour, c["dt"].minute)),
+    "ilun": (ref.get_ilun_list, lambda fn, c: fn(c["dt"].year, c["dt"].month, c["dt"].day, 7)),
+    "daewoon": (ref.get_daewoon, lambda fn, c: fn(c["year_gan"], c["gender"], c["dt"], c["month"][1], c["month"][2], c["solar"])),
+}
+CHART_TARGETS = {
+    "strengths": (ref.calculate_ohaeng_sipshin_strengths, lambda fn, c: fn(c["chart"])),
+    "shinkang": (ref.determine_shinkang_shinyak, lambda fn, c: fn(c["sipshin"])),
+    "gekuk": (ref.determine_gekuk, lambda fn, c: fn(c["chart"]["day_gan"], c["chart"]["month_gan"], c["chart"]["month_ji"], c["sipshin"])),
+    "yongshin": (ref.determine_yongshin_gishin_simplified, lambda fn, c: fn(c["chart"]["day_gan"], c["shinkang"])),
+    "hap_chung": (ref.analyze_hap_chung_interactions, lambda fn, c: fn(c["chart"])),
+    "shinsal": (ref.analyze_shinsal, lambda fn, c: fn(c["chart"])),
+}
+ALL_TARGETS = {**PILLAR_TARGETS, **CHART_TARGETS}
+GENDERS = ("남성", "여성")
+
+# target -> {후보 이름: (함수, project)}
+CANDIDATES = {target: {} for target in ALL_TARGETS}
+
+
+def register_candidate(target, name, func, project=None):
+    """
+    최적화 후보 함수를 등록합니다. 외부 모듈은 --candidates 옵션으로 import 되면서 이 함수를 호출하면 됩니다.
+    project: reference 출력 -> 후보 출력 형식 (배치 경로처럼 출력 형식이 다른 후보용, 없으면 그대로 비교)
+    """
+    if target not in ALL_TARGETS:
+        raise ValueError(f"알 수 없는 검증 대상: {target} (가능: {', '.join(ALL_TARGETS)})")
+    CANDIDATES[target][name] = (func, project)
+    return func
+
+
+def active_candidates(self_check=False):
+    """검증할 (target, 후보 이름, 함수, project) 목록. self_check이면 reference 자신을 후보로 사용합니다."""
+    if self_check:
+        return [(target, "reference", spec[0], None) for target, spec in ALL_TARGETS.items()]
+    return [(target, name, func, project) for target, funcs in CANDIDATES.items() for name, (func, project) in funcs.items()]
+
+
+def _expected(project, value):
+    try:
+        return project(value) if project else value
+    except Exception as e:  # reference 출력을 바꿀 수 없으면 그 자체를 불일치로 취급
+        return f"예외({type(e).__name__}: {e})"
+
+
+# ───────────────────────────────
+# 기본 등록 후보
+# ───────────────────────────────
+# 엔진 함수 전체: 엔진으로 옮기거나 제자리에서 다시 작성한 함수가 원본 결과와 같아야 함
+for _target, (_reference_fn, _) in ALL_TARGETS.items():
+    register_candidate(_target, "engine", getattr(engine, _reference_fn.__name__))
+# 분 단위 조회표 시주 (기본 자시 규칙은 get_time_ganji와 같아야 함)
+register_candidate("time_ganji", "minute_table", engine.get_time_pillar)
+
+
+# ───────────────────────────────
+# 배치(NumPy) 경로 후보: 한 건짜리 배열로 불러 단건 함수 형식으로 되돌림
+# ───────────────────────────────
+def time_pillar_from_arrays(day_gan_char, hour, minute):
+    """time_pillar_arrays (분 단위 조회표 배치 시주) -> get_time_ganji 형식."""
+    gan_idx, ji_idx, _ = engine.time_pillar_arrays([engine.GAN.index(day_gan_char)], [hour * 60 + minute])
+    gan, ji = engine.GAN[int(gan_idx[0])], engine.JI[int(ji_idx[0])]
+    return gan + ji, gan, ji
+
+
+register_candidate("time_ganji", "time_pillar_arrays", time_pillar_from_arrays)
+
+
+def strengths_from_arrays(chart):
+    """strength_arrays (오행/십신 세력 배치 합산) -> calculate_ohaeng_sipshin_strengths 형식."""
+    ohaeng, sipshin = engine.strength_arrays(*engine.encode_charts([chart]))
+    return engine.strength_dicts(ohaeng[0], sipshin[0])
+
+
+register_candidate("strengths", "strength_arrays", strengths_from_arrays)
+
+
+def shinsal_from_arrays(chart):
+    """shinsal_arrays (컴파일된 신살 규칙의 배치 판정) -> 성립한 열의 (신살 이름, 위치) 정렬 목록."""
+    stems, branches = engine.encode_charts([chart])
+    hits, features = engine.shinsal_arrays(stems, branches)
+    return sorted((name, where.replace(" ", "")) for (name, where), hit in zip(features, hits[0]) if hit)
+
+
+def shinsal_feature_list(found):
+    """analyze_shinsal 문장 목록 -> shinsal_from_arrays 형식. 항상 붙는 공망 요약 문장은 열이 없으므로 뺍니다."""
+    gongmang_name = next((item.split("(空亡)")[0] for item in found if "(空亡):" in item), None)
+    items = []
+    for item in found:
+        if item.startswith("  └"): # (년주의 술, 시주의 해)가 공망에 해당합니다.
+            items += [(gongmang_name, f"{pillar}지") for pillar in re.findall(r"([년월일시])주의", item)]
+        elif "(空亡):" not in item: # 이름: 위치(글자) ... -> 위치에서 글자와 공백을 뺀 열 설명
+            name, _, where = item.partition(": ")
+            items.append((name, re.sub(r"\([^)]*\)|\s", "", where)))
+    return sorted(items)
+
+
+register_candidate("shinsal", "shinsal_arrays", shinsal_from_arrays, shinsal_feature_list)
+
+
+def _sipshin_row(sipshin):
+    return [[sipshin[s] for s in engine.SIPSHIN_ORDER]]
+
+
+def shinkang_from_arrays(sipshin):
+    """shinkang_arrays (신강/신약 배치 판정) -> determine_shinkang_shinyak 형식."""
+    return engine.SHINKANG_LABELS[int(engine.shinkang_arrays(_sipshin_row(sipshin))[0])]
+
+
+def gekuk_from_arrays(day_gan_char, month_gan_char, month_ji_char, sipshin):
+    """gekuk_arrays (월령 조회표 + 세력 기준 격국) -> determine_gekuk 형식. 일간/월간/월지 외 글자는 판정에 쓰이지 않습니다."""
+    stems = [[0, engine.GAN_INDEX[month_gan_char], engine.GAN_INDEX[day_gan_char], 0]]
+    codes, labels = engine.gekuk_arrays(stems, [[0, engine.JI_INDEX[month_ji_char], 0, 0]], _sipshin_row(sipshin))
+    return labels[int(codes[0])]
+
+
+def yongshin_from_arrays(day_gan_char, shinkang_status):
+    """yongshin_arrays (용신/기신 비트마스크) -> (용신 목록, 기신 목록)."""
+    yongshin, gishin = engine.yongshin_arrays([engine.GAN_INDEX[day_gan_char]], [engine.SHINKANG_LABELS.index(shinkang_status)])
+    return engine.oheng_mask_names(yongshin[0]), engine.oheng_mask_names(gishin[0])
+
+
+def daewoon_from_arrays(year_gan_char, gender, birth_dt, month_gan_char, month_ji_char, solar_data):
+    """saju_batch 대운 시작 계산 + daewoon_arrays (DAEWOON_SEQUENCES 조회표) -> (시작 나이, 순행 여부, [(만 나이, 간지)])."""
+    import saju_batch # NumPy 필요
+
+    month_gapja = engine.GAPJA_NAME_INDEX[month_gan_char + month_ji_char]
+    rows, start_ages = saju_batch._daewoon_starts([birth_dt], [gender], [engine.GAN_INDEX[year_gan_char]], [month_gapja], [True], solar_data)
+    if rows[0] < 0:
+        return None
+    daewoon = engine.daewoon_arrays(rows, start_ages, [0])
+    return (int(start_ages[0]), not rows[0] % 2,
+            [(int(age), engine.GAPJA_NAMES[int(g)]) for age, g in zip(daewoon["age"][0], daewoon["gapja"][0])])
+
+
+def daewoon_periods(result):
+    """get_daewoon 반환값 -> daewoon_from_arrays 형식 (목록 문장에서 만 나이와 간지만, 오류면 None)."""
+    daewoon_list, start_age, is_sunhaeng = result
+    if not daewoon_list or "오류" in daewoon_list[0]:
+        return None
+    return start_age, is_sunhaeng, [(int(re.match(r"만 (\d+)세", item).group(1)), item.rsplit(": ", 1)[1]) for item in daewoon_list]
+
+
+register_candidate("daewoon", "daewoon_arrays", daewoon_from_arrays, daewoon_periods)
+register_candidate("shinkang", "shinkang_arrays", shinkang_from_arrays)
+register_candidate("gekuk", "gekuk_arrays", gekuk_from_arrays)
+register_candidate("yongshin", "yongshin_arrays", yongshin_from_arrays, lambda result: (result["yongshin"], result["gishin"]))
+
+
+# ───────────────────────────────
+# 스윕 생성
+# ───────────────────────────────
+def hourly_datetimes(year):
+    current = datetime(year, 1, 1, 0, 0)
+    end = datetime(year + 1, 1, 1, 0, 0)
+    while current < end:
+        yield current
+        current += timedelta(hours=1)
+
+
+def boundary_datetimes(year, solar_data, window_minutes):
+    """해당 연도의 모든 절입 시각 전후 ±window_minutes 분 (1분 간격)."""
+    seen = set()
+    for term_dt in solar_data.get(year, {}).values():
+        base = term_dt.to_pydatetime().replace(second=0, microsecond=0) if hasattr(term_dt, "to_pydatetime") else term_dt
+        for offset in range(-window_minutes, window_minutes + 1):
+            dt = base + timedelta(minutes=offset)
+            if dt not in seen:
+                seen.add(dt)
+                yield dt
+
+
+# ───────────────────────────────
+# 워커 (프로세스별로 절기 데이터를 한 번만 로딩)
+# ───────────────────────────────
+_worker = {"solar": None, "self_check": False}
+
+
+def _init_worker(file_name, candidate_modules, self_check):
+    for module_name in candidate_modules:
+        importlib.import_module(module_name)
+    _worker["solar"] = engine.load_solar_terms(file_name)
+    _worker["self_check"] = self_check
+
+
+def _safe_call(caller, func, ctx):
+    try:
+        return caller(func, ctx)
+    except Exception as e:  # 후보가 예외를 던지면 그 자체를 불일치로 취급
+        return f"예외({type(e).__name__}: {e})"
+
+
+class _Tally:
+    def __init__(self, max_examples):
+        self.max_examples = max_examples
+        self.checked = {}     # (target, name) -> 비교 횟수
+        self.mismatched = {}  # (target, name) -> 불일치 횟수
+        self.examples = []
+
+    def compare(self, target, name, case, expected, actual):
+        key = (target, name)
+        self.checked[key] = self.checked.get(key, 0) + 1
+        if expected != actual:
+            self.mismatched[key] = self.mismatched.get(key, 0) + 1
+            if sum(1 for e in self.examples if (e["target"], e["candidate"]) == key) < self.max_examples:
+                self.examples.append({"target": target, "candidate": name, "case": case,
+                                      "reference": repr(expected), "candidate_output": repr(actual)})
+
+    def as_dict(self):
+        return {"checked": self.checked, "mismatched": self.mismatched, "examples": self.examples}
+
+
+def _check_datetimes(datetimes, sweep_name, tally, candidates, chart_cache):
+    solar = _worker["solar"]
+    pillar_cands = [c for c in candidates if c[0] in PILLAR_TARGETS]
+    chart_cands = [c for c in candidates if c[0] in CHART_TARGETS]
+    for dt in datetimes:
+        year_str, year_gan, year_ji = ref.get_year_ganji(ref.get_saju_year(dt, solar))
+        month = ref.get_month_ganji(year_gan, dt, solar)
+        day = ref.get_day_ganji(dt.year, dt.month, dt.day)
+        time_p = ref.get_time_ganji(day[1], dt.hour, dt.minute)
+        ctx = {"dt": dt, "solar": solar, "year_gan": year_gan, "month": month, "day": day}
+        expected_cache = {"month_ganji": month, "day_ganji": day, "time_ganji": time_p}
+        case = f"{sweep_name} {dt:%Y-%m-%d %H:%M}"
+        for target, name, func, project in pillar_cands:
+            reference_fn, caller = PILLAR_TARGETS[target]
+            if target == "daewoon":
+                if "오류" in month[0]:
+                    continue  # UI와 동일하게 월주 오류 시 대운은 계산하지 않음
+                for gender in GENDERS:
+                    g_ctx = dict(ctx, gender=gender)
+                    tally.compare(target, name, f"{case} {gender}", _expected(project, _safe_call(caller, reference_fn, g_ctx)),
+                                  _safe_call(caller, func, g_ctx))
+                continue
+            if target == "ilun":
+                if dt.hour or dt.minute:
+                    continue  # 일운은 날짜만 보므로 하루에 한 번만 비교
+                tally.compare(target, name, case, _expected(project, _safe_call(caller, reference_fn, ctx)), _safe_call(caller, func, ctx))
+                continue
+            tally.compare(target, name, case, _expected(project, expected_cache[target]), _safe_call(caller, func, ctx))
+
+        if chart_cands and "오류" not in month[0] and "오류" not in time_p[0]:
+            chart_key = (year_gan, year_ji, month[1], month[2], day[1], day[2], time_p[1], time_p[2])
+            chart_cache.setdefault(chart_key, case)
+
+
+def _check_charts(chart_cache, tally, candidates):
+    chart_cands = [c for c in candidates if c[0] in CHART_TARGETS]
+    for chart_key, case in chart_cache.items():
+        chart = dict(zip(("year_gan", "year_ji", "month_gan", "month_ji", "day_gan", "day_ji", "time_gan", "time_ji"), chart_key))
+        _, sipshin = ref.calculate_ohaeng_sipshin_strengths(chart)
+        shinkang = ref.determine_shinkang_shinyak(sipshin)
+        ctx = {"chart": chart, "sipshin": sipshin, "shinkang": shinkang}
+        chart_case = f"{''.join(chart_key)} (최초: {case})"
+        for target, name, func, project in chart_cands:
+            reference_fn, caller = CHART_TARGETS[target]
+            tally.compare(target, name, chart_case, _expected(project, _safe_call(caller, reference_fn, ctx)), _safe_call(caller, func, ctx))
+
+
+def _run_task(task):
+    kind, year, window_minutes, max_examples = task
+    candidates = active_candidates(_worker["self_check"])
+    tally = _Tally(max_examples)
+    chart_cache = {}
+    if kind == "hourly":
+        _check_datetimes(hourly_datetimes(year), "hourly", tally, candidates, chart_cache)
+    elif kind == "boundary":
+        _check_datetimes(boundary_datetimes(year, _worker["solar"], window_minutes), "boundary", tally, candidates, chart_cache)
+    elif kind == "minutes":
+        # 시주 전수: 일간 10개 × 1440분
+        for target, name, func, project in candidates:
+            if target != "time_ganji":
+                continue
+            reference_fn, _ = PILLAR_TARGETS[target]
+            for day_gan in ref.GAN:
+                for minute_of_day in range(24 * 60):
+                    hour, minute = divmod(minute_of_day, 60)
+                    case = f"minutes 일간={day_gan} {hour:02d}:{minute:02d}"
+                    tally.compare(target, name, case, _expected(project, reference_fn(day_gan, hour, minute)),
+                                  _safe_call(lambda fn, _c: fn(day_gan, hour, minute), func, None))
+    _check_charts(chart_cache, tally, candidates)
+    return tally.as_dict()
+
+
+# ───────────────────────────────
+# 실행 및 보고
+# ───────────────────────────────
+def run_verification(start_year=None, end_year=None, workers=None, window_minutes=120,
+                     candidate_modules=(), self_check=False, max_examples=5, file_name=None):
+    """
+    스윕을 병렬로 실행하고 결과 요약을 반환합니다.
+    반환: {"checked": {(target, name): n}, "mismatched": {...}, "examples": [...], "elapsed": 초}
+    """
+    file_name = file_name or os.path.join(os.path.dirname(os.path.abspath(__file__)), engine.FILE_NAME)
+    for module_name in candidate_modules:
+        importlib.import_module(module_name)
+    candidates = active_candidates(self_check)
+    if not candidates:
+        return {"checked": {}, "mismatched": {}, "examples": [], "elapsed": 0.0}
+
+    solar = engine.load_solar_terms(file_name)
+    if solar is None:
+        raise RuntimeError(f"절기 데이터를 읽을 수 없습니다: {file_name}")
+    start_year = start_year or min(solar)
+    end_year = end_year or max(solar)
+
+    tasks = [("minutes", None, window_minutes, max_examples)]
+    for year in range(start_year, end_year + 1):
+        tasks.append(("hourly", year, window_minutes, max_examples))
+        tasks.append(("boundary", year, window_minutes, max_examples))
+
+    started = time.perf_counter()
+    merged = _Tally(max_examples)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(file_name, tuple(candidate_modules), self_check)) as pool:
+        for result in pool.map(_run_task, tasks):
+            for key, n in result["checked"].items():
+                merged.checked[key] = merged.checked.get(key, 0) + n
+            for key, n in result["mismatched"].items():
+                merged.mismatched[key] = merged.mismatched.get(key, 0) + n
+            for example in result["examples"]:
+                key = (example["target"], example["candidate"])
+                if sum(1 for e in merged.examples if (e["target"], e["candidate"]) == key) < max_examples:
+                    merged.examples.append(example)
+    summary = merged.as_dict()
+    summary["elapsed"] = time.perf_counter() - started
+    return summary
+
+
+def format_report(summary):
+    lines = []
+    if not summary["checked"]:
+        return "등록된 후보 함수가 없습니다. register_candidate()로 후보를 등록하거나 --self-check 를 사용하세요."
+    lines.append(f"{'대상':<14}{'후보':<24}{'비교 수':>12}{'불일치':>10}")
+    for (target, name), n in sorted(summary["checked"].items()):
+        lines.append(f"{target:<14}{name:<24}{n:>12,}{summary['mismatched'].get((target, name), 0):>10,}")
+    if summary["examples"]:
+        lines.append("")
+        lines.append("불일치 예시:")
+        for example in summary["examples"]:
+            lines.append(f"- [{example['target']}/{example['candidate']}] {example['case']}")
+            lines.append(f"    reference : {example['reference']}")
+            lines.append(f"    candidate : {example['candidate_output']}")
+    lines.append("")
+    lines.append(f"소요 시간: {summary['elapsed']:.1f}초, 결과: {'불일치 있음' if summary['mismatched'] else '모두 일치'}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="사주 엔진 reference/최적화 후보 차등 검증")
+    parser.add_argument("--start-year", type=int, default=None)
+    parser.add_argument("--end-year", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--window", type=int, default=120, help="절입 시각 전후 분 단위 스윕 범위 (기본 120분)")
+    parser.add_argument("--candidates", nargs="*", default=[], help="후보를 등록하는 추가 모듈 이름")
+    parser.add_argument("--self-check", action="store_true", help="reference끼리 비교하여 하네스 자체를 점검")
+    parser.add_argument("--max-examples", type=int, default=5)
+    parser.add_argument("--report", help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args(argv)
+
+    summary = run_verification(args.start_year, args.end_year, args.workers, args.window,
+                               args.candidates, args.self_check, args.max_examples)
+    print(format_report(summary))
+    if args.report:
+        serializable = dict(summary,
+                            checked={f"{t}/{n}": v for (t, n), v in summary["checked"].items()},
+                            mismatched={f"{t}/{n}": v for (t, n), v in summary["mismatched"].items()})
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(serializable, f, ensure_ascii=False, indent=2)
+    return 1 if summary["mismatched"] else 0
+
+
+if __name__ == "__main__":
+    # 후보 모듈이 `import saju_verify`로 등록하므로 __main__ 대신 정식 모듈 객체로 실행
+    import saju_verify
+    sys.exit(saju_verify.main())